@@ -0,0 +1,39 @@
+from __future__ import annotations
+
+import asyncio
+from typing import Any
+
+from ...libs.interfaces.llm import LLM, LLMResult
+from ...libs.interfaces.reranker import Reranker
+from ...libs.interfaces.vector_store import Candidate, RankedCandidate, Retriever, SearchFilter
+
+# Await a provider call: native `a*` method when the provider has one,
+# otherwise the sync method on a worker thread so the event loop never blocks.
+
+
+async def aretrieve(
+    retriever: Retriever,
+    query: str,
+    top_k: int,
+    search_filter: SearchFilter | None = None,
+) -> list[Candidate]:
+    fn = getattr(retriever, "aretrieve", None)
+    # Only pass the filter when set so retrievers without filter support keep working.
+    kwargs: dict[str, Any] = {} if search_filter is None else {"search_filter": search_filter}
+    if callable(fn):
+        return await fn(query, top_k, **kwargs)
+    return await asyncio.to_thread(retriever.retrieve, query, top_k, **kwargs)
+
+
+async def agenerate(llm: LLM, mode: str, messages: list[dict[str, Any]], **kwargs: Any) -> LLMResult:
+    fn = getattr(llm, "agenerate", None)
+    if callable(fn):
+        return await fn(mode, messages, **kwargs)
+    return await asyncio.to_thread(llm.generate, mode, messages, **kwargs)
+
+
+async def arerank(reranker: Reranker, query: str, candidates: list[RankedCandidate]) -> list[RankedCandidate]:
+    fn = getattr(reranker, "arerank", None)
+    if callable(fn):
+        return await fn(query, candidates)
+    return await asyncio.to_thread(reranker.rerank, query, candidates)
@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+from typing import Any
+
+from ...ingestion.stages.storage.sqlite import SqliteStore
+from ...libs.interfaces.vector_store import SearchFilter
+
+
+def resolve_search_filter(filters: dict[str, Any] | None, *, sqlite: SqliteStore) -> SearchFilter | None:
+    """Translate `QueryParams.filters` into a `SearchFilter` pushed into the indexes.
+
+    Recognized keys:
+    - `doc_id` / `doc_ids`: restrict to these documents.
+    - `version_id` / `version_ids`: restrict to these versions.
+    - `doc_scope`: a doc id, a list of doc ids, or a dict with the keys above.
+    - `include_deleted`: keep soft-deleted versions (default False).
+
+    Values without any usable id (e.g. `doc_id: 123`, `doc_scope: []`) are ignored.
+
+    Returns None when nothing needs to be restricted.
+    """
+    f = filters if isinstance(filters, dict) else {}
+
+    doc_ids = _collect(f, "doc_id", "doc_ids")
+    version_ids = _collect(f, "version_id", "version_ids")
+    scope = f.get("doc_scope")
+    if isinstance(scope, dict):
+        doc_ids = _intersect(doc_ids, _collect(scope, "doc_id", "doc_ids"))
+        version_ids = _intersect(version_ids, _collect(scope, "version_id", "version_ids"))
+    elif scope is not None:
+        doc_ids = _intersect(doc_ids, _ids(scope))
+
+    exclude: frozenset[str] = frozenset()
+    if not bool(f.get("include_deleted", False)):
+        exclude = frozenset(sqlite.fetch_deleted_version_ids())
+        if version_ids is not None:
+            exclude = exclude & version_ids
+
+    out = SearchFilter(doc_ids=doc_ids, version_ids=version_ids, exclude_version_ids=exclude)
+    return None if out.is_empty() else out
+
+
+def _collect(src: dict[str, Any], one: str, many: str) -> frozenset[str] | None:
+    a = _ids(src[one]) if src.get(one) else None
+    b = _ids(src[many]) if src.get(many) else None
+    return _intersect(a, b)
+
+
+def _ids(v: Any) -> frozenset[str] | None:
+    # Values with no usable id (wrong type, empty list) are ignored rather than
+    # turned into an empty allow-set that would silently match nothing.
+    ids: frozenset[str] = frozenset()
+    if isinstance(v, str):
+        ids = frozenset([v]) if v else frozenset()
+    elif isinstance(v, (list, tuple, set, frozenset)):
+        ids = frozenset(x for x in v if isinstance(x, str) and x)
+    return ids or None
+
+
+def _intersect(a: frozenset[str] | None, b: frozenset[str] | None) -> frozenset[str] | None:
+    if a is None:
+        return b
+    if b is None:
+        return a
+    return a & b
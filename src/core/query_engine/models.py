@@ -8,6 +8,7 @@ from ...libs.interfaces.embedding import Embedder
 from ...libs.interfaces.llm import LLM
 from ...libs.interfaces.reranker import Reranker
 from ...libs.interfaces.vector_store import Candidate, Fusion, Retriever, VectorIndex
+from .result_cache import QueryResultCache
 
 
 @dataclass(frozen=True)
@@ -46,3 +47,6 @@ class QueryRuntime:
     llm: LLM | None = None
     reranker_provider_id: str | None = None
     rerank_profile_id: str | None = None
+    result_cache: QueryResultCache | None = None
+    # Identity of the config / persisted index files the runtime was built from (result-cache keys).
+    config_fingerprint: str = ""
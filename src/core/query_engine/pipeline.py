@@ -1,11 +1,17 @@
 from __future__ import annotations
 
+import asyncio
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, wait
 from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable
 
 from ..response import ResponseIR
 from ...observability.obs import api as obs
 from ...observability.trace.context import TraceContext
-from .models import QueryParams, QueryRuntime
+from ...libs.interfaces.vector_store import Candidate, SearchFilter
+from .filters import resolve_search_filter
+from .models import QueryIR, QueryParams, QueryRuntime
 from .stages.format_response import FormatResponseStage
 from .stages.fusion import FusionStage
 from .stages.query_norm import query_norm
@@ -15,6 +21,11 @@ from .stages.rerank import RerankStage
 from .stages.context_build import ContextBuildStage
 from .stages.generate import GenerateStage
 
+# Shared across pipelines: sparse retrieval overlaps the dense embedding call.
+_POOL_LOCK = threading.Lock()
+_POOL: ThreadPoolExecutor | None = None
+_POOL_WORKERS = 8
+
 
 @dataclass
 class QueryPipeline:
@@ -24,6 +35,11 @@ class QueryPipeline:
     - stage.query_norm
     - stage.retrieve_dense
     - stage.format_response
+
+    With `concurrent_retrieval`, sparse retrieval runs on a shared worker pool
+    while dense retrieval (usually dominated by the query embedding call) runs
+    on the caller's thread; both spans stay children of the trace root.
+    `arun` is the asyncio variant of the same stage sequence.
     """
 
     retrieve_dense: DenseRetrieveStage = field(default_factory=DenseRetrieveStage)
@@ -33,26 +49,33 @@ class QueryPipeline:
     context_build: ContextBuildStage = field(default_factory=ContextBuildStage)
     generate: GenerateStage = field(default_factory=GenerateStage)
     format_response: FormatResponseStage = field(default_factory=FormatResponseStage)
+    concurrent_retrieval: bool = True
 
     def run(self, query: str, *, runtime: QueryRuntime, params: QueryParams) -> ResponseIR:
         trace_id = TraceContext.current().trace_id if TraceContext.current() else ""
+        q, search_filter = self._prepare(query, runtime, params)
+        ctx = TraceContext.current()
 
-        with obs.with_stage("query_norm"):
-            q = query_norm(query)
-            obs.event("query.normalized", {"query_hash": q.query_hash, "rewrite_used": q.rewrite_used})
-            ctx = TraceContext.current()
-            if ctx is not None:
-                ctx.replay_keys["query_hash"] = q.query_hash
-                if q.rewrite_used:
-                    ctx.replay_keys["rewrite_used"] = True
-
-        with obs.with_stage("retrieve_dense", {"top_k": params.top_k}):
-            dense = self.retrieve_dense.run(q, runtime, params)
-            _emit_candidates_event("dense", dense, top_k=params.top_k)
+        concurrent = self.concurrent_retrieval and runtime.sparse_retriever is not None
+        # Forked before the dense span opens, so the sparse span is its sibling.
+        sparse_trace = ctx.fork() if concurrent and ctx is not None else None
+        sparse_job: Future | None = None
+        try:
+            with obs.with_stage("retrieve_dense", {"top_k": params.top_k}):
+                if concurrent:
+                    sparse_job = _submit_traced(sparse_trace, self._run_sparse, q, runtime, params, search_filter)
+                dense = self.retrieve_dense.run(q, runtime, params, search_filter=search_filter)
+                _emit_candidates_event("dense", dense, top_k=params.top_k)
+        except BaseException:
+            # Never leave the sparse stage writing into a trace that is being finished.
+            if sparse_job is not None:
+                wait([sparse_job])
+            raise
 
-        with obs.with_stage("retrieve_sparse", {"top_k": params.top_k}):
-            sparse = self.retrieve_sparse.run(q, runtime, params)
-            _emit_candidates_event("sparse", sparse, top_k=params.top_k)
+        if sparse_job is not None:
+            sparse = sparse_job.result()
+        else:
+            sparse = self._run_sparse(q, runtime, params, search_filter)
 
         candidates_by_source = {"dense": dense, "sparse": sparse}
         with obs.with_stage("fusion"):
@@ -74,6 +97,145 @@ class QueryPipeline:
         with obs.with_stage("format_response"):
             return self.format_response.run(q=q, bundle=bundle, gen=gen, trace_id=trace_id)
 
+    async def arun(self, query: str, *, runtime: QueryRuntime, params: QueryParams) -> ResponseIR:
+        """Async variant of `run`: provider calls are awaited, SQLite work runs on worker threads.
+
+        Dense and sparse retrieval run as concurrent tasks, each under its own
+        trace fork; rerank and generation await the providers' native async
+        methods when they have them (see `aio`). Filter resolution and context
+        building (chunk text lookups) use `asyncio.to_thread`.
+        """
+        trace_id = TraceContext.current().trace_id if TraceContext.current() else ""
+        q, search_filter = await asyncio.to_thread(self._prepare, query, runtime, params)
+        ctx = TraceContext.current()
+
+        if self.concurrent_retrieval and runtime.sparse_retriever is not None:
+            # Forked before either span opens, so both are children of the same parent.
+            dense_job = asyncio.create_task(
+                _atraced(ctx.fork() if ctx is not None else None, self._arun_dense, q, runtime, params, search_filter)
+            )
+            sparse_job = asyncio.create_task(
+                _atraced(ctx.fork() if ctx is not None else None, self._arun_sparse, q, runtime, params, search_filter)
+            )
+            try:
+                dense, sparse = await asyncio.gather(dense_job, sparse_job)
+            except BaseException:
+                # Never leave a stage writing into a trace that is being finished.
+                await asyncio.wait([dense_job, sparse_job])
+                raise
+        else:
+            dense = await self._arun_dense(q, runtime, params, search_filter)
+            sparse = await self._arun_sparse(q, runtime, params, search_filter)
+
+        candidates_by_source = {"dense": dense, "sparse": sparse}
+        with obs.with_stage("fusion"):
+            ranked = self.fusion.run(runtime=runtime, params=params, candidates_by_source=candidates_by_source)
+            _emit_ranked_event(ranked, top_k=params.top_k)
+
+        with obs.with_stage("rerank"):
+            ranked = await self.rerank.arun(q=q, runtime=runtime, params=params, ranked=ranked)
+            ctx = TraceContext.current()
+            if ctx is not None:
+                ctx.replay_keys["ranked_chunk_ids"] = [r.chunk_id for r in ranked[: max(0, params.top_k)]]
+
+        with obs.with_stage("context_build"):
+            bundle = await asyncio.to_thread(self.context_build.run, q=q, runtime=runtime, params=params, ranked=ranked)
+
+        with obs.with_stage("generate"):
+            gen = await self.generate.arun(q=q, bundle=bundle, runtime=runtime, params=params)
+
+        with obs.with_stage("format_response"):
+            return self.format_response.run(q=q, bundle=bundle, gen=gen, trace_id=trace_id)
+
+    def _prepare(
+        self, query: str, runtime: QueryRuntime, params: QueryParams
+    ) -> tuple[QueryIR, SearchFilter | None]:
+        with obs.with_stage("query_norm"):
+            q = query_norm(query)
+            obs.event("query.normalized", {"query_hash": q.query_hash, "rewrite_used": q.rewrite_used})
+            ctx = TraceContext.current()
+            if ctx is not None:
+                ctx.replay_keys["query_hash"] = q.query_hash
+                if q.rewrite_used:
+                    ctx.replay_keys["rewrite_used"] = True
+
+        # Filters are pushed into the index queries so top_k is not eaten by
+        # candidates that ContextBuildStage would drop anyway.
+        search_filter = None
+        if q.query_norm:
+            search_filter = resolve_search_filter(params.filters, sqlite=runtime.sqlite)
+        if search_filter is not None:
+            obs.event(
+                "retrieval.filter",
+                {
+                    "doc_ids": len(search_filter.doc_ids) if search_filter.doc_ids is not None else None,
+                    "version_ids": len(search_filter.version_ids) if search_filter.version_ids is not None else None,
+                    "exclude_version_ids": len(search_filter.exclude_version_ids),
+                },
+            )
+        return q, search_filter
+
+    def _run_sparse(
+        self,
+        q: QueryIR,
+        runtime: QueryRuntime,
+        params: QueryParams,
+        search_filter: SearchFilter | None,
+    ) -> list[Candidate]:
+        with obs.with_stage("retrieve_sparse", {"top_k": params.top_k}):
+            sparse = self.retrieve_sparse.run(q, runtime, params, search_filter=search_filter)
+            _emit_candidates_event("sparse", sparse, top_k=params.top_k)
+        return sparse
+
+    async def _arun_dense(
+        self,
+        q: QueryIR,
+        runtime: QueryRuntime,
+        params: QueryParams,
+        search_filter: SearchFilter | None,
+    ) -> list[Candidate]:
+        with obs.with_stage("retrieve_dense", {"top_k": params.top_k}):
+            dense = await self.retrieve_dense.arun(q, runtime, params, search_filter=search_filter)
+            _emit_candidates_event("dense", dense, top_k=params.top_k)
+        return dense
+
+    async def _arun_sparse(
+        self,
+        q: QueryIR,
+        runtime: QueryRuntime,
+        params: QueryParams,
+        search_filter: SearchFilter | None,
+    ) -> list[Candidate]:
+        with obs.with_stage("retrieve_sparse", {"top_k": params.top_k}):
+            sparse = await self.retrieve_sparse.arun(q, runtime, params, search_filter=search_filter)
+            _emit_candidates_event("sparse", sparse, top_k=params.top_k)
+        return sparse
+
+
+async def _atraced(trace: TraceContext | None, fn: Callable[..., Awaitable[Any]], *args: Any) -> Any:
+    """Await `fn(*args)` with `trace` (a fork) active in the current task."""
+    if trace is None:
+        return await fn(*args)
+    with TraceContext.activate(trace):
+        return await fn(*args)
+
+
+def _submit_traced(trace: TraceContext | None, fn: Callable[..., Any], *args: Any) -> Future:
+    """Run `fn(*args)` on the shared pool with `trace` (a fork) active in the worker."""
+    global _POOL
+    with _POOL_LOCK:
+        if _POOL is None:
+            _POOL = ThreadPoolExecutor(max_workers=_POOL_WORKERS, thread_name_prefix="query-retrieve")
+        pool = _POOL
+
+    def _call() -> Any:
+        if trace is None:
+            return fn(*args)
+        with TraceContext.activate(trace):
+            return fn(*args)
+
+    return pool.submit(_call)
+
 
 def _emit_candidates_event(source: str, candidates: list, *, top_k: int) -> None:
     # Keep the payload small; dashboard can join details from sqlite later.
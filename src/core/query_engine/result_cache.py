@@ -0,0 +1,183 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Protocol
+
+from ..response import ResponseIR, SourceRef
+
+RESULT_CACHE_PROVIDERS = ("query_cache.memory", "query_cache.sqlite")
+
+
+class QueryResultCache(Protocol):
+    def get(self, key: str) -> dict[str, Any] | None:
+        ...
+
+    def put(self, key: str, value: dict[str, Any]) -> None:
+        ...
+
+    def clear(self) -> None:
+        ...
+
+
+@dataclass
+class MemoryResultCache:
+    """In-process LRU with a TTL; thread-safe."""
+
+    max_entries: int = 1024
+    ttl_s: float = 300.0
+    _entries: OrderedDict[str, tuple[float, dict[str, Any]]] = field(default_factory=OrderedDict, repr=False)
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def get(self, key: str) -> dict[str, Any] | None:
+        with self._lock:
+            hit = self._entries.get(key)
+            if hit is None:
+                return None
+            stored_at, value = hit
+            if time.monotonic() - stored_at > self.ttl_s:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def put(self, key: str, value: dict[str, Any]) -> None:
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+@dataclass
+class SqliteResultCache:
+    """Memory LRU in front of a SQLite table, so results survive restarts and are shared across processes."""
+
+    db_path: str = "cache/query_cache.sqlite"
+    ttl_s: float = 86400.0
+    max_entries: int = 100_000
+    memory_entries: int = 1024
+    memory_ttl_s: float = 300.0
+    prune_every: int = 64
+
+    def __post_init__(self) -> None:
+        self._memory = MemoryResultCache(max_entries=self.memory_entries, ttl_s=min(self.memory_ttl_s, self.ttl_s))
+        self._puts = 0
+        Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS query_results (key TEXT PRIMARY KEY, value_json TEXT, created_at REAL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_query_results_created ON query_results(created_at)")
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.db_path)
+
+    def get(self, key: str) -> dict[str, Any] | None:
+        value = self._memory.get(key)
+        if value is not None:
+            return value
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT value_json FROM query_results WHERE key=? AND created_at >= ?",
+                (key, time.time() - self.ttl_s),
+            ).fetchone()
+        if row is None:
+            return None
+        value = json.loads(row[0])
+        self._memory.put(key, value)
+        return value
+
+    def put(self, key: str, value: dict[str, Any]) -> None:
+        self._memory.put(key, value)
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO query_results(key, value_json, created_at) VALUES(?, ?, ?)",
+                (key, json.dumps(value, ensure_ascii=False), now),
+            )
+            self._puts += 1
+            if self._puts % max(1, self.prune_every) == 0:
+                conn.execute("DELETE FROM query_results WHERE created_at < ?", (now - self.ttl_s,))
+                conn.execute(
+                    """
+                    DELETE FROM query_results WHERE key IN (
+                        SELECT key FROM query_results ORDER BY created_at DESC LIMIT -1 OFFSET ?
+                    )
+                    """,
+                    (max(0, self.max_entries),),
+                )
+
+    def clear(self) -> None:
+        self._memory.clear()
+        with self._connect() as conn:
+            conn.execute("DELETE FROM query_results")
+
+
+def make_result_cache(provider_id: str, params: dict[str, Any] | None, *, default_db_path: Path) -> QueryResultCache:
+    kwargs = dict(params or {})
+    if provider_id == "query_cache.memory":
+        return MemoryResultCache(**kwargs)
+    if provider_id == "query_cache.sqlite":
+        kwargs.setdefault("db_path", str(default_db_path))
+        return SqliteResultCache(**kwargs)
+    raise ValueError(f"unknown query cache provider: {provider_id!r} (expected one of {RESULT_CACHE_PROVIDERS})")
+
+
+def result_cache_key(
+    *,
+    query_hash: str,
+    strategy_config_id: str,
+    top_k: int,
+    filters: dict[str, Any] | None,
+    index_generation: int,
+    runtime_fingerprint: str = "",
+    text_norm_profile_id: str = "default",
+    sparse_generation: int = 0,
+) -> str:
+    blob = json.dumps(
+        [
+            query_hash,
+            strategy_config_id,
+            int(top_k),
+            filters or {},
+            int(index_generation),
+            runtime_fingerprint,
+            text_norm_profile_id,
+            int(sparse_generation),
+        ],
+        sort_keys=True,
+        ensure_ascii=False,
+        default=str,
+    )
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+def response_to_cache(resp: ResponseIR, *, replay: dict[str, Any]) -> dict[str, Any]:
+    return {
+        "content_md": resp.content_md,
+        "sources": [asdict(s) for s in resp.sources],
+        "structured": dict(resp.structured),
+        "replay": dict(replay),
+    }
+
+
+def response_from_cache(value: dict[str, Any], *, trace_id: str) -> ResponseIR:
+    return ResponseIR(
+        trace_id=trace_id,
+        content_md=str(value.get("content_md") or ""),
+        sources=[SourceRef(**s) for s in value.get("sources") or []],
+        structured=dict(value.get("structured") or {}),
+    )
@@ -5,6 +5,7 @@ from typing import Any
 
 from ....libs.interfaces.llm import LLM, LLMResult
 from ....observability.obs import api as obs
+from ..aio import agenerate
 from ..models import QueryIR, QueryParams, QueryRuntime
 from .context_build import ContextBundle
 
@@ -38,49 +39,77 @@ class GenerateStage:
         params: QueryParams,
     ) -> GenerationResult:
         _ = params
+        early = _precheck(bundle, runtime.llm)
+        if early is not None:
+            return early
+        try:
+            res = runtime.llm.generate(self.mode, self._messages(q, bundle))
+            return self._accept(res)
+        except Exception as e:
+            return _fallback(bundle, e)
 
-        if not bundle.chunks:
-            return GenerationResult(
-                answer_md="未召回到相关内容，无法生成答案。",
-                used_llm=False,
-                warning="no_context",
-            )
-
-        llm = runtime.llm
-        if llm is None:
-            obs.event("generate.skipped", {"reason": "no_llm"})
-            return GenerationResult(
-                answer_md=_extractive_fallback(bundle),
-                used_llm=False,
-                warning="no_llm",
-            )
-
+    async def arun(
+        self,
+        *,
+        q: QueryIR,
+        bundle: ContextBundle,
+        runtime: QueryRuntime,
+        params: QueryParams,
+    ) -> GenerationResult:
+        _ = params
+        early = _precheck(bundle, runtime.llm)
+        if early is not None:
+            return early
         try:
-            prompt = _build_prompt(q, bundle, max_chunks=self.max_context_chunks)
-            res = llm.generate(
-                self.mode,
-                [
-                    {"role": "system", "content": "You are a RAG document assistant. Answer concisely and cite sources like [1]."},
-                    {"role": "user", "content": prompt},
-                ],
-            )
-            obs.event(
-                "generate.used",
-                {
-                    "mode": self.mode,
-                    "tokens_in": res.tokens_in,
-                    "tokens_out": res.tokens_out,
-                    "has_meta": bool(res.meta),
-                },
-            )
-            return GenerationResult(answer_md=res.text, used_llm=True, llm_meta=dict(res.meta))
+            res = await agenerate(runtime.llm, self.mode, self._messages(q, bundle))
+            return self._accept(res)
         except Exception as e:
-            obs.event("warn.generate_fallback", {"exc_type": type(e).__name__, "message": str(e)})
-            return GenerationResult(
-                answer_md=_extractive_fallback(bundle),
-                used_llm=False,
-                warning=f"llm_failed:{type(e).__name__}",
-            )
+            return _fallback(bundle, e)
+
+    def _messages(self, q: QueryIR, bundle: ContextBundle) -> list[dict[str, Any]]:
+        prompt = _build_prompt(q, bundle, max_chunks=self.max_context_chunks)
+        return [
+            {"role": "system", "content": "You are a RAG document assistant. Answer concisely and cite sources like [1]."},
+            {"role": "user", "content": prompt},
+        ]
+
+    def _accept(self, res: LLMResult) -> GenerationResult:
+        obs.event(
+            "generate.used",
+            {
+                "mode": self.mode,
+                "tokens_in": res.tokens_in,
+                "tokens_out": res.tokens_out,
+                "has_meta": bool(res.meta),
+            },
+        )
+        return GenerationResult(answer_md=res.text, used_llm=True, llm_meta=dict(res.meta))
+
+
+def _precheck(bundle: ContextBundle, llm: LLM | None) -> GenerationResult | None:
+    if not bundle.chunks:
+        return GenerationResult(
+            answer_md="未召回到相关内容，无法生成答案。",
+            used_llm=False,
+            warning="no_context",
+        )
+    if llm is None:
+        obs.event("generate.skipped", {"reason": "no_llm"})
+        return GenerationResult(
+            answer_md=_extractive_fallback(bundle),
+            used_llm=False,
+            warning="no_llm",
+        )
+    return None
+
+
+def _fallback(bundle: ContextBundle, e: Exception) -> GenerationResult:
+    obs.event("warn.generate_fallback", {"exc_type": type(e).__name__, "message": str(e)})
+    return GenerationResult(
+        answer_md=_extractive_fallback(bundle),
+        used_llm=False,
+        warning=f"llm_failed:{type(e).__name__}",
+    )
 
 
 def _build_prompt(q: QueryIR, bundle: ContextBundle, *, max_chunks: int) -> str:
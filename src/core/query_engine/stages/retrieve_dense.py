@@ -2,7 +2,8 @@ from __future__ import annotations
 
 from dataclasses import dataclass
 
-from ....libs.interfaces.vector_store import Candidate
+from ....libs.interfaces.vector_store import Candidate, SearchFilter
+from ..aio import aretrieve
 from ..models import QueryIR, QueryParams, QueryRuntime
 
 
@@ -10,6 +11,23 @@ from ..models import QueryIR, QueryParams, QueryRuntime
 class DenseRetrieveStage:
     """Dense-only retrieval via the configured Retriever provider."""
 
-    def run(self, q: QueryIR, runtime: QueryRuntime, params: QueryParams) -> list[Candidate]:
-        _ = params  # D-2: keep params for later (filters, per-call profile overrides, etc.)
-        return runtime.retriever.retrieve(q.query_norm, params.top_k)
+    def run(
+        self,
+        q: QueryIR,
+        runtime: QueryRuntime,
+        params: QueryParams,
+        search_filter: SearchFilter | None = None,
+    ) -> list[Candidate]:
+        # Only pass the filter when set so retrievers without filter support keep working.
+        if search_filter is None:
+            return runtime.retriever.retrieve(q.query_norm, params.top_k)
+        return runtime.retriever.retrieve(q.query_norm, params.top_k, search_filter=search_filter)
+
+    async def arun(
+        self,
+        q: QueryIR,
+        runtime: QueryRuntime,
+        params: QueryParams,
+        search_filter: SearchFilter | None = None,
+    ) -> list[Candidate]:
+        return await aretrieve(runtime.retriever, q.query_norm, params.top_k, search_filter)
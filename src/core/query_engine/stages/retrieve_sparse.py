@@ -2,7 +2,8 @@ from __future__ import annotations
 
 from dataclasses import dataclass
 
-from ....libs.interfaces.vector_store import Candidate
+from ....libs.interfaces.vector_store import Candidate, SearchFilter
+from ..aio import aretrieve
 from ..models import QueryIR, QueryParams, QueryRuntime
 
 
@@ -10,9 +11,26 @@ from ..models import QueryIR, QueryParams, QueryRuntime
 class SparseRetrieveStage:
     """Sparse-only retrieval via the configured sparse retriever provider."""
 
-    def run(self, q: QueryIR, runtime: QueryRuntime, params: QueryParams) -> list[Candidate]:
+    def run(
+        self,
+        q: QueryIR,
+        runtime: QueryRuntime,
+        params: QueryParams,
+        search_filter: SearchFilter | None = None,
+    ) -> list[Candidate]:
         if runtime.sparse_retriever is None:
             return []
-        _ = params
-        return runtime.sparse_retriever.retrieve(q.query_norm, params.top_k)
+        if search_filter is None:
+            return runtime.sparse_retriever.retrieve(q.query_norm, params.top_k)
+        return runtime.sparse_retriever.retrieve(q.query_norm, params.top_k, search_filter=search_filter)
 
+    async def arun(
+        self,
+        q: QueryIR,
+        runtime: QueryRuntime,
+        params: QueryParams,
+        search_filter: SearchFilter | None = None,
+    ) -> list[Candidate]:
+        if runtime.sparse_retriever is None:
+            return []
+        return await aretrieve(runtime.sparse_retriever, q.query_norm, params.top_k, search_filter)
@@ -1,17 +1,30 @@
 from __future__ import annotations
 
+import time
 from dataclasses import dataclass
 from pathlib import Path
 from typing import Any
 
-from ..strategy import load_settings
+from ..strategy import StrategyLoader, load_settings, merge_provider_overrides
 from ...observability.obs import api as obs
 from ...observability.trace.context import TraceContext
 from ...ingestion.stages.storage.fs import FsStore
-from ...ingestion.stages.storage.fts5 import Fts5Store
+from ...ingestion.stages.storage.fts5 import FTS_TOKENIZERS, Fts5Store
+from ...ingestion.stages.storage.near_dup import NearDupStore
 from ...ingestion.stages.storage.sqlite import SqliteStore
 from ...ingestion.stages.storage.chroma import ChromaStore
+from ...libs.providers import register_builtin_providers
 from ...libs.providers.vector_store.chroma_lite import ChromaLiteVectorIndex
+from ...libs.registry import ProviderRegistry
+
+
+# Vector providers that persist their own copy of the vectors under `paths.chroma_dir`
+# (provider id, default sub-directory, file whose presence means the index exists).
+_PERSISTED_VECTOR_INDEXES = (
+    ("vector.hnsw", "hnsw", "hnsw_graph.npz"),
+    ("vector.segments", "segments", "manifest.json"),
+    ("vector.ivf_pq", "ivf_pq", "ivf_pq.npz"),
+)
 
 
 @dataclass
@@ -25,6 +38,26 @@ class DeleteResult:
     warnings: list[str]
 
 
+@dataclass
+class TrainIndexResult:
+    trace_id: str
+    status: str  # ok|noop|unsupported
+    provider_id: str
+    stats: dict[str, Any]
+    warnings: list[str]
+
+
+@dataclass
+class FtsMaintenanceResult:
+    trace_id: str
+    status: str  # ok|noop
+    before: dict[str, Any]
+    after: dict[str, Any]
+    merge_steps: int
+    complete: bool  # False when the time budget ran out before segments were fully merged
+    warnings: list[str]
+
+
 @dataclass
 class AdminRunner:
     settings_path: str | Path = "config/settings.yaml"
@@ -36,7 +69,14 @@ class AdminRunner:
         version_id: str | None = None,
         mode: str = "soft",
         dry_run: bool = False,
+        strategy_config_id: str | None = None,
     ) -> DeleteResult:
+        """Soft-delete (mark) or hard-delete (purge) a document or one of its versions.
+
+        A hard delete also removes the chunks from the vector index configured by
+        `strategy_config_id` (default: `settings.defaults.strategy_config_id`) and
+        from every HNSW / segment / IVF-PQ index persisted under `paths.chroma_dir`.
+        """
         ctx = TraceContext.new(trace_type="admin.delete", strategy_config_id="admin")
         with TraceContext.activate(ctx):
             with obs.with_stage("delete", {"mode": mode, "dry_run": bool(dry_run)}):
@@ -86,6 +126,10 @@ class AdminRunner:
                     affected["chroma"] = {"vectors": len(chunk_ids)}
                     affected["fts5"] = {"docs": len(chunk_ids)}
                     affected["fs"] = {"md_files": "n/a", "raw_files": len(file_hashes)}
+                    affected["vector_indexes"] = {
+                        label: len(chunk_ids)
+                        for label, _ in _vector_indexes(settings, strategy_config_id, warnings, open_=False)
+                    }
                     trace = ctx.finish()
                     return DeleteResult(
                         trace_id=trace.trace_id,
@@ -102,6 +146,13 @@ class AdminRunner:
                 fts5.delete(chunk_ids)
                 affected["chroma"] = {"vectors": len(chunk_ids)}
                 affected["fts5"] = {"docs": len(chunk_ids)}
+                near_dup_path = settings.paths.sqlite_dir / "near_dup.sqlite"
+                if near_dup_path.exists():
+                    NearDupStore(db_path=near_dup_path).delete(chunk_ids)
+                affected["vector_indexes"] = {}
+                for label, index in _vector_indexes(settings, strategy_config_id, warnings):
+                    index.delete(chunk_ids)
+                    affected["vector_indexes"][label] = len(chunk_ids)
 
                 # 2) sqlite rows
                 affected["sqlite"]["chunk_assets"] = sqlite.delete_chunk_assets(chunk_ids)
@@ -136,3 +187,200 @@ class AdminRunner:
                     affected=affected,
                     warnings=warnings,
                 )
+
+    def train_vector_index(self, *, strategy_config_id: str) -> TrainIndexResult:
+        """Train/rebuild the strategy's vector index from the vectors already stored.
+
+        Only providers exposing `train()` (e.g. `vector.ivf_pq`) need this; others
+        report `unsupported`.
+        """
+        ctx = TraceContext.new(trace_type="admin.train_vector_index", strategy_config_id=strategy_config_id)
+        with TraceContext.activate(ctx):
+            with obs.with_stage("train_vector_index"):
+                settings = load_settings(self.settings_path)
+                strategy = StrategyLoader().load(strategy_config_id)
+                strategy.providers = merge_provider_overrides(
+                    strategy.providers,
+                    settings.raw.get("providers"),
+                    settings.raw.get("model_endpoints"),
+                )
+                provider_id, params = strategy.resolve_provider("vector_index")
+
+                registry = ProviderRegistry()
+                register_builtin_providers(registry)
+                index = registry.create("vector_index", provider_id, **_vector_index_kwargs(provider_id, params, settings))
+
+                train = getattr(index, "train", None)
+                if not callable(train):
+                    trace = ctx.finish()
+                    return TrainIndexResult(
+                        trace_id=trace.trace_id,
+                        status="unsupported",
+                        provider_id=provider_id,
+                        stats={},
+                        warnings=["provider_has_no_train"],
+                    )
+
+                stats = dict(train() or {})
+                obs.event("vector_index.trained", {"provider_id": provider_id, **stats})
+                trace = ctx.finish()
+                return TrainIndexResult(
+                    trace_id=trace.trace_id,
+                    status="ok" if stats.get("trained") else "noop",
+                    provider_id=provider_id,
+                    stats=stats,
+                    warnings=[],
+                )
+
+    def maintain_fts_index(
+        self,
+        *,
+        budget_s: float = 5.0,
+        merge_pages: int = 256,
+        automerge: int | None = None,
+        crisismerge: int | None = None,
+        stats_only: bool = False,
+        tokenizer: str | None = None,
+    ) -> FtsMaintenanceResult:
+        """Report FTS5 segment/size stats and merge segments within `budget_s`.
+
+        Merging runs as short incremental steps (`merge_pages` leaf pages each),
+        at least one per call, so it can be re-run until `complete`;
+        `automerge` / `crisismerge` are persisted in the index before merging.
+        A `tokenizer` other than the index's current profile re-indexes every
+        chunk with it first (the only place the profile is switched).
+        """
+        ctx = TraceContext.new(trace_type="admin.maintain_fts_index", strategy_config_id="admin")
+        with TraceContext.activate(ctx):
+            with obs.with_stage("maintain_fts_index", {"budget_s": budget_s, "stats_only": bool(stats_only)}):
+                settings = load_settings(self.settings_path)
+                fts5 = Fts5Store(db_path=settings.paths.sqlite_dir / "fts.sqlite")
+
+                warnings: list[str] = []
+                if automerge is not None and not 0 <= automerge <= 16:
+                    automerge = None
+                    warnings.append("invalid_automerge_ignored")
+                if crisismerge is not None and not 2 <= crisismerge <= 64:
+                    crisismerge = None
+                    warnings.append("invalid_crisismerge_ignored")
+                if tokenizer is not None and tokenizer not in FTS_TOKENIZERS:
+                    tokenizer = None
+                    warnings.append("invalid_tokenizer_ignored")
+
+                before = fts5.index_stats()
+                steps = 0
+                merged = False
+                complete = before["segments"] <= 1
+                rebuilt = not stats_only and tokenizer is not None and tokenizer != before["tokenizer"]
+                if rebuilt:
+                    fts5.rebuild(tokenizer)
+                if not stats_only:
+                    fts5.configure_merge(automerge=automerge, crisismerge=crisismerge)
+                    deadline = time.monotonic() + max(0.0, float(budget_s))
+                    # Always take at least one step: a lone segment may still carry
+                    # delete tombstones, so only `merge_step` can tell it is done.
+                    while True:
+                        complete = not fts5.merge_step(merge_pages)
+                        merged = merged or not complete
+                        steps += 1
+                        if complete or time.monotonic() >= deadline:
+                            break
+                after = fts5.index_stats()
+
+                obs.event(
+                    "fts5.maintained",
+                    {
+                        "segments_before": before["segments"],
+                        "segments_after": after["segments"],
+                        "index_bytes_before": before["index_bytes"],
+                        "index_bytes_after": after["index_bytes"],
+                        "merge_steps": steps,
+                        "complete": complete,
+                        "tokenizer_before": before["tokenizer"],
+                        "tokenizer_after": after["tokenizer"],
+                    },
+                )
+                trace = ctx.finish()
+                changed = merged or rebuilt or automerge is not None or crisismerge is not None
+                return FtsMaintenanceResult(
+                    trace_id=trace.trace_id,
+                    status="ok" if changed else "noop",
+                    before=before,
+                    after=after,
+                    merge_steps=steps,
+                    complete=complete,
+                    warnings=warnings + (["stats_only"] if stats_only else []),
+                )
+
+
+def _vector_index_kwargs(provider_id: str, params: dict[str, Any] | None, settings: Any) -> dict[str, Any]:
+    """Provider kwargs with the same default locations the ingest/query runners use."""
+    chroma_dir = settings.paths.chroma_dir
+    kwargs = dict(params or {})
+    if provider_id in {"vector.chroma_lite", "vector.ivf_pq"}:
+        kwargs.setdefault("db_path", str(chroma_dir / "chroma_lite.sqlite"))
+    if provider_id == "vector.chroma":
+        kwargs.setdefault("persist_dir", str(chroma_dir / "chroma"))
+    for pid, sub, _ in _PERSISTED_VECTOR_INDEXES:
+        if provider_id == pid:
+            kwargs.setdefault("persist_dir", str(chroma_dir / sub))
+    return kwargs
+
+
+def _vector_indexes(
+    settings: Any,
+    strategy_config_id: str | None,
+    warnings: list[str],
+    *,
+    open_: bool = True,
+) -> list[tuple[str, Any]]:
+    """Vector indexes (besides the default ChromaLite store) that hold copies of chunk vectors.
+
+    The strategy's configured provider comes first, then any persisted HNSW /
+    segment / IVF-PQ index found under `paths.chroma_dir`. With `open_=False`
+    only the labels are resolved (dry runs).
+    """
+    default_lite = str(settings.paths.chroma_dir / "chroma_lite.sqlite")
+    targets: list[tuple[str, dict[str, Any]]] = []
+
+    scfg_id = strategy_config_id or settings.defaults.strategy_config_id
+    if scfg_id:
+        try:
+            strategy = StrategyLoader().load(scfg_id)
+            provider_id, params = strategy.resolve_provider("vector_index")
+        except Exception:
+            warnings.append("strategy_vector_index_unavailable")
+        else:
+            kwargs = _vector_index_kwargs(provider_id, params, settings)
+            persist_dir = kwargs.get("persist_dir")
+            if provider_id == "vector.chroma_lite" and kwargs.get("db_path") == default_lite:
+                pass  # already purged through ChromaStore
+            elif persist_dir and not Path(str(persist_dir)).exists():
+                pass  # nothing persisted yet
+            else:
+                targets.append((provider_id, kwargs))
+
+    for pid, sub, marker in _PERSISTED_VECTOR_INDEXES:
+        if (settings.paths.chroma_dir / sub / marker).exists():
+            targets.append((pid, _vector_index_kwargs(pid, None, settings)))
+
+    seen: set[tuple[str, str]] = set()
+    out: list[tuple[str, Any]] = []
+    registry: ProviderRegistry | None = None
+    for pid, kwargs in targets:
+        key = (pid, str(kwargs.get("persist_dir") or kwargs.get("db_path") or ""))
+        if key in seen:
+            continue
+        seen.add(key)
+        label = f"{pid}:{key[1]}" if key[1] else pid
+        if not open_:
+            out.append((label, None))
+            continue
+        if registry is None:
+            registry = ProviderRegistry()
+            register_builtin_providers(registry)
+        try:
+            out.append((label, registry.create("vector_index", pid, **kwargs)))
+        except Exception:
+            warnings.append(f"vector_index_unavailable:{label}")
+    return out
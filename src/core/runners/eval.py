@@ -91,8 +91,14 @@ class EvalRunner:
         aggregates: dict[str, list[float]] = {}
 
         runner = QueryRunner(settings_path=self.settings_path, settings=settings)
-        for case in dataset.iter_cases():
-            resp = runner.run(case.query, strategy_config_id=strategy_config_id, top_k=top_k)
+        cases = list(dataset.iter_cases())
+        # One runtime and one batched dense pass over the index for the whole dataset.
+        responses = runner.run_batch(
+            [case.query for case in cases],
+            strategy_config_id=strategy_config_id,
+            top_k=top_k,
+        )
+        for case, resp in zip(cases, responses):
             run_output = _response_to_run_output(resp, sqlite, top_k=top_k)
             result = evaluator.evaluate_case(case, run_output)
             trace_id = resp.trace.trace_id if resp.trace is not None else resp.trace_id
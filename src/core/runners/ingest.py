@@ -15,13 +15,16 @@ from ...ingestion.stages.receive.loader import LoaderStage
 from ...ingestion.stages.storage.assets import AssetStore
 from ...ingestion.stages.storage.fs import FsStore
 from ...ingestion.stages.storage.fts5 import Fts5Store
+from ...ingestion.stages.storage.near_dup import NearDupStore
 from ...ingestion.stages.storage.sqlite import SqliteStore
 from ...ingestion.stages.storage.upsert import UpsertResult, UpsertStage
 from ...ingestion.stages.transform.asset_normalize import FsAssetNormalizer
+from ...ingestion.stages.transform.near_dup import NearDupConfig, NearDupStage
 from ...ingestion.stages.transform.transform_post import TransformPostStage
 from ...ingestion.stages.transform.retrieval_view import RetrievalViewConfig
 from ...ingestion.stages.transform.transform_pre import DefaultTransformPre, TransformPreStage
 from ...libs.providers import register_builtin_providers
+from ...libs.providers.embedding.cache import embedder_cache_id, make_embedding_cache
 from ...libs.registry import ProviderRegistry
 from ..response import ResponseIR
 from ..strategy import StrategyLoader, load_settings, merge_provider_overrides
@@ -110,7 +113,6 @@ def _build_ingestion_pipeline(strategy_config_id: str, *, settings_path: Path) -
     # Stores (cross-stage dependencies)
     fs_store = FsStore(raw_dir=settings.paths.raw_dir, md_dir=settings.paths.md_dir)
     sqlite_store = SqliteStore(db_path=settings.paths.sqlite_dir / "app.sqlite")
-    fts5 = Fts5Store(db_path=settings.paths.sqlite_dir / "fts.sqlite")
     assets_dir = settings.paths.assets_dir
     assets_store = AssetStore(assets_dir=assets_dir)
 
@@ -138,6 +140,24 @@ def _build_ingestion_pipeline(strategy_config_id: str, *, settings_path: Path) -
     except Exception:
         pass
 
+    # Sparse index tokenizer profile follows the FTS5 retriever so both sides agree.
+    fts_tokenizer = None
+    # BM25 retrievers keep a derived index file plus an in-memory delta of newer
+    # rows; refreshing right after upsert runs any due rebuild here, not in a query.
+    bm25_retriever = None
+    if "sparse_retriever" in strategy.providers:
+        sparse_provider_id, sparse_params = strategy.resolve_provider("sparse_retriever")
+        if sparse_provider_id == "sparse_retriever.fts5":
+            fts_tokenizer = (sparse_params or {}).get("tokenizer")
+        elif sparse_provider_id == "sparse_retriever.bm25":
+            bm25_retriever = registry.create(
+                "sparse_retriever",
+                sparse_provider_id,
+                db_path=str(settings.paths.sqlite_dir / "fts.sqlite"),
+                **(sparse_params or {}),
+            )
+    fts5 = Fts5Store(db_path=settings.paths.sqlite_dir / "fts.sqlite", tokenizer=fts_tokenizer)
+
     # Loader dispatch: md uses configured provider; pdf always available as built-in.
     md_loader = registry.create("loader", loader_provider_id, **(loader_params or {}))
     pdf_loader = registry.create("loader", "loader.pdf")
@@ -154,6 +174,13 @@ def _build_ingestion_pipeline(strategy_config_id: str, *, settings_path: Path) -
         vec_kwargs["db_path"] = str(settings.paths.chroma_dir / "chroma_lite.sqlite")
     if vector_provider_id == "vector.chroma" and "persist_dir" not in vec_kwargs:
         vec_kwargs["persist_dir"] = str(settings.paths.chroma_dir / "chroma")
+    if vector_provider_id == "vector.hnsw" and "persist_dir" not in vec_kwargs:
+        vec_kwargs["persist_dir"] = str(settings.paths.chroma_dir / "hnsw")
+    if vector_provider_id == "vector.segments" and "persist_dir" not in vec_kwargs:
+        vec_kwargs["persist_dir"] = str(settings.paths.chroma_dir / "segments")
+    if vector_provider_id == "vector.ivf_pq":
+        vec_kwargs.setdefault("db_path", str(settings.paths.chroma_dir / "chroma_lite.sqlite"))
+        vec_kwargs.setdefault("persist_dir", str(settings.paths.chroma_dir / "ivf_pq"))
     vector_index = registry.create("vector_index", vector_provider_id, **vec_kwargs)
 
     # Stages
@@ -189,9 +216,33 @@ def _build_ingestion_pipeline(strategy_config_id: str, *, settings_path: Path) -
         pass
 
     transform_post = TransformPostStage(view_cfg=view_cfg, enrichers=enrichers or None, sqlite=sqlite_store)
+    # Near-duplicate detection (MinHash/LSH): off unless the strategy sets a policy.
+    near_dup_cfg = NearDupConfig()
+    if "near_dup" in strategy.providers:
+        _, nd_params = strategy.resolve_provider("near_dup")
+        near_dup_cfg = NearDupConfig.from_params(nd_params)
+    near_dup = NearDupStage(
+        cfg=near_dup_cfg,
+        store=(
+            NearDupStore(db_path=settings.paths.sqlite_dir / "near_dup.sqlite")
+            if near_dup_cfg.policy != "off"
+            else None
+        ),
+        sqlite=sqlite_store,
+    )
+    # Persistent embedding cache (optional): unchanged chunk texts skip the embedder on re-ingest.
+    embedding_cache = None
+    if "embedding_cache" in strategy.providers:
+        cache_provider_id, cache_params = strategy.resolve_provider("embedding_cache")
+        embedding_cache = make_embedding_cache(
+            cache_provider_id,
+            cache_params,
+            default_db_path=settings.paths.cache_dir / "embeddings.sqlite",
+        )
     embedding = EmbeddingStage(
         embedder=embedder,
-        embedder_id=embedder_provider_id,
+        cache=embedding_cache,
+        embedder_id=embedder_cache_id(embedder_provider_id, embedder_params),
         embedder_version=str(embedder_params.get("version", "0")) if isinstance(embedder_params, dict) else "0",
     )
     upsert = UpsertStage(
@@ -305,6 +356,13 @@ def _build_ingestion_pipeline(strategy_config_id: str, *, settings_path: Path) -
         state.chunks = transform_post.run(state.chunks)
         return state
 
+    def st_near_dup(state: IngestState, ctx) -> IngestState:
+        if state.skipped:
+            return state
+        assert state.chunks is not None
+        state.chunks = near_dup.run(state.chunks, doc_id=state.doc_id, version_id=state.version_id)
+        return state
+
     def st_embedding(state: IngestState, ctx) -> IngestState:
         if state.skipped:
             return state
@@ -334,6 +392,8 @@ def _build_ingestion_pipeline(strategy_config_id: str, *, settings_path: Path) -
             chunks=state.chunks,
             encoded=state.encoded,
         )
+        if bm25_retriever is not None:
+            bm25_retriever.index()
         return state
 
     providers_snapshot = _build_providers_snapshot(
@@ -358,6 +418,7 @@ def _build_ingestion_pipeline(strategy_config_id: str, *, settings_path: Path) -
         StageSpec(name="section_assets", fn=st_section_assets),
         StageSpec(name="chunker", fn=st_chunker),
         StageSpec(name="transform_post", fn=st_transform_post),
+        StageSpec(name="near_dup", fn=st_near_dup),
         StageSpec(name="embedding", fn=st_embedding),
         StageSpec(name="upsert", fn=st_upsert),
     ]
@@ -1,20 +1,54 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+import asyncio
+import hashlib
+import json
+import os
+import threading
+from dataclasses import dataclass, field, replace
 from pathlib import Path
 from typing import Any, Callable
 
 from ...ingestion.stages.storage.sqlite import SqliteStore
 from ...libs.factories import make_embedding, make_llm
+from ...libs.providers.embedding.cache import embedder_cache_id, make_embedding_cache
 from ...libs.providers import register_builtin_providers
 from ...libs.registry import ProviderRegistry
+from ...observability.obs import api as obs
 from ...observability.trace.context import TraceContext
+from ...libs.interfaces.vector_store import Candidate, Retriever, SearchFilter
 from ..query_engine import QueryParams, QueryPipeline, QueryRuntime
+from ..query_engine.filters import resolve_search_filter
+from ..query_engine.result_cache import make_result_cache, response_from_cache, response_to_cache, result_cache_key
+from ..query_engine.stages.query_norm import query_norm
 from ..response import ResponseIR
-from ..strategy import Settings, StrategyLoader, load_settings, merge_provider_overrides
+from ..strategy import Settings, StrategyLoader, load_settings, merge_provider_overrides, settings_sources
 
 RuntimeBuilder = Callable[[str], QueryRuntime]
 
+# Process-level runtime cache: (strategy_config_id, settings identity) -> warm runtime.
+_RUNTIME_LOCK = threading.Lock()
+_RUNTIMES: dict[tuple[str, str], "_CachedRuntime"] = {}
+
+
+# Files persisted by vector indexes that load them once at construction
+# (HNSW graph, segment manifest, IVF-PQ codebook).
+_PERSISTED_INDEX_FILES = ("hnsw_graph.npz", "hnsw_graph.log", "manifest.json", "ivf_pq.npz")
+
+
+@dataclass(frozen=True)
+class _CachedRuntime:
+    fingerprint: tuple
+    runtime: QueryRuntime
+    providers_snapshot: dict[str, Any] = field(default_factory=dict)
+    index_stamp: tuple = ()
+
+
+def clear_runtime_cache() -> None:
+    """Drop every cached query runtime (next query rebuilds providers)."""
+    with _RUNTIME_LOCK:
+        _RUNTIMES.clear()
+
 
 @dataclass
 class _InitErrorReranker:
@@ -26,16 +60,44 @@ class _InitErrorReranker:
         raise RuntimeError(f"reranker_init_failed:{self.provider_id}:{self.err_message}")
 
 
+@dataclass
+class _PrefetchedRetriever:
+    """Serves dense hits computed up front by `retrieve_batch`; misses go to `inner`."""
+
+    inner: Retriever
+    hits: dict[str, list[Candidate]]
+    top_k: int
+
+    def retrieve(self, query: str, top_k: int, search_filter: SearchFilter | None = None) -> list[Candidate]:
+        cached = self.hits.get(query)
+        if cached is not None and top_k == self.top_k:
+            return list(cached)
+        if search_filter is None:
+            return self.inner.retrieve(query, top_k)
+        return self.inner.retrieve(query, top_k, search_filter=search_filter)
+
+
 @dataclass
 class QueryRunner:
     """User-facing query entry for core (MCP tool will call this).
 
     D-1 scope: no LLM generation; returns an extractive markdown response.
+
+    Runtimes built from settings are cached per process and keyed by
+    `(strategy_config_id, settings fingerprint)`; the fingerprint covers the
+    strategy file and every settings source file, so editing either rebuilds
+    the runtime on the next query. A runtime is also rebuilt once the vector
+    index's persisted files change (see `_index_stamp`). `cache_runtime=False`
+    rebuilds every time.
+
+    A strategy with a `query_cache` provider (`query_cache.memory` /
+    `query_cache.sqlite`) answers repeated queries from cache; see `_cache_lookup`.
     """
 
     runtime_builder: RuntimeBuilder | None = None
     settings_path: str | Path = "config/settings.yaml"
     settings: Settings | None = None
+    cache_runtime: bool = True
 
     def run(
         self,
@@ -47,19 +109,246 @@ class QueryRunner:
     ) -> ResponseIR:
         ctx = TraceContext.new(trace_type="query", strategy_config_id=strategy_config_id)
         with TraceContext.activate(ctx):
-            if self.runtime_builder is not None:
-                runtime = self.runtime_builder(strategy_config_id)
-            elif self.settings is not None:
-                runtime = _build_query_runtime_from_settings(
-                    strategy_config_id,
-                    settings=self.settings,
-                )
-            else:
-                runtime = _build_query_runtime(strategy_config_id, settings_path=self.settings_path)
+            runtime = self._build_runtime(strategy_config_id)
             params = QueryParams(top_k=top_k, filters=filters)
-            resp = QueryPipeline().run(query, runtime=runtime, params=params)
+            resp, cache_key = _cache_lookup(query, strategy_config_id=strategy_config_id, runtime=runtime, params=params)
+            if resp is None:
+                resp = QueryPipeline().run(query, runtime=runtime, params=params)
             resp.trace = ctx.finish()
-            return resp
+        _cache_store(runtime, cache_key, resp)
+        return resp
+
+    async def arun(
+        self,
+        query: str,
+        *,
+        strategy_config_id: str,
+        top_k: int = 5,
+        filters: dict | None = None,
+    ) -> ResponseIR:
+        """Async `run` for event-loop callers; provider I/O is awaited, not blocking.
+
+        A cold runtime is built on a worker thread so provider construction does
+        not stall the loop; the result-cache lookup and store run there too.
+        """
+        ctx = TraceContext.new(trace_type="query", strategy_config_id=strategy_config_id)
+        with TraceContext.activate(ctx):
+            runtime = await asyncio.to_thread(self._build_runtime, strategy_config_id)
+            params = QueryParams(top_k=top_k, filters=filters)
+            resp, cache_key = await asyncio.to_thread(
+                _cache_lookup, query, strategy_config_id=strategy_config_id, runtime=runtime, params=params
+            )
+            if resp is None:
+                resp = await QueryPipeline().arun(query, runtime=runtime, params=params)
+            resp.trace = ctx.finish()
+        await asyncio.to_thread(_cache_store, runtime, cache_key, resp)
+        return resp
+
+    def run_batch(
+        self,
+        queries: list[str],
+        *,
+        strategy_config_id: str,
+        top_k: int = 5,
+        filters: dict | None = None,
+    ) -> list[ResponseIR]:
+        """Run many queries against one runtime (eval / bulk callers).
+
+        When the dense retriever offers `retrieve_batch`, dense retrieval for all
+        queries is done up front in a single pass over the index. Every query
+        still gets its own trace.
+        """
+        if not queries:
+            return []
+        setup = TraceContext.new(trace_type="query", strategy_config_id=strategy_config_id)
+        with TraceContext.activate(setup):
+            runtime = self._build_runtime(strategy_config_id)
+            params = QueryParams(top_k=top_k, filters=filters)
+            misses = [
+                q for q in queries if not _cache_has(q, strategy_config_id=strategy_config_id, runtime=runtime, params=params)
+            ]
+            runtime = _prefetch_dense(misses, runtime=runtime, params=params)
+
+        out: list[ResponseIR] = []
+        for query in queries:
+            ctx = TraceContext.new(trace_type="query", strategy_config_id=strategy_config_id)
+            ctx.providers_snapshot = dict(setup.providers_snapshot)
+            with TraceContext.activate(ctx):
+                resp, cache_key = _cache_lookup(query, strategy_config_id=strategy_config_id, runtime=runtime, params=params)
+                if resp is None:
+                    resp = QueryPipeline().run(query, runtime=runtime, params=params)
+                resp.trace = ctx.finish()
+            _cache_store(runtime, cache_key, resp)
+            out.append(resp)
+        return out
+
+    def _build_runtime(self, strategy_config_id: str) -> QueryRuntime:
+        if self.runtime_builder is not None:
+            return self.runtime_builder(strategy_config_id)
+        try:
+            key, fingerprint = self._runtime_key(strategy_config_id)
+        except FileNotFoundError:
+            return self._build_uncached(strategy_config_id)  # raises the loader's error
+        if not self.cache_runtime:
+            return _with_fingerprint(self._build_uncached(strategy_config_id), fingerprint)
+
+        ctx = TraceContext.current()
+        with _RUNTIME_LOCK:
+            cached = _RUNTIMES.get(key)
+        if (
+            cached is not None
+            and cached.fingerprint == fingerprint
+            and cached.index_stamp == _index_stamp(cached.runtime)
+        ):
+            if ctx is not None:
+                ctx.providers_snapshot = dict(cached.providers_snapshot)
+            return cached.runtime
+
+        runtime = _with_fingerprint(self._build_uncached(strategy_config_id), fingerprint)
+        # A reranker that failed to initialize is retried on the next query, not pinned.
+        if not isinstance(runtime.reranker, _InitErrorReranker):
+            snapshot = dict(ctx.providers_snapshot) if ctx is not None else {}
+            with _RUNTIME_LOCK:
+                _RUNTIMES[key] = _CachedRuntime(
+                    fingerprint=fingerprint,
+                    runtime=runtime,
+                    providers_snapshot=snapshot,
+                    index_stamp=_index_stamp(runtime),
+                )
+        return runtime
+
+    def _build_uncached(self, strategy_config_id: str) -> QueryRuntime:
+        if self.settings is not None:
+            return _build_query_runtime_from_settings(strategy_config_id, settings=self.settings)
+        return _build_query_runtime(strategy_config_id, settings_path=self.settings_path)
+
+    def _runtime_key(self, strategy_config_id: str) -> tuple[tuple[str, str], tuple]:
+        strategy_stamp = _file_stamp(StrategyLoader().resolve_path(strategy_config_id))
+        if self.settings is not None:
+            blob = json.dumps(self.settings.raw, sort_keys=True, default=str) + repr(self.settings.paths)
+            digest = hashlib.sha256(blob.encode("utf-8")).hexdigest()
+            return (strategy_config_id, f"settings:{digest}"), (strategy_stamp,)
+        sources = settings_sources(self.settings_path)
+        stamps = tuple((str(p), _file_stamp(p)) for p in sources)
+        return (strategy_config_id, str(sources[0])), (strategy_stamp, stamps)
+
+
+def _index_stamp(runtime: QueryRuntime) -> tuple:
+    """Stamps of the vector index's persisted files.
+
+    Indexes such as HNSW or IVF-PQ load their graph / codebook once, so a
+    runtime built before another process rewrote them must be rebuilt. Plain
+    corpus writes do not count: the ChromaLite matrix cache and the result
+    cache keys already follow the store generations.
+    """
+    persist_dir = getattr(runtime.vector_index, "persist_dir", None)
+    if not persist_dir:
+        return ()
+    return tuple((name, _file_stamp(Path(persist_dir) / name)) for name in _PERSISTED_INDEX_FILES)
+
+
+def _with_fingerprint(runtime: QueryRuntime, fingerprint: tuple) -> QueryRuntime:
+    """`runtime` tagged with a digest of its config files and persisted index files."""
+    blob = json.dumps([fingerprint, _index_stamp(runtime)], default=str)
+    return replace(runtime, config_fingerprint=hashlib.sha256(blob.encode("utf-8")).hexdigest())
+
+
+def _file_stamp(path: Path) -> tuple[int, int]:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return (0, 0)
+    return (st.st_mtime_ns, st.st_size)
+
+
+def _cache_key(query: str, *, strategy_config_id: str, runtime: QueryRuntime, params: QueryParams) -> tuple[str, str, int]:
+    q = query_norm(query)
+    generation = runtime.sqlite.generation()
+    sparse_generation = getattr(runtime.sparse_retriever, "generation", None)
+    key = result_cache_key(
+        query_hash=q.query_hash,
+        strategy_config_id=strategy_config_id,
+        top_k=params.top_k,
+        filters=params.filters,
+        index_generation=generation,
+        runtime_fingerprint=runtime.config_fingerprint,
+        text_norm_profile_id=params.text_norm_profile_id,
+        sparse_generation=sparse_generation() if callable(sparse_generation) else 0,
+    )
+    return key, q.query_hash, generation
+
+
+def _cache_has(query: str, *, strategy_config_id: str, runtime: QueryRuntime, params: QueryParams) -> bool:
+    if runtime.result_cache is None:
+        return False
+    key, _, _ = _cache_key(query, strategy_config_id=strategy_config_id, runtime=runtime, params=params)
+    return runtime.result_cache.get(key) is not None
+
+
+def _cache_lookup(
+    query: str,
+    *,
+    strategy_config_id: str,
+    runtime: QueryRuntime,
+    params: QueryParams,
+) -> tuple[ResponseIR | None, str | None]:
+    """Serve a cached response, or return the key to store the fresh one under.
+
+    The key includes the app store's and the sparse index's write generations
+    and the runtime's config fingerprint, so any ingest, delete, FTS rebuild,
+    strategy/settings edit or index retrain makes earlier entries unreachable
+    (they age out of the cache).
+    """
+    cache = runtime.result_cache
+    if cache is None:
+        return None, None
+    with obs.with_stage("query_cache"):
+        key, query_hash, generation = _cache_key(
+            query, strategy_config_id=strategy_config_id, runtime=runtime, params=params
+        )
+        value = cache.get(key)
+        attrs = {"query_hash": query_hash, "index_generation": generation, "top_k": params.top_k}
+        ctx = TraceContext.current()
+        if value is None:
+            obs.event("query_cache.miss", attrs)
+            return None, key
+        obs.event("query_cache.hit", attrs)
+        if ctx is not None:
+            ctx.replay_keys.update(value.get("replay") or {})
+        return response_from_cache(value, trace_id=ctx.trace_id if ctx is not None else ""), None
+
+
+def _cache_store(runtime: QueryRuntime, key: str | None, resp: ResponseIR) -> None:
+    # Degraded answers (rerank / LLM fallbacks, errors) are recomputed rather than pinned.
+    if key is None or runtime.result_cache is None or resp.trace is None:
+        return
+    if resp.trace.status != "ok":
+        return
+    for span in resp.trace.spans:
+        if any(e.kind.startswith("warn.") for e in span.events):
+            return
+    runtime.result_cache.put(key, response_to_cache(resp, replay=resp.trace.replay))
+
+
+def _prefetch_dense(queries: list[str], *, runtime: QueryRuntime, params: QueryParams) -> QueryRuntime:
+    retrieve_batch = getattr(runtime.retriever, "retrieve_batch", None)
+    if not callable(retrieve_batch):
+        return runtime
+    norms = [query_norm(q).query_norm for q in queries]
+    todo = sorted({n for n in norms if n})
+    if not todo:
+        return runtime
+    search_filter = resolve_search_filter(params.filters, sqlite=runtime.sqlite)
+    if search_filter is None:
+        batches = retrieve_batch(todo, params.top_k)
+    else:
+        batches = retrieve_batch(todo, params.top_k, search_filter=search_filter)
+    prefetched = _PrefetchedRetriever(
+        inner=runtime.retriever,
+        hits=dict(zip(todo, batches)),
+        top_k=params.top_k,
+    )
+    return replace(runtime, retriever=prefetched)
 
 
 def _build_query_runtime(strategy_config_id: str, *, settings_path: str | Path) -> QueryRuntime:
@@ -95,6 +384,13 @@ def _build_query_runtime_from_settings(
         vec_kwargs["db_path"] = str(settings.paths.chroma_dir / "chroma_lite.sqlite")
     if vec_provider_id == "vector.chroma" and "persist_dir" not in vec_kwargs:
         vec_kwargs["persist_dir"] = str(settings.paths.chroma_dir / "chroma")
+    if vec_provider_id == "vector.hnsw" and "persist_dir" not in vec_kwargs:
+        vec_kwargs["persist_dir"] = str(settings.paths.chroma_dir / "hnsw")
+    if vec_provider_id == "vector.segments" and "persist_dir" not in vec_kwargs:
+        vec_kwargs["persist_dir"] = str(settings.paths.chroma_dir / "segments")
+    if vec_provider_id == "vector.ivf_pq":
+        vec_kwargs.setdefault("db_path", str(settings.paths.chroma_dir / "chroma_lite.sqlite"))
+        vec_kwargs.setdefault("persist_dir", str(settings.paths.chroma_dir / "ivf_pq"))
     vector_index = registry.create("vector_index", vec_provider_id, **vec_kwargs)
 
     # Dense retriever: injected with embedder + vector_index.
@@ -102,12 +398,28 @@ def _build_query_runtime_from_settings(
         retriever_provider_id, retriever_params = strategy.resolve_provider("retriever")
     except Exception:
         retriever_provider_id, retriever_params = "retriever.chroma_dense", {}
+    retriever_kwargs = dict(retriever_params or {})
+    if retriever_provider_id == "retriever.chroma_dense":
+        # Query-vector cache keys follow the embedder in use.
+        embedder_provider_id, embedder_params = strategy.resolve_provider("embedder")
+        retriever_kwargs.setdefault("embedder_id", embedder_cache_id(embedder_provider_id, embedder_params))
+        retriever_kwargs.setdefault("embedder_version", str((embedder_params or {}).get("version", "0")))
+        if "embedding_cache" in strategy.providers:
+            cache_provider_id, cache_params = strategy.resolve_provider("embedding_cache")
+            retriever_kwargs.setdefault(
+                "embedding_cache",
+                make_embedding_cache(
+                    cache_provider_id,
+                    cache_params,
+                    default_db_path=settings.paths.cache_dir / "embeddings.sqlite",
+                ),
+            )
     retriever = registry.create(
         "retriever",
         retriever_provider_id,
         embedder=embedder,
         vector_index=vector_index,
-        **retriever_params,
+        **retriever_kwargs,
     )
 
     # Sparse retriever (optional).
@@ -166,6 +478,16 @@ def _build_query_runtime_from_settings(
     except Exception:
         reranker = None
 
+    # Query result cache (optional).
+    result_cache = None
+    if "query_cache" in strategy.providers:
+        cache_provider_id, cache_params = strategy.resolve_provider("query_cache")
+        result_cache = make_result_cache(
+            cache_provider_id,
+            cache_params,
+            default_db_path=settings.paths.cache_dir / "query_cache.sqlite",
+        )
+
     _attach_providers_snapshot(
         strategy=strategy,
         vec_provider_id=vec_provider_id,
@@ -191,6 +513,7 @@ def _build_query_runtime_from_settings(
         llm=llm,
         reranker_provider_id=reranker_provider_id,
         rerank_profile_id=rerank_profile_id,
+        result_cache=result_cache,
     )
 
 
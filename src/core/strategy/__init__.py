@@ -1,5 +1,5 @@
 """Strategy/config loading and validation."""
-from .loader import StrategyLoader, load_settings, merge_provider_overrides
+from .loader import StrategyLoader, load_settings, merge_provider_overrides, settings_sources
 from .models import Settings, StrategyConfig
 from .runtime import Runtime, build_runtime_from_strategy
 
@@ -9,6 +9,7 @@ __all__ = [
     "StrategyLoader",
     "load_settings",
     "merge_provider_overrides",
+    "settings_sources",
     "Runtime",
     "build_runtime_from_strategy",
 ]
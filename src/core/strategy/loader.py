@@ -159,6 +159,33 @@ def merge_provider_overrides(
     return merged
 
 
+def _override_path(p: Path) -> Path | None:
+    # Optional private overrides (not committed). Controlled by env or default path.
+    # For generated QA settings (`settings.qa.*.yaml`), skip implicit local overrides so
+    # isolated runs are not polluted by developer-local experiments unless explicitly opted in.
+    override_path = os.environ.get("MODULE_RAG_SECRETS_PATH")
+    if override_path:
+        return Path(override_path).expanduser()
+    if p.name.startswith("settings.qa."):
+        return None
+    return (p.parent / "local.override.yaml").resolve()
+
+
+def _endpoints_path(p: Path) -> Path:
+    # Optional model endpoints file (not committed).
+    endpoints_path = os.environ.get("MODULE_RAG_MODEL_ENDPOINTS_PATH")
+    if endpoints_path:
+        return Path(endpoints_path).expanduser()
+    return (p.parent / "model_endpoints.local.yaml").resolve()
+
+
+def settings_sources(path: str | Path) -> list[Path]:
+    """Files `load_settings(path)` reads (or would read, if they existed)."""
+    p = Path(path).expanduser().resolve()
+    ov = _override_path(p)
+    return [p, *([ov] if ov is not None else []), _endpoints_path(p)]
+
+
 def load_settings(path: str | Path) -> Settings:
     """
     Load `config/settings.yaml` (workspace-local).
@@ -171,26 +198,12 @@ def load_settings(path: str | Path) -> Settings:
 
     raw = _load_yaml_mapping(p)
 
-    # Optional private overrides (not committed). Controlled by env or default path.
-    # For generated QA settings (`settings.qa.*.yaml`), skip implicit local overrides so
-    # isolated runs are not polluted by developer-local experiments unless explicitly opted in.
-    override_path = os.environ.get("MODULE_RAG_SECRETS_PATH")
-    if override_path:
-        ov = Path(override_path).expanduser()
-    elif p.name.startswith("settings.qa."):
-        ov = None
-    else:
-        ov = (p.parent / "local.override.yaml").resolve()
+    ov = _override_path(p)
     if ov is not None and ov.exists() and ov.is_file():
         raw_override = _load_yaml_mapping(ov)
         raw = _deep_merge(raw, raw_override)
 
-    # Optional model endpoints file (not committed).
-    endpoints_path = os.environ.get("MODULE_RAG_MODEL_ENDPOINTS_PATH")
-    if endpoints_path:
-        ep = Path(endpoints_path).expanduser()
-    else:
-        ep = (p.parent / "model_endpoints.local.yaml").resolve()
+    ep = _endpoints_path(p)
     if ep.exists() and ep.is_file():
         raw_endpoints = _load_yaml_mapping(ep)
         if isinstance(raw_endpoints, dict) and "providers" in raw_endpoints:
@@ -223,6 +236,10 @@ class StrategyLoader:
         raw = _load_yaml_mapping(path)
         return StrategyConfig.from_dict(strategy_config_id, raw)
 
+    def resolve_path(self, strategy_config_id: str) -> Path:
+        """Strategy file backing `strategy_config_id` (FileNotFoundError if missing)."""
+        return self._resolve_strategy_path(strategy_config_id)
+
     def _resolve_strategy_path(self, strategy_config_id: str) -> Path:
         p = Path(strategy_config_id)
         if p.suffix in {".yml", ".yaml"}:
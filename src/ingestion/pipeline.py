@@ -23,6 +23,7 @@ DEFAULT_STAGE_ORDER: list[str] = [
     "sectioner",
     "chunker",
     "transform_post",
+    "near_dup",
     "embedding",
     "upsert",
 ]
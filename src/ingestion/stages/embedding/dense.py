@@ -17,44 +17,35 @@ class DenseEncoder:
     embedder_version: str = "0"
 
     def encode(self, chunks: list[ChunkIR]) -> tuple[list[VectorItem], int, int]:
-        inputs: list[str] = []
-        keys: list[str] = []
-        cached_vectors: list[list[float] | None] = []
-
-        hits = 0
-        misses = 0
-
+        all_inputs: list[str] = []
+        all_keys: list[str] = []
         for c in chunks:
             raw_text = _chunk_retrieval_text(c)
             profile_id = c.metadata.get("text_norm_profile_id")
             if not isinstance(profile_id, str) or not profile_id:
                 profile_id = "default"
 
-            embedding_input = canonical(raw_text, profile_id=profile_id)
+            all_inputs.append(canonical(raw_text, profile_id=profile_id))
             ch = content_hash(raw_text, text_norm_profile_id=profile_id)
-            key = make_embedding_cache_key(
-                text_norm_profile_id=profile_id,
-                content_hash=ch,
-                embedder_id=self.embedder_id,
-                embedder_version=self.embedder_version,
+            all_keys.append(
+                make_embedding_cache_key(
+                    text_norm_profile_id=profile_id,
+                    content_hash=ch,
+                    embedder_id=self.embedder_id,
+                    embedder_version=self.embedder_version,
+                )
             )
 
-            if self.cache is None:
-                inputs.append(embedding_input)
-                keys.append(key)
-                cached_vectors.append(None)
-                misses += 1
-                continue
-
-            vec = self.cache.get(key)
-            if vec is not None:
-                cached_vectors.append(vec)
-                hits += 1
-            else:
-                cached_vectors.append(None)
-                inputs.append(embedding_input)
-                keys.append(key)
-                misses += 1
+        cached_vectors = self._lookup(all_keys)
+        # Chunks with identical canonical text share one embedding call.
+        todo: dict[str, str] = {}
+        for key, text, vec in zip(all_keys, all_inputs, cached_vectors):
+            if vec is None:
+                todo.setdefault(key, text)
+        keys = list(todo)
+        inputs = list(todo.values())
+        hits = sum(v is not None for v in cached_vectors)
+        misses = len(chunks) - hits
 
         new_vectors: list[list[float]] = []
         if inputs:
@@ -63,14 +54,16 @@ class DenseEncoder:
                 raise ValueError("embedder returned mismatched vector count")
 
         if self.cache is not None and inputs:
-            for key, vec in zip(keys, new_vectors):
-                self.cache.put(key, vec)
+            put_many = getattr(self.cache, "put_many", None)
+            if callable(put_many):
+                put_many(list(zip(keys, new_vectors)))
+            else:
+                for key, vec in zip(keys, new_vectors):
+                    self.cache.put(key, vec)
 
         # merge vectors back to per-chunk order
-        merged: list[list[float]] = []
-        it = iter(new_vectors)
-        for v in cached_vectors:
-            merged.append(v if v is not None else next(it))
+        fresh = dict(zip(keys, new_vectors))
+        merged = [v if v is not None else fresh[k] for k, v in zip(all_keys, cached_vectors)]
 
         items: list[VectorItem] = []
         for c, vec in zip(chunks, merged):
@@ -91,6 +84,14 @@ class DenseEncoder:
         obs.metric("embedding_cache_miss", misses, {"embedder_id": self.embedder_id})
         return items, hits, misses
 
+    def _lookup(self, keys: list[str]) -> list[list[float] | None]:
+        if self.cache is None:
+            return [None] * len(keys)
+        get_many = getattr(self.cache, "get_many", None)
+        if callable(get_many):
+            return list(get_many(keys))
+        return [self.cache.get(k) for k in keys]
+
 
 def _chunk_retrieval_text(chunk: ChunkIR) -> str:
     v = chunk.metadata.get("chunk_retrieval_text")
@@ -1,15 +1,112 @@
 from __future__ import annotations
 
+import json
+import re
 import sqlite3
 from dataclasses import dataclass
 from pathlib import Path
+from typing import Any, Iterator
+
+from ....libs.interfaces.vector_store.store import SearchFilter
+from ....observability.obs import api as obs
+
+
+# SQLite's default host parameter limit is 999 on older builds.
+_SQL_BATCH = 500
+# Deleted chunk ids kept for `changes_since`; older entries are pruned.
+_DELETE_LOG_MAX = 100_000
+
+# FTS5 built-in values when the config table has no explicit setting.
+_FTS5_DEFAULTS = {"automerge": 4, "crisismerge": 16}
+
+# Sparse index tokenizer profiles:
+# - `unicode61`: FTS5 default; a CJK run is one token.
+# - `trigram`: FTS5 `trigram` tokenizer (substring matching; query terms need >= 3 chars).
+# - `cjk_bigram`: CJK runs pre-split into overlapping bigrams, stored in
+#   `chunk_docs.text_bigram` and indexed instead of `text`.
+FTS_TOKENIZERS = ("unicode61", "trigram", "cjk_bigram")
+
+_CJK_RUN_RE = re.compile(r"[\u4e00-\u9fff]+")
+_TRIGGER_NAMES = ("chunk_docs_ai", "chunk_docs_ad", "chunk_docs_au")
+
+
+def cjk_bigrams(run: str) -> list[str]:
+    """Overlapping bigrams of a CJK run (a single character stays as is)."""
+    if len(run) < 2:
+        return [run]
+    return [run[i : i + 2] for i in range(len(run) - 1)]
+
+
+def bigram_text(text: str) -> str:
+    """`text` with every CJK run replaced by its space-separated bigrams."""
+    return _CJK_RUN_RE.sub(lambda m: " " + " ".join(cjk_bigrams(m.group(0))) + " ", text or "")
+
+
+def _fts_column(tokenizer: str) -> str:
+    return "text_bigram" if tokenizer == "cjk_bigram" else "text"
+
+
+def _create_fts(conn: sqlite3.Connection, tokenizer: str) -> None:
+    """Create `chunks_fts` for `tokenizer` plus the triggers keeping it in sync with `chunk_docs`."""
+    col = _fts_column(tokenizer)
+    tokenize = ", tokenize='trigram'" if tokenizer == "trigram" else ""
+    conn.execute(
+        f"""
+        CREATE VIRTUAL TABLE IF NOT EXISTS chunks_fts
+        USING fts5({col}, content='chunk_docs', content_rowid='rowid'{tokenize})
+        """
+    )
+    conn.execute(
+        f"""
+        CREATE TRIGGER IF NOT EXISTS chunk_docs_ai AFTER INSERT ON chunk_docs BEGIN
+            INSERT INTO chunks_fts(rowid, {col}) VALUES (new.rowid, new.{col});
+        END
+        """
+    )
+    conn.execute(
+        f"""
+        CREATE TRIGGER IF NOT EXISTS chunk_docs_ad AFTER DELETE ON chunk_docs BEGIN
+            INSERT INTO chunks_fts(chunks_fts, rowid, {col}) VALUES ('delete', old.rowid, old.{col});
+        END
+        """
+    )
+    conn.execute(
+        f"""
+        CREATE TRIGGER IF NOT EXISTS chunk_docs_au AFTER UPDATE OF {col} ON chunk_docs BEGIN
+            INSERT INTO chunks_fts(chunks_fts, rowid, {col}) VALUES ('delete', old.rowid, old.{col});
+            INSERT INTO chunks_fts(rowid, {col}) VALUES (new.rowid, new.{col});
+        END
+        """
+    )
 
 
 @dataclass
 class Fts5Store:
+    """SQLite FTS5 (BM25) store for sparse retrieval.
+
+    Chunk rows live in the regular table `chunk_docs` (integer rowid, unique
+    `chunk_id`, doc/version scope); `chunks_fts` is an external-content FTS5
+    index over `chunk_docs.text`, kept in sync by triggers. Upserts and deletes
+    are keyed lookups on `chunk_id` and run as one `executemany` transaction.
+
+    `tokenizer` selects the profile a new index is built with (see
+    `FTS_TOKENIZERS`, default `unicode61`). An existing index keeps its profile:
+    opening it with a different one only emits an `fts5.tokenizer_mismatch`
+    event, and `rebuild(tokenizer)` switches it.
+
+    Every write bumps `generation()`; rows remember the generation that last
+    changed them and deletes are logged, so derived indexes can catch up with
+    `changes_since` instead of re-reading the whole table.
+
+    Databases with the legacy `fts5(chunk_id, text)` layout are migrated on open.
+    """
+
     db_path: Path
+    tokenizer: str | None = None
 
     def __post_init__(self) -> None:
+        if self.tokenizer is not None and self.tokenizer not in FTS_TOKENIZERS:
+            raise ValueError(f"unknown fts tokenizer: {self.tokenizer!r} (expected one of {FTS_TOKENIZERS})")
         self.db_path.parent.mkdir(parents=True, exist_ok=True)
         self._init_db()
 
@@ -20,36 +117,321 @@ class Fts5Store:
 
     def _init_db(self) -> None:
         with self._connect() as conn:
+            legacy = _is_legacy_layout(conn)
+            if legacy:
+                conn.execute("ALTER TABLE chunks_fts RENAME TO chunks_fts_legacy")
             conn.execute(
                 """
-                CREATE VIRTUAL TABLE IF NOT EXISTS chunks_fts
-                USING fts5(chunk_id, text)
+                CREATE TABLE IF NOT EXISTS chunk_docs (
+                    rowid INTEGER PRIMARY KEY,
+                    chunk_id TEXT NOT NULL UNIQUE,
+                    text TEXT,
+                    doc_id TEXT,
+                    version_id TEXT,
+                    text_bigram TEXT,
+                    gen INTEGER DEFAULT 0
+                )
                 """
             )
-
-    def upsert(self, docs: list[tuple[str, str]]) -> None:
-        with self._connect() as conn:
-            for chunk_id, text in docs:
-                conn.execute("DELETE FROM chunks_fts WHERE chunk_id=?", (chunk_id,))
+            cols = {r[1] for r in conn.execute("PRAGMA table_info(chunk_docs)").fetchall()}
+            if "text_bigram" not in cols:
+                conn.execute("ALTER TABLE chunk_docs ADD COLUMN text_bigram TEXT")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_chunk_docs_version ON chunk_docs(version_id)")
+            conn.execute("CREATE TABLE IF NOT EXISTS fts_meta (key TEXT PRIMARY KEY, value TEXT)")
+            conn.execute("INSERT OR IGNORE INTO fts_meta(key, value) VALUES('generation', '0')")
+            conn.execute("INSERT OR IGNORE INTO fts_meta(key, value) VALUES('delta_floor', '0')")
+            if "gen" not in cols:
+                conn.execute("ALTER TABLE chunk_docs ADD COLUMN gen INTEGER DEFAULT 0")
+                # Writes before this point were not tracked: older derived indexes must rebuild.
                 conn.execute(
-                    "INSERT INTO chunks_fts(chunk_id, text) VALUES(?, ?)",
-                    (chunk_id, text),
+                    "UPDATE fts_meta SET value = (SELECT value FROM fts_meta WHERE key='generation') "
+                    "WHERE key='delta_floor'"
                 )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_chunk_docs_gen ON chunk_docs(gen)")
+            conn.execute("CREATE TABLE IF NOT EXISTS chunk_deletes (gen INTEGER NOT NULL, chunk_id TEXT NOT NULL)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_chunk_deletes_gen ON chunk_deletes(gen)")
+
+            has_fts = (
+                conn.execute("SELECT 1 FROM sqlite_master WHERE type='table' AND name='chunks_fts'").fetchone()
+                is not None
+            )
+            row = conn.execute("SELECT value FROM fts_meta WHERE key='tokenizer'").fetchone()
+            # Indexes created before profiles existed are unicode61.
+            stored = row["value"] if row else ("unicode61" if has_fts else None)
+
+            if has_fts:
+                if self.tokenizer is not None and self.tokenizer != stored:
+                    # Never switch implicitly: every runtime opening the store would
+                    # rebuild it; switching is an explicit `rebuild(tokenizer)`.
+                    obs.event(
+                        "fts5.tokenizer_mismatch",
+                        {"db_path": str(self.db_path), "index_tokenizer": stored, "requested": self.tokenizer},
+                    )
+                self.tokenizer = stored
+            else:
+                self.tokenizer = self.tokenizer or stored or "unicode61"
+                _create_fts(conn, self.tokenizer)
+                _set_tokenizer(conn, self.tokenizer)
+            if legacy:
+                _migrate_legacy(conn)
+                if self.tokenizer == "cjk_bigram":
+                    _rebuild(conn, self.tokenizer)
+                _bump_generation(conn)
+
+    def rebuild(self, tokenizer: str | None = None) -> None:
+        """Re-index every chunk row, optionally switching the tokenizer profile."""
+        tokenizer = tokenizer or self.tokenizer or "unicode61"
+        if tokenizer not in FTS_TOKENIZERS:
+            raise ValueError(f"unknown fts tokenizer: {tokenizer!r} (expected one of {FTS_TOKENIZERS})")
+        with self._connect() as conn:
+            _rebuild(conn, tokenizer)
+            _bump_generation(conn)
+        self.tokenizer = tokenizer
 
-    def query(self, query_expr: str, top_k: int) -> list[tuple[str, float]]:
-        if top_k <= 0:
+    def upsert(
+        self,
+        docs: list[tuple[str, str]],
+        *,
+        doc_id: str | None = None,
+        version_id: str | None = None,
+    ) -> None:
+        if not docs:
+            return
+        with self._connect() as conn:
+            gen = _bump_generation(conn)
+            # ON CONFLICT keeps the rowid (unlike INSERT OR REPLACE, which would
+            # bypass the delete trigger); unchanged rows are not re-indexed.
+            bigrams = self.tokenizer == "cjk_bigram"
+            conn.executemany(
+                """
+                INSERT INTO chunk_docs(chunk_id, text, doc_id, version_id, text_bigram, gen) VALUES(?, ?, ?, ?, ?, ?)
+                ON CONFLICT(chunk_id) DO UPDATE SET
+                    text = excluded.text, doc_id = excluded.doc_id, version_id = excluded.version_id,
+                    text_bigram = excluded.text_bigram, gen = excluded.gen
+                WHERE text IS NOT excluded.text
+                   OR doc_id IS NOT excluded.doc_id
+                   OR version_id IS NOT excluded.version_id
+                """,
+                [
+                    (chunk_id, text, doc_id, version_id, bigram_text(text) if bigrams else None, gen)
+                    for chunk_id, text in docs
+                ],
+            )
+
+    def query(
+        self,
+        query_expr: str,
+        top_k: int,
+        search_filter: SearchFilter | None = None,
+        *,
+        substrings: tuple[str, ...] = (),
+    ) -> list[tuple[str, float]]:
+        """BM25-ranked chunks matching `query_expr`, further required to contain every `substrings` term.
+
+        `substrings` covers terms the index cannot match (e.g. under 3 chars for
+        `trigram`); they are checked with LIKE on `chunk_docs.text`. With an
+        empty `query_expr` the substring filter alone selects rows (score 0, in
+        insertion order).
+        """
+        if top_k <= 0 or not (query_expr or substrings):
             return []
+        where, params = _filter_sql(search_filter)
+        like = "".join(" AND s.text LIKE ? ESCAPE '\\'" for _ in substrings)
+        like_params = tuple(f"%{_like_escape(t)}%" for t in substrings)
+        if query_expr:
+            sql = (
+                "SELECT s.chunk_id AS chunk_id, bm25(chunks_fts) AS score FROM chunks_fts "
+                "JOIN chunk_docs s ON s.rowid = chunks_fts.rowid "
+                f"WHERE chunks_fts MATCH ?{like}{where} ORDER BY score LIMIT ?"
+            )
+            args: tuple[Any, ...] = (query_expr, *like_params, *params, top_k)
+        else:
+            sql = (
+                "SELECT s.chunk_id AS chunk_id, 0.0 AS score FROM chunk_docs s "
+                f"WHERE 1{like}{where} ORDER BY s.rowid LIMIT ?"
+            )
+            args = (*like_params, *params, top_k)
         with self._connect() as conn:
-            rows = conn.execute(
-                "SELECT chunk_id, bm25(chunks_fts) AS score FROM chunks_fts WHERE chunks_fts MATCH ? ORDER BY score LIMIT ?",
-                (query_expr, top_k),
-            ).fetchall()
+            rows = conn.execute(sql, args).fetchall()
         return [(r["chunk_id"], float(r["score"])) for r in rows]
 
     def delete(self, chunk_ids: list[str]) -> None:
         if not chunk_ids:
             return
-        placeholders = ",".join(["?"] * len(chunk_ids))
-        sql = f"DELETE FROM chunks_fts WHERE chunk_id IN ({placeholders})"
         with self._connect() as conn:
-            conn.execute(sql, tuple(chunk_ids))
+            gen = _bump_generation(conn)
+            for i in range(0, len(chunk_ids), _SQL_BATCH):
+                batch = tuple(chunk_ids[i : i + _SQL_BATCH])
+                placeholders = ",".join(["?"] * len(batch))
+                conn.execute(f"DELETE FROM chunk_docs WHERE chunk_id IN ({placeholders})", batch)
+            conn.executemany("INSERT INTO chunk_deletes(gen, chunk_id) VALUES(?, ?)", [(gen, c) for c in chunk_ids])
+            _prune_delete_log(conn)
+
+    def generation(self) -> int:
+        """Counter bumped by every write; derived indexes compare it to detect staleness."""
+        with self._connect() as conn:
+            row = conn.execute("SELECT value FROM fts_meta WHERE key='generation'").fetchone()
+        return int(row["value"]) if row else 0
+
+    def index_stats(self) -> dict[str, Any]:
+        """Size/fragmentation of the FTS index: rows, b-tree segments, shadow-table bytes, merge settings."""
+        with self._connect() as conn:
+            rows = conn.execute("SELECT COUNT(*) AS c FROM chunk_docs").fetchone()["c"]
+            seg = conn.execute("SELECT COUNT(DISTINCT segid) AS c FROM chunks_fts_idx").fetchone()["c"]
+            data = conn.execute("SELECT COALESCE(SUM(LENGTH(block)), 0) AS n FROM chunks_fts_data").fetchone()["n"]
+            config = {r["k"]: r["v"] for r in conn.execute("SELECT k, v FROM chunks_fts_config")}
+        size = self.db_path.stat().st_size if self.db_path.exists() else 0
+        return {
+            "tokenizer": self.tokenizer or "unicode61",
+            "rows": int(rows),
+            "segments": int(seg),
+            "index_bytes": int(data),
+            "db_bytes": int(size),
+            "automerge": int(config.get("automerge", _FTS5_DEFAULTS["automerge"])),
+            "crisismerge": int(config.get("crisismerge", _FTS5_DEFAULTS["crisismerge"])),
+        }
+
+    def configure_merge(self, *, automerge: int | None = None, crisismerge: int | None = None) -> None:
+        """Persist FTS5 `automerge` / `crisismerge` (stored in the index's config table)."""
+        with self._connect() as conn:
+            for key, value in (("automerge", automerge), ("crisismerge", crisismerge)):
+                if value is not None:
+                    conn.execute("INSERT INTO chunks_fts(chunks_fts, rank) VALUES(?, ?)", (key, int(value)))
+
+    def merge_step(self, pages: int = 256) -> bool:
+        """Write up to ~`pages` leaf pages merging segments toward one; False once nothing is left to merge.
+
+        Each step is its own short transaction, so readers and writers are not
+        blocked for the whole optimize (a negative `merge` is an incremental optimize).
+        """
+        with self._connect() as conn:
+            before = conn.total_changes
+            conn.execute("INSERT INTO chunks_fts(chunks_fts, rank) VALUES('merge', ?)", (-max(1, int(pages)),))
+            # Per the FTS5 docs, fewer than two changes means the merge did no work.
+            return conn.total_changes - before >= 2
+
+    def iter_docs(self) -> Iterator[tuple[str, str, str | None, str | None]]:
+        """Yield `(chunk_id, text, doc_id, version_id)` in insertion order."""
+        with self._connect() as conn:
+            for r in conn.execute("SELECT chunk_id, text, doc_id, version_id FROM chunk_docs ORDER BY rowid"):
+                yield r["chunk_id"], r["text"] or "", r["doc_id"], r["version_id"]
+
+    def changes_since(
+        self, generation: int
+    ) -> tuple[int, list[tuple[str, str, str | None, str | None]], list[str]] | None:
+        """`(current generation, rows written after `generation`, chunk ids deleted after it)`.
+
+        Rows are `iter_docs` tuples in insertion order; a deleted id may also be
+        among the rows when it was written again. None when that history is gone
+        (pruned delete log, or writes from before change tracking existed).
+        """
+        with self._connect() as conn:
+            conn.execute("BEGIN")  # one read snapshot for the generation, rows and deletes
+            meta = {r["key"]: r["value"] for r in conn.execute("SELECT key, value FROM fts_meta")}
+            if int(generation) < int(meta.get("delta_floor") or 0):
+                return None
+            rows = conn.execute(
+                "SELECT chunk_id, text, doc_id, version_id FROM chunk_docs WHERE gen > ? ORDER BY rowid",
+                (int(generation),),
+            ).fetchall()
+            deleted = conn.execute("SELECT chunk_id FROM chunk_deletes WHERE gen > ?", (int(generation),)).fetchall()
+        return (
+            int(meta.get("generation") or 0),
+            [(r["chunk_id"], r["text"] or "", r["doc_id"], r["version_id"]) for r in rows],
+            [r["chunk_id"] for r in deleted],
+        )
+
+
+def _bump_generation(conn: sqlite3.Connection) -> int:
+    """Bump the write generation inside the caller's transaction and return it."""
+    conn.execute("UPDATE fts_meta SET value = CAST(value AS INTEGER) + 1 WHERE key='generation'")
+    return int(conn.execute("SELECT value FROM fts_meta WHERE key='generation'").fetchone()[0])
+
+
+def _prune_delete_log(conn: sqlite3.Connection) -> None:
+    row = conn.execute(
+        "SELECT gen FROM chunk_deletes ORDER BY gen DESC LIMIT 1 OFFSET ?", (_DELETE_LOG_MAX,)
+    ).fetchone()
+    if row is None:
+        return
+    floor = int(row[0])
+    conn.execute("DELETE FROM chunk_deletes WHERE gen <= ?", (floor,))
+    conn.execute(
+        "UPDATE fts_meta SET value = MAX(CAST(value AS INTEGER), ?) WHERE key='delta_floor'", (floor,)
+    )
+
+
+def _set_tokenizer(conn: sqlite3.Connection, tokenizer: str) -> None:
+    conn.execute("INSERT OR REPLACE INTO fts_meta(key, value) VALUES('tokenizer', ?)", (tokenizer,))
+
+
+def _rebuild(conn: sqlite3.Connection, tokenizer: str) -> None:
+    """Drop and recreate `chunks_fts` (+ triggers) for `tokenizer`, re-indexing `chunk_docs`."""
+    for name in _TRIGGER_NAMES:
+        conn.execute(f"DROP TRIGGER IF EXISTS {name}")
+    conn.execute("DROP TABLE IF EXISTS chunks_fts")
+    if tokenizer == "cjk_bigram":
+        rows = conn.execute("SELECT rowid, text FROM chunk_docs").fetchall()
+        conn.executemany(
+            "UPDATE chunk_docs SET text_bigram = ? WHERE rowid = ?",
+            [(bigram_text(r["text"] or ""), r["rowid"]) for r in rows],
+        )
+    else:
+        conn.execute("UPDATE chunk_docs SET text_bigram = NULL WHERE text_bigram IS NOT NULL")
+    _create_fts(conn, tokenizer)
+    conn.execute("INSERT INTO chunks_fts(chunks_fts) VALUES('rebuild')")
+    _set_tokenizer(conn, tokenizer)
+
+
+def _is_legacy_layout(conn: sqlite3.Connection) -> bool:
+    """True for the original `fts5(chunk_id, text)` table (chunk_id as an indexed column)."""
+    cols = {r[1] for r in conn.execute("PRAGMA table_info(chunks_fts)").fetchall()}
+    return "chunk_id" in cols
+
+
+def _migrate_legacy(conn: sqlite3.Connection) -> None:
+    """Copy rows from the legacy FTS table (+ `chunk_scope`, if present) into `chunk_docs`."""
+    has_scope = (
+        conn.execute("SELECT 1 FROM sqlite_master WHERE type='table' AND name='chunk_scope'").fetchone() is not None
+    )
+    if has_scope:
+        select = (
+            "SELECT f.chunk_id, f.text, s.doc_id, s.version_id FROM chunks_fts_legacy f "
+            "LEFT JOIN chunk_scope s ON s.chunk_id = f.chunk_id WHERE true ORDER BY f.rowid"
+        )
+    else:
+        select = "SELECT chunk_id, text, NULL, NULL FROM chunks_fts_legacy WHERE true ORDER BY rowid"
+    # `WHERE true` in the SELECT disambiguates the upsert clause (SQLite parser rule).
+    conn.execute(
+        f"""
+        INSERT INTO chunk_docs(chunk_id, text, doc_id, version_id) {select}
+        ON CONFLICT(chunk_id) DO UPDATE SET
+            text = excluded.text, doc_id = excluded.doc_id, version_id = excluded.version_id
+        """
+    )
+    conn.execute("DROP TABLE chunks_fts_legacy")
+    if has_scope:
+        conn.execute("DROP TABLE chunk_scope")
+
+
+def _like_escape(term: str) -> str:
+    return term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def _filter_sql(search_filter: SearchFilter | None) -> tuple[str, tuple[str, ...]]:
+    # Chunks without a scope (indexed before scopes were recorded) only pass
+    # exclusion-only filters.
+    if search_filter is None or search_filter.is_empty():
+        return "", ()
+    clauses: list[str] = []
+    params: list[str] = []
+    if search_filter.doc_ids is not None:
+        clauses.append("s.doc_id IN (SELECT value FROM json_each(?))")
+        params.append(json.dumps(sorted(search_filter.doc_ids)))
+    if search_filter.version_ids is not None:
+        clauses.append("s.version_id IN (SELECT value FROM json_each(?))")
+        params.append(json.dumps(sorted(search_filter.version_ids)))
+    if search_filter.exclude_version_ids:
+        clauses.append("(s.version_id IS NULL OR s.version_id NOT IN (SELECT value FROM json_each(?)))")
+        params.append(json.dumps(sorted(search_filter.exclude_version_ids)))
+    return "".join(f" AND {c}" for c in clauses), tuple(params)
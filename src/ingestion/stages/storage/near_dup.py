@@ -0,0 +1,156 @@
+from __future__ import annotations
+
+import sqlite3
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+# SQLite's default host parameter limit is 999 on older builds.
+_SQL_BATCH = 500
+
+
+@dataclass(frozen=True)
+class NearDupEntry:
+    chunk_id: str
+    doc_id: str
+    version_id: str
+    signature: bytes  # packed uint32 MinHash values
+    bucket_keys: tuple[int, ...]  # one LSH bucket key per band
+
+
+@dataclass
+class NearDupStore:
+    """SQLite-backed MinHash LSH index persisted across documents.
+
+    Only canonical chunks are indexed; collapsed duplicates (always from the same
+    document version as their canonical) are recorded in `near_dup_collapsed`
+    (chunk -> canonical chunk) for audit and dropped along with the canonical.
+    """
+
+    db_path: Path
+
+    def __post_init__(self) -> None:
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._init_db()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def _init_db(self) -> None:
+        with self._connect() as conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS minhash_sigs (
+                    chunk_id TEXT PRIMARY KEY,
+                    doc_id TEXT,
+                    version_id TEXT,
+                    signature BLOB
+                )
+                """
+            )
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS minhash_bands (
+                    band INTEGER,
+                    bucket INTEGER,
+                    chunk_id TEXT,
+                    PRIMARY KEY(band, bucket, chunk_id)
+                ) WITHOUT ROWID
+                """
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_minhash_bands_chunk ON minhash_bands(chunk_id)")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS near_dup_collapsed (
+                    chunk_id TEXT PRIMARY KEY,
+                    doc_id TEXT,
+                    version_id TEXT,
+                    canonical_chunk_id TEXT,
+                    score REAL,
+                    created_at REAL
+                )
+                """
+            )
+
+    def candidates(self, bucket_keys: tuple[int, ...]) -> list[NearDupEntry]:
+        """Indexed chunks sharing at least one band bucket with `bucket_keys`."""
+        if not bucket_keys:
+            return []
+        clause = " OR ".join(["(b.band=? AND b.bucket=?)"] * len(bucket_keys))
+        params: list[int] = []
+        for band, key in enumerate(bucket_keys):
+            params.extend((band, key))
+        with self._connect() as conn:
+            rows = conn.execute(
+                f"""
+                SELECT DISTINCT s.chunk_id, s.doc_id, s.version_id, s.signature
+                FROM minhash_bands b JOIN minhash_sigs s ON s.chunk_id = b.chunk_id
+                WHERE {clause}
+                """,
+                params,
+            ).fetchall()
+        return [
+            NearDupEntry(
+                chunk_id=r["chunk_id"],
+                doc_id=r["doc_id"] or "",
+                version_id=r["version_id"] or "",
+                signature=r["signature"],
+                bucket_keys=(),
+            )
+            for r in rows
+        ]
+
+    def add(self, entries: list[NearDupEntry]) -> None:
+        if not entries:
+            return
+        with self._connect() as conn:
+            self._delete(conn, [e.chunk_id for e in entries])
+            conn.executemany(
+                "INSERT INTO minhash_sigs(chunk_id, doc_id, version_id, signature) VALUES(?, ?, ?, ?)",
+                [(e.chunk_id, e.doc_id, e.version_id, e.signature) for e in entries],
+            )
+            conn.executemany(
+                "INSERT OR IGNORE INTO minhash_bands(band, bucket, chunk_id) VALUES(?, ?, ?)",
+                [(band, key, e.chunk_id) for e in entries for band, key in enumerate(e.bucket_keys)],
+            )
+
+    def record_collapsed(self, rows: list[tuple[str, str, str, str, float]]) -> None:
+        """Persist `(chunk_id, doc_id, version_id, canonical_chunk_id, score)` rows."""
+        if not rows:
+            return
+        now = time.time()
+        with self._connect() as conn:
+            conn.executemany(
+                """
+                INSERT OR REPLACE INTO near_dup_collapsed(
+                    chunk_id, doc_id, version_id, canonical_chunk_id, score, created_at
+                )
+                VALUES(?, ?, ?, ?, ?, ?)
+                """,
+                [(*r, now) for r in rows],
+            )
+
+    def count(self) -> int:
+        with self._connect() as conn:
+            row = conn.execute("SELECT COUNT(*) AS c FROM minhash_sigs").fetchone()
+        return int(row["c"] if row else 0)
+
+    def delete(self, chunk_ids: list[str]) -> None:
+        if not chunk_ids:
+            return
+        with self._connect() as conn:
+            self._delete(conn, chunk_ids)
+
+    def _delete(self, conn: sqlite3.Connection, chunk_ids: list[str]) -> None:
+        for i in range(0, len(chunk_ids), _SQL_BATCH):
+            batch = tuple(chunk_ids[i : i + _SQL_BATCH])
+            placeholders = ",".join(["?"] * len(batch))
+            conn.execute(f"DELETE FROM minhash_bands WHERE chunk_id IN ({placeholders})", batch)
+            conn.execute(f"DELETE FROM minhash_sigs WHERE chunk_id IN ({placeholders})", batch)
+            conn.execute(
+                f"DELETE FROM near_dup_collapsed WHERE chunk_id IN ({placeholders}) "
+                f"OR canonical_chunk_id IN ({placeholders})",
+                batch + batch,
+            )
@@ -170,6 +170,17 @@ class SqliteStore:
                 )
                 """
             )
+            _init_generation(conn)
+
+    def generation(self) -> int:
+        """Counter bumped (by triggers) on every write to `doc_versions` / `chunks`.
+
+        Ingest and delete both finish with such a write, so anything derived from
+        the indexed corpus (e.g. cached query results) can key on it.
+        """
+        with self._connect() as conn:
+            row = conn.execute("SELECT value FROM store_meta WHERE key='generation'").fetchone()
+        return int(row["value"]) if row else 0
 
     def find_version_by_file_hash(self, file_sha256: str) -> tuple[str, str] | None:
         with self._connect() as conn:
@@ -224,6 +235,11 @@ class SqliteStore:
             out[str(r["version_id"])] = str(r["status"] or "")
         return out
 
+    def fetch_deleted_version_ids(self) -> list[str]:
+        with self._connect() as conn:
+            rows = conn.execute("SELECT version_id FROM doc_versions WHERE status='deleted'").fetchall()
+        return [str(r["version_id"]) for r in rows]
+
     def mark_deleted(self, *, doc_id: str, version_id: str | None = None) -> dict[str, Any]:
         """Soft delete by setting doc_versions.status='deleted'.
 
@@ -812,6 +828,21 @@ class SqliteStore:
         return 0
 
 
+def _init_generation(conn: sqlite3.Connection) -> None:
+    conn.execute("CREATE TABLE IF NOT EXISTS store_meta (key TEXT PRIMARY KEY, value INTEGER)")
+    conn.execute("INSERT OR IGNORE INTO store_meta(key, value) VALUES('generation', 0)")
+    for table in ("doc_versions", "chunks"):
+        for op in ("INSERT", "UPDATE", "DELETE"):
+            conn.execute(
+                f"""
+                CREATE TRIGGER IF NOT EXISTS {table}_{op.lower()}_gen AFTER {op} ON {table}
+                BEGIN
+                    UPDATE store_meta SET value = value + 1 WHERE key = 'generation';
+                END
+                """
+            )
+
+
 def new_doc_id() -> str:
     return f"doc_{uuid.uuid4().hex}"
 
@@ -114,7 +114,7 @@ class UpsertStage:
         sparse_written = 0
         if encoded.sparse is not None:
             docs = [(d.chunk_id, d.text) for d in encoded.sparse.docs]
-            self.fts5.upsert(docs)
+            self.fts5.upsert(docs, doc_id=doc_id, version_id=version_id)
             sparse_written = len(docs)
 
         self.sqlite.set_version_status(version_id, "indexed")
@@ -0,0 +1,208 @@
+from __future__ import annotations
+
+import hashlib
+import re
+from dataclasses import dataclass
+from typing import Any
+
+import numpy as np
+
+from ....libs.interfaces.splitter import ChunkIR
+from ....observability.obs import api as obs
+from ..storage.near_dup import NearDupEntry, NearDupStore
+from ..storage.sqlite import SqliteStore
+
+_MERSENNE_61 = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64(0xFFFFFFFF)
+_SIG_DTYPE = np.dtype("<u4")
+_WS_RE = re.compile(r"\s+")
+
+POLICIES = ("off", "flag", "collapse")
+
+
+@dataclass(frozen=True)
+class NearDupConfig:
+    """Strategy policy for near-duplicate chunk detection.
+
+    - `off`: the stage is a no-op.
+    - `flag`: duplicates are kept but annotated with `near_dup_of` / `near_dup_score`.
+    - `collapse`: duplicates within the same document version are dropped before
+      embedding (not embedded, stored or indexed); only the canonical chunk is
+      kept. Matches in other documents or versions are flagged instead, so every
+      document keeps its own vectors/FTS rows and survives deletion of the other.
+
+    `bands * rows == num_perm`; candidates share at least one band bucket and are
+    confirmed when the estimated Jaccard similarity reaches `threshold`.
+    """
+
+    policy: str = "off"
+    threshold: float = 0.8
+    num_perm: int = 128
+    bands: int = 16
+    shingle_size: int = 5
+    seed: int = 1
+
+    def __post_init__(self) -> None:
+        if self.policy not in POLICIES:
+            raise ValueError(f"unknown near_dup policy: {self.policy!r} (expected one of {POLICIES})")
+        if self.num_perm <= 0 or self.bands <= 0 or self.num_perm % self.bands:
+            raise ValueError("near_dup num_perm must be a positive multiple of bands")
+        if not 0.0 < self.threshold <= 1.0:
+            raise ValueError("near_dup threshold must be in (0, 1]")
+        if self.shingle_size <= 0:
+            raise ValueError("near_dup shingle_size must be positive")
+
+    @classmethod
+    def from_params(cls, params: dict[str, Any] | None) -> "NearDupConfig":
+        p = dict(params or {})
+        defaults = cls()
+        return cls(
+            policy=str(p.get("policy", defaults.policy)),
+            threshold=float(p.get("threshold", defaults.threshold)),
+            num_perm=int(p.get("num_perm", defaults.num_perm)),
+            bands=int(p.get("bands", defaults.bands)),
+            shingle_size=int(p.get("shingle_size", defaults.shingle_size)),
+            seed=int(p.get("seed", defaults.seed)),
+        )
+
+
+class MinHasher:
+    """MinHash over character shingles of whitespace-normalized, lower-cased text.
+
+    Uses the universal hash family `(a * x + b) mod (2^61 - 1)` truncated to 32 bits,
+    evaluated for all permutations at once with NumPy.
+    """
+
+    def __init__(self, *, num_perm: int, shingle_size: int, seed: int = 1) -> None:
+        rng = np.random.default_rng(seed)
+        self.num_perm = int(num_perm)
+        self.shingle_size = int(shingle_size)
+        self._a = rng.integers(1, 1 << 32, size=self.num_perm, dtype=np.uint64)
+        self._b = rng.integers(0, 1 << 32, size=self.num_perm, dtype=np.uint64)
+
+    def signature(self, text: str) -> np.ndarray | None:
+        """(num_perm,) little-endian uint32 signature, or None for blank text."""
+        norm = _WS_RE.sub(" ", text.lower()).strip()
+        if not norm:
+            return None
+        k = self.shingle_size
+        shingles = {norm[i : i + k] for i in range(max(1, len(norm) - k + 1))}
+        x = np.fromiter(
+            (int.from_bytes(hashlib.blake2b(s.encode("utf-8"), digest_size=4).digest(), "little") for s in shingles),
+            dtype=np.uint64,
+            count=len(shingles),
+        )
+        # uint64 wraparound is part of the (deterministic) hash family.
+        h = (x[:, None] * self._a[None, :] + self._b[None, :]) % _MERSENNE_61 & _MAX_HASH
+        return h.min(axis=0).astype(_SIG_DTYPE)
+
+
+def bucket_keys(signature: np.ndarray, bands: int) -> tuple[int, ...]:
+    """One signed 64-bit bucket key per LSH band."""
+    rows = signature.shape[0] // bands
+    out = []
+    for band in range(bands):
+        digest = hashlib.blake2b(signature[band * rows : (band + 1) * rows].tobytes(), digest_size=8).digest()
+        out.append(int.from_bytes(digest, "little", signed=True))
+    return tuple(out)
+
+
+def estimate_jaccard(a: np.ndarray, b: np.ndarray) -> float:
+    return float(np.count_nonzero(a == b)) / float(a.shape[0])
+
+
+@dataclass
+class NearDupStage:
+    """Detect near-duplicate chunks (MinHash + LSH) between `transform_post` and `embedding`.
+
+    Chunks are compared with earlier chunks of the same document and with the
+    canonical chunks of every previously ingested, non-deleted version.
+    """
+
+    cfg: NearDupConfig
+    store: NearDupStore | None = None
+    sqlite: SqliteStore | None = None
+
+    def __post_init__(self) -> None:
+        self._hasher = MinHasher(num_perm=self.cfg.num_perm, shingle_size=self.cfg.shingle_size, seed=self.cfg.seed)
+
+    def run(self, chunks: list[ChunkIR], *, doc_id: str, version_id: str) -> list[ChunkIR]:
+        if self.cfg.policy == "off" or self.store is None or not chunks:
+            return chunks
+
+        deleted = set(self.sqlite.fetch_deleted_version_ids()) if self.sqlite is not None else set()
+        pending: list[NearDupEntry] = []
+        pending_buckets: dict[tuple[int, int], list[int]] = {}
+        kept: list[ChunkIR] = []
+        collapsed: list[tuple[str, str, str, str, float]] = []
+        flagged = 0
+
+        for chunk in chunks:
+            sig = self._hasher.signature(chunk.text)
+            if sig is None:
+                kept.append(chunk)
+                continue
+            keys = bucket_keys(sig, self.cfg.bands)
+            best, best_score = self._best_match(chunk.chunk_id, sig, keys, pending, pending_buckets, deleted)
+
+            if best is None:
+                entry = NearDupEntry(
+                    chunk_id=chunk.chunk_id,
+                    doc_id=doc_id,
+                    version_id=version_id,
+                    signature=sig.tobytes(),
+                    bucket_keys=keys,
+                )
+                for band, key in enumerate(keys):
+                    pending_buckets.setdefault((band, key), []).append(len(pending))
+                pending.append(entry)
+                kept.append(chunk)
+            elif self.cfg.policy == "collapse" and best.version_id == version_id:
+                collapsed.append((chunk.chunk_id, doc_id, version_id, best.chunk_id, best_score))
+            else:
+                chunk.metadata["near_dup_of"] = best.chunk_id
+                chunk.metadata["near_dup_score"] = round(best_score, 4)
+                kept.append(chunk)
+                flagged += 1
+
+        self.store.add(pending)
+        self.store.record_collapsed(collapsed)
+        obs.event(
+            "ingest.near_dup",
+            {
+                "policy": self.cfg.policy,
+                "chunks_in": len(chunks),
+                "chunks_out": len(kept),
+                "flagged": flagged,
+                "collapsed": len(collapsed),
+            },
+        )
+        return kept
+
+    def _best_match(
+        self,
+        chunk_id: str,
+        sig: np.ndarray,
+        keys: tuple[int, ...],
+        pending: list[NearDupEntry],
+        pending_buckets: dict[tuple[int, int], list[int]],
+        deleted: set[str],
+    ) -> tuple[NearDupEntry | None, float]:
+        cands = [e for e in self.store.candidates(keys) if e.version_id not in deleted] if self.store else []
+        seen: set[int] = set()
+        for band, key in enumerate(keys):
+            for i in pending_buckets.get((band, key), ()):
+                if i not in seen:
+                    seen.add(i)
+                    cands.append(pending[i])
+
+        best: NearDupEntry | None = None
+        best_score = 0.0
+        for e in cands:
+            # The same chunk id re-ingested is an overwrite, not a duplicate.
+            if e.chunk_id == chunk_id:
+                continue
+            score = estimate_jaccard(sig, np.frombuffer(e.signature, dtype=_SIG_DTYPE))
+            if score >= self.cfg.threshold and (score > best_score or best is None):
+                best, best_score = e, score
+        return best, best_score
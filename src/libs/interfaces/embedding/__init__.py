@@ -1,3 +1,3 @@
-from .embedder import Embedder, SparseEncoder
+from .embedder import AsyncEmbedder, Embedder, SparseEncoder
 
-__all__ = ["Embedder", "SparseEncoder"]
+__all__ = ["AsyncEmbedder", "Embedder", "SparseEncoder"]
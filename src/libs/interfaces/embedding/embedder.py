@@ -8,6 +8,11 @@ class Embedder(Protocol):
         ...
 
 
+class AsyncEmbedder(Protocol):
+    async def aembed_texts(self, texts: list[str]) -> list[list[float]]:
+        ...
+
+
 class SparseEncoder(Protocol):
     def encode(self, texts: list[str]) -> list[dict]:
         ...
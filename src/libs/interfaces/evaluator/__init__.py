@@ -1,4 +1,4 @@
 from .evaluator import EvalCaseResult, EvalReport, Evaluator
-from .judge import Judge, JudgeScore
+from .judge import AsyncJudge, Judge, JudgeScore
 
-__all__ = ["Evaluator", "EvalReport", "EvalCaseResult", "Judge", "JudgeScore"]
+__all__ = ["Evaluator", "EvalReport", "EvalCaseResult", "AsyncJudge", "Judge", "JudgeScore"]
@@ -19,3 +19,13 @@ class Judge(Protocol):
 
     def score_answer_relevancy(self, answer: str, query: str) -> JudgeScore:
         ...
+
+
+class AsyncJudge(Protocol):
+    provider_id: str
+
+    async def ascore_faithfulness(self, answer: str, context: str) -> JudgeScore:
+        ...
+
+    async def ascore_answer_relevancy(self, answer: str, query: str) -> JudgeScore:
+        ...
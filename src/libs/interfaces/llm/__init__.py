@@ -1,3 +1,3 @@
-from .llm import LLMResult, LLM
+from .llm import AsyncLLM, LLMResult, LLM
 
-__all__ = ["LLM", "LLMResult"]
+__all__ = ["AsyncLLM", "LLM", "LLMResult"]
@@ -15,3 +15,8 @@ class LLMResult:
 class LLM(Protocol):
     def generate(self, mode: str, messages: list[dict[str, Any]], **kwargs: Any) -> LLMResult:
         ...
+
+
+class AsyncLLM(Protocol):
+    async def agenerate(self, mode: str, messages: list[dict[str, Any]], **kwargs: Any) -> LLMResult:
+        ...
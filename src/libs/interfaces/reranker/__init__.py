@@ -1,3 +1,3 @@
-from .reranker import Reranker
+from .reranker import AsyncReranker, Reranker
 
-__all__ = ["Reranker"]
+__all__ = ["AsyncReranker", "Reranker"]
@@ -8,3 +8,8 @@ from ..vector_store.retriever import RankedCandidate
 class Reranker(Protocol):
     def rerank(self, query: str, candidates: list[RankedCandidate]) -> list[RankedCandidate]:
         ...
+
+
+class AsyncReranker(Protocol):
+    async def arerank(self, query: str, candidates: list[RankedCandidate]) -> list[RankedCandidate]:
+        ...
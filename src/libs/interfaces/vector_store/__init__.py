@@ -1,12 +1,14 @@
-from .retriever import Candidate, Fusion, RankedCandidate, Retriever
-from .store import SparseIndex, VectorIndex, VectorItem
+from .retriever import AsyncRetriever, Candidate, Fusion, RankedCandidate, Retriever
+from .store import SearchFilter, SparseIndex, VectorIndex, VectorItem
 
 __all__ = [
     "Candidate",
     "RankedCandidate",
     "Retriever",
+    "AsyncRetriever",
     "Fusion",
     "VectorItem",
+    "SearchFilter",
     "VectorIndex",
     "SparseIndex",
 ]
@@ -3,6 +3,8 @@ from __future__ import annotations
 from dataclasses import dataclass, field
 from typing import Any, Protocol
 
+from .store import SearchFilter
+
 
 @dataclass
 class Candidate:
@@ -22,7 +24,22 @@ class RankedCandidate:
 
 
 class Retriever(Protocol):
-    def retrieve(self, query: str, top_k: int) -> list[Candidate]:
+    def retrieve(
+        self,
+        query: str,
+        top_k: int,
+        search_filter: SearchFilter | None = None,
+    ) -> list[Candidate]:
+        ...
+
+
+class AsyncRetriever(Protocol):
+    async def aretrieve(
+        self,
+        query: str,
+        top_k: int,
+        search_filter: SearchFilter | None = None,
+    ) -> list[Candidate]:
         ...
 
 
@@ -11,11 +11,50 @@ class VectorItem:
     metadata: dict[str, Any] = field(default_factory=dict)
 
 
+@dataclass(frozen=True)
+class SearchFilter:
+    """Structured candidate restriction pushed down into index queries.
+
+    `None` means "unrestricted". Version status lives in app.sqlite, so callers
+    resolve soft-deleted versions into `exclude_version_ids` before querying.
+    """
+
+    doc_ids: frozenset[str] | None = None
+    version_ids: frozenset[str] | None = None
+    exclude_version_ids: frozenset[str] = frozenset()
+
+    def is_empty(self) -> bool:
+        return self.doc_ids is None and self.version_ids is None and not self.exclude_version_ids
+
+    def allows(self, doc_id: str | None, version_id: str | None) -> bool:
+        if self.doc_ids is not None and doc_id not in self.doc_ids:
+            return False
+        if self.version_ids is not None and version_id not in self.version_ids:
+            return False
+        if version_id is not None and version_id in self.exclude_version_ids:
+            return False
+        return True
+
+
 class VectorIndex(Protocol):
     def upsert(self, items: list[VectorItem]) -> None:
         ...
 
-    def query(self, vector: list[float], top_k: int) -> list[tuple[str, float]]:
+    def query(
+        self,
+        vector: list[float],
+        top_k: int,
+        search_filter: SearchFilter | None = None,
+    ) -> list[tuple[str, float]]:
+        ...
+
+    def query_batch(
+        self,
+        vectors: list[list[float]],
+        top_k: int,
+        search_filter: SearchFilter | None = None,
+    ) -> list[list[tuple[str, float]]]:
+        """One result list per query vector, in input order."""
         ...
 
     def delete(self, chunk_ids: list[str]) -> None:
@@ -26,5 +65,10 @@ class SparseIndex(Protocol):
     def upsert(self, items: list[dict[str, Any]]) -> None:
         ...
 
-    def query(self, query_expr: str, top_k: int) -> list[tuple[str, float]]:
+    def query(
+        self,
+        query_expr: str,
+        top_k: int,
+        search_filter: SearchFilter | None = None,
+    ) -> list[tuple[str, float]]:
         ...
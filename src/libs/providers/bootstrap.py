@@ -5,6 +5,7 @@ from .embedding.fake_embedder import FakeEmbedder
 from .embedding.bow_embedder import BowHashEmbedder
 from .embedding.openai_compatible import OpenAICompatibleEmbedder
 from .embedding.azure_openai import AzureOpenAIEmbedder
+from .embedding.sentence_transformer import SentenceTransformerEmbedder
 from .loader.markdown_loader import MarkdownLoader
 from .loader.pdf_loader import PdfLoader
 from .llm.fake_llm import FakeLLM
@@ -27,8 +28,12 @@ from .evaluator.deepeval_adapter import DeepEvalAdapter
 from .vector_store.in_memory import InMemoryVectorIndex
 from .vector_store.chroma import ChromaVectorIndex
 from .vector_store.chroma_lite import ChromaLiteVectorIndex
+from .vector_store.hnsw import HnswVectorIndex
+from .vector_store.ivf_pq import IvfPqVectorIndex
+from .vector_store.segmented import SegmentedVectorIndex
 from .vector_store.chroma_retriever import ChromaDenseRetriever
 from .vector_store.fts5_retriever import Fts5Retriever
+from .vector_store.bm25_retriever import Bm25Retriever
 from .vector_store.rrf_fusion import RrfFusion
 
 
@@ -43,6 +48,8 @@ def register_builtin_providers(registry: ProviderRegistry) -> None:
     registry.register("embedder", "deepseek", OpenAICompatibleEmbedder)
     registry.register("embedder", "qwen", OpenAICompatibleEmbedder)
     registry.register("embedder", "azure_openai", AzureOpenAIEmbedder)
+    registry.register("embedder", "sentence_transformers", SentenceTransformerEmbedder)
+    registry.register("embedder", "local", SentenceTransformerEmbedder)
     registry.register("loader", "loader.markdown", MarkdownLoader)
     registry.register("loader", "loader.pdf", PdfLoader)
     registry.register("sectioner", "sectioner.markdown_headings", MarkdownHeadingsSectioner)
@@ -57,8 +64,12 @@ def register_builtin_providers(registry: ProviderRegistry) -> None:
     registry.register("vector_index", "vector.in_memory", InMemoryVectorIndex)
     registry.register("vector_index", "vector.chroma", ChromaVectorIndex)
     registry.register("vector_index", "vector.chroma_lite", ChromaLiteVectorIndex)
+    registry.register("vector_index", "vector.hnsw", HnswVectorIndex)
+    registry.register("vector_index", "vector.ivf_pq", IvfPqVectorIndex)
+    registry.register("vector_index", "vector.segments", SegmentedVectorIndex)
     registry.register("retriever", "retriever.chroma_dense", ChromaDenseRetriever)
     registry.register("sparse_retriever", "sparse_retriever.fts5", Fts5Retriever)
+    registry.register("sparse_retriever", "sparse_retriever.bm25", Bm25Retriever)
     registry.register("fusion", "fusion.rrf", RrfFusion)
     registry.register("reranker", "noop", NoopReranker)
     # Back-compat alias (do not use in new configs).
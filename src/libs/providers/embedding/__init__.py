@@ -1,9 +1,17 @@
 from .fake_embedder import FakeEmbedder
-from .cache import EmbeddingCache, InMemoryEmbeddingCache, make_embedding_cache_key
+from .cache import (
+    EmbeddingCache,
+    InMemoryEmbeddingCache,
+    LruEmbeddingCache,
+    SqliteEmbeddingCache,
+    make_embedding_cache_key,
+)
 
 __all__ = [
     "FakeEmbedder",
     "EmbeddingCache",
     "InMemoryEmbeddingCache",
+    "LruEmbeddingCache",
+    "SqliteEmbeddingCache",
     "make_embedding_cache_key",
 ]
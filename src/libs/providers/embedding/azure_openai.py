@@ -1,17 +1,19 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Any, Iterable
+from typing import Any
 
-import httpx
-
-
-def _chunks(items: list[str], size: int) -> Iterable[list[str]]:
-    if size <= 0:
-        yield items
-        return
-    for i in range(0, len(items), size):
-        yield items[i : i + size]
+from .batching import (
+    aadaptive,
+    adaptive,
+    apost_json,
+    arun_batches,
+    async_client,
+    plan_batches,
+    pooled_client,
+    post_json,
+    run_batches,
+)
 
 
 @dataclass
@@ -25,29 +27,65 @@ class AzureOpenAIEmbedder:
     timeout_s: float = 60.0
     batch_size: int = 128
     extra_headers: dict[str, str] | None = None
+    # Batches in flight at once over a shared keep-alive client (HTTP/2 when `h2` is installed).
+    max_concurrency: int = 4
+    http2: bool = True
+    max_retries: int = 2
+    # Per-request cap on estimated tokens; `batch_size` caps items. Rejected (413) batches are split.
+    max_batch_tokens: int = 64_000
 
     def embed_texts(self, texts: list[str]) -> list[list[float]]:
         if not texts:
             return []
         url = self._endpoint()
+        headers = self._headers()
+        client = pooled_client(timeout_s=self.timeout_s, max_connections=self.max_concurrency, http2=self.http2)
+
+        def post(batch: list[str]) -> list[list[float]]:
+            data = post_json(client, url, headers=headers, payload={"input": batch}, max_retries=self.max_retries)
+            return _extract_embeddings(data)
+
+        out = run_batches(
+            adaptive(post, provider=f"azure_openai/{self.deployment_name}"),
+            self._plan(texts),
+            max_concurrency=self.max_concurrency,
+        )
+        if len(out) != len(texts):
+            raise ValueError("embedding_count_mismatch")
+        return out
+
+    async def aembed_texts(self, texts: list[str]) -> list[list[float]]:
+        """Async `embed_texts` over `httpx.AsyncClient`."""
+        if not texts:
+            return []
+        url = self._endpoint()
+        headers = self._headers()
+        client = async_client(timeout_s=self.timeout_s, max_connections=self.max_concurrency, http2=self.http2)
+
+        async def post(batch: list[str]) -> list[list[float]]:
+            data = await apost_json(client, url, headers=headers, payload={"input": batch}, max_retries=self.max_retries)
+            return _extract_embeddings(data)
+
+        out = await arun_batches(
+            aadaptive(post, provider=f"azure_openai/{self.deployment_name}"),
+            self._plan(texts),
+            max_concurrency=self.max_concurrency,
+        )
+        if len(out) != len(texts):
+            raise ValueError("embedding_count_mismatch")
+        return out
+
+    def _headers(self) -> dict[str, str]:
         headers = {
             "api-key": self.api_key,
             "Content-Type": "application/json",
         }
         if self.extra_headers:
             headers.update(self.extra_headers)
+        return headers
 
-        out: list[list[float]] = []
-        with httpx.Client(timeout=self.timeout_s) as client:
-            for batch in _chunks(texts, self.batch_size):
-                payload: dict[str, Any] = {"input": batch}
-                res = client.post(url, headers=headers, json=payload)
-                res.raise_for_status()
-                data = res.json()
-                out.extend(_extract_embeddings(data))
-        if len(out) != len(texts):
-            raise ValueError("embedding_count_mismatch")
-        return out
+    def _plan(self, texts: list[str]) -> list[list[str]]:
+        return plan_batches(texts, max_items=self.batch_size, max_tokens=self.max_batch_tokens)
 
     def _endpoint(self) -> str:
         base = self.base_url.rstrip("/")
@@ -0,0 +1,262 @@
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import importlib.util
+import re
+import threading
+import time
+import weakref
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Awaitable, Callable
+
+import httpx
+
+from ....observability.obs import api as obs
+
+# Request plumbing shared by the HTTP embedding providers: a process-wide pooled
+# client (keep-alive, HTTP/2 when `h2` is installed), token-aware batch planning
+# with split-on-reject, and ordered concurrent batches. The async LLM, reranker
+# and judge providers reuse `async_client` for their keep-alive connections.
+
+_RETRY_STATUS = {429, 503}
+_CJK = re.compile(r"[\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uac00-\ud7af\uf900-\ufaff]")
+# A 400 counts as a size rejection only when its body has a size phrase *and*
+# names what is too big, so e.g. "Too many requests" or "temperature exceeds
+# maximum" are not split and retried.
+_SIZE_PHRASE = re.compile(
+    r"maximum context length|context length exceeded|too many tokens|token limit|too (large|long|many)"
+    r"|larger than|exceeds? (the )?(maximum|max|limit)",
+    re.IGNORECASE,
+)
+_SIZE_SUBJECT = re.compile(r"\b(batch|inputs?|tokens?|items|texts|array|payload)\b", re.IGNORECASE)
+_MAX_RETRY_DELAY_S = 30.0
+
+_CLIENT_LOCK = threading.Lock()
+_CLIENTS: dict[tuple[float, int, bool], httpx.Client] = {}
+# Async clients are bound to the loop that opened their connections: one set per
+# running loop, dropped together with the loop.
+_ASYNC_CLIENTS: weakref.WeakKeyDictionary[
+    asyncio.AbstractEventLoop, dict[tuple[float, int | None, bool], httpx.AsyncClient]
+] = weakref.WeakKeyDictionary()
+
+
+def http2_available() -> bool:
+    return importlib.util.find_spec("h2") is not None
+
+
+def pooled_client(*, timeout_s: float, max_connections: int, http2: bool = True) -> httpx.Client:
+    """Long-lived client shared by every embedder with the same timeout / pool size."""
+    use_http2 = bool(http2) and http2_available()
+    key = (float(timeout_s), max(1, int(max_connections)), use_http2)
+    with _CLIENT_LOCK:
+        client = _CLIENTS.get(key)
+        if client is None or client.is_closed:
+            client = httpx.Client(
+                timeout=timeout_s,
+                http2=use_http2,
+                limits=httpx.Limits(max_connections=key[1], max_keepalive_connections=key[1]),
+            )
+            _CLIENTS[key] = client
+        return client
+
+
+def async_client(*, timeout_s: float, max_connections: int | None = None, http2: bool = True) -> httpx.AsyncClient:
+    """Long-lived async client for the running event loop, shared by every caller with the same
+    timeout / pool size. Callers must not close it; `max_connections=None` keeps httpx's default pool.
+    """
+    loop = asyncio.get_running_loop()
+    use_http2 = bool(http2) and http2_available()
+    n = None if max_connections is None else max(1, int(max_connections))
+    key = (float(timeout_s), n, use_http2)
+    with _CLIENT_LOCK:
+        clients = _ASYNC_CLIENTS.setdefault(loop, {})
+        client = clients.get(key)
+        if client is None or client.is_closed:
+            limits = httpx.Limits() if n is None else httpx.Limits(max_connections=n, max_keepalive_connections=n)
+            client = httpx.AsyncClient(timeout=timeout_s, http2=use_http2, limits=limits)
+            clients[key] = client
+        return client
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap upper-leaning token estimate: one per CJK character, one per ~4 other characters."""
+    cjk = len(_CJK.findall(text))
+    return cjk + (len(text) - cjk + 3) // 4 + 1
+
+
+def plan_batches(texts: list[str], *, max_items: int, max_tokens: int) -> list[list[str]]:
+    """Pack consecutive texts into batches capped by item count and estimated tokens.
+
+    Order is preserved (batches are contiguous); a single text over `max_tokens`
+    still gets a batch of its own and is left to the provider to accept or reject.
+    """
+    batches: list[list[str]] = []
+    cur: list[str] = []
+    cur_tokens = 0
+    for text in texts:
+        n = estimate_tokens(text)
+        full = (max_items > 0 and len(cur) >= max_items) or (max_tokens > 0 and cur_tokens + n > max_tokens)
+        if cur and full:
+            batches.append(cur)
+            cur, cur_tokens = [], 0
+        cur.append(text)
+        cur_tokens += n
+    if cur:
+        batches.append(cur)
+    return batches
+
+
+def adaptive(post: Callable[[list[str]], list[list[float]]], *, provider: str) -> Callable[[list[str]], list[list[float]]]:
+    """Wrap a batch request: emit per-batch metrics, and split-and-retry batches rejected for size."""
+
+    def _post(batch: list[str]) -> list[list[float]]:
+        started = time.perf_counter()
+        try:
+            out = post(batch)
+        except httpx.HTTPStatusError as e:
+            if len(batch) <= 1 or not is_size_rejection(e.response):
+                raise
+            _emit_split(batch, provider)
+            mid = len(batch) // 2
+            return _post(batch[:mid]) + _post(batch[mid:])
+        _emit_batch(batch, started, provider)
+        return out
+
+    return _post
+
+
+def aadaptive(
+    post: Callable[[list[str]], Awaitable[list[list[float]]]], *, provider: str
+) -> Callable[[list[str]], Awaitable[list[list[float]]]]:
+    async def _post(batch: list[str]) -> list[list[float]]:
+        started = time.perf_counter()
+        try:
+            out = await post(batch)
+        except httpx.HTTPStatusError as e:
+            if len(batch) <= 1 or not is_size_rejection(e.response):
+                raise
+            _emit_split(batch, provider)
+            mid = len(batch) // 2
+            return await _post(batch[:mid]) + await _post(batch[mid:])
+        _emit_batch(batch, started, provider)
+        return out
+
+    return _post
+
+
+def is_size_rejection(res: httpx.Response) -> bool:
+    """413, or a 400 whose body says the batch/input/tokens are too large (providers differ on the status)."""
+    if res.status_code == 413:
+        return True
+    if res.status_code != 400:
+        return False
+    try:
+        body = res.text
+    except Exception:
+        return False
+    body = body or ""
+    return bool(_SIZE_PHRASE.search(body) and _SIZE_SUBJECT.search(body))
+
+
+def _emit_batch(batch: list[str], started: float, provider: str) -> None:
+    attrs = {"provider": provider}
+    obs.metric("embedding_batch_items", len(batch), attrs)
+    obs.metric("embedding_batch_tokens", sum(estimate_tokens(t) for t in batch), attrs)
+    obs.metric("embedding_batch_latency_ms", round((time.perf_counter() - started) * 1000.0, 3), attrs)
+
+
+def _emit_split(batch: list[str], provider: str) -> None:
+    obs.metric("embedding_batch_split", 1, {"provider": provider, "items": len(batch)})
+
+
+def post_json(
+    client: httpx.Client,
+    url: str,
+    *,
+    headers: dict[str, str],
+    payload: dict[str, Any],
+    max_retries: int = 2,
+) -> Any:
+    """POST and decode JSON; 429/503 are retried after `Retry-After` (or exponential backoff)."""
+    attempt = 0
+    while True:
+        res = client.post(url, headers=headers, json=payload)
+        if res.status_code in _RETRY_STATUS and attempt < max_retries:
+            time.sleep(_retry_delay(res, attempt))
+            attempt += 1
+            continue
+        res.raise_for_status()
+        return res.json()
+
+
+async def apost_json(
+    client: httpx.AsyncClient,
+    url: str,
+    *,
+    headers: dict[str, str],
+    payload: dict[str, Any],
+    max_retries: int = 2,
+) -> Any:
+    attempt = 0
+    while True:
+        res = await client.post(url, headers=headers, json=payload)
+        if res.status_code in _RETRY_STATUS and attempt < max_retries:
+            await asyncio.sleep(_retry_delay(res, attempt))
+            attempt += 1
+            continue
+        res.raise_for_status()
+        return res.json()
+
+
+def run_batches(
+    post: Callable[[list[str]], list[list[float]]],
+    batches: list[list[str]],
+    *,
+    max_concurrency: int,
+) -> list[list[float]]:
+    """Embed `batches` with up to `max_concurrency` requests in flight; output keeps input order."""
+    if max_concurrency <= 1 or len(batches) <= 1:
+        return [vec for batch in batches for vec in post(batch)]
+
+    with ThreadPoolExecutor(max_workers=min(max_concurrency, len(batches)), thread_name_prefix="embed") as pool:
+        # Each task gets its own context copy so trace events from workers land in the caller's trace.
+        futures: list[Future] = [pool.submit(contextvars.copy_context().run, post, b) for b in batches]
+        try:
+            results = [f.result() for f in futures]
+        except BaseException:
+            for f in futures:
+                f.cancel()
+            raise
+    return [vec for r in results for vec in r]
+
+
+async def arun_batches(
+    post: Callable[[list[str]], Awaitable[list[list[float]]]],
+    batches: list[list[str]],
+    *,
+    max_concurrency: int,
+) -> list[list[float]]:
+    sem = asyncio.Semaphore(max(1, int(max_concurrency)))
+
+    async def _one(batch: list[str]) -> list[list[float]]:
+        async with sem:
+            return await post(batch)
+
+    tasks = [asyncio.ensure_future(_one(b)) for b in batches]
+    try:
+        results = await asyncio.gather(*tasks)
+    except BaseException:
+        for t in tasks:
+            t.cancel()
+        raise
+    return [vec for r in results for vec in r]
+
+
+def _retry_delay(res: httpx.Response, attempt: int) -> float:
+    raw = res.headers.get("retry-after")
+    try:
+        delay = float(raw) if raw is not None else 0.5 * (2**attempt)
+    except ValueError:
+        delay = 0.5 * (2**attempt)
+    return max(0.0, min(delay, _MAX_RETRY_DELAY_S))
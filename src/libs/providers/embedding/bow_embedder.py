@@ -1,12 +1,16 @@
 from __future__ import annotations
 
 import hashlib
-import math
 import re
 from dataclasses import dataclass
+from functools import lru_cache
+
+import numpy as np
 
 
 _TOK_RE = re.compile(r"[0-9A-Za-z_]+|[\u4e00-\u9fff]+")
+# Texts per bincount pass; bounds the dense (rows x dim) scratch matrix.
+_BLOCK_ROWS = 4096
 
 
 @dataclass
@@ -22,18 +26,28 @@ class BowHashEmbedder:
     def embed_texts(self, texts: list[str]) -> list[list[float]]:
         if self.dim <= 0:
             raise ValueError("dim must be positive")
-        return [self._embed_one(t or "") for t in texts]
-
-    def _embed_one(self, text: str) -> list[float]:
-        vec = [0.0] * self.dim
-        tokens = _TOK_RE.findall(text.lower())
-        for tok in tokens:
-            h = hashlib.sha256(tok.encode("utf-8")).digest()
-            idx = int.from_bytes(h[:4], "big") % self.dim
-            vec[idx] += 1.0
-
-        n = math.sqrt(sum(v * v for v in vec))
-        if n > 0.0:
-            vec = [v / n for v in vec]
-        return vec
-
+        out: list[list[float]] = []
+        for start in range(0, len(texts), _BLOCK_ROWS):
+            out.extend(self._embed_block(texts[start : start + _BLOCK_ROWS]))
+        return out
+
+    def _embed_block(self, texts: list[str]) -> list[list[float]]:
+        dim = int(self.dim)
+        rows: list[int] = []
+        hashes: list[int] = []
+        for row, text in enumerate(texts):
+            tokens = _TOK_RE.findall((text or "").lower())
+            hashes.extend(map(_token_hash, tokens))
+            rows.extend([row] * len(tokens))
+
+        flat = np.asarray(rows, dtype=np.int64) * dim + np.asarray(hashes, dtype=np.int64) % dim
+        counts = np.bincount(flat, minlength=len(texts) * dim).astype(np.float64).reshape(len(texts), dim)
+        # Counts are small integers, so the squared norm is exact and matches a sequential sum.
+        norms = np.sqrt(np.einsum("ij,ij->i", counts, counts))[:, None]
+        np.divide(counts, norms, out=counts, where=norms > 0.0)
+        return counts.tolist()
+
+
+@lru_cache(maxsize=1 << 16)
+def _token_hash(tok: str) -> int:
+    return int.from_bytes(hashlib.sha256(tok.encode("utf-8")).digest()[:4], "big")
@@ -1,10 +1,20 @@
 from __future__ import annotations
 
 import hashlib
+import json
+import sqlite3
+import threading
+import time
 import unicodedata
+from collections import OrderedDict
 from dataclasses import dataclass, field
+from pathlib import Path
 from typing import Protocol
 
+import numpy as np
+
+_SQL_BATCH = 500
+
 
 class EmbeddingCache(Protocol):
     def get(self, key: str) -> list[float] | None:
@@ -25,6 +35,144 @@ class InMemoryEmbeddingCache:
         self._store[key] = vector
 
 
+@dataclass
+class LruEmbeddingCache:
+    """Bounded, thread-safe LRU; `max_entries <= 0` caches nothing."""
+
+    max_entries: int = 1024
+    _store: OrderedDict[str, list[float]] = field(default_factory=OrderedDict, repr=False)
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def get(self, key: str) -> list[float] | None:
+        with self._lock:
+            vec = self._store.get(key)
+            if vec is not None:
+                self._store.move_to_end(key)
+            return vec
+
+    def put(self, key: str, vector: list[float]) -> None:
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._store[key] = vector
+            self._store.move_to_end(key)
+            while len(self._store) > self.max_entries:
+                self._store.popitem(last=False)
+
+
+@dataclass
+class SqliteEmbeddingCache:
+    """Persistent cache: float32 vector blobs in SQLite, evicting least recently used past `max_entries`.
+
+    `get_many` / `put_many` serve a whole batch per connection; ingestion uses them when present.
+    The row count lives in `cache_meta` (kept by triggers) so writes never scan the table, and a
+    hit only rewrites `last_used` once it is older than `touch_interval_s`, so warm reads stay
+    read-only. Eviction order is therefore LRU at that granularity.
+    """
+
+    db_path: str = "cache/embeddings.sqlite"
+    max_entries: int = 500_000
+    touch_interval_s: float = 60.0
+
+    def __post_init__(self) -> None:
+        Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, dim INTEGER, vector_blob BLOB, last_used REAL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_embeddings_last_used ON embeddings(last_used)")
+            conn.execute("CREATE TABLE IF NOT EXISTS cache_meta (key TEXT PRIMARY KEY, value TEXT)")
+            for name, op, delta in (("embeddings_ai", "INSERT", "+ 1"), ("embeddings_ad", "DELETE", "- 1")):
+                conn.execute(
+                    f"""
+                    CREATE TRIGGER IF NOT EXISTS {name} AFTER {op} ON embeddings BEGIN
+                        UPDATE cache_meta SET value = CAST(value AS INTEGER) {delta} WHERE key = 'row_count';
+                    END
+                    """
+                )
+            # Seeded after the triggers exist, so rows written in between are counted exactly once.
+            conn.execute(
+                "INSERT OR IGNORE INTO cache_meta(key, value) VALUES('row_count', (SELECT COUNT(*) FROM embeddings))"
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.db_path)
+
+    def get(self, key: str) -> list[float] | None:
+        return self.get_many([key])[0]
+
+    def put(self, key: str, vector: list[float]) -> None:
+        self.put_many([(key, vector)])
+
+    def get_many(self, keys: list[str]) -> list[list[float] | None]:
+        found: dict[str, list[float]] = {}
+        now = time.time()
+        stale: list[str] = []
+        with self._connect() as conn:
+            for i in range(0, len(keys), _SQL_BATCH):
+                batch = keys[i : i + _SQL_BATCH]
+                placeholders = ",".join("?" * len(batch))
+                rows = conn.execute(
+                    f"SELECT key, vector_blob, last_used FROM embeddings WHERE key IN ({placeholders})", batch
+                ).fetchall()
+                for key, blob, last_used in rows:
+                    found[key] = np.frombuffer(blob, dtype=np.float32).tolist()
+                    if last_used is None or now - float(last_used) >= self.touch_interval_s:
+                        stale.append(key)
+            for i in range(0, len(stale), _SQL_BATCH):
+                batch = stale[i : i + _SQL_BATCH]
+                conn.execute(
+                    f"UPDATE embeddings SET last_used=? WHERE key IN ({','.join('?' * len(batch))})", [now, *batch]
+                )
+        return [found.get(k) for k in keys]
+
+    def put_many(self, items: list[tuple[str, list[float]]]) -> None:
+        if not items:
+            return
+        now = time.time()
+        rows = []
+        for key, vector in items:
+            arr = np.asarray(vector, dtype=np.float32)
+            rows.append((key, int(arr.shape[0]), arr.tobytes(), now))
+        with self._connect() as conn:
+            # ON CONFLICT (not INSERT OR REPLACE) so overwrites do not fire the count triggers.
+            conn.executemany(
+                """
+                INSERT INTO embeddings(key, dim, vector_blob, last_used) VALUES(?, ?, ?, ?)
+                ON CONFLICT(key) DO UPDATE SET
+                    dim=excluded.dim, vector_blob=excluded.vector_blob, last_used=excluded.last_used
+                """,
+                rows,
+            )
+            count = _row_count(conn)
+            if count > self.max_entries:
+                conn.execute(
+                    "DELETE FROM embeddings WHERE key IN (SELECT key FROM embeddings ORDER BY last_used LIMIT ?)",
+                    (count - max(0, self.max_entries),),
+                )
+
+    def count(self) -> int:
+        with self._connect() as conn:
+            return _row_count(conn)
+
+
+def _row_count(conn: sqlite3.Connection) -> int:
+    return int(conn.execute("SELECT value FROM cache_meta WHERE key = 'row_count'").fetchone()[0])
+
+
+EMBEDDING_CACHE_PROVIDERS = ("embedding_cache.sqlite", "embedding_cache.memory")
+
+
+def make_embedding_cache(provider_id: str, params: dict | None, *, default_db_path: Path) -> EmbeddingCache:
+    kwargs = dict(params or {})
+    if provider_id == "embedding_cache.sqlite":
+        kwargs.setdefault("db_path", str(default_db_path))
+        return SqliteEmbeddingCache(**kwargs)
+    if provider_id == "embedding_cache.memory":
+        return LruEmbeddingCache(**kwargs)
+    raise ValueError(f"unknown embedding cache provider: {provider_id!r} (expected one of {EMBEDDING_CACHE_PROVIDERS})")
+
+
 def canonical(text: str, *, profile_id: str = "default") -> str:
     """Canonicalize text for stable hashing/embedding.
 
@@ -65,3 +213,39 @@ def make_embedding_cache_key(
     embedder_version: str,
 ) -> str:
     return f"{embedder_id}:{embedder_version}:{text_norm_profile_id}:{content_hash}"
+
+
+# Embedder params that change how requests are made, never the vectors returned.
+_RUNTIME_ONLY_PARAMS = frozenset(
+    {
+        "api_key",
+        "timeout_s",
+        "batch_size",
+        "max_batch_tokens",
+        "max_concurrency",
+        "max_retries",
+        "http2",
+        "extra_headers",
+        "num_threads",
+        "device",
+        "version",  # already part of the cache key as `embedder_version`
+    }
+)
+_MODEL_PARAMS = ("model", "deployment_name", "model_name")
+
+
+def embedder_cache_id(provider_id: str, params: dict | None) -> str:
+    """Embedder identity for cache keys: provider id and model, plus a digest of the other params.
+
+    Every param not in `_RUNTIME_ONLY_PARAMS` is assumed to affect the output
+    (`dimensions`, `dim`, `normalize`, `backend`, `onnx_file_name`, `base_url`, ...),
+    so changing one of them never serves vectors computed under the old value.
+    """
+    params = params or {}
+    model = next((params[k] for k in _MODEL_PARAMS if params.get(k)), None)
+    ident = f"{provider_id}/{model}" if model else provider_id
+    output = {k: v for k, v in params.items() if k not in _RUNTIME_ONLY_PARAMS and k not in _MODEL_PARAMS}
+    if not output:
+        return ident
+    digest = hashlib.sha256(json.dumps(output, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+    return f"{ident}#{digest[:16]}"
@@ -1,20 +1,23 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Any, Iterable
+from typing import Any
 
 import httpx
 import logging
 
 from ....observability.obs import api as obs
-
-
-def _chunks(items: list[str], size: int) -> Iterable[list[str]]:
-    if size <= 0:
-        yield items
-        return
-    for i in range(0, len(items), size):
-        yield items[i : i + size]
+from .batching import (
+    aadaptive,
+    adaptive,
+    apost_json,
+    arun_batches,
+    async_client,
+    plan_batches,
+    pooled_client,
+    post_json,
+    run_batches,
+)
 
 
 @dataclass
@@ -30,11 +33,68 @@ class OpenAICompatibleEmbedder:
     batch_size: int = 10
     dimensions: int | None = None
     extra_headers: dict[str, str] | None = None
+    # Batches in flight at once over a shared keep-alive client (HTTP/2 when `h2` is installed).
+    max_concurrency: int = 4
+    http2: bool = True
+    max_retries: int = 2
+    # Per-request cap on estimated tokens; `batch_size` caps items. Rejected (413) batches are split.
+    max_batch_tokens: int = 64_000
 
     def embed_texts(self, texts: list[str]) -> list[list[float]]:
         if not texts:
             return []
 
+        url, headers = self._endpoint()
+        client = pooled_client(timeout_s=self.timeout_s, max_connections=self.max_concurrency, http2=self.http2)
+
+        def post(batch: list[str]) -> list[list[float]]:
+            try:
+                data = post_json(client, url, headers=headers, payload=self._payload(batch), max_retries=self.max_retries)
+            except httpx.HTTPError as e:
+                _report_error(url, e)
+                raise
+            return _extract_embeddings(data)
+
+        out = run_batches(
+            adaptive(post, provider=f"openai_compatible/{self.model}"),
+            self._plan(texts),
+            max_concurrency=self.max_concurrency,
+        )
+        if len(out) != len(texts):
+            raise ValueError("embedding_count_mismatch")
+        return out
+
+    async def aembed_texts(self, texts: list[str]) -> list[list[float]]:
+        """Async `embed_texts` over `httpx.AsyncClient`."""
+        if not texts:
+            return []
+
+        url, headers = self._endpoint()
+        client = async_client(timeout_s=self.timeout_s, max_connections=self.max_concurrency, http2=self.http2)
+
+        async def post(batch: list[str]) -> list[list[float]]:
+            try:
+                data = await apost_json(
+                    client, url, headers=headers, payload=self._payload(batch), max_retries=self.max_retries
+                )
+            except httpx.HTTPError as e:
+                _report_error(url, e)
+                raise
+            return _extract_embeddings(data)
+
+        out = await arun_batches(
+            aadaptive(post, provider=f"openai_compatible/{self.model}"),
+            self._plan(texts),
+            max_concurrency=self.max_concurrency,
+        )
+        if len(out) != len(texts):
+            raise ValueError("embedding_count_mismatch")
+        return out
+
+    def _plan(self, texts: list[str]) -> list[list[str]]:
+        return plan_batches(texts, max_items=self.batch_size, max_tokens=self.max_batch_tokens)
+
+    def _endpoint(self) -> tuple[str, dict[str, str]]:
         url = self._join(self.base_url, "/embeddings")
         headers = {
             "Authorization": f"Bearer {self.api_key}",
@@ -42,41 +102,13 @@ class OpenAICompatibleEmbedder:
         }
         if self.extra_headers:
             headers.update(self.extra_headers)
+        return url, headers
 
-        out: list[list[float]] = []
-        with httpx.Client(timeout=self.timeout_s) as client:
-            for batch in _chunks(texts, self.batch_size):
-                payload: dict[str, Any] = {"model": self.model, "input": batch}
-                if self.dimensions is not None:
-                    payload["dimensions"] = self.dimensions
-                try:
-                    res = client.post(url, headers=headers, json=payload)
-                    res.raise_for_status()
-                    data = res.json()
-                    out.extend(_extract_embeddings(data))
-                except httpx.HTTPStatusError as e:
-                    resp = e.response
-                    status = getattr(resp, "status_code", None)
-                    text = getattr(resp, "text", "")
-                    # Emit observability event with trimmed response body
-                    try:
-                        obs.event("embedder.http_error", {"url": url, "status": status, "response_snippet": (text[:1000] if isinstance(text, str) else repr(text))})
-                    except Exception:
-                        logging.exception("failed to emit embedder observability event")
-                    logging.error("Embedding HTTP error %s %s: %s", status, url, text[:1000])
-                    raise
-                except httpx.RequestError as e:
-                    # Network / timeout / DNS errors
-                    try:
-                        obs.event("embedder.request_error", {"url": url, "error": str(e)})
-                    except Exception:
-                        logging.exception("failed to emit embedder observability event")
-                    logging.exception("Embedding request failed for %s", url)
-                    raise
-
-        if len(out) != len(texts):
-            raise ValueError("embedding_count_mismatch")
-        return out
+    def _payload(self, batch: list[str]) -> dict[str, Any]:
+        payload: dict[str, Any] = {"model": self.model, "input": batch}
+        if self.dimensions is not None:
+            payload["dimensions"] = self.dimensions
+        return payload
 
     @staticmethod
     def _join(base: str, path: str) -> str:
@@ -84,6 +116,26 @@ class OpenAICompatibleEmbedder:
         return f"{base}{path}"
 
 
+def _report_error(url: str, e: httpx.HTTPError) -> None:
+    if isinstance(e, httpx.HTTPStatusError):
+        resp = e.response
+        status = getattr(resp, "status_code", None)
+        text = getattr(resp, "text", "")
+        # Emit observability event with trimmed response body
+        try:
+            obs.event("embedder.http_error", {"url": url, "status": status, "response_snippet": (text[:1000] if isinstance(text, str) else repr(text))})
+        except Exception:
+            logging.exception("failed to emit embedder observability event")
+        logging.error("Embedding HTTP error %s %s: %s", status, url, text[:1000])
+    elif isinstance(e, httpx.RequestError):
+        # Network / timeout / DNS errors
+        try:
+            obs.event("embedder.request_error", {"url": url, "error": str(e)})
+        except Exception:
+            logging.exception("failed to emit embedder observability event")
+        logging.exception("Embedding request failed for %s", url)
+
+
 def _extract_embeddings(data: Any) -> list[list[float]]:
     if not isinstance(data, dict):
         return []
@@ -0,0 +1,153 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any
+
+from .batching import estimate_tokens
+
+
+@dataclass
+class SentenceTransformerEmbedder:
+    """Local CPU/GPU embedder with lazy model loading + process cache.
+
+    Texts are sorted by length and packed into buckets capped by item count and
+    padded tokens (longest text x items), so short chunks are not padded up to
+    the longest one in the request. Output order always matches input order.
+    """
+
+    model_name: str
+    device: str = "cpu"
+    revision: str | None = None
+    batch_size: int = 32
+    # Cap on longest-text tokens x items per forward pass; <= 0 disables.
+    max_batch_tokens: int = 16_384
+    max_length: int = 512
+    normalize: bool = True
+    # Intra-op threads for torch / onnxruntime; 0 keeps the library default.
+    num_threads: int = 0
+    backend: str = "torch"  # torch|onnx
+    # ONNX file inside the model repo, e.g. "onnx/model_qint8_avx512_vnni.onnx" for int8 inference.
+    onnx_file_name: str | None = None
+
+    def embed_texts(self, texts: list[str]) -> list[list[float]]:
+        if not texts:
+            return []
+
+        out: list[list[float] | None] = [None] * len(texts)
+        for idx in self._buckets(texts):
+            vecs = self._encode([texts[i] or "" for i in idx])
+            if len(vecs) != len(idx):
+                raise ValueError("embedding_count_mismatch")
+            for i, vec in zip(idx, vecs):
+                out[i] = vec
+        return [v for v in out if v is not None]
+
+    def _buckets(self, texts: list[str]) -> list[list[int]]:
+        max_items = max(1, int(self.batch_size))
+        max_tokens = int(self.max_batch_tokens)
+        cap = int(self.max_length) if int(self.max_length) > 0 else None
+        lengths = [min(estimate_tokens(t or ""), cap) if cap else estimate_tokens(t or "") for t in texts]
+
+        buckets: list[list[int]] = []
+        cur: list[int] = []
+        longest = 0
+        # Longest first: the first text of a bucket sets its padded width.
+        for i in sorted(range(len(texts)), key=lambda j: lengths[j], reverse=True):
+            width = max(longest, lengths[i])
+            full = len(cur) >= max_items or (max_tokens > 0 and width * (len(cur) + 1) > max_tokens)
+            if cur and full:
+                buckets.append(cur)
+                cur, width = [], lengths[i]
+            cur.append(i)
+            longest = width
+        if cur:
+            buckets.append(cur)
+        return buckets
+
+    def _encode(self, batch: list[str]) -> list[list[float]]:
+        model = self._load_model_cached(
+            self.model_name,
+            self.device,
+            self.revision,
+            (self.backend or "torch").strip().lower(),
+            self.onnx_file_name,
+            int(self.num_threads),
+            int(self.max_length),
+        )
+        raw = model.encode(
+            batch,
+            batch_size=len(batch),
+            normalize_embeddings=bool(self.normalize),
+            convert_to_numpy=True,
+            show_progress_bar=False,
+        )
+        if hasattr(raw, "tolist"):
+            raw = raw.tolist()
+        return [[float(x) for x in vec] for vec in raw]
+
+    @staticmethod
+    @lru_cache(maxsize=4)
+    def _load_model_cached(
+        model_name: str,
+        device: str,
+        revision: str | None,
+        backend: str,
+        onnx_file_name: str | None,
+        num_threads: int,
+        max_length: int,
+    ) -> Any:
+        # `max_length` is part of the key: `max_seq_length` lives on the shared model
+        # object, so embedders with different limits must not share (and race on) one.
+        if not (model_name or "").strip():
+            raise ValueError("model_name is required for sentence_transformers embedder")
+        if backend not in {"torch", "onnx"}:
+            raise ValueError(f"unsupported backend: {backend}")
+        try:
+            from sentence_transformers import SentenceTransformer
+        except Exception as e:  # pragma: no cover - exercised via integration/runtime.
+            raise RuntimeError(
+                "sentence_transformers dependency missing; install the `local_embedding` optional extras"
+            ) from e
+
+        kwargs: dict[str, Any] = {}
+        dev = (device or "").strip().lower()
+        if dev and dev != "auto":
+            kwargs["device"] = dev
+        if revision:
+            kwargs["revision"] = revision
+        if backend == "onnx":
+            kwargs["backend"] = "onnx"
+            model_kwargs: dict[str, Any] = {}
+            if onnx_file_name:
+                model_kwargs["file_name"] = onnx_file_name
+            if num_threads > 0:
+                model_kwargs["session_options"] = _ort_session_options(num_threads)
+            if model_kwargs:
+                kwargs["model_kwargs"] = model_kwargs
+        elif num_threads > 0:
+            _set_torch_threads(num_threads)
+        model = SentenceTransformer(model_name, **kwargs)
+        if max_length > 0:
+            model.max_seq_length = max_length
+        return model
+
+
+def _set_torch_threads(n: int) -> None:
+    try:
+        import torch
+    except Exception:  # pragma: no cover - torch ships with sentence-transformers.
+        return
+    torch.set_num_threads(n)
+
+
+def _ort_session_options(n: int) -> Any:
+    try:
+        import onnxruntime
+    except Exception as e:  # pragma: no cover - exercised via integration/runtime.
+        raise RuntimeError(
+            "onnx backend requires onnxruntime; install the `local_embedding` optional extras"
+        ) from e
+    opts = onnxruntime.SessionOptions()
+    opts.intra_op_num_threads = n
+    return opts
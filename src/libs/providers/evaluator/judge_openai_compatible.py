@@ -8,6 +8,7 @@ from typing import Any
 import httpx
 
 from ...interfaces.evaluator.judge import JudgeScore
+from ..embedding.batching import async_client
 
 
 @dataclass
@@ -23,22 +24,34 @@ class OpenAICompatibleJudge:
     extra_headers: dict[str, str] | None = None
 
     def score_faithfulness(self, answer: str, context: str) -> JudgeScore:
-        system = (
-            "You are a strict evaluator. Score faithfulness of the answer given the context. "
-            "Return JSON: {\"score\": float between 0 and 1, \"reason\": string}."
-        )
-        user = f"Context:\n{context}\n\nAnswer:\n{answer}\n\nScore faithfulness.".strip()
-        return self._score(system, user)
+        return self._score(*_faithfulness_prompt(answer, context))
 
     def score_answer_relevancy(self, answer: str, query: str) -> JudgeScore:
-        system = (
-            "You are a strict evaluator. Score answer relevancy to the query. "
-            "Return JSON: {\"score\": float between 0 and 1, \"reason\": string}."
-        )
-        user = f"Query:\n{query}\n\nAnswer:\n{answer}\n\nScore relevancy.".strip()
-        return self._score(system, user)
+        return self._score(*_relevancy_prompt(answer, query))
+
+    async def ascore_faithfulness(self, answer: str, context: str) -> JudgeScore:
+        return await self._ascore(*_faithfulness_prompt(answer, context))
+
+    async def ascore_answer_relevancy(self, answer: str, query: str) -> JudgeScore:
+        return await self._ascore(*_relevancy_prompt(answer, query))
 
     def _score(self, system: str, user: str) -> JudgeScore:
+        url, headers, payload = self._request(system, user)
+        with httpx.Client(timeout=self.timeout_s) as client:
+            res = client.post(url, headers=headers, json=payload)
+            res.raise_for_status()
+            data = res.json()
+        return _parse_score(_extract_text(data))
+
+    async def _ascore(self, system: str, user: str) -> JudgeScore:
+        url, headers, payload = self._request(system, user)
+        client = async_client(timeout_s=self.timeout_s, http2=False)
+        res = await client.post(url, headers=headers, json=payload)
+        res.raise_for_status()
+        data = res.json()
+        return _parse_score(_extract_text(data))
+
+    def _request(self, system: str, user: str) -> tuple[str, dict[str, str], dict[str, Any]]:
         url = self._join(self.base_url, "/chat/completions")
         headers = {
             "Authorization": f"Bearer {self.api_key}",
@@ -55,14 +68,7 @@ class OpenAICompatibleJudge:
             ],
             "temperature": self.temperature,
         }
-
-        with httpx.Client(timeout=self.timeout_s) as client:
-            res = client.post(url, headers=headers, json=payload)
-            res.raise_for_status()
-            data = res.json()
-
-        content = _extract_text(data)
-        return _parse_score(content)
+        return url, headers, payload
 
     @staticmethod
     def _join(base: str, path: str) -> str:
@@ -70,6 +76,22 @@ class OpenAICompatibleJudge:
         return f"{base}{path}"
 
 
+def _faithfulness_prompt(answer: str, context: str) -> tuple[str, str]:
+    system = (
+        "You are a strict evaluator. Score faithfulness of the answer given the context. "
+        "Return JSON: {\"score\": float between 0 and 1, \"reason\": string}."
+    )
+    return system, f"Context:\n{context}\n\nAnswer:\n{answer}\n\nScore faithfulness.".strip()
+
+
+def _relevancy_prompt(answer: str, query: str) -> tuple[str, str]:
+    system = (
+        "You are a strict evaluator. Score answer relevancy to the query. "
+        "Return JSON: {\"score\": float between 0 and 1, \"reason\": string}."
+    )
+    return system, f"Query:\n{query}\n\nAnswer:\n{answer}\n\nScore relevancy.".strip()
+
+
 def _extract_text(data: Any) -> str:
     if not isinstance(data, dict):
         return ""
@@ -6,7 +6,8 @@ from typing import Any
 import httpx
 
 from ...interfaces.llm import LLMResult
-from .openai_compatible import _extract_text
+from ..embedding.batching import async_client
+from .openai_compatible import _to_result
 
 
 @dataclass
@@ -21,7 +22,23 @@ class AzureOpenAILLM:
     extra_headers: dict[str, str] | None = None
 
     def generate(self, mode: str, messages: list[dict[str, Any]], **kwargs: Any) -> LLMResult:
-        url = self._endpoint()
+        headers, payload = self._request(messages, kwargs)
+        with httpx.Client(timeout=self.timeout_s) as client:
+            res = client.post(self._endpoint(), headers=headers, json=payload)
+            res.raise_for_status()
+            data = res.json()
+        return _to_result(data, provider="azure_openai", mode=mode)
+
+    async def agenerate(self, mode: str, messages: list[dict[str, Any]], **kwargs: Any) -> LLMResult:
+        """Async `generate` over the event loop's shared `httpx.AsyncClient`."""
+        headers, payload = self._request(messages, kwargs)
+        client = async_client(timeout_s=self.timeout_s, http2=False)
+        res = await client.post(self._endpoint(), headers=headers, json=payload)
+        res.raise_for_status()
+        data = res.json()
+        return _to_result(data, provider="azure_openai", mode=mode)
+
+    def _request(self, messages: list[dict[str, Any]], kwargs: dict[str, Any]) -> tuple[dict[str, str], dict[str, Any]]:
         headers = {
             "api-key": self.api_key,
             "Content-Type": "application/json",
@@ -31,20 +48,7 @@ class AzureOpenAILLM:
 
         payload = {"messages": messages}
         payload.update(kwargs or {})
-
-        with httpx.Client(timeout=self.timeout_s) as client:
-            res = client.post(url, headers=headers, json=payload)
-            res.raise_for_status()
-            data = res.json()
-
-        text = _extract_text(data)
-        usage = data.get("usage", {}) if isinstance(data, dict) else {}
-        return LLMResult(
-            text=text,
-            tokens_in=usage.get("prompt_tokens"),
-            tokens_out=usage.get("completion_tokens"),
-            meta={"provider": "azure_openai", "mode": mode},
-        )
+        return headers, payload
 
     def _endpoint(self) -> str:
         base = self.base_url.rstrip("/")
@@ -9,6 +9,7 @@ import httpx
 
 from ...interfaces.llm import LLMResult
 from ....observability.obs import api as obs
+from ..embedding.batching import async_client
 
 
 @dataclass
@@ -25,6 +26,33 @@ class OpenAICompatibleLLM:
     extra_headers: dict[str, str] | None = None
 
     def generate(self, mode: str, messages: list[dict[str, Any]], **kwargs: Any) -> LLMResult:
+        url, headers, payload = self._request(messages, kwargs)
+        with httpx.Client(timeout=self.timeout_s) as client:
+            try:
+                res = client.post(url, headers=headers, json=payload)
+                res.raise_for_status()
+                data = res.json()
+            except httpx.HTTPError as e:
+                _report_error(url, e)
+                raise
+        return _to_result(data, provider="openai_compatible", mode=mode)
+
+    async def agenerate(self, mode: str, messages: list[dict[str, Any]], **kwargs: Any) -> LLMResult:
+        """Async `generate` over the event loop's shared `httpx.AsyncClient`."""
+        url, headers, payload = self._request(messages, kwargs)
+        client = async_client(timeout_s=self.timeout_s, http2=False)
+        try:
+            res = await client.post(url, headers=headers, json=payload)
+            res.raise_for_status()
+            data = res.json()
+        except httpx.HTTPError as e:
+            _report_error(url, e)
+            raise
+        return _to_result(data, provider="openai_compatible", mode=mode)
+
+    def _request(
+        self, messages: list[dict[str, Any]], kwargs: dict[str, Any]
+    ) -> tuple[str, dict[str, str], dict[str, Any]]:
         url = self._join(self.base_url, "/chat/completions")
         headers = {
             "Authorization": f"Bearer {self.api_key}",
@@ -38,38 +66,7 @@ class OpenAICompatibleLLM:
             "messages": messages,
         }
         payload.update(kwargs or {})
-
-        with httpx.Client(timeout=self.timeout_s) as client:
-            try:
-                res = client.post(url, headers=headers, json=payload)
-                res.raise_for_status()
-                data = res.json()
-            except httpx.HTTPStatusError as e:
-                resp = e.response
-                status = getattr(resp, "status_code", None)
-                text = getattr(resp, "text", "")
-                try:
-                    obs.event("llm.http_error", {"url": url, "status": status, "response_snippet": (text[:1000] if isinstance(text, str) else repr(text))})
-                except Exception:
-                    logging.exception("failed to emit llm observability event")
-                logging.error("LLM HTTP error %s %s: %s", status, url, text[:1000])
-                raise
-            except httpx.RequestError as e:
-                try:
-                    obs.event("llm.request_error", {"url": url, "error": str(e)})
-                except Exception:
-                    logging.exception("failed to emit llm observability event")
-                logging.exception("LLM request failed for %s", url)
-                raise
-
-        text = _extract_text(data)
-        usage = data.get("usage", {}) if isinstance(data, dict) else {}
-        return LLMResult(
-            text=text,
-            tokens_in=usage.get("prompt_tokens"),
-            tokens_out=usage.get("completion_tokens"),
-            meta={"provider": "openai_compatible", "mode": mode},
-        )
+        return url, headers, payload
 
     @staticmethod
     def _join(base: str, path: str) -> str:
@@ -77,6 +74,35 @@ class OpenAICompatibleLLM:
         return f"{base}{path}"
 
 
+def _report_error(url: str, e: httpx.HTTPError) -> None:
+    if isinstance(e, httpx.HTTPStatusError):
+        resp = e.response
+        status = getattr(resp, "status_code", None)
+        text = getattr(resp, "text", "")
+        try:
+            obs.event("llm.http_error", {"url": url, "status": status, "response_snippet": (text[:1000] if isinstance(text, str) else repr(text))})
+        except Exception:
+            logging.exception("failed to emit llm observability event")
+        logging.error("LLM HTTP error %s %s: %s", status, url, text[:1000])
+    elif isinstance(e, httpx.RequestError):
+        try:
+            obs.event("llm.request_error", {"url": url, "error": str(e)})
+        except Exception:
+            logging.exception("failed to emit llm observability event")
+        logging.exception("LLM request failed for %s", url)
+
+
+def _to_result(data: Any, *, provider: str, mode: str) -> LLMResult:
+    text = _extract_text(data)
+    usage = data.get("usage", {}) if isinstance(data, dict) else {}
+    return LLMResult(
+        text=text,
+        tokens_in=usage.get("prompt_tokens"),
+        tokens_out=usage.get("completion_tokens"),
+        meta={"provider": provider, "mode": mode},
+    )
+
+
 def _extract_text(data: Any) -> str:
     if not isinstance(data, dict):
         return ""
@@ -8,6 +8,7 @@ from typing import Any
 import httpx
 
 from ...interfaces.vector_store.retriever import RankedCandidate
+from ..embedding.batching import async_client
 
 
 @dataclass
@@ -26,9 +27,30 @@ class OpenAICompatibleLLMReranker:
     max_chunk_chars: int = 600
 
     def rerank(self, query: str, candidates: list[RankedCandidate]) -> list[RankedCandidate]:
-        if not candidates:
-            return []
+        items = self._items(candidates)
+        if not items:
+            return candidates
+        url, headers, payload = self._request(query, items)
+        with httpx.Client(timeout=self.timeout_s) as client:
+            res = client.post(url, headers=headers, json=payload)
+            res.raise_for_status()
+            data = res.json()
+        return _order(candidates, _parse_scores(_extract_text(data)))
 
+    async def arerank(self, query: str, candidates: list[RankedCandidate]) -> list[RankedCandidate]:
+        """Async `rerank` over the event loop's shared `httpx.AsyncClient`."""
+        items = self._items(candidates)
+        if not items:
+            return candidates
+        url, headers, payload = self._request(query, items)
+        client = async_client(timeout_s=self.timeout_s, http2=False)
+        res = await client.post(url, headers=headers, json=payload)
+        res.raise_for_status()
+        data = res.json()
+        return _order(candidates, _parse_scores(_extract_text(data)))
+
+    def _items(self, candidates: list[RankedCandidate]) -> list[dict[str, Any]]:
+        """Passages to score; empty when there is nothing (no candidates / no text) to rerank."""
         top = list(candidates[: max(0, int(self.max_candidates))])
         payload_items: list[dict[str, Any]] = []
         for c in top:
@@ -38,20 +60,10 @@ class OpenAICompatibleLLMReranker:
 
         # If no text is available, keep original order.
         if not any(it.get("text") for it in payload_items):
-            return candidates
-
-        scores = self._score(query, payload_items)
-        if not scores:
-            return candidates
-
-        def key_fn(rc: RankedCandidate) -> tuple[float, int]:
-            # Stable: keep original rank for tie-break.
-            return (float(scores.get(rc.chunk_id, -1.0)), -int(getattr(rc, "rank", 0) or 0))
-
-        reranked = sorted(list(candidates), key=key_fn, reverse=True)
-        return reranked
+            return []
+        return payload_items
 
-    def _score(self, query: str, items: list[dict[str, Any]]) -> dict[str, float]:
+    def _request(self, query: str, items: list[dict[str, Any]]) -> tuple[str, dict[str, str], dict[str, Any]]:
         url = self._join(self.base_url, "/chat/completions")
         headers = {
             "Authorization": f"Bearer {self.api_key}",
@@ -74,34 +86,7 @@ class OpenAICompatibleLLMReranker:
             ],
             "temperature": 0.0,
         }
-
-        with httpx.Client(timeout=self.timeout_s) as client:
-            res = client.post(url, headers=headers, json=payload)
-            res.raise_for_status()
-            data = res.json()
-
-        text = _extract_text(data)
-        if not text:
-            return {}
-
-        try:
-            arr = json.loads(_extract_json(text))
-            if not isinstance(arr, list):
-                return {}
-            out: dict[str, float] = {}
-            for item in arr:
-                if not isinstance(item, dict):
-                    continue
-                cid = item.get("chunk_id")
-                score = item.get("score")
-                if isinstance(cid, str) and cid:
-                    try:
-                        out[cid] = float(score)
-                    except Exception:
-                        continue
-            return out
-        except Exception:
-            return {}
+        return url, headers, payload
 
     @staticmethod
     def _join(base: str, path: str) -> str:
@@ -109,6 +94,41 @@ class OpenAICompatibleLLMReranker:
         return f"{base}{path}"
 
 
+def _order(candidates: list[RankedCandidate], scores: dict[str, float]) -> list[RankedCandidate]:
+    if not scores:
+        return candidates
+
+    def key_fn(rc: RankedCandidate) -> tuple[float, int]:
+        # Stable: keep original rank for tie-break.
+        return (float(scores.get(rc.chunk_id, -1.0)), -int(getattr(rc, "rank", 0) or 0))
+
+    return sorted(list(candidates), key=key_fn, reverse=True)
+
+
+def _parse_scores(text: str) -> dict[str, float]:
+    if not text:
+        return {}
+
+    try:
+        arr = json.loads(_extract_json(text))
+        if not isinstance(arr, list):
+            return {}
+        out: dict[str, float] = {}
+        for item in arr:
+            if not isinstance(item, dict):
+                continue
+            cid = item.get("chunk_id")
+            score = item.get("score")
+            if isinstance(cid, str) and cid:
+                try:
+                    out[cid] = float(score)
+                except Exception:
+                    continue
+        return out
+    except Exception:
+        return {}
+
+
 def _truncate(text: str, max_chars: int) -> str:
     s = (text or "").strip()
     if max_chars <= 0:
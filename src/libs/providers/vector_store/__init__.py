@@ -1,5 +1,15 @@
 from .chroma import ChromaVectorIndex
 from .chroma_lite import ChromaLiteVectorIndex
+from .hnsw import HnswVectorIndex
 from .in_memory import InMemoryVectorIndex
+from .ivf_pq import IvfPqVectorIndex
+from .segmented import SegmentedVectorIndex
 
-__all__ = ["InMemoryVectorIndex", "ChromaLiteVectorIndex", "ChromaVectorIndex"]
+__all__ = [
+    "InMemoryVectorIndex",
+    "ChromaLiteVectorIndex",
+    "ChromaVectorIndex",
+    "HnswVectorIndex",
+    "IvfPqVectorIndex",
+    "SegmentedVectorIndex",
+]
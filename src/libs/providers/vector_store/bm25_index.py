@@ -0,0 +1,568 @@
+from __future__ import annotations
+
+import json
+import os
+import re
+import unicodedata
+from collections import Counter
+from dataclasses import dataclass, replace
+from functools import cached_property
+from pathlib import Path
+from typing import Iterable
+
+import numpy as np
+
+from ...interfaces.vector_store.store import SearchFilter
+from .matrix import filter_mask, top_k_indices
+
+_MAGIC = b"BM25IDX2"
+_ALIGN = 8
+_UB_MARGIN = 1e-5
+_LOOKUP_COST = 4
+_WORD_RE = re.compile(r"[0-9a-z_]+|[\u4e00-\u9fff]+")
+_CJK_RE = re.compile(r"[\u4e00-\u9fff]")
+
+TOKENIZERS = ("unicode61", "cjk_bigram")
+TOPK_METHODS = ("block_max", "exhaustive")
+
+
+def tokenize(text: str, profile: str = "unicode61") -> list[str]:
+    """Lower-cased ASCII word tokens plus CJK runs.
+
+    `unicode61` keeps each CJK run as one token (like FTS5's default tokenizer);
+    `cjk_bigram` splits CJK runs into overlapping bigrams.
+    """
+    text = unicodedata.normalize("NFKC", text or "").lower()
+    tokens = _WORD_RE.findall(text)
+    if profile == "unicode61":
+        return tokens
+    if profile != "cjk_bigram":
+        raise ValueError(f"unknown tokenizer: {profile!r} (expected one of {TOKENIZERS})")
+    out: list[str] = []
+    for tok in tokens:
+        if len(tok) > 1 and _CJK_RE.match(tok):
+            out.extend(tok[i : i + 2] for i in range(len(tok) - 1))
+        else:
+            out.append(tok)
+    return out
+
+
+@dataclass(frozen=True)
+class Bm25Index:
+    """Immutable inverted index: term -> (doc ordinals, term frequencies).
+
+    Postings of term `t` are `post_docs[term_offsets[t]:term_offsets[t + 1]]`
+    (ascending doc ordinal) with matching `post_tf`. Arrays loaded from disk are
+    read-only views over an mmap.
+
+    Each posting list is cut into blocks at document-window boundaries
+    (`window` consecutive ordinals). A block stores its max tf and the shortest
+    document length it touches, which bound the BM25 contribution of every
+    posting in it for any k1/b; block-max top-k uses these bounds to skip
+    postings that cannot reach the current top-k.
+
+    `live`, when set, masks out rows superseded by a `Bm25DeltaIndex`.
+    """
+
+    generation: int
+    tokenizer: str
+    terms: dict[str, int]
+    term_offsets: np.ndarray  # int64 (V + 1,)
+    post_docs: np.ndarray  # int32 (P,)
+    post_tf: np.ndarray  # float32 (P,)
+    idf: np.ndarray  # float32 (V,)
+    doc_len: np.ndarray  # float32 (N,)
+    chunk_ids: list[str]
+    doc_ids: np.ndarray  # str (N,), "" when unknown
+    version_ids: np.ndarray  # str (N,)
+    avg_len: float
+    window: int
+    blk_offsets: np.ndarray  # int64 (V + 1,): blocks of term t are blk_offsets[t]:blk_offsets[t + 1]
+    blk_start: np.ndarray  # int64 (B + 1,): postings of block j are blk_start[j]:blk_start[j + 1]
+    blk_win: np.ndarray  # int32 (B,)
+    blk_max_tf: np.ndarray  # float32 (B,)
+    blk_min_len: np.ndarray  # float32 (B,)
+    live: np.ndarray | None = None  # bool (N,)
+
+    @property
+    def num_docs(self) -> int:
+        return len(self.chunk_ids)
+
+    @cached_property
+    def ordinals(self) -> dict[str, int]:
+        """chunk id -> doc ordinal."""
+        return {cid: i for i, cid in enumerate(self.chunk_ids)}
+
+    @classmethod
+    def build(
+        cls,
+        docs: Iterable[tuple[str, str, str | None, str | None]],
+        *,
+        tokenizer: str = "unicode61",
+        generation: int = 0,
+        window: int = 128,
+    ) -> "Bm25Index":
+        """Build from `(chunk_id, text, doc_id, version_id)` rows."""
+        terms: dict[str, int] = {}
+        chunk_ids: list[str] = []
+        doc_ids: list[str] = []
+        version_ids: list[str] = []
+        lengths: list[int] = []
+        p_term: list[int] = []
+        p_doc: list[int] = []
+        p_tf: list[int] = []
+        for chunk_id, text, doc_id, version_id in docs:
+            ordinal = len(chunk_ids)
+            chunk_ids.append(chunk_id)
+            doc_ids.append(doc_id or "")
+            version_ids.append(version_id or "")
+            toks = tokenize(text, tokenizer)
+            lengths.append(len(toks))
+            for term, tf in Counter(toks).items():
+                p_term.append(terms.setdefault(term, len(terms)))
+                p_doc.append(ordinal)
+                p_tf.append(tf)
+
+        n = len(chunk_ids)
+        v = len(terms)
+        term_arr = np.asarray(p_term, dtype=np.int64)
+        # Stable sort keeps doc ordinals ascending within each posting list.
+        order = np.argsort(term_arr, kind="stable")
+        df = np.bincount(term_arr, minlength=v).astype(np.int64)
+        offsets = np.zeros(v + 1, dtype=np.int64)
+        np.cumsum(df, out=offsets[1:])
+        idf = _idf(n, df)
+        post_docs = np.asarray(p_doc, dtype=np.int32)[order]
+        post_tf = np.asarray(p_tf, dtype=np.float32)[order]
+        doc_len = np.asarray(lengths, dtype=np.float32)
+        blk_offsets, blk_start, blk_win, blk_max_tf, blk_min_len = _blocks(
+            offsets, post_docs, post_tf, doc_len, int(window)
+        )
+        return cls(
+            generation=int(generation),
+            tokenizer=tokenizer,
+            terms=terms,
+            term_offsets=offsets,
+            post_docs=post_docs,
+            post_tf=post_tf,
+            idf=idf,
+            doc_len=doc_len,
+            chunk_ids=chunk_ids,
+            doc_ids=np.asarray(doc_ids, dtype=str),
+            version_ids=np.asarray(version_ids, dtype=str),
+            avg_len=float(np.mean(lengths)) if lengths else 0.0,
+            window=int(window),
+            blk_offsets=blk_offsets,
+            blk_start=blk_start,
+            blk_win=blk_win,
+            blk_max_tf=blk_max_tf,
+            blk_min_len=blk_min_len,
+        )
+
+    def term_ids(self, query: str) -> list[int]:
+        """Distinct known term ids of `query`, in first-occurrence order."""
+        seen = dict.fromkeys(t for t in tokenize(query, self.tokenizer) if t in self.terms)
+        return [self.terms[t] for t in seen]
+
+    def search(
+        self,
+        query: str,
+        top_k: int,
+        *,
+        k1: float = 1.2,
+        b: float = 0.75,
+        search_filter: SearchFilter | None = None,
+        method: str = "block_max",
+        stats: dict[str, int] | None = None,
+    ) -> list[tuple[str, float]]:
+        """BM25 top-k (any-term match), best first; ties keep the lower doc ordinal.
+
+        `block_max` returns exactly the `exhaustive` result while skipping
+        postings whose score upper bound cannot enter the top-k. `stats`, when
+        given, receives posting counts (total vs scored).
+        """
+        if method not in TOPK_METHODS:
+            raise ValueError(f"unknown top-k method: {method!r} (expected one of {TOPK_METHODS})")
+        tids = self.term_ids(query)
+        if top_k <= 0 or not tids or self.num_docs == 0:
+            return []
+        # Rarest terms first; both methods accumulate in this order.
+        tids.sort(key=lambda t: (int(self.term_offsets[t + 1] - self.term_offsets[t]), t))
+        total = sum(int(self.term_offsets[t + 1] - self.term_offsets[t]) for t in tids)
+        if stats is not None:
+            stats["postings_total"] = total
+            stats["postings_scored"] = total
+        allowed = self.live
+        if search_filter is not None and not search_filter.is_empty():
+            allowed = filter_mask(self.doc_ids, self.version_ids, search_filter)
+            if self.live is not None:
+                allowed &= self.live
+        # Below ~one posting per four documents the per-query O(N) setup dominates.
+        if method == "block_max" and total * 4 > self.num_docs:
+            return self._search_block_max(tids, top_k, k1, b, allowed, stats)
+        return self._search_exhaustive(tids, top_k, k1, b, allowed)
+
+    def _search_exhaustive(
+        self,
+        tids: list[int],
+        top_k: int,
+        k1: float,
+        b: float,
+        allowed: np.ndarray | None,
+    ) -> list[tuple[str, float]]:
+        scores = np.zeros(self.num_docs, dtype=np.float32)
+        matched = np.zeros(self.num_docs, dtype=np.bool_)
+        for t in tids:
+            self._accumulate(t, scores, matched, k1, b)
+        return self._top(scores, matched, top_k, allowed)
+
+    def _search_block_max(
+        self,
+        tids: list[int],
+        top_k: int,
+        k1: float,
+        b: float,
+        allowed: np.ndarray | None,
+        stats: dict[str, int] | None,
+    ) -> list[tuple[str, float]]:
+        """Block-max MaxScore.
+
+        Terms are scored exhaustively ("essential", rarest first) until the
+        remaining terms' upper bounds sum below the k-th best partial score; a
+        document matching only those cannot enter the top-k. Candidates are then
+        pruned with the remaining terms' per-window block bounds, and the
+        survivors get those terms via posting-list lookups. Scores accumulate in
+        the same term order as the exhaustive path, so results are identical.
+        """
+        n = self.num_docs
+        w_size = self.window
+        win_ub: dict[int, np.ndarray] = {}
+        term_ub: dict[int, float] = {}
+        for t in tids:
+            lo, hi = int(self.blk_offsets[t]), int(self.blk_offsets[t + 1])
+            mtf = self.blk_max_tf[lo:hi]
+            ub = self.idf[t] * mtf * (k1 + 1.0) / (mtf + self._norm_of_len(self.blk_min_len[lo:hi], k1, b))
+            per_win = np.zeros((n + w_size - 1) // w_size, dtype=np.float64)
+            per_win[self.blk_win[lo:hi]] = ub  # at most one block per (term, window)
+            win_ub[t] = per_win
+            term_ub[t] = float(ub.max()) if hi > lo else 0.0
+
+        partial = np.zeros(n, dtype=np.float32)
+        matched = np.zeros(n, dtype=np.bool_)
+        rest = sum(term_ub.values())
+        theta = -np.inf
+        scored = 0
+        n_essential = len(tids)
+        for i, t in enumerate(tids):
+            # Float bounds get a small margin so pruning never drops a tie.
+            if rest * (1.0 + _UB_MARGIN) < theta:
+                n_essential = i
+                break
+            scored += self._accumulate(t, partial, matched, k1, b)
+            rest -= term_ub[t]
+            cand_scores = partial[matched if allowed is None else matched & allowed]
+            if cand_scores.shape[0] >= top_k:
+                theta = float(np.partition(cand_scores, cand_scores.shape[0] - top_k)[cand_scores.shape[0] - top_k])
+
+        lazy = tids[n_essential:]
+        cand = np.flatnonzero(matched if allowed is None else matched & allowed)
+        if lazy and cand.shape[0]:
+            upper = partial[cand].astype(np.float64)
+            wins = cand // w_size
+            for t in lazy:
+                upper += win_ub[t][wins]
+            cand = cand[upper * (1.0 + _UB_MARGIN) >= theta]
+
+        remaining = sum(int(self.term_offsets[t + 1] - self.term_offsets[t]) for t in lazy)
+        # A binary-search lookup costs several times a sequential posting.
+        if cand.shape[0] * len(lazy) * _LOOKUP_COST >= remaining:
+            for t in lazy:
+                scored += self._accumulate(t, partial, matched, k1, b)
+            if stats is not None:
+                stats["postings_scored"] = scored
+            return self._top(partial, matched, top_k, allowed)
+
+        scores = partial[cand]
+        cand_key = cand.astype(self.post_docs.dtype)  # same dtype keeps searchsorted on the fast path
+        for t in lazy:
+            s, e = int(self.term_offsets[t]), int(self.term_offsets[t + 1])
+            plist = self.post_docs[s:e]
+            pos = np.minimum(np.searchsorted(plist, cand_key), e - s - 1)
+            found = plist[pos] == cand_key
+            tf = self.post_tf[s + pos[found]]
+            scores[found] += self.idf[t] * tf * (k1 + 1.0) / (tf + self._length_norm(cand[found], k1, b))
+            scored += int(cand.shape[0])
+        if stats is not None:
+            stats["postings_scored"] = scored
+        return [(self.chunk_ids[int(cand[i])], float(scores[i])) for i in top_k_indices(scores, top_k)]
+
+    def _accumulate(self, t: int, scores: np.ndarray, matched: np.ndarray, k1: float, b: float) -> int:
+        """Add term `t`'s BM25 contribution to `scores`; returns the postings scored."""
+        s, e = int(self.term_offsets[t]), int(self.term_offsets[t + 1])
+        docs = self.post_docs[s:e]
+        tf = self.post_tf[s:e]
+        scores[docs] += self.idf[t] * tf * (k1 + 1.0) / (tf + self._length_norm(docs, k1, b))
+        matched[docs] = True
+        return e - s
+
+    def _top(
+        self, scores: np.ndarray, matched: np.ndarray, top_k: int, allowed: np.ndarray | None
+    ) -> list[tuple[str, float]]:
+        cand = np.flatnonzero(matched if allowed is None else matched & allowed)
+        head = top_k_indices(scores[cand], top_k)
+        return [(self.chunk_ids[int(cand[i])], float(scores[cand[i]])) for i in head]
+
+    def _length_norm(self, docs: np.ndarray, k1: float, b: float) -> np.ndarray:
+        """`k1 * (1 - b + b * len / avg_len)` for the given doc ordinals."""
+        return self._norm_of_len(self.doc_len[docs], k1, b)
+
+    def _norm_of_len(self, lengths: np.ndarray, k1: float, b: float) -> np.ndarray:
+        if self.avg_len <= 0:
+            return np.full(lengths.shape[0], k1, dtype=np.float32)
+        return (k1 * (1.0 - b + b * lengths / self.avg_len)).astype(np.float32)
+
+    def save(self, path: str | Path) -> None:
+        """Write a single file: magic, header length, JSON header, 8-byte aligned arrays.
+
+        Written to a temp file and renamed, so readers never see a partial index.
+        """
+        p = Path(path)
+        p.parent.mkdir(parents=True, exist_ok=True)
+        term_blob, term_offs = _pack_strings(sorted(self.terms, key=self.terms.__getitem__))
+        id_blob, id_offs = _pack_strings(self.chunk_ids)
+        doc_blob, doc_offs = _pack_strings(self.doc_ids.tolist())
+        ver_blob, ver_offs = _pack_strings(self.version_ids.tolist())
+        arrays = {
+            "term_offsets": self.term_offsets,
+            "post_docs": self.post_docs,
+            "post_tf": self.post_tf,
+            "idf": self.idf,
+            "doc_len": self.doc_len,
+            "blk_offsets": self.blk_offsets,
+            "blk_start": self.blk_start,
+            "blk_win": self.blk_win,
+            "blk_max_tf": self.blk_max_tf,
+            "blk_min_len": self.blk_min_len,
+            "term_blob": term_blob,
+            "term_str_offsets": term_offs,
+            "id_blob": id_blob,
+            "id_str_offsets": id_offs,
+            "doc_blob": doc_blob,
+            "doc_str_offsets": doc_offs,
+            "ver_blob": ver_blob,
+            "ver_str_offsets": ver_offs,
+        }
+        layout: dict[str, dict[str, object]] = {}
+        pos = 0
+        for name, arr in arrays.items():
+            arr = np.ascontiguousarray(arr)
+            layout[name] = {"offset": pos, "dtype": arr.dtype.str, "shape": list(arr.shape)}
+            pos += _aligned(arr.nbytes)
+        header = json.dumps(
+            {"generation": self.generation, "tokenizer": self.tokenizer, "window": self.window, "arrays": layout},
+            separators=(",", ":"),
+        ).encode("utf-8")
+        prefix = len(_MAGIC) + 8 + _aligned(len(header))
+        tmp = p.with_name(p.name + f".tmp{os.getpid()}")
+        with open(tmp, "wb") as f:
+            f.write(_MAGIC)
+            f.write(len(header).to_bytes(8, "little"))
+            f.write(header.ljust(_aligned(len(header)), b" "))
+            assert f.tell() == prefix
+            for arr in arrays.values():
+                data = np.ascontiguousarray(arr).tobytes()
+                f.write(data.ljust(_aligned(len(data)), b"\0"))
+        os.replace(tmp, p)
+
+    @classmethod
+    def load(cls, path: str | Path) -> "Bm25Index":
+        """Memory-map an index written by `save` (posting arrays stay on disk)."""
+        raw = np.memmap(path, dtype=np.uint8, mode="r")
+        if bytes(raw[: len(_MAGIC)]) != _MAGIC:
+            raise ValueError(f"not a BM25 index file: {path}")
+        hlen = int.from_bytes(bytes(raw[len(_MAGIC) : len(_MAGIC) + 8]), "little")
+        start = len(_MAGIC) + 8
+        header = json.loads(bytes(raw[start : start + hlen]).decode("utf-8"))
+        base = start + _aligned(hlen)
+
+        def arr(name: str) -> np.ndarray:
+            spec = header["arrays"][name]
+            dt = np.dtype(spec["dtype"])
+            shape = tuple(spec["shape"])
+            nbytes = int(np.prod(shape, dtype=np.int64)) * dt.itemsize
+            off = base + int(spec["offset"])
+            return raw[off : off + nbytes].view(dt).reshape(shape)
+
+        terms = _unpack_strings(arr("term_blob"), arr("term_str_offsets"))
+        doc_len = arr("doc_len")
+        return cls(
+            generation=int(header["generation"]),
+            tokenizer=str(header["tokenizer"]),
+            terms={t: i for i, t in enumerate(terms)},
+            term_offsets=arr("term_offsets"),
+            post_docs=arr("post_docs"),
+            post_tf=arr("post_tf"),
+            idf=arr("idf"),
+            doc_len=doc_len,
+            chunk_ids=_unpack_strings(arr("id_blob"), arr("id_str_offsets")),
+            doc_ids=np.asarray(_unpack_strings(arr("doc_blob"), arr("doc_str_offsets")), dtype=str),
+            version_ids=np.asarray(_unpack_strings(arr("ver_blob"), arr("ver_str_offsets")), dtype=str),
+            avg_len=float(doc_len.mean()) if doc_len.shape[0] else 0.0,
+            window=int(header["window"]),
+            blk_offsets=arr("blk_offsets"),
+            blk_start=arr("blk_start"),
+            blk_win=arr("blk_win"),
+            blk_max_tf=arr("blk_max_tf"),
+            blk_min_len=arr("blk_min_len"),
+        )
+
+
+@dataclass(frozen=True)
+class Bm25DeltaIndex:
+    """A persisted base index plus the rows changed since its generation.
+
+    Base rows that were deleted or rewritten are masked out, and the changed
+    rows go into a small in-memory `delta` index. Both halves are re-weighted
+    with the combined corpus statistics (live documents, document frequencies,
+    average length), so scores match a full rebuild; only ties between a
+    rewritten row and an untouched one may order differently.
+    """
+
+    base: Bm25Index  # as persisted; the next delta is applied to this again
+    weighted_base: Bm25Index  # `base` with superseded rows masked and combined statistics
+    delta: Bm25Index
+    generation: int
+
+    @property
+    def tokenizer(self) -> str:
+        return self.base.tokenizer
+
+    @property
+    def window(self) -> int:
+        return self.base.window
+
+    @property
+    def num_docs(self) -> int:
+        live = self.weighted_base.live
+        return (self.base.num_docs if live is None else int(live.sum())) + self.delta.num_docs
+
+    @classmethod
+    def over(
+        cls,
+        base: Bm25Index,
+        rows: list[tuple[str, str, str | None, str | None]],
+        deleted: Iterable[str],
+        *,
+        generation: int,
+    ) -> "Bm25DeltaIndex":
+        """Apply `rows` (written after `base.generation`) and `deleted` ids on top of `base`.
+
+        Costs O(changed rows) tokenization plus one vectorized pass over the
+        base postings when base rows were superseded.
+        """
+        ordinals = base.ordinals
+        dead = np.zeros(base.num_docs, dtype=np.bool_)
+        superseded = [ordinals[c] for c in (*(r[0] for r in rows), *deleted) if c in ordinals]
+        dead[superseded] = True
+        delta = Bm25Index.build(rows, tokenizer=base.tokenizer, generation=generation, window=base.window)
+
+        base_df = np.diff(base.term_offsets)
+        if superseded:
+            term_of = np.repeat(np.arange(base_df.shape[0], dtype=np.int64), base_df)
+            base_df = base_df - np.bincount(term_of[dead[base.post_docs]], minlength=base_df.shape[0])
+        delta_df = np.diff(delta.term_offsets)
+        base_total = base_df.copy()
+        delta_total = delta_df.copy()
+        for term, t in delta.terms.items():
+            bt = base.terms.get(term)
+            if bt is not None:
+                base_total[bt] += delta_df[t]
+                delta_total[t] += base_df[bt]
+
+        live = ~dead
+        n = int(live.sum()) + delta.num_docs
+        total_len = float(base.doc_len[live].sum(dtype=np.float64)) + float(delta.doc_len.sum(dtype=np.float64))
+        avg_len = total_len / n if n else 0.0
+        return cls(
+            base=base,
+            weighted_base=replace(base, idf=_idf(n, base_total), avg_len=avg_len, live=live if superseded else None),
+            delta=replace(delta, idf=_idf(n, delta_total), avg_len=avg_len),
+            generation=int(generation),
+        )
+
+    def search(
+        self,
+        query: str,
+        top_k: int,
+        *,
+        k1: float = 1.2,
+        b: float = 0.75,
+        search_filter: SearchFilter | None = None,
+        method: str = "block_max",
+        stats: dict[str, int] | None = None,
+    ) -> list[tuple[str, float]]:
+        """`Bm25Index.search` over both halves, merged; ties keep base rows first."""
+        hits: list[tuple[str, float]] = []
+        for part in (self.weighted_base, self.delta):
+            part_stats: dict[str, int] = {}
+            hits += part.search(
+                query, top_k, k1=k1, b=b, search_filter=search_filter, method=method, stats=part_stats
+            )
+            if stats is not None:
+                for name, value in part_stats.items():
+                    stats[name] = stats.get(name, 0) + value
+        hits.sort(key=lambda h: -h[1])
+        return hits[:top_k]
+
+
+def _idf(n: int, df: np.ndarray) -> np.ndarray:
+    return np.log1p((n - df + 0.5) / (df + 0.5)).astype(np.float32)
+
+
+def _blocks(
+    term_offsets: np.ndarray,
+    post_docs: np.ndarray,
+    post_tf: np.ndarray,
+    doc_len: np.ndarray,
+    window: int,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Cut posting lists at term and document-window boundaries; per-block max tf / min length."""
+    if window <= 0:
+        raise ValueError("bm25 window must be positive")
+    v = term_offsets.shape[0] - 1
+    p = post_docs.shape[0]
+    if p == 0:
+        empty = np.zeros(0, dtype=np.float32)
+        return np.zeros(v + 1, dtype=np.int64), np.zeros(1, dtype=np.int64), np.zeros(0, dtype=np.int32), empty, empty
+    win = post_docs.astype(np.int64) // window
+    starts = np.zeros(p, dtype=np.bool_)
+    starts[term_offsets[:-1][np.diff(term_offsets) > 0]] = True
+    starts[1:] |= win[1:] != win[:-1]
+    blk_start = np.flatnonzero(starts)
+    blk_term = np.searchsorted(term_offsets, blk_start, side="right") - 1
+    blk_offsets = np.zeros(v + 1, dtype=np.int64)
+    np.cumsum(np.bincount(blk_term, minlength=v), out=blk_offsets[1:])
+    return (
+        blk_offsets,
+        np.append(blk_start, p).astype(np.int64),
+        win[blk_start].astype(np.int32),
+        np.maximum.reduceat(post_tf, blk_start).astype(np.float32),
+        np.minimum.reduceat(doc_len[post_docs], blk_start).astype(np.float32),
+    )
+
+
+def _aligned(n: int) -> int:
+    return (n + _ALIGN - 1) // _ALIGN * _ALIGN
+
+
+def _pack_strings(values: list[str]) -> tuple[np.ndarray, np.ndarray]:
+    encoded = [v.encode("utf-8") for v in values]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum(np.fromiter((len(e) for e in encoded), dtype=np.int64, count=len(encoded)), out=offsets[1:])
+    return np.frombuffer(b"".join(encoded), dtype=np.uint8), offsets
+
+
+def _unpack_strings(blob: np.ndarray, offsets: np.ndarray) -> list[str]:
+    data = blob.tobytes()
+    offs = offsets.tolist()
+    return [data[offs[i] : offs[i + 1]].decode("utf-8") for i in range(len(offs) - 1)]
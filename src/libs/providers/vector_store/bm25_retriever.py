@@ -0,0 +1,183 @@
+from __future__ import annotations
+
+import os
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterator
+
+try:  # POSIX only; elsewhere builds are serialized per process.
+    import fcntl
+except ImportError:  # pragma: no cover
+    fcntl = None  # type: ignore[assignment]
+
+from ...interfaces.vector_store import Candidate, Retriever, SearchFilter
+from ....ingestion.stages.storage.fts5 import Fts5Store
+from .bm25_index import TOKENIZERS, TOPK_METHODS, Bm25DeltaIndex, Bm25Index
+
+# Process-level cache: index path -> (source stat, index file stat, loaded index).
+_LOCK = threading.Lock()
+_LOADED: dict[str, tuple[tuple[int, int], tuple[int, int], Bm25Index | Bm25DeltaIndex]] = {}
+# Index path -> lock held while (re)building it, so concurrent queries build once.
+_BUILD_LOCKS: dict[str, threading.Lock] = {}
+# Changed rows a delta may always hold before the base is rebuilt, however small the base.
+_DELTA_MIN_ROWS = 512
+
+
+@dataclass
+class Bm25Retriever(Retriever):
+    """Sparse retriever over a native inverted index (BM25 with tunable k1/b).
+
+    The index is derived from the FTS5 store's chunk rows (`db_path`), persisted
+    as one file (`index_path`, default `bm25_<tokenizer>.idx` next to the
+    database) and memory-mapped. When the store's write generation moves on,
+    the rows changed since the file's generation are applied as an in-memory
+    delta (`Bm25DeltaIndex`); the file is rebuilt only once that delta exceeds
+    `delta_max_fraction` of it, or when the store's change history no longer
+    reaches back far enough. The generation is only re-read when the database
+    file changed on disk, so hot queries never touch SQLite. Rebuilds hold a
+    per-path lock (plus a `<index_path>.lock` file lock across processes);
+    ingest calls `index()` after writing so queries normally find a due
+    rebuild already done.
+
+    Scores are BM25 (larger is better); any query term may match. `topk_method`
+    `block_max` (default) skips postings whose per-term / per-block score upper
+    bounds cannot enter the top-k, so long OR-style queries do not score every
+    matching posting; `exhaustive` scores them all (same results).
+    """
+
+    db_path: str = "data/sqlite/fts.sqlite"
+    index_path: str | None = None
+    k1: float = 1.2
+    b: float = 0.75
+    tokenizer: str = "unicode61"
+    topk_method: str = "block_max"
+    window: int = 128
+    delta_max_fraction: float = 0.1
+    source_name: str = "sparse"
+
+    def __post_init__(self) -> None:
+        if self.tokenizer not in TOKENIZERS:
+            raise ValueError(f"unknown tokenizer: {self.tokenizer!r} (expected one of {TOKENIZERS})")
+        if self.k1 < 0 or not 0.0 <= self.b <= 1.0:
+            raise ValueError("bm25 requires k1 >= 0 and 0 <= b <= 1")
+        if self.delta_max_fraction < 0:
+            raise ValueError("bm25 delta_max_fraction must be >= 0")
+        if self.topk_method not in TOPK_METHODS:
+            raise ValueError(f"unknown top-k method: {self.topk_method!r} (expected one of {TOPK_METHODS})")
+        self._store = Fts5Store(db_path=Path(self.db_path))
+        if self.index_path is None:
+            self.index_path = str(Path(self.db_path).with_name(f"bm25_{self.tokenizer}.idx"))
+
+    def retrieve(
+        self,
+        query: str,
+        top_k: int,
+        search_filter: SearchFilter | None = None,
+    ) -> list[Candidate]:
+        if top_k <= 0 or not (query or "").strip():
+            return []
+        index = self.index()
+        hits = index.search(
+            query, top_k, k1=self.k1, b=self.b, search_filter=search_filter, method=self.topk_method
+        )
+        return [
+            Candidate(
+                chunk_id=chunk_id,
+                score=score,
+                source=self.source_name,
+                metadata={"bm25": score},
+            )
+            for chunk_id, score in hits
+        ]
+
+    def generation(self) -> int:
+        """Write generation of the FTS store the index is derived from."""
+        return self._store.generation()
+
+    def index(self) -> Bm25Index | Bm25DeltaIndex:
+        """Current index: cached, the persisted file plus a delta, or rebuilt from the store."""
+        key = str(Path(self.index_path or "").resolve())
+        stamp = _stat(self.db_path)
+        with _LOCK:
+            cached = _LOADED.get(key)
+        if cached is not None and cached[0] == stamp and cached[2].window == self.window:
+            return cached[2]
+
+        file_stamp = _stat(key)
+        current = None
+        if cached is not None and cached[1] == file_stamp and cached[2].window == self.window:
+            current = cached[2]
+        if current is None or current.generation != self._store.generation():
+            current = self._refresh(key, current)
+            file_stamp = _stat(key)
+        with _LOCK:
+            _LOADED[key] = (stamp, file_stamp, current)
+        return current
+
+    def _refresh(self, key: str, current: Bm25Index | Bm25DeltaIndex | None) -> Bm25Index | Bm25DeltaIndex:
+        base = current.base if isinstance(current, Bm25DeltaIndex) else current
+        if base is None:
+            base = self._load_file()
+        if base is not None:
+            changes = self._store.changes_since(base.generation)
+            if changes is not None:
+                generation, rows, deleted = changes
+                if generation == base.generation:
+                    return base
+                if len(rows) + len(deleted) <= max(_DELTA_MIN_ROWS, self.delta_max_fraction * base.num_docs):
+                    return Bm25DeltaIndex.over(base, rows, deleted, generation=generation)
+        return self._build(key)
+
+    def _build(self, key: str) -> Bm25Index:
+        with _LOCK:
+            lock = _BUILD_LOCKS.setdefault(key, threading.Lock())
+        with lock, _file_lock(key + ".lock"):
+            # Another thread or process may have built it while we waited.
+            generation = self._store.generation()
+            index = self._load_file(generation)
+            if index is None:
+                # Rows written while building are re-applied as a delta on the next call.
+                index = Bm25Index.build(
+                    self._store.iter_docs(), tokenizer=self.tokenizer, generation=generation, window=self.window
+                )
+                index.save(key)
+        return index
+
+    def _load_file(self, generation: int | None = None) -> Bm25Index | None:
+        """The persisted index, if it matches this retriever (and `generation`, when given)."""
+        p = Path(self.index_path or "")
+        if not p.exists():
+            return None
+        try:
+            index = Bm25Index.load(p)
+        except (OSError, ValueError, KeyError):
+            return None
+        if generation is not None and index.generation != generation:
+            return None
+        if index.tokenizer != self.tokenizer or index.window != self.window:
+            return None
+        return index
+
+
+def _stat(path: str) -> tuple[int, int]:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return (0, 0)
+    return (st.st_mtime_ns, st.st_size)
+
+
+@contextmanager
+def _file_lock(path: str) -> Iterator[None]:
+    if fcntl is None:
+        yield
+        return
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "a+b") as f:
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f.fileno(), fcntl.LOCK_UN)
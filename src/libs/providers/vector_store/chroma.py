@@ -4,7 +4,7 @@ from dataclasses import dataclass
 from pathlib import Path
 from typing import Any
 
-from ...interfaces.vector_store.store import VectorItem
+from ...interfaces.vector_store.store import SearchFilter, VectorItem
 
 
 @dataclass
@@ -40,14 +40,42 @@ class ChromaVectorIndex:
         metas = [it.metadata or {} for it in items]
         self._col.upsert(ids=ids, embeddings=embs, metadatas=metas)
 
-    def query(self, vector: list[float], top_k: int) -> list[tuple[str, float]]:
-        if top_k <= 0:
-            return []
+    def query(
+        self,
+        vector: list[float],
+        top_k: int,
+        search_filter: SearchFilter | None = None,
+    ) -> list[tuple[str, float]]:
+        return self.query_batch([vector], top_k, search_filter=search_filter)[0]
+
+    def query_batch(
+        self,
+        vectors: list[list[float]],
+        top_k: int,
+        search_filter: SearchFilter | None = None,
+    ) -> list[list[tuple[str, float]]]:
+        if top_k <= 0 or not vectors:
+            return [[] for _ in vectors]
+        kwargs: dict[str, Any] = {}
+        where = _to_where(search_filter)
+        if where:
+            kwargs["where"] = where
         # `ids` are always returned by Chroma; `include` only controls extra fields.
         # Newer chromadb versions reject "ids" in include (ValueError).
-        res: Any = self._col.query(query_embeddings=[vector], n_results=int(top_k), include=["distances"])
-        ids = (res.get("ids") or [[]])[0]
-        dists = (res.get("distances") or [[]])[0]
+        res: Any = self._col.query(
+            query_embeddings=list(vectors), n_results=int(top_k), include=["distances"], **kwargs
+        )
+        all_ids = res.get("ids") or []
+        all_dists = res.get("distances") or []
+        return [
+            self._to_hits(
+                all_ids[i] if i < len(all_ids) else [],
+                all_dists[i] if i < len(all_dists) else [],
+            )
+            for i in range(len(vectors))
+        ]
+
+    def _to_hits(self, ids: list[Any], dists: list[Any]) -> list[tuple[str, float]]:
         out: list[tuple[str, float]] = []
         for cid, dist in zip(ids, dists):
             out.append((str(cid), _distance_to_score(float(dist), space=self.space)))
@@ -59,6 +87,20 @@ class ChromaVectorIndex:
         self._col.delete(ids=list(chunk_ids))
 
 
+def _to_where(search_filter: SearchFilter | None) -> dict[str, Any] | None:
+    # Chroma metadata filter; doc_id/version_id are written by DenseEncoder.
+    if search_filter is None or search_filter.is_empty():
+        return None
+    clauses: list[dict[str, Any]] = []
+    if search_filter.doc_ids is not None:
+        clauses.append({"doc_id": {"$in": sorted(search_filter.doc_ids)}})
+    if search_filter.version_ids is not None:
+        clauses.append({"version_id": {"$in": sorted(search_filter.version_ids)}})
+    if search_filter.exclude_version_ids:
+        clauses.append({"version_id": {"$nin": sorted(search_filter.exclude_version_ids)}})
+    return clauses[0] if len(clauses) == 1 else {"$and": clauses}
+
+
 def _distance_to_score(dist: float, *, space: str) -> float:
     # Chroma returns a distance; convert to "larger is better" score.
     # - cosine: distance ~= 1 - cosine_similarity
@@ -1,66 +1,180 @@
 from __future__ import annotations
 
 import json
-import math
 import sqlite3
 import time
+import uuid
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Any
+from typing import Iterator
 
-from ...interfaces.vector_store.store import VectorItem
+import numpy as np
+
+from ...interfaces.vector_store.store import SearchFilter, VectorItem
+from .matrix import (
+    approx_cosine,
+    check_dtype,
+    cosine_scores,
+    cosine_scores_batch,
+    decode_f32,
+    encode_f32,
+    filter_mask,
+    hamming_distances,
+    quantize,
+    query_blocks,
+    sign_pack,
+    top_k_indices,
+    vector_norm,
+)
+from .matrix_cache import Rows, RowSnapshot, get_snapshot, put_snapshot
+
+# SQLite's default host parameter limit is 999 on older builds.
+_SQL_BATCH = 500
+# Deleted ids kept for incremental cache reloads; older entries are pruned and
+# readers whose snapshot predates the pruned range reload in full.
+_DELETE_LOG_MAX = 10_000
 
 
 @dataclass
 class ChromaLiteVectorIndex:
     """SQLite-backed vector index (dev-only stand-in for Chroma).
 
-    Stores vectors + metadata and supports a naive full-scan cosine Top-K.
+    Vectors are stored as little-endian float32 BLOBs with a precomputed L2 norm.
+    Queries load the rows into a contiguous NumPy matrix and score them with a
+    single matrix-vector product (exact cosine Top-K).
+
+    `doc_id` / `version_id` are copied out of the metadata into indexed columns so
+    a `SearchFilter` is applied in SQL before any vector is decoded.
+
+    `dtype="float16"` / `"int8"` (per-vector scale) keeps an extra quantized copy
+    of each vector. Queries then scan only the quantized matrix (2-4x less memory
+    and I/O than float32) and exactly rescore the best `top_k * oversample`
+    candidates from the float32 BLOBs.
+
+    Every row also carries a packed sign-bit code (`dim / 8` bytes) used by
+    `query_binary_batch` for a Hamming-distance shortlist.
+
+    With `matrix_cache=True` decoded matrices are kept in a process-level cache
+    shared by every instance on the same database file. Each write bumps a
+    sequence number (the watermark) and stamps the rows it touches; a query
+    whose cached watermark is behind only reads the rows written and ids
+    deleted since then.
+
+    Legacy databases that still carry `vector_json` rows are migrated in place
+    on open.
     """
 
     db_path: str = "data/chroma/chroma_lite.sqlite"
+    dtype: str = "float32"
+    oversample: int = 4
+    matrix_cache: bool = True
 
     def __post_init__(self) -> None:
+        check_dtype(self.dtype)
         p = Path(self.db_path)
         p.parent.mkdir(parents=True, exist_ok=True)
+        self._cache_key = str(p.resolve())
         self._init_db(p)
 
     def upsert(self, items: list[VectorItem]) -> None:
         if not items:
             return
+        now = time.time()
+        rows = []
+        for it in items:
+            vec = np.asarray(it.vector, dtype=np.float32)
+            meta = it.metadata or {}
+            qblob, qscale, qdtype = self._quantize_row(vec)
+            rows.append(
+                (
+                    it.chunk_id,
+                    int(vec.shape[0]),
+                    encode_f32(vec),
+                    vector_norm(vec),
+                    qblob,
+                    qscale,
+                    qdtype,
+                    sign_pack(vec).tobytes(),
+                    _opt_str(meta.get("doc_id")),
+                    _opt_str(meta.get("version_id")),
+                    json.dumps(meta, separators=(",", ":")),
+                    now,
+                )
+            )
         with self._connect() as conn:
-            for it in items:
-                conn.execute(
-                    """
-                    INSERT OR REPLACE INTO vectors(chunk_id, dim, vector_json, metadata_json, updated_at)
-                    VALUES(?, ?, ?, ?, ?)
-                    """,
-                    (
-                        it.chunk_id,
-                        len(it.vector),
-                        json.dumps(it.vector, separators=(",", ":")),
-                        json.dumps(it.metadata or {}, separators=(",", ":")),
-                        time.time(),
-                    ),
+            seq = _next_seq(conn)
+            conn.executemany(
+                """
+                INSERT OR REPLACE INTO vectors(
+                    chunk_id, dim, vector_blob, norm, qblob, qscale, qdtype, bcode,
+                    doc_id, version_id, metadata_json, updated_at, seq
                 )
+                VALUES(?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                [(*r, seq) for r in rows],
+            )
 
-    def query(self, vector: list[float], top_k: int) -> list[tuple[str, float]]:
-        if top_k <= 0:
-            return []
-
-        qn = _norm(vector)
-        scored: list[tuple[str, float]] = []
-
-        with self._connect() as conn:
-            rows = conn.execute("SELECT chunk_id, vector_json FROM vectors").fetchall()
+    def query(
+        self,
+        vector: list[float],
+        top_k: int,
+        search_filter: SearchFilter | None = None,
+    ) -> list[tuple[str, float]]:
+        return self.query_batch([vector], top_k, search_filter=search_filter)[0]
 
-        for row in rows:
-            vec = json.loads(row["vector_json"])
-            score = _cosine(vector, qn, vec)
-            scored.append((row["chunk_id"], score))
+    def query_batch(
+        self,
+        vectors: list[list[float]],
+        top_k: int,
+        search_filter: SearchFilter | None = None,
+    ) -> list[list[tuple[str, float]]]:
+        """Score all queries in one pass: the matrix is loaded once and scored with
+        a single matrix-matrix product per query dimension."""
+        out: list[list[tuple[str, float]]] = [[] for _ in vectors]
+        if top_k <= 0 or not vectors:
+            return out
+        by_dim: dict[int, list[int]] = {}
+        for i, v in enumerate(vectors):
+            by_dim.setdefault(len(v), []).append(i)
+        for dim, rows in by_dim.items():
+            qmat = np.asarray([vectors[i] for i in rows], dtype=np.float32).reshape(len(rows), dim)
+            if self.dtype == "float32":
+                hits = self._query_exact(dim, qmat, top_k, search_filter)
+            else:
+                hits = self._query_quantized(dim, qmat, top_k, search_filter)
+            for i, h in zip(rows, hits):
+                out[i] = h
+        return out
 
-        scored.sort(key=lambda x: x[1], reverse=True)
-        return scored[:top_k]
+    def query_binary_batch(
+        self,
+        vectors: list[list[float]],
+        top_k: int,
+        *,
+        shortlist: int,
+        search_filter: SearchFilter | None = None,
+    ) -> list[list[tuple[str, float]]]:
+        """Pick `shortlist` rows by Hamming distance on sign-bit codes, then rescore them exactly."""
+        out: list[list[tuple[str, float]]] = [[] for _ in vectors]
+        if top_k <= 0 or not vectors:
+            return out
+        by_dim: dict[int, list[int]] = {}
+        for i, v in enumerate(vectors):
+            by_dim.setdefault(len(v), []).append(i)
+        for dim, rows in by_dim.items():
+            loaded, mask = self._load_rows(dim=dim, kind="bits", search_filter=search_filter)
+            if not loaded.ids:
+                continue
+            qmat = np.asarray([vectors[i] for i in rows], dtype=np.float32).reshape(len(rows), dim)
+            qcodes = sign_pack(qmat)
+            want = max(int(shortlist), top_k)
+            heads = [
+                top_k_indices(-hamming_distances(loaded.data, qcodes[j]).astype(np.float32), want, mask)
+                for j in range(len(rows))
+            ]
+            for i, hits in zip(rows, self._rescore_exact(loaded.ids, loaded.norms, heads, qmat, top_k)):
+                out[i] = hits
+        return out
 
     def count(self) -> int:
         with self._connect() as conn:
@@ -70,10 +184,217 @@ class ChromaLiteVectorIndex:
     def delete(self, chunk_ids: list[str]) -> None:
         if not chunk_ids:
             return
-        placeholders = ",".join(["?"] * len(chunk_ids))
-        sql = f"DELETE FROM vectors WHERE chunk_id IN ({placeholders})"
         with self._connect() as conn:
-            conn.execute(sql, tuple(chunk_ids))
+            seq = _next_seq(conn)
+            for i in range(0, len(chunk_ids), _SQL_BATCH):
+                batch = chunk_ids[i : i + _SQL_BATCH]
+                placeholders = ",".join(["?"] * len(batch))
+                conn.execute(f"DELETE FROM vectors WHERE chunk_id IN ({placeholders})", tuple(batch))
+            conn.executemany("INSERT INTO vector_deletes(seq, chunk_id) VALUES(?, ?)", [(seq, c) for c in chunk_ids])
+            _prune_delete_log(conn)
+
+    def load_matrix(self, dim: int | None = None) -> tuple[list[str], np.ndarray, np.ndarray]:
+        """Return `(chunk_ids, matrix, norms)` for all vectors of `dim`.
+
+        When `dim` is omitted the most common stored dimension is used.
+        """
+        if dim is None:
+            dim = self.common_dim()
+            if dim is None:
+                return [], np.zeros((0, 0), dtype=np.float32), np.zeros(0, dtype=np.float32)
+        loaded, _ = self._load_rows(dim=dim, kind="float32")
+        return loaded.ids, loaded.data, loaded.norms
+
+    def common_dim(self) -> int | None:
+        """The most common stored dimension (None when the store is empty)."""
+        with self._connect() as conn:
+            row = conn.execute("SELECT dim FROM vectors GROUP BY dim ORDER BY COUNT(*) DESC LIMIT 1").fetchone()
+        return None if row is None else int(row["dim"])
+
+    def iter_rows(self, dim: int, *, block_rows: int = 8192) -> Iterator[Rows]:
+        """Float32 rows of `dim` in insertion order, `block_rows` at a time, read straight from SQLite."""
+        last = -1
+        while True:
+            with self._connect() as conn:
+                fetched = conn.execute(
+                    f"SELECT rowid AS rid, {_row_columns('float32')} FROM vectors"
+                    " WHERE dim=? AND rowid>? ORDER BY rowid LIMIT ?",
+                    (dim, last, max(1, int(block_rows))),
+                ).fetchall()
+            if not fetched:
+                return
+            last = int(fetched[-1]["rid"])
+            yield _decode_rows(fetched, dim=dim, kind="float32")
+
+    def sample_rows(self, dim: int, size: int, *, seed: int = 0) -> Rows:
+        """Up to `size` float32 rows of `dim`, drawn uniformly without replacement (insertion order)."""
+        with self._connect() as conn:
+            rowids = np.fromiter(
+                (r[0] for r in conn.execute("SELECT rowid FROM vectors WHERE dim=? ORDER BY rowid", (dim,))),
+                dtype=np.int64,
+            )
+            if rowids.shape[0] > size:
+                rng = np.random.default_rng(seed)
+                rowids = np.sort(rng.choice(rowids, size=max(0, int(size)), replace=False))
+            fetched: list[sqlite3.Row] = []
+            for i in range(0, rowids.shape[0], _SQL_BATCH):
+                batch = rowids[i : i + _SQL_BATCH].tolist()
+                fetched.extend(
+                    conn.execute(
+                        f"SELECT {_row_columns('float32')} FROM vectors"
+                        f" WHERE rowid IN ({','.join('?' * len(batch))}) ORDER BY rowid",
+                        batch,
+                    ).fetchall()
+                )
+        return _decode_rows(fetched, dim=dim, kind="float32")
+
+    def get_vectors(self, chunk_ids: list[str]) -> dict[str, np.ndarray]:
+        """Fetch stored vectors by id (missing ids are omitted)."""
+        if not chunk_ids:
+            return {}
+        out: dict[str, np.ndarray] = {}
+        with self._connect() as conn:
+            for i in range(0, len(chunk_ids), _SQL_BATCH):
+                batch = chunk_ids[i : i + _SQL_BATCH]
+                placeholders = ",".join(["?"] * len(batch))
+                rows = conn.execute(
+                    f"SELECT chunk_id, dim, vector_blob FROM vectors WHERE chunk_id IN ({placeholders})",
+                    tuple(batch),
+                ).fetchall()
+                for r in rows:
+                    out[r["chunk_id"]] = decode_f32(r["vector_blob"], dim=int(r["dim"]))[0]
+        return out
+
+    def get_scopes(self) -> dict[str, tuple[str, str]]:
+        """Map every stored chunk id to its `(doc_id, version_id)` ("" when unknown)."""
+        with self._connect() as conn:
+            rows = conn.execute("SELECT chunk_id, doc_id, version_id FROM vectors").fetchall()
+        return {r["chunk_id"]: (r["doc_id"] or "", r["version_id"] or "") for r in rows}
+
+    def _query_exact(
+        self,
+        dim: int,
+        qmat: np.ndarray,
+        top_k: int,
+        search_filter: SearchFilter | None,
+    ) -> list[list[tuple[str, float]]]:
+        loaded, mask = self._load_rows(dim=dim, kind="float32", search_filter=search_filter)
+        if not loaded.ids:
+            return [[] for _ in range(qmat.shape[0])]
+        out: list[list[tuple[str, float]]] = []
+        for block in query_blocks(qmat.shape[0], len(loaded.ids)):
+            scores = cosine_scores_batch(loaded.data, loaded.norms, qmat[block])
+            out.extend([(loaded.ids[k], float(row[k])) for k in top_k_indices(row, top_k, mask)] for row in scores)
+        return out
+
+    def _query_quantized(
+        self,
+        dim: int,
+        qmat: np.ndarray,
+        top_k: int,
+        search_filter: SearchFilter | None,
+    ) -> list[list[tuple[str, float]]]:
+        loaded, mask = self._load_rows(dim=dim, kind=self.dtype, search_filter=search_filter)
+        if not loaded.ids:
+            return [[] for _ in range(qmat.shape[0])]
+
+        # First pass: approximate cosine over the quantized matrix.
+        want = top_k * max(1, int(self.oversample))
+        heads: list[list[int]] = []
+        for block in query_blocks(qmat.shape[0], len(loaded.ids)):
+            approx = approx_cosine(loaded.data, loaded.scales, loaded.norms, qmat[block])
+            heads.extend(top_k_indices(row, want, mask) for row in approx)
+        return self._rescore_exact(loaded.ids, loaded.norms, heads, qmat, top_k)
+
+    def _rescore_exact(
+        self,
+        chunk_ids: list[str],
+        norms: np.ndarray,
+        heads: list[list[int]],
+        qmat: np.ndarray,
+        top_k: int,
+    ) -> list[list[tuple[str, float]]]:
+        """Exact float32 cosine over each shortlist (`heads[j]` are row positions)."""
+        exact = self.get_vectors(sorted({chunk_ids[k] for head in heads for k in head}))
+        out: list[list[tuple[str, float]]] = []
+        for j, head in enumerate(heads):
+            head = [k for k in head if chunk_ids[k] in exact]
+            if not head:
+                out.append([])
+                continue
+            mat = np.stack([exact[chunk_ids[k]] for k in head])
+            scores = cosine_scores(mat, norms[head], qmat[j])
+            out.append([(chunk_ids[head[i]], float(scores[i])) for i in top_k_indices(scores, top_k)])
+        return out
+
+    def _quantize_row(self, vec: np.ndarray) -> tuple[bytes | None, float | None, str | None]:
+        if self.dtype == "float32":
+            return None, None, None
+        codes, scales = quantize(vec, self.dtype)
+        return _encode_codes(codes, self.dtype), float(scales[0]), self.dtype
+
+    def _load_rows(
+        self, *, dim: int, kind: str, search_filter: SearchFilter | None = None
+    ) -> tuple[Rows, np.ndarray | None]:
+        """Rows of `dim` decoded as `kind` ("float32", a quantized dtype or "bits").
+
+        Returns `(rows, mask)`. With the matrix cache the shared snapshot is
+        returned as-is and a filter comes back as a boolean row mask for the
+        scorer (copying the eligible rows out costs more than scoring them all);
+        otherwise SQL applies the filter and `mask` is None.
+        """
+        if self.matrix_cache:
+            rows = self._snapshot(dim, kind).rows
+            if search_filter is None or search_filter.is_empty():
+                return rows, None
+            return rows, filter_mask(rows.doc_ids, rows.version_ids, search_filter)
+        where, params = _filter_sql(search_filter)
+        with self._connect() as conn:
+            fetched = conn.execute(
+                f"SELECT {_row_columns(kind)} FROM vectors WHERE dim=?{where} ORDER BY rowid",
+                (*_row_params(kind), dim, *params),
+            ).fetchall()
+        return _decode_rows(fetched, dim=dim, kind=kind), None
+
+    def _snapshot(self, dim: int, kind: str) -> RowSnapshot:
+        """Bring the process-level snapshot for `(db, dim, kind)` up to the write watermark.
+
+        A matching `(epoch, seq)` is a cache hit; otherwise only rows written and
+        ids deleted since the snapshot's watermark are read back. A snapshot from
+        another epoch (recreated database) or older than the pruned delete log is
+        rebuilt from scratch.
+        """
+        key = (self._cache_key, dim, kind)
+        snap = get_snapshot(key)
+        qparams = _row_params(kind)
+        with self._connect() as conn:
+            conn.execute("BEGIN")  # one read transaction: meta and rows agree
+            meta = {r["key"]: r["value"] for r in conn.execute("SELECT key, value FROM index_meta")}
+            epoch, seq, floor = meta["epoch"], int(meta["seq"]), int(meta["delete_floor"])
+            if snap is not None and snap.epoch == epoch and snap.watermark == seq:
+                return snap
+            if snap is None or snap.epoch != epoch or snap.watermark < floor:
+                fetched = conn.execute(
+                    f"SELECT {_row_columns(kind)} FROM vectors WHERE dim=? ORDER BY rowid",
+                    (*qparams, dim),
+                ).fetchall()
+                fresh = RowSnapshot(epoch=epoch, watermark=seq, rows=_decode_rows(fetched, dim=dim, kind=kind))
+            else:
+                wm = snap.watermark
+                deleted = [r[0] for r in conn.execute("SELECT chunk_id FROM vector_deletes WHERE seq > ?", (wm,))]
+                # A row re-written with another dimension leaves this slice.
+                deleted += [
+                    r[0] for r in conn.execute("SELECT chunk_id FROM vectors WHERE seq > ? AND dim != ?", (wm, dim))
+                ]
+                fetched = conn.execute(
+                    f"SELECT {_row_columns(kind)} FROM vectors WHERE seq > ? AND dim=? ORDER BY rowid",
+                    (*qparams, wm, dim),
+                ).fetchall()
+                fresh = snap.merged(
+                    watermark=seq, deleted=deleted, changed=_decode_rows(fetched, dim=dim, kind=kind)
+                )
+        put_snapshot(key, fresh)
+        return fresh
 
     def _connect(self) -> sqlite3.Connection:
         conn = sqlite3.connect(self.db_path)
@@ -87,21 +408,248 @@ class ChromaLiteVectorIndex:
                 CREATE TABLE IF NOT EXISTS vectors (
                     chunk_id TEXT PRIMARY KEY,
                     dim INTEGER,
-                    vector_json TEXT,
+                    vector_blob BLOB,
+                    norm REAL,
+                    qblob BLOB,
+                    qscale REAL,
+                    qdtype TEXT,
+                    bcode BLOB,
+                    doc_id TEXT,
+                    version_id TEXT,
                     metadata_json TEXT,
-                    updated_at REAL
+                    updated_at REAL,
+                    seq INTEGER DEFAULT 0
                 )
                 """
             )
+            conn.execute("CREATE TABLE IF NOT EXISTS index_meta (key TEXT PRIMARY KEY, value TEXT)")
+            conn.execute("CREATE TABLE IF NOT EXISTS vector_deletes (seq INTEGER, chunk_id TEXT)")
+            conn.executemany(
+                "INSERT OR IGNORE INTO index_meta(key, value) VALUES(?, ?)",
+                [("epoch", uuid.uuid4().hex), ("seq", "0"), ("delete_floor", "0")],
+            )
+            _migrate_seq_column(conn)
+            _migrate_vector_json(conn)
+            _migrate_scope_columns(conn)
+            _migrate_quantized(conn, self.dtype)
+            _migrate_binary_codes(conn)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_vectors_doc ON vectors(doc_id)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_vectors_version ON vectors(version_id)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_vectors_seq ON vectors(seq)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_vector_deletes_seq ON vector_deletes(seq)")
+
+
+def _migrate_vector_json(conn: sqlite3.Connection) -> None:
+    """Upgrade legacy `vector_json` rows to float32 BLOBs + norms (idempotent)."""
+
+    cols = {r[1] for r in conn.execute("PRAGMA table_info(vectors)").fetchall()}
+    if "vector_blob" not in cols:
+        conn.execute("ALTER TABLE vectors ADD COLUMN vector_blob BLOB")
+    if "norm" not in cols:
+        conn.execute("ALTER TABLE vectors ADD COLUMN norm REAL")
+    if "vector_json" not in cols:
+        return
+
+    rows = conn.execute(
+        "SELECT chunk_id, vector_json FROM vectors WHERE vector_blob IS NULL AND vector_json IS NOT NULL"
+    ).fetchall()
+    updates = []
+    for chunk_id, vector_json in rows:
+        vec = np.asarray(json.loads(vector_json), dtype=np.float32)
+        updates.append((int(vec.shape[0]), encode_f32(vec), vector_norm(vec), chunk_id))
+    if updates:
+        seq = _next_seq(conn)
+        conn.executemany(
+            "UPDATE vectors SET dim=?, vector_blob=?, norm=?, vector_json=NULL, seq=? WHERE chunk_id=?",
+            [(*u[:3], seq, u[3]) for u in updates],
+        )
+
+
+def _migrate_scope_columns(conn: sqlite3.Connection) -> None:
+    """Backfill `doc_id` / `version_id` columns from `metadata_json` (idempotent)."""
+
+    cols = {r[1] for r in conn.execute("PRAGMA table_info(vectors)").fetchall()}
+    added = False
+    for col in ("doc_id", "version_id"):
+        if col not in cols:
+            conn.execute(f"ALTER TABLE vectors ADD COLUMN {col} TEXT")
+            added = True
+    if not added:
+        return
+    rows = conn.execute("SELECT chunk_id, metadata_json FROM vectors").fetchall()
+    updates = []
+    for chunk_id, metadata_json in rows:
+        try:
+            meta = json.loads(metadata_json or "{}")
+        except ValueError:
+            meta = {}
+        if not isinstance(meta, dict):
+            meta = {}
+        updates.append((_opt_str(meta.get("doc_id")), _opt_str(meta.get("version_id")), chunk_id))
+    if updates:
+        conn.executemany("UPDATE vectors SET doc_id=?, version_id=? WHERE chunk_id=?", updates)
+
+
+def _migrate_quantized(conn: sqlite3.Connection, dtype: str) -> None:
+    """Add the quantized columns and (re)quantize rows not yet stored as `dtype`."""
+
+    cols = {r[1] for r in conn.execute("PRAGMA table_info(vectors)").fetchall()}
+    for col, decl in (("qblob", "BLOB"), ("qscale", "REAL"), ("qdtype", "TEXT")):
+        if col not in cols:
+            conn.execute(f"ALTER TABLE vectors ADD COLUMN {col} {decl}")
+    if dtype == "float32":
+        return
+    stale = [
+        r[0]
+        for r in conn.execute(
+            "SELECT chunk_id FROM vectors WHERE vector_blob IS NOT NULL AND (qdtype IS NULL OR qdtype != ?)",
+            (dtype,),
+        ).fetchall()
+    ]
+    for i in range(0, len(stale), _SQL_BATCH):
+        batch = stale[i : i + _SQL_BATCH]
+        placeholders = ",".join(["?"] * len(batch))
+        rows = conn.execute(
+            f"SELECT chunk_id, dim, vector_blob FROM vectors WHERE chunk_id IN ({placeholders})",
+            tuple(batch),
+        ).fetchall()
+        updates = []
+        for chunk_id, dim, blob in rows:
+            codes, scales = quantize(decode_f32(blob, dim=int(dim)), dtype)
+            updates.append((_encode_codes(codes, dtype), float(scales[0]), dtype, chunk_id))
+        conn.executemany("UPDATE vectors SET qblob=?, qscale=?, qdtype=? WHERE chunk_id=?", updates)
+
+
+def _migrate_binary_codes(conn: sqlite3.Connection) -> None:
+    """Add the `bcode` column and fill sign-bit codes for rows that lack one."""
+
+    cols = {r[1] for r in conn.execute("PRAGMA table_info(vectors)").fetchall()}
+    if "bcode" not in cols:
+        conn.execute("ALTER TABLE vectors ADD COLUMN bcode BLOB")
+    missing = [
+        r[0]
+        for r in conn.execute(
+            "SELECT chunk_id FROM vectors WHERE bcode IS NULL AND vector_blob IS NOT NULL"
+        ).fetchall()
+    ]
+    for i in range(0, len(missing), _SQL_BATCH):
+        batch = missing[i : i + _SQL_BATCH]
+        placeholders = ",".join(["?"] * len(batch))
+        rows = conn.execute(
+            f"SELECT chunk_id, dim, vector_blob FROM vectors WHERE chunk_id IN ({placeholders})",
+            tuple(batch),
+        ).fetchall()
+        updates = [
+            (sign_pack(decode_f32(blob, dim=int(dim))).tobytes(), chunk_id) for chunk_id, dim, blob in rows
+        ]
+        conn.executemany("UPDATE vectors SET bcode=? WHERE chunk_id=?", updates)
+
+
+def _row_columns(kind: str) -> str:
+    base = "chunk_id, norm, doc_id, version_id"
+    if kind == "float32":
+        return f"{base}, vector_blob"
+    if kind == "bits":
+        return f"{base}, bcode, CASE WHEN bcode IS NULL THEN vector_blob END AS vector_blob"
+    # Rows written by a float32 (or differently quantized) writer are quantized
+    # on the fly from their float32 BLOB.
+    return (
+        f"{base}, CASE WHEN qdtype = ? THEN qblob END AS qblob,"
+        " CASE WHEN qdtype = ? THEN qscale END AS qscale,"
+        " CASE WHEN qdtype IS NOT ? THEN vector_blob END AS vector_blob"
+    )
+
+
+def _row_params(kind: str) -> tuple[str, ...]:
+    return () if kind in ("float32", "bits") else (kind, kind, kind)
+
+
+def _decode_rows(rows: list[sqlite3.Row], *, dim: int, kind: str) -> Rows:
+    n = len(rows)
+    scales = np.ones(n, dtype=np.float32)
+    if kind == "float32":
+        data = decode_f32(b"".join(r["vector_blob"] for r in rows), dim=dim)
+    elif kind == "bits":
+        buf = b"".join(
+            r["bcode"] if r["bcode"] is not None else sign_pack(decode_f32(r["vector_blob"], dim=dim)).tobytes()
+            for r in rows
+        )
+        data = np.frombuffer(buf, dtype=np.uint8).reshape(n, (dim + 7) // 8)
+    else:
+        blobs: list[bytes] = []
+        for i, r in enumerate(rows):
+            if r["qblob"] is None:
+                codes, qscale = quantize(decode_f32(r["vector_blob"], dim=dim)[0], kind)
+                blobs.append(_encode_codes(codes, kind))
+                scales[i] = float(qscale[0])
+            else:
+                blobs.append(r["qblob"])
+                scales[i] = float(r["qscale"] or 0.0)
+        data = _decode_codes(b"".join(blobs), kind, dim=dim)
+    return Rows(
+        ids=[r["chunk_id"] for r in rows],
+        data=data,
+        scales=scales,
+        norms=np.fromiter((float(r["norm"] or 0.0) for r in rows), dtype=np.float32, count=n),
+        doc_ids=np.asarray([r["doc_id"] or "" for r in rows], dtype=str),
+        version_ids=np.asarray([r["version_id"] or "" for r in rows], dtype=str),
+    )
+
+
+def _migrate_seq_column(conn: sqlite3.Connection) -> None:
+    """Add the write-sequence column (existing rows count as written at seq 0)."""
+
+    cols = {r[1] for r in conn.execute("PRAGMA table_info(vectors)").fetchall()}
+    if "seq" not in cols:
+        conn.execute("ALTER TABLE vectors ADD COLUMN seq INTEGER DEFAULT 0")
+
+
+def _next_seq(conn: sqlite3.Connection) -> int:
+    """Bump the write watermark inside the caller's transaction and return it."""
+    conn.execute("UPDATE index_meta SET value = CAST(value AS INTEGER) + 1 WHERE key = 'seq'")
+    return int(conn.execute("SELECT value FROM index_meta WHERE key = 'seq'").fetchone()[0])
+
+
+def _prune_delete_log(conn: sqlite3.Connection) -> None:
+    row = conn.execute(
+        "SELECT seq FROM vector_deletes ORDER BY seq DESC LIMIT 1 OFFSET ?", (_DELETE_LOG_MAX,)
+    ).fetchone()
+    if row is None:
+        return
+    floor = int(row[0])
+    conn.execute("DELETE FROM vector_deletes WHERE seq <= ?", (floor,))
+    conn.execute("UPDATE index_meta SET value = ? WHERE key = 'delete_floor'", (str(floor),))
+
+
+def _encode_codes(codes: np.ndarray, dtype: str) -> bytes:
+    return np.ascontiguousarray(codes, dtype=np.dtype(dtype).newbyteorder("<")).tobytes()
+
+
+def _decode_codes(buf: bytes, dtype: str, *, dim: int) -> np.ndarray:
+    dt = np.dtype(dtype).newbyteorder("<")
+    if dim <= 0 or not buf:
+        return np.zeros((0, max(dim, 0)), dtype=dt)
+    return np.frombuffer(buf, dtype=dt).reshape(-1, dim)
 
 
-def _norm(vec: list[float]) -> float:
-    return math.sqrt(sum(v * v for v in vec))
+def _filter_sql(search_filter: SearchFilter | None) -> tuple[str, tuple[str, ...]]:
+    """Translate a SearchFilter into an ` AND ...` clause (JSON array params avoid the
+    host-parameter limit for long id lists)."""
+    if search_filter is None or search_filter.is_empty():
+        return "", ()
+    clauses: list[str] = []
+    params: list[str] = []
+    if search_filter.doc_ids is not None:
+        clauses.append("doc_id IN (SELECT value FROM json_each(?))")
+        params.append(json.dumps(sorted(search_filter.doc_ids)))
+    if search_filter.version_ids is not None:
+        clauses.append("version_id IN (SELECT value FROM json_each(?))")
+        params.append(json.dumps(sorted(search_filter.version_ids)))
+    if search_filter.exclude_version_ids:
+        clauses.append("(version_id IS NULL OR version_id NOT IN (SELECT value FROM json_each(?)))")
+        params.append(json.dumps(sorted(search_filter.exclude_version_ids)))
+    return "".join(f" AND {c}" for c in clauses), tuple(params)
 
 
-def _cosine(a: list[float], a_norm: float, b: list[float]) -> float:
-    b_norm = _norm(b)
-    if a_norm == 0.0 or b_norm == 0.0:
-        return 0.0
-    dot = sum(x * y for x, y in zip(a, b))
-    return dot / (a_norm * b_norm)
+def _opt_str(v: object) -> str | None:
+    return v if isinstance(v, str) and v else None
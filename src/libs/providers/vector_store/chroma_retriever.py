@@ -1,10 +1,15 @@
 from __future__ import annotations
 
+import asyncio
 from dataclasses import dataclass
+from typing import Any, Callable
 
 from ...interfaces.embedding import Embedder
-from ...interfaces.vector_store import Candidate, Retriever, VectorIndex
-from ..embedding.cache import canonical
+from ...interfaces.vector_store import Candidate, Retriever, SearchFilter, VectorIndex
+from ....observability.obs import api as obs
+from ..embedding.cache import EmbeddingCache, LruEmbeddingCache, canonical, content_hash, make_embedding_cache_key
+
+_PREFILTERS = ("none", "binary")
 
 
 @dataclass
@@ -12,22 +17,168 @@ class ChromaDenseRetriever(Retriever):
     """Dense retriever backed by a VectorIndex (Chroma/ChromaLite/InMemory).
 
     Note: despite the name, this works with any `VectorIndex` implementation.
+
+    `prefilter="binary"` picks `top_k * prefilter_factor` candidates by Hamming
+    distance on sign-bit codes and rescores only those exactly. It needs an index
+    with `query_binary_batch` (ChromaLite / InMemory); other indexes use a normal query.
+
+    Query vectors are kept in an LRU of `query_cache_size` entries (0 disables),
+    keyed like ingestion (`make_embedding_cache_key`) so an optional persistent
+    `embedding_cache` tier can sit behind it; repeats skip the embedder call.
     """
 
     embedder: Embedder
     vector_index: VectorIndex
     text_norm_profile_id: str = "default"
     source_name: str = "dense"
+    prefilter: str = "none"
+    prefilter_factor: int = 20
+    embedder_id: str = "embedder.unknown"
+    embedder_version: str = "0"
+    query_cache_size: int = 1024
+    embedding_cache: EmbeddingCache | None = None
+
+    def __post_init__(self) -> None:
+        if self.prefilter not in _PREFILTERS:
+            raise ValueError(f"unsupported dense prefilter: {self.prefilter!r}")
+        self._query_vectors = LruEmbeddingCache(max_entries=int(self.query_cache_size))
+
+    def retrieve(
+        self,
+        query: str,
+        top_k: int,
+        search_filter: SearchFilter | None = None,
+    ) -> list[Candidate]:
+        if top_k <= 0:
+            return []
+        q = (query or "").strip()
+        if not q:
+            return []
 
-    def retrieve(self, query: str, top_k: int) -> list[Candidate]:
+        keys, vecs = self._cached([q])
+        if vecs[0] is None:
+            vecs[0] = self._store(keys[0], self.embedder.embed_texts([self._embedding_input(q)])[0])
+        return self._search_one(vecs[0], top_k, search_filter)
+
+    async def aretrieve(
+        self,
+        query: str,
+        top_k: int,
+        search_filter: SearchFilter | None = None,
+    ) -> list[Candidate]:
+        """Like `retrieve`, awaiting the embedder (`aembed_texts` when it has one).
+
+        Embedding-cache lookups (which may hit SQLite) and the index search run
+        on worker threads, so the event loop never blocks on them.
+        """
         if top_k <= 0:
             return []
         q = (query or "").strip()
         if not q:
             return []
 
-        emb_in = canonical(q, profile_id=self.text_norm_profile_id)
-        vec = self.embedder.embed_texts([emb_in])[0]
-        hits = self.vector_index.query(vec, top_k)
+        keys, vecs = await asyncio.to_thread(self._cached, [q])
+        if vecs[0] is None:
+            emb_in = [self._embedding_input(q)]
+            aembed = getattr(self.embedder, "aembed_texts", None)
+            if callable(aembed):
+                fresh = await aembed(emb_in)
+            else:
+                fresh = await asyncio.to_thread(self.embedder.embed_texts, emb_in)
+            vecs[0] = await asyncio.to_thread(self._store, keys[0], fresh[0])
+        return await asyncio.to_thread(self._search_one, vecs[0], top_k, search_filter)
+
+    def _search_one(
+        self,
+        vec: list[float],
+        top_k: int,
+        search_filter: SearchFilter | None,
+    ) -> list[Candidate]:
+        if search_filter is not None and search_filter.is_empty():
+            search_filter = None
+        if self._binary_query() is not None:
+            hits = self._search([vec], top_k, search_filter)[0]
+        elif search_filter is None:
+            hits = self.vector_index.query(vec, top_k)
+        else:
+            hits = self.vector_index.query(vec, top_k, search_filter=search_filter)
         return [Candidate(chunk_id=cid, score=float(score), source=self.source_name) for cid, score in hits]
 
+    def retrieve_batch(
+        self,
+        queries: list[str],
+        top_k: int,
+        search_filter: SearchFilter | None = None,
+    ) -> list[list[Candidate]]:
+        """Retrieve for many queries with one embedding call and one index pass."""
+        out: list[list[Candidate]] = [[] for _ in queries]
+        if top_k <= 0:
+            return out
+        rows = [i for i, q in enumerate(queries) if (q or "").strip()]
+        if not rows:
+            return out
+
+        keys, vecs = self._cached([queries[i].strip() for i in rows])
+        todo = [j for j, v in enumerate(vecs) if v is None]
+        if todo:
+            fresh = self.embedder.embed_texts([self._embedding_input(queries[rows[j]].strip()) for j in todo])
+            for j, vec in zip(todo, fresh):
+                vecs[j] = self._store(keys[j], vec)
+        if search_filter is not None and search_filter.is_empty():
+            search_filter = None
+        for i, hits in zip(rows, self._search(vecs, top_k, search_filter)):
+            out[i] = [Candidate(chunk_id=cid, score=float(score), source=self.source_name) for cid, score in hits]
+        return out
+
+    def _embedding_input(self, query: str) -> str:
+        return canonical(query, profile_id=self.text_norm_profile_id)
+
+    def _cached(self, queries: list[str]) -> tuple[list[str], list[list[float] | None]]:
+        """Cache keys and cached vectors (None = miss) for stripped, non-empty queries."""
+        keys = [
+            make_embedding_cache_key(
+                text_norm_profile_id=self.text_norm_profile_id,
+                content_hash=content_hash(q, text_norm_profile_id=self.text_norm_profile_id),
+                embedder_id=self.embedder_id,
+                embedder_version=self.embedder_version,
+            )
+            for q in queries
+        ]
+        vecs: list[list[float] | None] = []
+        for key in keys:
+            vec = self._query_vectors.get(key)
+            if vec is None and self.embedding_cache is not None:
+                vec = self.embedding_cache.get(key)
+                if vec is not None:
+                    self._query_vectors.put(key, vec)
+            vecs.append(vec)
+        hits = sum(v is not None for v in vecs)
+        obs.metric("query_embedding_cache_hit", hits, {"embedder_id": self.embedder_id})
+        obs.metric("query_embedding_cache_miss", len(vecs) - hits, {"embedder_id": self.embedder_id})
+        return keys, vecs
+
+    def _store(self, key: str, vec: list[float]) -> list[float]:
+        self._query_vectors.put(key, vec)
+        if self.embedding_cache is not None:
+            self.embedding_cache.put(key, vec)
+        return vec
+
+    def _search(
+        self,
+        vecs: list[list[float]],
+        top_k: int,
+        search_filter: SearchFilter | None,
+    ) -> list[list[tuple[str, float]]]:
+        binary = self._binary_query()
+        if binary is not None:
+            shortlist = top_k * max(1, int(self.prefilter_factor))
+            return binary(vecs, top_k, shortlist=shortlist, search_filter=search_filter)
+        if search_filter is None:
+            return self.vector_index.query_batch(vecs, top_k)
+        return self.vector_index.query_batch(vecs, top_k, search_filter=search_filter)
+
+    def _binary_query(self) -> Callable[..., Any] | None:
+        if self.prefilter != "binary":
+            return None
+        fn = getattr(self.vector_index, "query_binary_batch", None)
+        return fn if callable(fn) else None
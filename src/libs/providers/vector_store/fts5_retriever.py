@@ -4,47 +4,88 @@ import re
 from dataclasses import dataclass
 from pathlib import Path
 
-from ...interfaces.vector_store import Candidate, Retriever
-from ....ingestion.stages.storage.fts5 import Fts5Store
+from ...interfaces.vector_store import Candidate, Retriever, SearchFilter
+from ....ingestion.stages.storage.fts5 import Fts5Store, cjk_bigrams
 
 
 _TERM_RE = re.compile(r"[0-9A-Za-z_]+|[\u4e00-\u9fff]+")
+_CJK_RE = re.compile(r"[\u4e00-\u9fff]")
 
 
-def build_fts5_query(query_norm: str) -> str:
+def build_fts5_query(query_norm: str, tokenizer: str = "unicode61") -> str:
     """Build a conservative FTS5 MATCH expression.
 
     D-3 scope: minimal parser.
     - Drops most punctuation/special operators to avoid surprising semantics.
     - Keeps ASCII word tokens and CJK runs.
+    - `trigram`: terms are quoted substrings; terms under 3 chars cannot match and are dropped
+      (see `short_trigram_terms` for the substring fallback).
+    - `cjk_bigram`: a CJK run becomes a phrase of its bigrams (a single
+      character a prefix query), mirroring how the index was pre-tokenized.
     """
     q = (query_norm or "").strip()
     if not q:
         return ""
-    terms = _TERM_RE.findall(q)
-    return " ".join(t for t in terms if t)
+    terms = [t for t in _TERM_RE.findall(q) if t]
+    if tokenizer == "trigram":
+        return " ".join(f'"{t}"' for t in terms if len(t) >= 3)
+    if tokenizer == "cjk_bigram":
+        out = []
+        for t in terms:
+            if not _CJK_RE.match(t):
+                out.append(t)
+            elif len(t) == 1:
+                out.append(f"{t}*")
+            else:
+                out.append('"' + " ".join(cjk_bigrams(t)) + '"')
+        return " ".join(out)
+    return " ".join(terms)
+
+
+def short_trigram_terms(query_norm: str) -> tuple[str, ...]:
+    """Query terms a `trigram` index cannot match (under 3 chars), e.g. 2-char CJK words or "AI"."""
+    return tuple(dict.fromkeys(t for t in _TERM_RE.findall(query_norm or "") if len(t) < 3))
 
 
 @dataclass
 class Fts5Retriever(Retriever):
     """Sparse retriever backed by SQLite FTS5 (BM25).
 
-    Returns Candidate.score where larger is better (we negate bm25).
+    Returns Candidate.score where larger is better (we negate bm25). Under
+    `trigram`, query terms shorter than 3 chars are matched as substrings of
+    the chunk text; a query made only of such terms returns unranked matches.
+
+    `tokenizer` (`unicode61` | `trigram` | `cjk_bigram`) selects the profile
+    of a new index; an existing index is queried with the profile it was built
+    with (switch it with `AdminRunner.maintain_fts_index(tokenizer=...)`).
     """
 
     db_path: str = "data/sqlite/fts.sqlite"
+    tokenizer: str | None = None
     source_name: str = "sparse"
 
     def __post_init__(self) -> None:
-        self._store = Fts5Store(db_path=Path(self.db_path))
+        self._store = Fts5Store(db_path=Path(self.db_path), tokenizer=self.tokenizer)
+
+    def generation(self) -> int:
+        """Write generation of the FTS store (bumped by writes and rebuilds)."""
+        return self._store.generation()
 
-    def retrieve(self, query: str, top_k: int) -> list[Candidate]:
+    def retrieve(
+        self,
+        query: str,
+        top_k: int,
+        search_filter: SearchFilter | None = None,
+    ) -> list[Candidate]:
         if top_k <= 0:
             return []
-        qexpr = build_fts5_query(query)
-        if not qexpr:
+        tokenizer = self._store.tokenizer or "unicode61"
+        qexpr = build_fts5_query(query, tokenizer)
+        # Short terms still have to match under `trigram`, as LIKE substring filters.
+        substrings = short_trigram_terms(query) if tokenizer == "trigram" else ()
+        if not qexpr and not substrings:
             return []
-        hits = self._store.query(qexpr, top_k=top_k)
+        hits = self._store.query(qexpr, top_k=top_k, search_filter=search_filter, substrings=substrings)
         out: list[Candidate] = []
         for chunk_id, bm25_score in hits:
             # SQLite's bm25 is "smaller is better"; normalize to "larger is better".
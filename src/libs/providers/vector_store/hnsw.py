@@ -0,0 +1,478 @@
+from __future__ import annotations
+
+import heapq
+import io
+import math
+import os
+import random
+import uuid
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+
+from ...interfaces.vector_store.store import SearchFilter, VectorItem
+from .matrix import filter_mask, top_k_indices, vector_norm
+
+_FORMAT_VERSION = 1
+_GRAPH_FILE = "hnsw_graph.npz"
+_LOG_FILE = "hnsw_graph.log"
+_LOG_MAGIC = b"HNSWLOG1"
+# The log is folded into a new snapshot once it is larger than the snapshot (and this).
+_LOG_MIN_BYTES = 1 << 20
+
+
+@dataclass
+class HnswVectorIndex:
+    """Built-in HNSW approximate nearest neighbour index (cosine).
+
+    Pure Python graph + NumPy distance kernels, no external service. Vectors are
+    L2-normalized on insert so cosine == inner product; the returned score is the
+    cosine similarity (larger is better), matching the flat providers.
+
+    - `M`: max neighbours per node on upper layers (layer 0 keeps `2*M`).
+    - `ef_construction`: candidate list size while inserting.
+    - `ef_search`: candidate list size while querying (raised to `top_k` if smaller).
+
+    Deletes are tombstones; the graph is rebuilt once tombstones outnumber live
+    nodes. When `persist_dir` is set each write call is persisted by appending
+    its new nodes, rewired links and tombstones to `hnsw_graph.log`; the full
+    graph (`hnsw_graph.npz`) is only rewritten after a rebuild or once the log
+    outgrows it, so a write costs O(changed nodes) rather than O(index).
+
+    A `SearchFilter` is applied as a node predicate: selective filters (at most
+    `filter_scan_max` eligible nodes) are answered by an exact scan over the
+    eligible nodes, otherwise the layer-0 search widens `ef` until enough
+    eligible nodes are found.
+    """
+
+    persist_dir: str | None = "data/chroma/hnsw"
+    M: int = 16
+    ef_construction: int = 200
+    ef_search: int = 64
+    seed: int = 42
+    filter_scan_max: int = 2048
+
+    def __post_init__(self) -> None:
+        if self.M < 2:
+            raise ValueError("M must be >= 2")
+        self._rng = random.Random(self.seed)
+        self._ml = 1.0 / math.log(self.M)
+        self._reset(dim=0)
+        if self.persist_dir:
+            Path(self.persist_dir).mkdir(parents=True, exist_ok=True)
+            self._load()
+
+    # ---- VectorIndex protocol ----
+
+    def upsert(self, items: list[VectorItem]) -> None:
+        if not items:
+            return
+        for it in items:
+            vec = np.asarray(it.vector, dtype=np.float32)
+            if self._dim == 0:
+                self._reset(dim=int(vec.shape[0]))
+            if vec.shape[0] != self._dim:
+                raise ValueError(f"vector dim mismatch: expected {self._dim}, got {vec.shape[0]}")
+            old = self._node_by_id.pop(it.chunk_id, None)
+            if old is not None:
+                self._tombstone(old)
+            meta = it.metadata or {}
+            self._insert(it.chunk_id, vec, _scope(meta.get("doc_id")), _scope(meta.get("version_id")))
+        self._maybe_rebuild()
+        self._save()
+
+    def query(
+        self,
+        vector: list[float],
+        top_k: int,
+        search_filter: SearchFilter | None = None,
+    ) -> list[tuple[str, float]]:
+        if top_k <= 0 or not self._node_by_id:
+            return []
+        q = np.asarray(vector, dtype=np.float32)
+        if q.shape[0] != self._dim:
+            return []
+        qn = vector_norm(q)
+        if qn == 0.0:
+            return []
+        q = q / qn
+
+        allowed: np.ndarray | None = None
+        if search_filter is not None and not search_filter.is_empty():
+            doc_ids, version_ids = self._scope_arrays()
+            allowed = filter_mask(doc_ids, version_ids, search_filter)
+            allowed &= ~np.asarray(self._deleted, dtype=np.bool_)
+            eligible = np.flatnonzero(allowed)
+            if eligible.shape[0] == 0:
+                return []
+            if eligible.shape[0] <= self.filter_scan_max:
+                scores = self._vecs[eligible] @ q
+                return [(self._ids[int(eligible[i])], float(scores[i])) for i in top_k_indices(scores, top_k)]
+
+        ep = self._entry
+        for layer in range(self._max_level, 0, -1):
+            ep = self._search_layer(q, [ep], 1, layer)[0][1]
+
+        ef = max(int(self.ef_search), int(top_k))
+        while True:
+            found = self._search_layer(q, [ep], ef, 0)
+            out: list[tuple[str, float]] = []
+            for dist, node in found:
+                if self._deleted[node] or (allowed is not None and not allowed[node]):
+                    continue
+                out.append((self._ids[node], 1.0 - dist))
+                if len(out) >= top_k:
+                    break
+            if len(out) >= top_k or allowed is None or ef >= self._size:
+                return out
+            ef *= 2
+
+    def query_batch(
+        self,
+        vectors: list[list[float]],
+        top_k: int,
+        search_filter: SearchFilter | None = None,
+    ) -> list[list[tuple[str, float]]]:
+        # Graph walks are per query; batching only saves the caller round-trips.
+        return [self.query(v, top_k, search_filter=search_filter) for v in vectors]
+
+    def delete(self, chunk_ids: list[str]) -> None:
+        if not chunk_ids:
+            return
+        changed = False
+        for cid in chunk_ids:
+            node = self._node_by_id.pop(cid, None)
+            if node is not None:
+                self._tombstone(node)
+                changed = True
+        if not changed:
+            return
+        self._maybe_rebuild()
+        self._save()
+
+    def count(self) -> int:
+        return len(self._node_by_id)
+
+    # ---- graph construction ----
+
+    def _reset(self, *, dim: int) -> None:
+        self._dim = dim
+        self._vecs = np.zeros((0, dim), dtype=np.float32)
+        self._size = 0
+        self._ids: list[str] = []
+        self._doc_ids: list[str] = []
+        self._version_ids: list[str] = []
+        self._scope_cache: tuple[np.ndarray, np.ndarray] | None = None
+        self._levels: list[int] = []
+        self._deleted: list[bool] = []
+        self._neighbors: list[list[list[int]]] = []
+        self._node_by_id: dict[str, int] = {}
+        self._entry = -1
+        self._max_level = -1
+        # Persistence bookkeeping: nodes below `_saved_size` are on disk; `_relinked` /
+        # `_tombstoned` are those of them changed since, logged by the next `_save`.
+        self._saved_size = 0
+        self._relinked: set[int] = set()
+        self._tombstoned: set[int] = set()
+        self._needs_snapshot = True
+        self._log_id = ""
+
+    def _append_vector(self, vec: np.ndarray) -> int:
+        if self._size == self._vecs.shape[0]:
+            cap = max(16, self._vecs.shape[0] * 2)
+            grown = np.zeros((cap, self._dim), dtype=np.float32)
+            grown[: self._size] = self._vecs[: self._size]
+            self._vecs = grown
+        node = self._size
+        self._vecs[node] = vec
+        self._size += 1
+        return node
+
+    def _scope_arrays(self) -> tuple[np.ndarray, np.ndarray]:
+        if self._scope_cache is None:
+            self._scope_cache = (
+                np.array(self._doc_ids, dtype=np.str_),
+                np.array(self._version_ids, dtype=np.str_),
+            )
+        return self._scope_cache
+
+    def _insert(self, chunk_id: str, vec: np.ndarray, doc_id: str = "", version_id: str = "") -> None:
+        n = vector_norm(vec)
+        unit = vec / n if n > 0.0 else vec
+        level = int(-math.log(1.0 - self._rng.random()) * self._ml)
+
+        node = self._append_vector(unit)
+        self._ids.append(chunk_id)
+        self._doc_ids.append(doc_id)
+        self._version_ids.append(version_id)
+        self._scope_cache = None
+        self._levels.append(level)
+        self._deleted.append(False)
+        self._neighbors.append([[] for _ in range(level + 1)])
+        self._node_by_id[chunk_id] = node
+
+        if self._entry < 0:
+            self._entry = node
+            self._max_level = level
+            return
+
+        ep = self._entry
+        for layer in range(self._max_level, level, -1):
+            ep = self._search_layer(unit, [ep], 1, layer)[0][1]
+
+        eps = [ep]
+        for layer in range(min(level, self._max_level), -1, -1):
+            found = self._search_layer(unit, eps, self.ef_construction, layer)
+            selected = [c for _, c in found[: self.M]]
+            self._neighbors[node][layer] = list(selected)
+            cap = self._max_neighbors(layer)
+            for other in selected:
+                links = self._neighbors[other][layer]
+                links.append(node)
+                if len(links) > cap:
+                    self._neighbors[other][layer] = self._closest(other, links, cap)
+                self._relinked.add(other)
+            eps = [c for _, c in found]
+
+        if level > self._max_level:
+            self._entry = node
+            self._max_level = level
+
+    def _tombstone(self, node: int) -> None:
+        self._deleted[node] = True
+        self._tombstoned.add(node)
+
+    def _max_neighbors(self, layer: int) -> int:
+        return self.M * 2 if layer == 0 else self.M
+
+    def _closest(self, node: int, candidates: list[int], k: int) -> list[int]:
+        dists = 1.0 - self._vecs[candidates] @ self._vecs[node]
+        order = np.argsort(dists, kind="stable")[:k]
+        return [candidates[i] for i in order]
+
+    def _search_layer(self, q: np.ndarray, entry_points: list[int], ef: int, layer: int) -> list[tuple[float, int]]:
+        """Greedy best-first search on one layer; returns (distance, node) nearest first."""
+        visited = set(entry_points)
+        dists = 1.0 - self._vecs[entry_points] @ q
+        candidates = [(float(d), n) for d, n in zip(dists, entry_points)]
+        heapq.heapify(candidates)
+        results = [(-d, n) for d, n in candidates]
+        heapq.heapify(results)
+        while len(results) > ef:
+            heapq.heappop(results)
+
+        while candidates:
+            dist, node = heapq.heappop(candidates)
+            if dist > -results[0][0] and len(results) >= ef:
+                break
+            fresh = [nb for nb in self._neighbors[node][layer] if nb not in visited]
+            if not fresh:
+                continue
+            visited.update(fresh)
+            nb_dists = 1.0 - self._vecs[fresh] @ q
+            for d, nb in zip(nb_dists.tolist(), fresh):
+                if len(results) < ef or d < -results[0][0]:
+                    heapq.heappush(candidates, (d, nb))
+                    heapq.heappush(results, (-d, nb))
+                    if len(results) > ef:
+                        heapq.heappop(results)
+
+        return sorted(((-nd, n) for nd, n in results), key=lambda x: (x[0], x[1]))
+
+    def _maybe_rebuild(self) -> None:
+        live = len(self._node_by_id)
+        dead = self._size - live
+        if dead == 0 or dead <= live:
+            return
+        keep = sorted(self._node_by_id.values())
+        rows = [(self._ids[i], self._doc_ids[i], self._version_ids[i]) for i in keep]
+        vecs = self._vecs[keep].copy()
+        self._reset(dim=self._dim if rows else 0)
+        for (cid, doc_id, version_id), vec in zip(rows, vecs):
+            self._insert(cid, vec, doc_id, version_id)
+
+    # ---- persistence ----
+
+    def _graph_path(self) -> Path | None:
+        if not self.persist_dir:
+            return None
+        return Path(self.persist_dir) / _GRAPH_FILE
+
+    def _log_path(self) -> Path | None:
+        if not self.persist_dir:
+            return None
+        return Path(self.persist_dir) / _LOG_FILE
+
+    def _save(self) -> None:
+        path = self._graph_path()
+        log = self._log_path()
+        if path is None or log is None:
+            return
+        log_bytes = log.stat().st_size if log.exists() else -1
+        if (
+            self._needs_snapshot
+            or not path.exists()
+            or log_bytes < 0
+            or log_bytes > max(_LOG_MIN_BYTES, path.stat().st_size)
+        ):
+            self._write_snapshot(path, log)
+        else:
+            self._append_log(log)
+        self._saved_size = self._size
+        self._relinked.clear()
+        self._tombstoned.clear()
+        self._needs_snapshot = False
+
+    def _write_snapshot(self, path: Path, log: Path) -> None:
+        """Rewrite the whole graph, then start an empty log tied to it by `log_id`."""
+        counts, flat = self._links_of(range(self._size))
+        log_id = uuid.uuid4().hex
+        tmp = path.with_suffix(".tmp.npz")
+        np.savez(
+            tmp,
+            meta=np.array([_FORMAT_VERSION, self._dim, self.M, self._entry, self._max_level], dtype=np.int64),
+            log_id=np.array(log_id, dtype=np.str_),
+            vectors=self._vecs[: self._size],
+            ids=np.array(self._ids, dtype=np.str_),
+            doc_ids=np.array(self._doc_ids, dtype=np.str_),
+            version_ids=np.array(self._version_ids, dtype=np.str_),
+            levels=np.array(self._levels, dtype=np.int32),
+            deleted=np.array(self._deleted, dtype=np.bool_),
+            link_counts=counts,
+            links=flat,
+        )
+        os.replace(tmp, path)
+        # A crash before this replace leaves the old log, whose id no longer matches.
+        tmp_log = log.with_suffix(".tmp.log")
+        tmp_log.write_bytes(_LOG_MAGIC + log_id.encode("ascii"))
+        os.replace(tmp_log, log)
+        self._log_id = log_id
+
+    def _append_log(self, log: Path) -> None:
+        """Append one record: nodes added since the last save plus links / tombstones of older nodes."""
+        first = self._saved_size
+        new = range(first, self._size)
+        relinked = sorted(n for n in self._relinked if n < first)
+        counts, flat = self._links_of(new)
+        upd_counts, upd_flat = self._links_of(relinked)
+        buf = io.BytesIO()
+        np.savez(
+            buf,
+            meta=np.array([first, self._entry, self._max_level], dtype=np.int64),
+            vectors=self._vecs[first : self._size],
+            ids=np.array(self._ids[first:], dtype=np.str_),
+            doc_ids=np.array(self._doc_ids[first:], dtype=np.str_),
+            version_ids=np.array(self._version_ids[first:], dtype=np.str_),
+            levels=np.array(self._levels[first:], dtype=np.int32),
+            deleted=np.array(self._deleted[first:], dtype=np.bool_),
+            link_counts=counts,
+            links=flat,
+            upd_nodes=np.array(relinked, dtype=np.int32),
+            upd_link_counts=upd_counts,
+            upd_links=upd_flat,
+            del_nodes=np.array(sorted(n for n in self._tombstoned if n < first), dtype=np.int32),
+        )
+        record = buf.getvalue()
+        with open(log, "ab") as f:
+            f.write(len(record).to_bytes(8, "little"))
+            f.write(record)
+
+    def _links_of(self, nodes: range | list[int]) -> tuple[np.ndarray, np.ndarray]:
+        """Per-layer link counts and the flattened links of `nodes` (all layers, in order)."""
+        counts: list[int] = []
+        flat: list[int] = []
+        for node in nodes:
+            for links in self._neighbors[node]:
+                counts.append(len(links))
+                flat.extend(links)
+        return np.array(counts, dtype=np.int32), np.array(flat, dtype=np.int32)
+
+    def _load(self) -> None:
+        path = self._graph_path()
+        if path is None or not path.exists():
+            return
+        with np.load(path, allow_pickle=False) as data:
+            version, dim, m, entry, max_level = (int(v) for v in data["meta"])
+            if version != _FORMAT_VERSION:
+                raise ValueError(f"unsupported hnsw graph format: {version}")
+            if m != self.M:
+                # Graph degree is baked into the links; honour the persisted value.
+                self.M = m
+                self._ml = 1.0 / math.log(m)
+            self._reset(dim=dim)
+            self._entry = entry
+            self._max_level = max_level
+            self._log_id = str(data["log_id"]) if "log_id" in data else ""
+            vectors = [np.array(data["vectors"], dtype=np.float32)]
+            self._ids = [str(x) for x in data["ids"]]
+            blank = [""] * len(self._ids)
+            self._doc_ids = [str(x) for x in data["doc_ids"]] if "doc_ids" in data else list(blank)
+            self._version_ids = [str(x) for x in data["version_ids"]] if "version_ids" in data else list(blank)
+            self._levels = [int(x) for x in data["levels"]]
+            self._deleted = [bool(x) for x in data["deleted"]]
+            self._neighbors = _split_links(self._levels, data["link_counts"].tolist(), data["links"].tolist())
+
+        # Without a matching log (older snapshot, torn tail) the next save writes a fresh snapshot.
+        self._needs_snapshot = not self._replay_log(vectors)
+        self._vecs = np.concatenate(vectors) if len(vectors) > 1 else vectors[0]
+        self._size = int(self._vecs.shape[0])
+        self._saved_size = self._size
+        self._node_by_id = {cid: i for i, cid in enumerate(self._ids) if not self._deleted[i]}
+
+    def _replay_log(self, vectors: list[np.ndarray]) -> bool:
+        """Apply the records of the snapshot's log; False when the log is missing, foreign or torn."""
+        log = self._log_path()
+        if log is None or not self._log_id or not log.exists():
+            return False
+        raw = log.read_bytes()
+        header = _LOG_MAGIC + self._log_id.encode("ascii")
+        if not raw.startswith(header):
+            return False
+        pos = len(header)
+        while pos < len(raw):
+            n = int.from_bytes(raw[pos : pos + 8], "little")
+            if pos + 8 + n > len(raw):
+                return False  # interrupted append: keep the complete records
+            with np.load(io.BytesIO(raw[pos + 8 : pos + 8 + n]), allow_pickle=False) as rec:
+                first, self._entry, self._max_level = (int(v) for v in rec["meta"])
+                if first != len(self._ids):
+                    raise ValueError("hnsw graph log does not continue its snapshot")
+                levels = [int(x) for x in rec["levels"]]
+                vectors.append(np.array(rec["vectors"], dtype=np.float32).reshape(len(levels), self._dim))
+                self._ids.extend(str(x) for x in rec["ids"])
+                self._doc_ids.extend(str(x) for x in rec["doc_ids"])
+                self._version_ids.extend(str(x) for x in rec["version_ids"])
+                self._levels.extend(levels)
+                self._deleted.extend(bool(x) for x in rec["deleted"])
+                self._neighbors.extend(_split_links(levels, rec["link_counts"].tolist(), rec["links"].tolist()))
+                relinked = [int(x) for x in rec["upd_nodes"]]
+                rewired = _split_links(
+                    [self._levels[i] for i in relinked], rec["upd_link_counts"].tolist(), rec["upd_links"].tolist()
+                )
+                for node, layers in zip(relinked, rewired):
+                    self._neighbors[node] = layers
+                for node in rec["del_nodes"].tolist():
+                    self._deleted[node] = True
+            pos += 8 + n
+        return True
+
+
+def _split_links(levels: list[int], counts: list[int], flat: list[int]) -> list[list[list[int]]]:
+    """Inverse of `_links_of`: per-node layer lists from counts + flattened links."""
+    out: list[list[list[int]]] = []
+    pos = 0
+    cidx = 0
+    for level in levels:
+        layers: list[list[int]] = []
+        for _ in range(level + 1):
+            c = counts[cidx]
+            layers.append(flat[pos : pos + c])
+            pos += c
+            cidx += 1
+        out.append(layers)
+    return out
+
+
+def _scope(v: object) -> str:
+    return v if isinstance(v, str) else ""
@@ -1,50 +1,188 @@
 from __future__ import annotations
 
-import math
-from dataclasses import dataclass, field
+from dataclasses import dataclass
 
-from ...interfaces.vector_store.store import VectorItem
+import numpy as np
+
+from ...interfaces.vector_store.store import SearchFilter, VectorItem
+from .matrix import (
+    check_dtype,
+    cosine_scores_batch,
+    filter_mask,
+    hamming_distances,
+    query_blocks,
+    sign_pack,
+    top_k_indices,
+    vector_norm,
+)
 
 
 @dataclass
 class InMemoryVectorIndex:
-    """Simple in-memory vector index for local/dev use."""
+    """Simple in-memory vector index for local/dev use.
+
+    Vectors live in one contiguous float32 matrix (not per-item Python lists).
+    Only `dtype="float32"` is supported: there is no full-precision copy to
+    rescore a quantized first pass from, so float16/int8 storage with exact
+    rescoring is `ChromaLiteVectorIndex`'s job.
+
+    Packed sign-bit codes for `query_binary_batch` (Hamming shortlist) are built
+    on its first call and maintained from then on.
+    """
 
-    _items: dict[str, VectorItem] = field(default_factory=dict)
-    _norms: dict[str, float] = field(default_factory=dict)
+    dtype: str = "float32"
+
+    def __post_init__(self) -> None:
+        check_dtype(self.dtype)
+        if self.dtype != "float32":
+            raise ValueError(
+                f"InMemoryVectorIndex stores float32 only (got dtype={self.dtype!r}); "
+                "use vector.chroma_lite for quantized storage with exact rescoring"
+            )
+        self._ids: list[str] = []
+        self._row_by_id: dict[str, int] = {}
+        self._reset(dim=0)
 
     def upsert(self, items: list[VectorItem]) -> None:
         for item in items:
-            self._items[item.chunk_id] = item
-            self._norms[item.chunk_id] = _norm(item.vector)
+            vec = np.asarray(item.vector, dtype=np.float32)
+            if self._size == 0 and self._dim != vec.shape[0]:
+                self._reset(dim=int(vec.shape[0]))
+            if vec.shape[0] != self._dim:
+                raise ValueError(f"vector dim mismatch: expected {self._dim}, got {vec.shape[0]}")
+            row = self._row_by_id.get(item.chunk_id)
+            if row is None:
+                row = self._append_row()
+                self._ids.append(item.chunk_id)
+                self._row_by_id[item.chunk_id] = row
+            self._norms[row] = vector_norm(vec)
+            self._vecs[row] = vec
+            if self._bits is not None:
+                self._bits[row] = sign_pack(vec)[0]
+            meta = item.metadata or {}
+            self._doc_ids[row] = meta.get("doc_id") or ""
+            self._version_ids[row] = meta.get("version_id") or ""
+
+    def query(
+        self,
+        vector: list[float],
+        top_k: int,
+        search_filter: SearchFilter | None = None,
+    ) -> list[tuple[str, float]]:
+        return self.query_batch([vector], top_k, search_filter=search_filter)[0]
 
-    def query(self, vector: list[float], top_k: int) -> list[tuple[str, float]]:
-        if top_k <= 0:
-            return []
-        if not self._items:
-            return []
+    def query_batch(
+        self,
+        vectors: list[list[float]],
+        top_k: int,
+        search_filter: SearchFilter | None = None,
+    ) -> list[list[tuple[str, float]]]:
+        out: list[list[tuple[str, float]]] = [[] for _ in vectors]
+        if top_k <= 0 or self._size == 0:
+            return out
+        rows = [i for i, v in enumerate(vectors) if len(v) == self._dim]
+        if not rows:
+            return out
 
-        q_norm = _norm(vector)
-        scored: list[tuple[str, float]] = []
-        for chunk_id, item in self._items.items():
-            score = _cosine(vector, q_norm, item.vector, self._norms.get(chunk_id, 0.0))
-            scored.append((chunk_id, score))
+        eligible = self._eligible(search_filter)
+        if eligible.shape[0] == 0:
+            return out
 
-        scored.sort(key=lambda x: x[1], reverse=True)
-        return scored[:top_k]
+        qmat = np.asarray([vectors[i] for i in rows], dtype=np.float32)
+        mat, norms = self._take(self._vecs, eligible), self._take(self._norms, eligible)
+        for block in query_blocks(len(rows), eligible.shape[0]):
+            scores = cosine_scores_batch(mat, norms, qmat[block])
+            for j, row in zip(range(block.start, block.stop), scores):
+                out[rows[j]] = [(self._ids[eligible[k]], float(row[k])) for k in top_k_indices(row, top_k)]
+        return out
+
+    def query_binary_batch(
+        self,
+        vectors: list[list[float]],
+        top_k: int,
+        *,
+        shortlist: int,
+        search_filter: SearchFilter | None = None,
+    ) -> list[list[tuple[str, float]]]:
+        """Pick `shortlist` rows by Hamming distance on sign-bit codes, then rescore them."""
+        out: list[list[tuple[str, float]]] = [[] for _ in vectors]
+        if top_k <= 0 or self._size == 0:
+            return out
+        eligible = self._eligible(search_filter)
+        if eligible.shape[0] == 0:
+            return out
+        bits = self._take(self._sign_bits(), eligible)
+        want = max(int(shortlist), top_k)
+        for i, v in enumerate(vectors):
+            if len(v) != self._dim:
+                continue
+            q = np.asarray(v, dtype=np.float32)
+            dist = hamming_distances(bits, sign_pack(q)[0])
+            head = eligible[top_k_indices(-dist.astype(np.float32), want)]
+            scores = cosine_scores_batch(self._vecs[head], self._norms[head], q[None, :])[0]
+            out[i] = [(self._ids[head[k]], float(scores[k])) for k in top_k_indices(scores, top_k)]
+        return out
 
     def delete(self, chunk_ids: list[str]) -> None:
-        for cid in chunk_ids:
-            self._items.pop(cid, None)
-            self._norms.pop(cid, None)
+        drop = {self._row_by_id[cid] for cid in chunk_ids if cid in self._row_by_id}
+        if not drop:
+            return
+        keep = np.asarray([r for r in range(self._size) if r not in drop], dtype=np.int64)
+        self._vecs = self._vecs[keep]
+        self._norms = self._norms[keep]
+        if self._bits is not None:
+            self._bits = self._bits[keep]
+        self._doc_ids = self._doc_ids[keep]
+        self._version_ids = self._version_ids[keep]
+        self._ids = [self._ids[r] for r in keep]
+        self._size = int(keep.shape[0])
+        self._row_by_id = {cid: r for r, cid in enumerate(self._ids)}
+
+    def count(self) -> int:
+        return self._size
+
+    def _reset(self, *, dim: int) -> None:
+        self._dim = dim
+        self._size = 0
+        self._vecs = np.zeros((0, dim), dtype=np.float32)
+        self._norms = np.zeros(0, dtype=np.float32)
+        self._bits: np.ndarray | None = None
+        # Per-row doc / version ids ("" when missing) for `filter_mask`.
+        self._doc_ids = np.zeros(0, dtype=object)
+        self._version_ids = np.zeros(0, dtype=object)
+
+    def _sign_bits(self) -> np.ndarray:
+        if self._bits is None:
+            rows = self._vecs[: self._size]
+            bits = sign_pack(rows) if self._size else np.zeros((0, (self._dim + 7) // 8), dtype=np.uint8)
+            self._bits = _grow(bits, self._vecs.shape[0], self._size)
+        return self._bits
+
+    def _eligible(self, search_filter: SearchFilter | None) -> np.ndarray:
+        if search_filter is None or search_filter.is_empty():
+            return np.arange(self._size)
+        n = self._size
+        return np.flatnonzero(filter_mask(self._doc_ids[:n], self._version_ids[:n], search_filter))
 
+    def _take(self, arr: np.ndarray, eligible: np.ndarray) -> np.ndarray:
+        # Unfiltered queries use a view instead of copying the whole matrix.
+        return arr[: self._size] if eligible.shape[0] == self._size else arr[eligible]
 
-def _norm(vec: list[float]) -> float:
-    return math.sqrt(sum(v * v for v in vec))
+    def _append_row(self) -> int:
+        if self._size == self._vecs.shape[0]:
+            cap = max(16, self._vecs.shape[0] * 2)
+            self._vecs = _grow(self._vecs, cap, self._size)
+            self._norms = _grow(self._norms, cap, self._size)
+            self._doc_ids = _grow(self._doc_ids, cap, self._size)
+            self._version_ids = _grow(self._version_ids, cap, self._size)
+            if self._bits is not None:
+                self._bits = _grow(self._bits, cap, self._size)
+        row = self._size
+        self._size += 1
+        return row
 
 
-def _cosine(a: list[float], a_norm: float, b: list[float], b_norm: float) -> float:
-    if a_norm == 0.0 or b_norm == 0.0:
-        return 0.0
-    dot = sum(x * y for x, y in zip(a, b))
-    return dot / (a_norm * b_norm)
+def _grow(arr: np.ndarray, cap: int, used: int) -> np.ndarray:
+    grown = np.zeros((cap, *arr.shape[1:]), dtype=arr.dtype)
+    grown[:used] = arr[:used]
+    return grown
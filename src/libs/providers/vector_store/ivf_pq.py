@@ -0,0 +1,338 @@
+from __future__ import annotations
+
+import math
+import os
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+
+from ...interfaces.vector_store.store import SearchFilter, VectorItem
+from .chroma_lite import ChromaLiteVectorIndex
+from .matrix import cosine_scores, filter_mask, kmeans, nearest_centroid, top_k_indices, vector_norm
+
+_FORMAT_VERSION = 1
+_INDEX_FILE = "ivf_pq.npz"
+
+
+@dataclass
+class IvfPqVectorIndex:
+    """IVF + product-quantization compressed vector index (cosine).
+
+    Full-precision vectors stay in the ChromaLite store at `db_path` (the same
+    file `UpsertStage` writes for `vector.chroma_lite`); this index keeps only
+    coarse list assignments plus `m` one-byte PQ codes per vector.
+
+    - `train()` learns `nlist` coarse centroids and per-subspace PQ codebooks from
+      a sample of at most `max_train_points` stored vectors, then encodes all of
+      them `encode_block_rows` at a time, so the full float32 matrix is never
+      held in memory.
+    - `query()` probes the `nprobe` closest lists (via per-list postings, so only
+      the probed rows are touched) and scores codes with asymmetric distance
+      tables. With `rerank=True` the best `top_k * rerank_factor` candidates are
+      rescored exactly.
+    - Until the index is trained, queries fall back to the exact ChromaLite scan.
+    - A `SearchFilter` masks rows by per-row doc/version ids before scoring.
+    """
+
+    db_path: str = "data/chroma/chroma_lite.sqlite"
+    persist_dir: str | None = "data/chroma/ivf_pq"
+    nlist: int = 256
+    m: int = 16
+    nprobe: int = 8
+    rerank: bool = True
+    rerank_factor: int = 4
+    train_iters: int = 20
+    max_train_points: int = 100_000
+    encode_block_rows: int = 16_384
+    seed: int = 0
+
+    def __post_init__(self) -> None:
+        # Rows are read from SQLite on demand; a process-level matrix copy would defeat the compression.
+        self._store = ChromaLiteVectorIndex(db_path=self.db_path, matrix_cache=False)
+        self._reset()
+        if self.persist_dir:
+            Path(self.persist_dir).mkdir(parents=True, exist_ok=True)
+            self._load()
+
+    # ---- VectorIndex protocol ----
+
+    def upsert(self, items: list[VectorItem]) -> None:
+        if not items:
+            return
+        self._store.upsert(items)
+        if not self.is_trained:
+            return
+        self._drop([it.chunk_id for it in items])
+        keep = [it for it in items if len(it.vector) == self._dim]
+        if keep:
+            mat = np.asarray([it.vector for it in keep], dtype=np.float32)
+            lists, codes = self._encode(mat)
+            self._ids.extend(it.chunk_id for it in keep)
+            self._doc_ids.extend(_scope((it.metadata or {}).get("doc_id")) for it in keep)
+            self._version_ids.extend(_scope((it.metadata or {}).get("version_id")) for it in keep)
+            self._scope_cache = None
+            self._lists = np.concatenate([self._lists, lists])
+            self._codes = np.concatenate([self._codes, codes])
+            self._alive = np.concatenate([self._alive, np.ones(len(keep), dtype=np.bool_)])
+            base = len(self._ids) - len(keep)
+            for i, it in enumerate(keep):
+                self._pos_by_id[it.chunk_id] = base + i
+            self._add_postings(lists, base)
+        self._save()
+
+    def query(
+        self,
+        vector: list[float],
+        top_k: int,
+        search_filter: SearchFilter | None = None,
+    ) -> list[tuple[str, float]]:
+        if top_k <= 0:
+            return []
+        if not self.is_trained or len(vector) != self._dim:
+            return self._store.query(vector, top_k, search_filter=search_filter)
+
+        q = np.asarray(vector, dtype=np.float32)
+        qn = vector_norm(q)
+        if qn == 0.0:
+            return []
+        q = q / qn
+
+        coarse = self._centroids @ q
+        probe = np.argsort(-coarse)[: max(1, min(int(self.nprobe), coarse.shape[0]))]
+        eligible = self._alive
+        if search_filter is not None and not search_filter.is_empty():
+            eligible = eligible & filter_mask(*self._scope_arrays(), search_filter)
+        # Ascending rows keep ties in insertion order.
+        rows = np.sort(np.concatenate([self._postings[int(c)] for c in probe]))
+        rows = rows[eligible[rows]]
+        if rows.shape[0] < top_k and eligible is not self._alive:
+            # Selective filters can starve the probed lists; widen to every list.
+            rows = np.flatnonzero(eligible)
+        if rows.shape[0] == 0:
+            return []
+
+        # Asymmetric distance: score(x) ~= q.c_list + sum_j q_j . codebook_j[code_j]
+        tables = np.einsum("jd,jkd->jk", self._split(q[None, :])[0], self._codebooks)
+        approx = coarse[self._lists[rows]] + tables[np.arange(self._m)[None, :], self._codes[rows]].sum(axis=1)
+
+        want = top_k * max(1, int(self.rerank_factor)) if self.rerank else top_k
+        head = [int(rows[i]) for i in top_k_indices(approx, want)]
+        if not self.rerank:
+            by_row = {int(r): float(s) for r, s in zip(rows, approx)}
+            return [(self._ids[r], by_row[r]) for r in head[:top_k]]
+
+        ids = [self._ids[r] for r in head]
+        exact = self._store.get_vectors(ids)
+        ids = [cid for cid in ids if cid in exact]
+        if not ids:
+            return []
+        mat = np.stack([exact[cid] for cid in ids]).astype(np.float32, copy=False)
+        norms = np.linalg.norm(mat, axis=1).astype(np.float32)
+        scores = cosine_scores(mat, norms, q)
+        return [(ids[i], float(scores[i])) for i in top_k_indices(scores, top_k)]
+
+    def query_batch(
+        self,
+        vectors: list[list[float]],
+        top_k: int,
+        search_filter: SearchFilter | None = None,
+    ) -> list[list[tuple[str, float]]]:
+        if not self.is_trained:
+            return self._store.query_batch(vectors, top_k, search_filter=search_filter)
+        return [self.query(v, top_k, search_filter=search_filter) for v in vectors]
+
+    def delete(self, chunk_ids: list[str]) -> None:
+        if not chunk_ids:
+            return
+        self._store.delete(chunk_ids)
+        if self.is_trained and self._drop(chunk_ids):
+            self._save()
+
+    def count(self) -> int:
+        return self._store.count()
+
+    # ---- training ----
+
+    @property
+    def is_trained(self) -> bool:
+        return self._centroids.shape[0] > 0
+
+    def train(self) -> dict[str, Any]:
+        """(Re)train centroids + codebooks from a sample of the stored vectors and re-encode all of them."""
+        dim = self._store.common_dim()
+        sample = self._store.sample_rows(dim, self.max_train_points, seed=self.seed).data if dim else None
+        if sample is None or sample.shape[0] == 0:
+            self._reset()
+            self._save()
+            return {"trained": False, "vectors": 0}
+
+        sample = _normalize_rows(sample)
+        m = max(1, min(int(self.m), int(dim)))
+        dsub = int(math.ceil(dim / m))
+        centroids, assign = kmeans(sample, self.nlist, iters=self.train_iters, seed=self.seed)
+        residuals = _pad(sample - centroids[assign], m * dsub).reshape(-1, m, dsub)
+        del sample
+        codebooks = np.zeros((m, 256, dsub), dtype=np.float32)
+        for j in range(m):
+            cb, _ = kmeans(residuals[:, j, :], 256, iters=self.train_iters, seed=self.seed + j + 1)
+            codebooks[j, : cb.shape[0]] = cb
+            # Unused code slots repeat the first codeword so they never win by accident.
+            codebooks[j, cb.shape[0] :] = cb[0]
+        del residuals
+
+        self._reset()
+        self._dim, self._m, self._dsub = int(dim), m, dsub
+        self._centroids = centroids.astype(np.float32)
+        self._codebooks = codebooks
+        lists: list[np.ndarray] = []
+        codes: list[np.ndarray] = []
+        for block in self._store.iter_rows(int(dim), block_rows=self.encode_block_rows):
+            block_lists, block_codes = self._encode(block.data)
+            lists.append(block_lists)
+            codes.append(block_codes)
+            self._ids.extend(block.ids)
+            self._doc_ids.extend(block.doc_ids.tolist())
+            self._version_ids.extend(block.version_ids.tolist())
+        self._lists = np.concatenate(lists) if lists else self._lists
+        self._codes = np.concatenate(codes) if codes else np.zeros((0, m), dtype=np.uint8)
+        n = len(self._ids)
+        self._alive = np.ones(n, dtype=np.bool_)
+        self._pos_by_id = {cid: i for i, cid in enumerate(self._ids)}
+        self._build_postings()
+        self._save()
+        return {
+            "trained": True,
+            "vectors": int(n),
+            "dim": int(dim),
+            "nlist": int(centroids.shape[0]),
+            "m": int(m),
+            "code_bytes": int(self._codes.nbytes),
+        }
+
+    def rebuild(self) -> dict[str, Any]:
+        return self.train()
+
+    # ---- internals ----
+
+    def _reset(self) -> None:
+        self._dim = 0
+        self._m = 0
+        self._dsub = 0
+        self._centroids = np.zeros((0, 0), dtype=np.float32)
+        self._codebooks = np.zeros((0, 256, 0), dtype=np.float32)
+        self._ids: list[str] = []
+        self._doc_ids: list[str] = []
+        self._version_ids: list[str] = []
+        self._scope_cache: tuple[np.ndarray, np.ndarray] | None = None
+        self._lists = np.zeros(0, dtype=np.int32)
+        self._codes = np.zeros((0, 0), dtype=np.uint8)
+        self._alive = np.zeros(0, dtype=np.bool_)
+        self._pos_by_id: dict[str, int] = {}
+        # Row positions per coarse list, ascending; dropped rows stay until the next train.
+        self._postings: list[np.ndarray] = []
+
+    def _scope_arrays(self) -> tuple[np.ndarray, np.ndarray]:
+        if self._scope_cache is None:
+            self._scope_cache = (
+                np.array(self._doc_ids, dtype=np.str_),
+                np.array(self._version_ids, dtype=np.str_),
+            )
+        return self._scope_cache
+
+    def _split(self, x: np.ndarray) -> np.ndarray:
+        return _pad(x, self._m * self._dsub).reshape(x.shape[0], self._m, self._dsub)
+
+    def _encode(self, mat: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        mat = _normalize_rows(mat)
+        lists = nearest_centroid(mat, self._centroids)
+        sub = self._split(mat - self._centroids[lists])
+        codes = np.empty((mat.shape[0], self._m), dtype=np.uint8)
+        for j in range(self._m):
+            codes[:, j] = nearest_centroid(sub[:, j, :], self._codebooks[j])
+        return lists.astype(np.int32), codes
+
+    def _build_postings(self) -> None:
+        nlist = int(self._centroids.shape[0])
+        order = np.argsort(self._lists, kind="stable").astype(np.int64)
+        bounds = np.searchsorted(self._lists[order], np.arange(nlist + 1))
+        self._postings = [order[bounds[c] : bounds[c + 1]] for c in range(nlist)]
+
+    def _add_postings(self, lists: np.ndarray, base: int) -> None:
+        """Append rows `base + i` (coarse list `lists[i]`) to their lists' postings."""
+        for c in np.unique(lists).tolist():
+            self._postings[c] = np.concatenate([self._postings[c], base + np.flatnonzero(lists == c)])
+
+    def _drop(self, chunk_ids: list[str]) -> bool:
+        changed = False
+        for cid in chunk_ids:
+            pos = self._pos_by_id.pop(cid, None)
+            if pos is not None:
+                self._alive[pos] = False
+                changed = True
+        return changed
+
+    def _index_path(self) -> Path | None:
+        if not self.persist_dir:
+            return None
+        return Path(self.persist_dir) / _INDEX_FILE
+
+    def _save(self) -> None:
+        path = self._index_path()
+        if path is None:
+            return
+        alive = self._alive
+        tmp = path.with_suffix(".tmp.npz")
+        np.savez(
+            tmp,
+            meta=np.array([_FORMAT_VERSION, self._dim, self._m, self._dsub], dtype=np.int64),
+            centroids=self._centroids,
+            codebooks=self._codebooks,
+            ids=np.array([cid for cid, ok in zip(self._ids, alive) if ok], dtype=np.str_),
+            doc_ids=np.array([v for v, ok in zip(self._doc_ids, alive) if ok], dtype=np.str_),
+            version_ids=np.array([v for v, ok in zip(self._version_ids, alive) if ok], dtype=np.str_),
+            lists=self._lists[alive],
+            codes=self._codes[alive],
+        )
+        os.replace(tmp, path)
+
+    def _load(self) -> None:
+        path = self._index_path()
+        if path is None or not path.exists():
+            return
+        with np.load(path, allow_pickle=False) as data:
+            version, dim, m, dsub = (int(v) for v in data["meta"])
+            if version != _FORMAT_VERSION:
+                raise ValueError(f"unsupported ivf_pq index format: {version}")
+            self._dim, self._m, self._dsub = dim, m, dsub
+            self._centroids = np.array(data["centroids"], dtype=np.float32)
+            self._codebooks = np.array(data["codebooks"], dtype=np.float32)
+            self._ids = [str(x) for x in data["ids"]]
+            blank = [""] * len(self._ids)
+            self._doc_ids = [str(x) for x in data["doc_ids"]] if "doc_ids" in data else list(blank)
+            self._version_ids = [str(x) for x in data["version_ids"]] if "version_ids" in data else list(blank)
+            self._lists = np.array(data["lists"], dtype=np.int32)
+            self._codes = np.array(data["codes"], dtype=np.uint8)
+        self._alive = np.ones(len(self._ids), dtype=np.bool_)
+        self._pos_by_id = {cid: i for i, cid in enumerate(self._ids)}
+        self._build_postings()
+
+
+def _normalize_rows(mat: np.ndarray) -> np.ndarray:
+    mat = np.asarray(mat, dtype=np.float32)
+    norms = np.linalg.norm(mat, axis=1, keepdims=True)
+    norms[norms == 0.0] = 1.0
+    return mat / norms
+
+
+def _pad(x: np.ndarray, width: int) -> np.ndarray:
+    if x.shape[1] == width:
+        return x
+    out = np.zeros((x.shape[0], width), dtype=np.float32)
+    out[:, : x.shape[1]] = x
+    return out
+
+
+def _scope(v: object) -> str:
+    return v if isinstance(v, str) else ""
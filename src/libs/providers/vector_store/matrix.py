@@ -0,0 +1,220 @@
+from __future__ import annotations
+
+import math
+from typing import Iterator
+
+import numpy as np
+
+from ...interfaces.vector_store.store import SearchFilter
+
+# Shared NumPy helpers for flat (exact full-scan) vector indexes.
+#
+# Storage encoding is little-endian float32 so BLOBs written on one machine stay
+# readable everywhere.
+
+_F32 = np.dtype("<f4")
+
+# Upper bound on (queries x rows) score cells materialized at once (64 MiB of float32).
+SCORE_BLOCK_CELLS = 1 << 24
+
+
+def encode_f32(vec: np.ndarray | list[float]) -> bytes:
+    return np.asarray(vec, dtype=_F32).tobytes()
+
+
+def decode_f32(buf: bytes, *, dim: int) -> np.ndarray:
+    """Decode concatenated float32 rows into a contiguous (n, dim) float32 matrix."""
+    if dim <= 0 or not buf:
+        return np.zeros((0, max(dim, 0)), dtype=np.float32)
+    return np.frombuffer(buf, dtype=_F32).reshape(-1, dim).astype(np.float32, copy=False)
+
+
+def vector_norm(vec: np.ndarray) -> float:
+    n = float(np.linalg.norm(vec))
+    return n if math.isfinite(n) else 0.0
+
+
+def cosine_scores(mat: np.ndarray, norms: np.ndarray, q: np.ndarray) -> np.ndarray:
+    """Cosine similarity of `q` against each row of `mat` (zero-norm rows score 0.0)."""
+    if mat.shape[0] == 0:
+        return np.zeros(0, dtype=np.float32)
+    q = np.asarray(q, dtype=np.float32)
+    q_norm = vector_norm(q)
+    if q_norm == 0.0:
+        return np.zeros(mat.shape[0], dtype=np.float32)
+    dots = mat @ q
+    denom = norms * np.float32(q_norm)
+    out = np.zeros_like(dots)
+    np.divide(dots, denom, out=out, where=denom > 0)
+    return out
+
+
+def cosine_scores_batch(mat: np.ndarray, norms: np.ndarray, queries: np.ndarray) -> np.ndarray:
+    """Cosine similarity of each query row against each row of `mat`, shape (n_queries, n).
+
+    One matrix-matrix product instead of a scan per query.
+    """
+    queries = np.asarray(queries, dtype=np.float32)
+    out = np.zeros((queries.shape[0], mat.shape[0]), dtype=np.float32)
+    if mat.shape[0] == 0 or queries.shape[0] == 0:
+        return out
+    q_norms = np.linalg.norm(queries, axis=1).astype(np.float32)
+    q_norms[~np.isfinite(q_norms)] = 0.0
+    dots = queries @ mat.T
+    denom = q_norms[:, None] * norms[None, :]
+    np.divide(dots, denom, out=out, where=denom > 0)
+    return out
+
+
+def query_blocks(n_queries: int, n_rows: int, *, max_cells: int | None = None) -> Iterator[slice]:
+    """Slices over the query axis so each block's score matrix stays under `max_cells`
+    (default `SCORE_BLOCK_CELLS`). A single query is never split.
+    """
+    cells = SCORE_BLOCK_CELLS if max_cells is None else int(max_cells)
+    step = max(1, cells // max(1, int(n_rows)))
+    for start in range(0, int(n_queries), step):
+        yield slice(start, start + step)
+
+
+QUANT_DTYPES = ("float32", "float16", "int8")
+
+
+def check_dtype(dtype: str) -> str:
+    if dtype not in QUANT_DTYPES:
+        raise ValueError(f"unsupported vector dtype: {dtype!r} (expected one of {', '.join(QUANT_DTYPES)})")
+    return dtype
+
+
+def quantize(mat: np.ndarray, dtype: str) -> tuple[np.ndarray, np.ndarray]:
+    """Quantize rows to `dtype`. Returns `(codes, scales)`; `row ~= codes * scale`.
+
+    int8 uses a symmetric per-vector scale (max |x| / 127); float16/float32 use scale 1.
+    """
+    mat = np.asarray(mat, dtype=np.float32)
+    if mat.ndim == 1:
+        mat = mat[None, :]
+    if dtype == "int8":
+        peak = np.abs(mat).max(axis=1) if mat.shape[1] else np.zeros(mat.shape[0], dtype=np.float32)
+        scales = np.where(peak > 0, peak / 127.0, 1.0).astype(np.float32)
+        codes = np.clip(np.rint(mat / scales[:, None]), -127, 127).astype(np.int8)
+        return codes, scales
+    return mat.astype(check_dtype(dtype)), np.ones(mat.shape[0], dtype=np.float32)
+
+
+def approx_dots(codes: np.ndarray, scales: np.ndarray, queries: np.ndarray, *, block: int = 65536) -> np.ndarray:
+    """Dot products of quantized rows with `queries` (n_queries, dim), shape (n_queries, n).
+
+    Rows are widened to float32 one block at a time so the full-precision matrix
+    is never materialized.
+    """
+    queries = np.asarray(queries, dtype=np.float32)
+    out = np.empty((queries.shape[0], codes.shape[0]), dtype=np.float32)
+    for start in range(0, codes.shape[0], block):
+        blk = codes[start : start + block].astype(np.float32)
+        out[:, start : start + block] = (queries @ blk.T) * scales[start : start + block][None, :]
+    return out
+
+
+def approx_cosine(codes: np.ndarray, scales: np.ndarray, norms: np.ndarray, queries: np.ndarray) -> np.ndarray:
+    """Approximate cosine of `queries` against quantized rows (`norms` are the float32 row norms)."""
+    queries = np.asarray(queries, dtype=np.float32)
+    q_norms = np.linalg.norm(queries, axis=1).astype(np.float32)
+    denom = q_norms[:, None] * norms[None, :]
+    out = np.zeros((queries.shape[0], codes.shape[0]), dtype=np.float32)
+    np.divide(approx_dots(codes, scales, queries), denom, out=out, where=denom > 0)
+    return out
+
+
+_POPCOUNT8 = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+
+def sign_pack(mat: np.ndarray) -> np.ndarray:
+    """Sign-bit binary codes: one bit per dimension (x > 0), packed to uint8 rows."""
+    mat = np.asarray(mat, dtype=np.float32)
+    if mat.ndim == 1:
+        mat = mat[None, :]
+    return np.packbits(mat > 0, axis=1)
+
+
+def hamming_distances(codes: np.ndarray, qcode: np.ndarray, *, block: int = 65536) -> np.ndarray:
+    """Hamming distance between each packed row of `codes` and one packed query code."""
+    out = np.empty(codes.shape[0], dtype=np.int32)
+    bitcount = getattr(np, "bitwise_count", None)  # NumPy >= 2.0
+    for start in range(0, codes.shape[0], block):
+        x = np.bitwise_xor(codes[start : start + block], qcode[None, :])
+        bits = bitcount(x) if bitcount is not None else _POPCOUNT8[x]
+        out[start : start + block] = bits.sum(axis=1, dtype=np.int32)
+    return out
+
+
+def filter_mask(doc_ids: np.ndarray, version_ids: np.ndarray, search_filter: SearchFilter) -> np.ndarray:
+    """Boolean prefilter mask over per-row doc/version id arrays (missing ids are "")."""
+    mask = np.ones(doc_ids.shape[0], dtype=np.bool_)
+    if search_filter.doc_ids is not None:
+        mask &= np.isin(doc_ids, list(search_filter.doc_ids))
+    if search_filter.version_ids is not None:
+        mask &= np.isin(version_ids, list(search_filter.version_ids))
+    if search_filter.exclude_version_ids:
+        mask &= ~np.isin(version_ids, list(search_filter.exclude_version_ids))
+    return mask
+
+
+def top_k_indices(scores: np.ndarray, top_k: int, mask: np.ndarray | None = None) -> list[int]:
+    """Indices of the `top_k` largest scores, best first.
+
+    Uses `argpartition` (O(N)) and only sorts the selected head. Ties keep the
+    lower (earlier inserted) index first. With a boolean `mask`, only indices
+    where it is True are returned.
+    """
+    n = int(scores.shape[0])
+    if top_k <= 0 or n == 0:
+        return []
+    k = min(int(top_k), n)
+    if mask is not None:
+        k = min(k, int(np.count_nonzero(mask)))
+        if k == 0:
+            return []
+        scores = np.where(mask, scores, np.float32(-np.inf))
+    if k < n:
+        kth = scores[np.argpartition(-scores, k - 1)[k - 1]]
+        above = np.flatnonzero(scores > kth)
+        # Scores equal to the k-th one: keep the lowest indices, not argpartition's pick.
+        head = np.concatenate((above, np.flatnonzero(scores == kth)[: k - above.shape[0]]))
+    else:
+        head = np.arange(n)
+    order = np.lexsort((head, -scores[head]))
+    return [int(i) for i in head[order]]
+
+
+def kmeans(x: np.ndarray, k: int, *, iters: int = 20, seed: int = 0) -> tuple[np.ndarray, np.ndarray]:
+    """Plain Lloyd k-means. Returns `(centroids (k, d), assignment (n,))`.
+
+    `k` is clamped to the number of rows; empty clusters keep their previous centroid.
+    """
+    x = np.asarray(x, dtype=np.float32)
+    n = int(x.shape[0])
+    if n == 0:
+        raise ValueError("kmeans needs at least one vector")
+    k = max(1, min(int(k), n))
+    rng = np.random.default_rng(seed)
+    centroids = x[rng.choice(n, size=k, replace=False)].copy()
+    for _ in range(max(1, int(iters))):
+        assign = nearest_centroid(x, centroids)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assign, x)
+        counts = np.bincount(assign, minlength=k)
+        filled = counts > 0
+        centroids[filled] = sums[filled] / counts[filled, None]
+    return centroids, nearest_centroid(x, centroids)
+
+
+def nearest_centroid(x: np.ndarray, centroids: np.ndarray, *, block: int = 4096) -> np.ndarray:
+    """Index of the nearest centroid (squared L2) for each row of `x`."""
+    c_sq = np.einsum("ij,ij->i", centroids, centroids)
+    out = np.empty(x.shape[0], dtype=np.int64)
+    for start in range(0, x.shape[0], block):
+        part = x[start : start + block]
+        # ||x||^2 is constant per row and does not change the argmin.
+        d = c_sq[None, :] - 2.0 * (part @ centroids.T)
+        out[start : start + block] = np.argmin(d, axis=1)
+    return out
@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+import threading
+from dataclasses import dataclass
+from typing import Iterable
+
+import numpy as np
+
+# Process-level cache of decoded vector matrices.
+#
+# Snapshots are immutable: a sync builds a new snapshot (copy-on-write) and swaps
+# it in, so queries running on the previous snapshot are never disturbed.
+
+
+@dataclass(frozen=True)
+class Rows:
+    """Row-aligned arrays for one (dim, kind) slice of a vector store."""
+
+    ids: list[str]
+    data: np.ndarray  # (n, width): float32 vectors, quantized codes or packed bits
+    scales: np.ndarray  # (n,) per-row dequantization scale (1.0 when unused)
+    norms: np.ndarray  # (n,) float32 L2 norms of the original vectors
+    doc_ids: np.ndarray  # (n,) str, "" when unknown
+    version_ids: np.ndarray  # (n,) str
+
+
+@dataclass(frozen=True)
+class RowSnapshot:
+    epoch: str
+    watermark: int
+    rows: Rows
+
+    def merged(self, *, watermark: int, deleted: Iterable[str], changed: Rows) -> "RowSnapshot":
+        """Apply deletes, then in-place updates / appends from `changed`."""
+        old = self.rows
+        pos = {cid: i for i, cid in enumerate(old.ids)}
+        drop = {pos[cid] for cid in deleted if cid in pos}
+        in_old: list[int] = []
+        in_new: list[int] = []
+        appended: list[int] = []
+        for j, cid in enumerate(changed.ids):
+            i = pos.get(cid)
+            if i is not None and i not in drop:
+                in_old.append(i)
+                in_new.append(j)
+            else:
+                appended.append(j)
+
+        keep = np.ones(len(old.ids), dtype=np.bool_)
+        if drop:
+            keep[list(drop)] = False
+        arrays = []
+        for name in ("data", "scales", "norms", "doc_ids", "version_ids"):
+            cur = getattr(old, name)
+            new = getattr(changed, name)
+            if in_old:
+                # astype copies; widening keeps longer id strings from being truncated.
+                cur = cur.astype(np.result_type(cur.dtype, new.dtype))
+                cur[in_old] = new[in_new]
+            arrays.append(np.concatenate([cur[keep], new[appended]]))
+        ids = [cid for cid, k in zip(old.ids, keep) if k] + [changed.ids[j] for j in appended]
+        data, scales, norms, doc_ids, version_ids = arrays
+        return RowSnapshot(
+            epoch=self.epoch,
+            watermark=watermark,
+            rows=Rows(ids=ids, data=data, scales=scales, norms=norms, doc_ids=doc_ids, version_ids=version_ids),
+        )
+
+
+_LOCK = threading.Lock()
+_SNAPSHOTS: dict[tuple[str, int, str], RowSnapshot] = {}
+
+
+def get_snapshot(key: tuple[str, int, str]) -> RowSnapshot | None:
+    with _LOCK:
+        return _SNAPSHOTS.get(key)
+
+
+def put_snapshot(key: tuple[str, int, str], snap: RowSnapshot) -> None:
+    with _LOCK:
+        cur = _SNAPSHOTS.get(key)
+        # Never replace a newer snapshot of the same database with an older one.
+        if cur is None or cur.epoch != snap.epoch or cur.watermark <= snap.watermark:
+            _SNAPSHOTS[key] = snap
+
+
+def clear_matrix_cache() -> None:
+    with _LOCK:
+        _SNAPSHOTS.clear()
@@ -0,0 +1,547 @@
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+
+from ...interfaces.vector_store.store import SearchFilter, VectorItem
+from .matrix import cosine_scores_batch, filter_mask, query_blocks, top_k_indices
+
+_FORMAT_VERSION = 1
+_MANIFEST = "manifest.json"
+_TAIL = "tail.npz"
+_TAIL_ID = -1
+
+
+@dataclass
+class _Segment:
+    seg_id: int
+    ids: list[str]
+    vectors: np.ndarray  # read-only memmap (n, dim) float32
+    norms: np.ndarray  # read-only memmap (n,) float32
+    tomb: np.ndarray  # mutable bool (n,)
+    doc_ids: np.ndarray  # str (n,), "" when unknown
+    version_ids: np.ndarray  # str (n,)
+
+
+@dataclass
+class SegmentedVectorIndex:
+    """Persistent vector store built from immutable memory-mapped `.npy` segments.
+
+    Layout under `persist_dir`:
+    - `manifest.json`: dim, ordered segment ids, a write generation and the
+      segments retired by compaction that are still awaiting deletion.
+    - `seg_XXXXXX.npy` / `.norms.npy` / `.ids.json`: sealed segment, opened with
+      `np.load(mmap_mode="r")` so cold start is an mmap and the OS page cache is
+      shared between processes (MCP server, dashboard).
+    - `seg_XXXXXX.tomb.npy`: packed tombstone bitmap for deletes.
+    - `seg_XXXXXX.scope.json`: per-row doc/version ids used by `SearchFilter`.
+    - `tail.npz`: small mutable tail; sealed into a segment at `tail_max_rows`.
+
+    Sealed segments are merged size-tiered (dropping tombstoned rows) on a
+    background thread unless `background_compaction=False`: `merge_factor`
+    adjacent segments of the same size tier (live rows within a factor of
+    `merge_factor` of each other) are merged into one, so each row is rewritten
+    about log(N) times rather than on every merge. Above `max_segments` the
+    cheapest adjacent run is merged regardless of tier. `compact()` merges all.
+
+    Readers in other processes notice writes via the manifest and reload.
+    Segments replaced by a merge stay on disk for `retire_grace_s` seconds so a
+    reader that still holds the previous manifest can open them.
+    """
+
+    persist_dir: str = "data/chroma/segments"
+    tail_max_rows: int = 4096
+    max_segments: int = 8
+    merge_factor: int = 4
+    retire_grace_s: float = 60.0
+    background_compaction: bool = True
+
+    _lock: threading.RLock = field(default_factory=threading.RLock, init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        if self.merge_factor < 2:
+            raise ValueError("merge_factor must be >= 2")
+        self._dir = Path(self.persist_dir)
+        self._dir.mkdir(parents=True, exist_ok=True)
+        self._compacting = False
+        self._compaction_thread: threading.Thread | None = None
+        with self._lock:
+            self._open()
+
+    # ---- VectorIndex protocol ----
+
+    def upsert(self, items: list[VectorItem]) -> None:
+        if not items:
+            return
+        with self._lock:
+            self._reload_if_stale()
+            for it in items:
+                vec = np.asarray(it.vector, dtype=np.float32)
+                if self._dim == 0:
+                    self._dim = int(vec.shape[0])
+                if vec.shape[0] != self._dim:
+                    raise ValueError(f"vector dim mismatch: expected {self._dim}, got {vec.shape[0]}")
+                self._forget(it.chunk_id)
+                meta = it.metadata or {}
+                self._tail_ids.append(it.chunk_id)
+                self._tail_rows.append(vec)
+                self._tail_scopes.append((_scope(meta.get("doc_id")), _scope(meta.get("version_id"))))
+                self._tail_cache = None
+                self._where[it.chunk_id] = (_TAIL_ID, len(self._tail_ids) - 1)
+
+            sealed = False
+            if len(self._tail_ids) >= self.tail_max_rows:
+                self._seal_tail()
+                sealed = True
+            self._write_tail()
+            self._write_manifest()
+            needs_compaction = sealed and self._merge_plan() is not None
+        if needs_compaction:
+            self._start_compaction(full=False, wait=not self.background_compaction)
+
+    def query(
+        self,
+        vector: list[float],
+        top_k: int,
+        search_filter: SearchFilter | None = None,
+    ) -> list[tuple[str, float]]:
+        return self.query_batch([vector], top_k, search_filter=search_filter)[0]
+
+    def query_batch(
+        self,
+        vectors: list[list[float]],
+        top_k: int,
+        search_filter: SearchFilter | None = None,
+    ) -> list[list[tuple[str, float]]]:
+        out: list[list[tuple[str, float]]] = [[] for _ in vectors]
+        if top_k <= 0 or not vectors:
+            return out
+        if search_filter is not None and search_filter.is_empty():
+            search_filter = None
+        with self._lock:
+            self._reload_if_stale()
+            rows = [i for i, v in enumerate(vectors) if len(v) == self._dim]
+            if not rows:
+                return out
+            qmat = np.asarray([vectors[i] for i in rows], dtype=np.float32)
+            # parts[j] collects (ids, scores) per segment for query rows[j].
+            parts: list[list[tuple[list[str], np.ndarray]]] = [[] for _ in rows]
+            for seg_id in self._order:
+                seg = self._segments[seg_id]
+                dead = seg.tomb
+                if search_filter is not None:
+                    dead = dead | ~filter_mask(seg.doc_ids, seg.version_ids, search_filter)
+                for block in query_blocks(len(rows), len(seg.ids)):
+                    scores = cosine_scores_batch(seg.vectors, seg.norms, qmat[block])
+                    self._collect(parts[block], seg.ids, scores, dead, top_k)
+            if self._tail_ids:
+                tail = self._tail_matrix()
+                norms = np.linalg.norm(tail, axis=1).astype(np.float32)
+                dead = np.zeros(len(self._tail_ids), dtype=np.bool_)
+                if search_filter is not None:
+                    dead = ~filter_mask(*_scope_arrays(self._tail_scopes), search_filter)
+                for block in query_blocks(len(rows), len(self._tail_ids)):
+                    scores = cosine_scores_batch(tail, norms, qmat[block])
+                    self._collect(parts[block], self._tail_ids, scores, dead, top_k)
+
+        for j, i in enumerate(rows):
+            ids = [cid for p_ids, _ in parts[j] for cid in p_ids]
+            if not ids:
+                continue
+            scores = np.concatenate([sc for _, sc in parts[j]]).astype(np.float32)
+            out[i] = [(ids[k], float(scores[k])) for k in top_k_indices(scores, top_k)]
+        return out
+
+    @staticmethod
+    def _collect(
+        parts: list[list[tuple[list[str], np.ndarray]]],
+        ids: list[str],
+        scores: np.ndarray,
+        dead: np.ndarray,
+        top_k: int,
+    ) -> None:
+        scores[:, dead] = -np.inf
+        for j in range(scores.shape[0]):
+            head = [k for k in top_k_indices(scores[j], top_k) if not dead[k]]
+            parts[j].append(([ids[k] for k in head], scores[j, head]))
+
+    def delete(self, chunk_ids: list[str]) -> None:
+        if not chunk_ids:
+            return
+        with self._lock:
+            self._reload_if_stale()
+            touched: set[int] = set()
+            tail_changed = False
+            for cid in chunk_ids:
+                loc = self._forget(cid)
+                if loc is None:
+                    continue
+                if loc == _TAIL_ID:
+                    tail_changed = True
+                else:
+                    touched.add(loc)
+            if not touched and not tail_changed:
+                return
+            for seg_id in touched:
+                self._write_tomb(self._segments[seg_id])
+            if tail_changed:
+                self._write_tail()
+            self._write_manifest()
+
+    def count(self) -> int:
+        with self._lock:
+            self._reload_if_stale()
+            return len(self._where)
+
+    # ---- compaction ----
+
+    def compact(self, *, wait: bool = True) -> None:
+        """Merge all sealed segments into one, dropping tombstoned rows."""
+        self._start_compaction(full=True, wait=wait)
+
+    def _start_compaction(self, *, full: bool, wait: bool) -> None:
+        with self._lock:
+            if self._compacting:
+                return
+            plan = list(self._order) if full else self._merge_plan()
+            if plan is None or len(plan) < 2:
+                return
+            self._compacting = True
+
+        def _work() -> None:
+            run: list[int] | None = plan
+            try:
+                while run is not None:
+                    with self._lock:
+                        snap_tombs = {sid: self._segments[sid].tomb.copy() for sid in run}
+                        new_id = self._next_seg_id
+                        self._next_seg_id += 1
+                    self._compact(run, snap_tombs, new_id)
+                    # Tiered merges can cascade (four tier-0 merges make a fourth tier-1 segment).
+                    with self._lock:
+                        run = None if full else self._merge_plan()
+            finally:
+                with self._lock:
+                    self._compacting = False
+
+        if wait:
+            _work()
+            return
+        t = threading.Thread(target=_work, name="vector-segments-compaction", daemon=True)
+        self._compaction_thread = t
+        t.start()
+
+    def _merge_plan(self) -> list[int] | None:
+        """Adjacent sealed segments to merge next, or None when the tiers are balanced.
+
+        Runs are contiguous in `_order` so a merge never moves rows past a newer
+        copy of the same chunk (later segments win on reopen).
+        """
+        f = int(self.merge_factor)
+        sizes = [int(self._segments[sid].tomb.shape[0] - self._segments[sid].tomb.sum()) for sid in self._order]
+        tiers = [_tier(n, self.tail_max_rows, f) for n in sizes]
+        best: tuple[int, int] | None = None  # (tier, start)
+        start = 0
+        for i in range(1, len(tiers) + 1):
+            if i < len(tiers) and tiers[i] == tiers[start]:
+                continue
+            if i - start >= f and (best is None or tiers[start] < best[0]):
+                best = (tiers[start], start)
+            start = i
+        if best is not None:
+            return self._order[best[1] : best[1] + f]
+        if len(self._order) <= self.max_segments:
+            return None
+        width = min(f, len(self._order))
+        totals = [sum(sizes[i : i + width]) for i in range(len(sizes) - width + 1)]
+        i = int(np.argmin(totals))
+        return self._order[i : i + width]
+
+    def wait_for_compaction(self, timeout: float | None = None) -> None:
+        t = self._compaction_thread
+        if t is not None:
+            t.join(timeout)
+
+    def _compact(self, snapshot: list[int], snap_tombs: dict[int, np.ndarray], new_id: int) -> None:
+        # Heavy lifting (reading + writing the merged segment) happens without the lock;
+        # sealed segments are immutable so only tombstones can change meanwhile.
+        ids: list[str] = []
+        scopes: list[tuple[str, str]] = []
+        blocks: list[np.ndarray] = []
+        sources: list[tuple[int, np.ndarray]] = []
+        for sid in snapshot:
+            seg = self._segments[sid]
+            live = np.flatnonzero(~snap_tombs[sid])
+            ids.extend(seg.ids[i] for i in live)
+            scopes.extend((str(seg.doc_ids[i]), str(seg.version_ids[i])) for i in live)
+            blocks.append(np.asarray(seg.vectors[live], dtype=np.float32))
+            sources.append((sid, live))
+        if ids:
+            self._write_segment_files(new_id, ids, np.concatenate(blocks), scopes)
+
+        with self._lock:
+            if any(sid not in self._segments for sid in snapshot):
+                # Store was reloaded/reset underneath us; abandon this merge.
+                self._remove_segment_files(new_id)
+                return
+            merged_ids: list[int] = []
+            if ids:
+                merged = self._open_segment(new_id, ids)
+                offset = 0
+                for sid, live in sources:
+                    # Rows deleted (or re-upserted) while we were merging.
+                    newly = self._segments[sid].tomb[live] & ~snap_tombs[sid][live]
+                    merged.tomb[offset : offset + live.shape[0]] = newly
+                    offset += live.shape[0]
+                for row, cid in enumerate(ids):
+                    if not merged.tomb[row]:
+                        self._where[cid] = (new_id, row)
+                self._segments[new_id] = merged
+                self._write_tomb(merged)
+                merged_ids = [new_id]
+            at = self._order.index(snapshot[0])
+            for sid in snapshot:
+                del self._segments[sid]
+            dropped = set(snapshot)
+            self._order = (
+                self._order[:at] + merged_ids + [sid for sid in self._order[at:] if sid not in dropped]
+            )
+            # Files go once the grace period passes; readers on the old manifest may still open them.
+            now = time.time()
+            self._retired.extend((sid, now) for sid in snapshot)
+            self._write_manifest()
+
+    # ---- state ----
+
+    def _reset_state(self) -> None:
+        self._dim = 0
+        self._generation = 0
+        self._next_seg_id = 1
+        self._order: list[int] = []
+        self._segments: dict[int, _Segment] = {}
+        self._tail_ids: list[str] = []
+        self._tail_rows: list[np.ndarray] = []
+        self._tail_scopes: list[tuple[str, str]] = []
+        self._tail_cache: np.ndarray | None = None
+        self._where: dict[str, tuple[int, int]] = {}
+        self._retired: list[tuple[int, float]] = []  # (segment id, retired at)
+        self._manifest_stat: tuple[int, int] | None = None
+
+    def _open(self) -> None:
+        self._reset_state()
+        manifest = self._dir / _MANIFEST
+        if manifest.exists():
+            meta = json.loads(manifest.read_text(encoding="utf-8"))
+            if int(meta.get("version", 0)) != _FORMAT_VERSION:
+                raise ValueError(f"unsupported segment store format: {meta.get('version')}")
+            self._dim = int(meta.get("dim") or 0)
+            self._generation = int(meta.get("generation") or 0)
+            self._next_seg_id = int(meta.get("next_seg_id") or 1)
+            self._retired = [(int(sid), float(at)) for sid, at in meta.get("retired") or []]
+            for sid in meta.get("segments") or []:
+                sid = int(sid)
+                ids = json.loads(self._seg_path(sid, ".ids.json").read_text(encoding="utf-8"))
+                self._segments[sid] = self._open_segment(sid, ids)
+                self._order.append(sid)
+            self._manifest_stat = self._stat_manifest()
+
+        tail_ids: list[str] = []
+        tail_vecs = np.zeros((0, self._dim), dtype=np.float32)
+        tail_scopes: list[tuple[str, str]] = []
+        tail = self._dir / _TAIL
+        if tail.exists() and self._dim:
+            with np.load(tail, allow_pickle=False) as data:
+                tail_ids = [str(x) for x in data["ids"]]
+                tail_vecs = np.array(data["vectors"], dtype=np.float32).reshape(-1, self._dim)
+                if "doc_ids" in data and "version_ids" in data:
+                    tail_scopes = [(str(d), str(v)) for d, v in zip(data["doc_ids"], data["version_ids"])]
+        if len(tail_scopes) != len(tail_ids):
+            tail_scopes = [("", "")] * len(tail_ids)
+
+        # Later occurrences win (e.g. crash between sealing and clearing the tail).
+        for sid in self._order:
+            seg = self._segments[sid]
+            for row, cid in enumerate(seg.ids):
+                if seg.tomb[row]:
+                    continue
+                self._forget(cid)
+                self._where[cid] = (sid, row)
+        for cid, vec, scope in zip(tail_ids, tail_vecs, tail_scopes):
+            self._forget(cid)
+            self._tail_ids.append(cid)
+            self._tail_rows.append(vec)
+            self._tail_scopes.append(scope)
+            self._where[cid] = (_TAIL_ID, len(self._tail_ids) - 1)
+
+    def _reload_if_stale(self) -> None:
+        if self._stat_manifest() != self._manifest_stat and not self._compacting:
+            self._open()
+
+    def _forget(self, chunk_id: str) -> int | None:
+        """Drop the live copy of `chunk_id`; returns the segment id it lived in."""
+        loc = self._where.pop(chunk_id, None)
+        if loc is None:
+            return None
+        sid, row = loc
+        if sid == _TAIL_ID:
+            del self._tail_ids[row]
+            del self._tail_rows[row]
+            del self._tail_scopes[row]
+            self._tail_cache = None
+            for i in range(row, len(self._tail_ids)):
+                self._where[self._tail_ids[i]] = (_TAIL_ID, i)
+        else:
+            self._segments[sid].tomb[row] = True
+        return sid
+
+    def _seal_tail(self) -> None:
+        sid = self._next_seg_id
+        self._next_seg_id += 1
+        self._write_segment_files(sid, self._tail_ids, self._tail_matrix(), self._tail_scopes)
+        self._segments[sid] = self._open_segment(sid, list(self._tail_ids))
+        self._order.append(sid)
+        for row, cid in enumerate(self._tail_ids):
+            self._where[cid] = (sid, row)
+        self._tail_ids = []
+        self._tail_rows = []
+        self._tail_scopes = []
+        self._tail_cache = None
+
+    def _tail_matrix(self) -> np.ndarray:
+        if self._tail_cache is None:
+            if self._tail_rows:
+                self._tail_cache = np.stack(self._tail_rows).astype(np.float32, copy=False)
+            else:
+                self._tail_cache = np.zeros((0, self._dim), dtype=np.float32)
+        return self._tail_cache
+
+    # ---- files ----
+
+    def _seg_path(self, sid: int, suffix: str) -> Path:
+        return self._dir / f"seg_{sid:06d}{suffix}"
+
+    def _open_segment(self, sid: int, ids: list[str]) -> _Segment:
+        vectors = np.load(self._seg_path(sid, ".npy"), mmap_mode="r")
+        norms = np.load(self._seg_path(sid, ".norms.npy"), mmap_mode="r")
+        tomb = np.zeros(len(ids), dtype=np.bool_)
+        tomb_path = self._seg_path(sid, ".tomb.npy")
+        if tomb_path.exists():
+            packed = np.load(tomb_path, allow_pickle=False)
+            tomb = np.unpackbits(packed, count=len(ids)).astype(np.bool_)
+        scopes = [("", "")] * len(ids)
+        scope_path = self._seg_path(sid, ".scope.json")
+        if scope_path.exists():
+            raw = json.loads(scope_path.read_text(encoding="utf-8"))
+            if len(raw) == len(ids):
+                scopes = [(str(d), str(v)) for d, v in raw]
+        doc_ids, version_ids = _scope_arrays(scopes)
+        return _Segment(
+            seg_id=sid,
+            ids=list(ids),
+            vectors=vectors,
+            norms=norms,
+            tomb=tomb,
+            doc_ids=doc_ids,
+            version_ids=version_ids,
+        )
+
+    def _write_segment_files(
+        self,
+        sid: int,
+        ids: list[str],
+        mat: np.ndarray,
+        scopes: list[tuple[str, str]],
+    ) -> None:
+        mat = np.ascontiguousarray(mat, dtype=np.float32)
+        norms = np.linalg.norm(mat, axis=1).astype(np.float32)
+        _atomic_npy(self._seg_path(sid, ".npy"), mat)
+        _atomic_npy(self._seg_path(sid, ".norms.npy"), norms)
+        _atomic_text(self._seg_path(sid, ".scope.json"), json.dumps(scopes, ensure_ascii=False))
+        _atomic_text(self._seg_path(sid, ".ids.json"), json.dumps(ids, ensure_ascii=False))
+
+    def _remove_segment_files(self, sid: int) -> None:
+        for suffix in (".npy", ".norms.npy", ".scope.json", ".ids.json", ".tomb.npy"):
+            try:
+                self._seg_path(sid, suffix).unlink()
+            except FileNotFoundError:
+                pass
+
+    def _write_tomb(self, seg: _Segment) -> None:
+        _atomic_npy(self._seg_path(seg.seg_id, ".tomb.npy"), np.packbits(seg.tomb))
+
+    def _write_tail(self) -> None:
+        path = self._dir / _TAIL
+        tmp = path.with_suffix(".tmp.npz")
+        doc_ids, version_ids = _scope_arrays(self._tail_scopes)
+        np.savez(
+            tmp,
+            ids=np.array(self._tail_ids, dtype=np.str_),
+            vectors=self._tail_matrix(),
+            doc_ids=doc_ids,
+            version_ids=version_ids,
+        )
+        os.replace(tmp, path)
+
+    def _write_manifest(self) -> None:
+        self._generation += 1
+        cutoff = time.time() - self.retire_grace_s
+        expired = [sid for sid, at in self._retired if at <= cutoff]
+        self._retired = [(sid, at) for sid, at in self._retired if at > cutoff]
+        meta: dict[str, Any] = {
+            "version": _FORMAT_VERSION,
+            "dim": self._dim,
+            "generation": self._generation,
+            "next_seg_id": self._next_seg_id,
+            "segments": list(self._order),
+            "retired": [[sid, at] for sid, at in self._retired],
+        }
+        _atomic_text(self._dir / _MANIFEST, json.dumps(meta))
+        self._manifest_stat = self._stat_manifest()
+        for sid in expired:
+            self._remove_segment_files(sid)
+
+    def _stat_manifest(self) -> tuple[int, int] | None:
+        try:
+            st = (self._dir / _MANIFEST).stat()
+        except FileNotFoundError:
+            return None
+        return (st.st_mtime_ns, st.st_ino)
+
+
+def _atomic_npy(path: Path, arr: np.ndarray) -> None:
+    tmp = path.with_name(path.name + ".tmp")
+    with tmp.open("wb") as f:
+        np.save(f, arr)
+    os.replace(tmp, path)
+
+
+def _atomic_text(path: Path, text: str) -> None:
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_text(text, encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def _tier(rows: int, base_rows: int, factor: int) -> int:
+    """Size tier: 0 up to `base_rows` live rows, +1 per further factor of `factor`."""
+    tier, cap = 0, max(1, base_rows)
+    while rows > cap:
+        tier, cap = tier + 1, cap * factor
+    return tier
+
+
+def _scope(v: object) -> str:
+    return v if isinstance(v, str) else ""
+
+
+def _scope_arrays(scopes: list[tuple[str, str]]) -> tuple[np.ndarray, np.ndarray]:
+    return (
+        np.array([d for d, _ in scopes], dtype=np.str_),
+        np.array([v for _, v in scopes], dtype=np.str_),
+    )
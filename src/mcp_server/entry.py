@@ -23,6 +23,8 @@ from .mcp.tools.ingest import IngestToolConfig
 from .mcp.tools.ingest import make_tool as make_ingest_tool
 from .mcp.tools.list_documents import ListDocumentsToolConfig
 from .mcp.tools.list_documents import make_tool as make_list_tool
+from .mcp.tools.maintain_fts_index import MaintainFtsIndexToolConfig
+from .mcp.tools.maintain_fts_index import make_tool as make_maintain_fts_tool
 from .mcp.tools.ping import tool as ping_tool
 from .mcp.tools.query import QueryToolConfig
 from .mcp.tools.query import make_tool as make_query_tool
@@ -87,6 +89,7 @@ def serve_stdio(settings_path: str | Path) -> None:
     )
     tools.register(make_list_tool(cfg=ListDocumentsToolConfig(settings_path=settings_path)))
     tools.register(make_delete_tool(cfg=DeleteDocumentToolConfig(settings_path=settings_path)))
+    tools.register(make_maintain_fts_tool(cfg=MaintainFtsIndexToolConfig(settings_path=settings_path)))
 
     proto = McpProtocol(tools=tools)
 
@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+from ....core.runners.admin import AdminRunner
+from ....ingestion.stages.storage.fts5 import FTS_TOKENIZERS
+from ...jsonrpc.codec import INTERNAL_ERROR, INVALID_PARAMS
+from ...jsonrpc.dispatcher import JsonRpcAppError
+from ..session import McpSession
+from .base import FunctionTool, ToolSpec
+
+
+@dataclass
+class MaintainFtsIndexToolConfig:
+    settings_path: str | Path = "config/settings.yaml"
+
+
+def _opt_int(args: dict[str, Any], key: str) -> int | None:
+    value = args.get(key)
+    if value is None:
+        return None
+    if not isinstance(value, int) or isinstance(value, bool):
+        raise JsonRpcAppError(INVALID_PARAMS, f"invalid param: {key} must be integer")
+    return value
+
+
+def make_tool(*, cfg: MaintainFtsIndexToolConfig | None = None) -> FunctionTool:
+    cfg = cfg or MaintainFtsIndexToolConfig()
+
+    def _handler(session: McpSession, args: dict[str, Any]) -> dict[str, Any]:
+        _ = session
+        budget_s = args.get("budget_s", 5.0)
+        if not isinstance(budget_s, (int, float)) or isinstance(budget_s, bool) or budget_s < 0:
+            raise JsonRpcAppError(INVALID_PARAMS, "invalid param: budget_s must be a non-negative number")
+        merge_pages = _opt_int(args, "merge_pages")
+        if merge_pages is not None and merge_pages <= 0:
+            raise JsonRpcAppError(INVALID_PARAMS, "invalid param: merge_pages must be positive")
+        automerge = _opt_int(args, "automerge")
+        crisismerge = _opt_int(args, "crisismerge")
+        stats_only = bool(args.get("stats_only", False))
+        tokenizer = args.get("tokenizer")
+        if tokenizer is not None and not isinstance(tokenizer, str):
+            raise JsonRpcAppError(INVALID_PARAMS, "invalid param: tokenizer must be a string")
+
+        try:
+            res = AdminRunner(settings_path=cfg.settings_path).maintain_fts_index(
+                budget_s=float(budget_s),
+                merge_pages=merge_pages or 256,
+                automerge=automerge,
+                crisismerge=crisismerge,
+                stats_only=stats_only,
+                tokenizer=tokenizer or None,
+            )
+        except Exception as e:
+            raise JsonRpcAppError(INTERNAL_ERROR, "fts maintenance failed", {"exc_type": type(e).__name__}) from e
+
+        text_lines = [
+            "FTS index maintenance finished.",
+            f"- status: {res.status}",
+            f"- segments: {res.before['segments']} -> {res.after['segments']}",
+            f"- index_bytes: {res.before['index_bytes']} -> {res.after['index_bytes']}",
+            f"- merge_steps: {res.merge_steps}",
+            f"- complete: {res.complete}",
+        ]
+        if res.warnings:
+            text_lines.append(f"- warnings: {', '.join(res.warnings)}")
+
+        return {
+            "text": "\n".join(text_lines),
+            "structured": {
+                "status": res.status,
+                "before": res.before,
+                "after": res.after,
+                "merge_steps": res.merge_steps,
+                "complete": res.complete,
+                "warnings": res.warnings,
+            },
+        }
+
+    return FunctionTool(
+        spec=ToolSpec(
+            name="library_maintain_fts_index",
+            description=(
+                "Report sparse (FTS5) index segments/size and merge segments within a time budget; "
+                "`tokenizer` switches the index profile (full re-index)."
+            ),
+            input_schema={
+                "type": "object",
+                "properties": {
+                    "budget_s": {"type": "number"},
+                    "merge_pages": {"type": "integer"},
+                    "automerge": {"type": "integer"},
+                    "crisismerge": {"type": "integer"},
+                    "stats_only": {"type": "boolean"},
+                    "tokenizer": {"type": "string", "enum": list(FTS_TOKENIZERS)},
+                },
+                "additionalProperties": False,
+            },
+        ),
+        fn=_handler,
+    )
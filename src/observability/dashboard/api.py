@@ -275,7 +275,7 @@ def post_ingest(request: Request, payload: dict[str, Any]) -> dict[str, Any]:
 
 
 @router.post("/query")
-def post_query(request: Request, payload: dict[str, Any]) -> dict[str, Any]:
+async def post_query(request: Request, payload: dict[str, Any]) -> dict[str, Any]:
     settings = get_settings(request)
     query = str(payload.get("query") or "").strip()
     if not query:
@@ -295,7 +295,7 @@ def post_query(request: Request, payload: dict[str, Any]) -> dict[str, Any]:
 
     settings_path = os.environ.get("MODULE_RAG_SETTINGS_PATH", "config/settings.yaml")
     runner = QueryRunner(settings_path=settings_path)
-    resp = runner.run(query, strategy_config_id=str(strategy_config_id), top_k=top_k)
+    resp = await runner.arun(query, strategy_config_id=str(strategy_config_id), top_k=top_k)
     sources = [
         {
             "chunk_id": s.chunk_id,
@@ -334,10 +334,40 @@ def post_delete(request: Request, payload: dict[str, Any]) -> dict[str, Any]:
         version_id=version_id,
         mode=str(mode),
         dry_run=dry_run,
+        strategy_config_id=payload.get("strategy_config_id") or None,
     )
     return {"status": res.status, "trace_id": res.trace_id, "affected": res.affected}
 
 
+def _opt_int(value: Any) -> int | None:
+    return None if value is None else int(value)
+
+
+@router.post("/fts/maintain")
+def post_fts_maintain(request: Request, payload: dict[str, Any] | None = None) -> dict[str, Any]:
+    _ = get_settings(request)
+    payload = payload or {}
+    settings_path = os.environ.get("MODULE_RAG_SETTINGS_PATH", "config/settings.yaml")
+    runner = AdminRunner(settings_path=settings_path)
+    res = runner.maintain_fts_index(
+        budget_s=float(payload.get("budget_s", 5.0)),
+        merge_pages=int(payload.get("merge_pages", 256)),
+        automerge=_opt_int(payload.get("automerge")),
+        crisismerge=_opt_int(payload.get("crisismerge")),
+        stats_only=bool(payload.get("stats_only", False)),
+        tokenizer=payload.get("tokenizer") or None,
+    )
+    return {
+        "status": res.status,
+        "trace_id": res.trace_id,
+        "before": res.before,
+        "after": res.after,
+        "merge_steps": res.merge_steps,
+        "complete": res.complete,
+        "warnings": res.warnings,
+    }
+
+
 @router.post("/eval/run")
 def post_run_eval(request: Request, payload: dict[str, Any] | None = None) -> dict[str, Any]:
     settings = get_settings(request)
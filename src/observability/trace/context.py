@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 from contextlib import contextmanager
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, replace
 import contextvars
 import time
 import traceback
@@ -72,6 +72,15 @@ class TraceContext:
         finally:
             _CTX.reset(token)
 
+    def fork(self) -> "TraceContext":
+        """A view of this trace with its own copy of the current span stack.
+
+        Spans and events recorded through the fork land in the same trace, parented
+        under the span that was current at fork time. Activate one fork per thread
+        (or asyncio task) when stages run concurrently so their span stacks do not interleave.
+        """
+        return replace(self, _span_stack=list(self._span_stack))
+
     def _current_span(self) -> SpanRecord | None:
         if not self._span_stack:
             return None
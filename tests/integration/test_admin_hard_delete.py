@@ -28,8 +28,12 @@ from src.libs.providers.splitter.recursive_chunker import RecursiveCharChunkerWi
 from src.libs.providers.vector_store.chroma_lite import ChromaLiteVectorIndex
 from src.libs.providers.vector_store.chroma_retriever import ChromaDenseRetriever
 from src.libs.providers.vector_store.fts5_retriever import Fts5Retriever
+from src.libs.providers.vector_store.hnsw import HnswVectorIndex
+from src.libs.providers.vector_store.ivf_pq import IvfPqVectorIndex
+from src.libs.providers.vector_store.segmented import SegmentedVectorIndex
 from src.libs.providers.vector_store.rrf_fusion import RrfFusion
 from src.libs.providers.llm.fake_llm import FakeLLM
+from src.libs.interfaces.vector_store import VectorItem
 
 
 @pytest.mark.integration
@@ -118,11 +122,27 @@ def test_admin_hard_delete_removes_storage_rows(tmp_path: Path, tmp_workdir: Pat
         row = conn.execute("SELECT COUNT(*) AS c FROM vectors").fetchone()
     assert row is not None and int(row[0]) > 0
 
+    # Persisted ANN / segment indexes hold their own copies of the vectors.
+    ids, mat, _ = vector_index.load_matrix()
+    items = [VectorItem(chunk_id=cid, vector=row.tolist(), metadata={}) for cid, row in zip(ids, mat)]
+    HnswVectorIndex(persist_dir=str(chroma_dir / "hnsw")).upsert(items)
+    SegmentedVectorIndex(persist_dir=str(chroma_dir / "segments")).upsert(items)
+    IvfPqVectorIndex(db_path=str(chroma_dir / "chroma_lite.sqlite"), persist_dir=str(chroma_dir / "ivf_pq"), nlist=1, m=2).train()
+
     # Hard delete
     res = AdminRunner(settings_path=settings_path).delete_document(
         doc_id=dec.doc_id, version_id=dec.version_id, mode="hard"
     )
     assert res.status == "ok"
+    assert {label.split(":")[0] for label in res.affected["vector_indexes"]} == {
+        "vector.hnsw",
+        "vector.segments",
+        "vector.ivf_pq",
+    }
+    assert HnswVectorIndex(persist_dir=str(chroma_dir / "hnsw")).count() == 0
+    assert SegmentedVectorIndex(persist_dir=str(chroma_dir / "segments")).count() == 0
+    ivf = IvfPqVectorIndex(db_path=str(chroma_dir / "chroma_lite.sqlite"), persist_dir=str(chroma_dir / "ivf_pq"))
+    assert ivf.is_trained and not ivf._pos_by_id
 
     # SQLite chunks removed
     with sqlite3.connect(sqlite_store.db_path) as conn:
@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+import asyncio
+import json
+
+import httpx
+
+from src.libs.interfaces.vector_store.retriever import RankedCandidate
+from src.libs.providers.embedding import batching
+from src.libs.providers.evaluator.judge_azure_openai import AzureOpenAIJudge
+from src.libs.providers.evaluator.judge_openai_compatible import OpenAICompatibleJudge
+from src.libs.providers.llm.azure_openai import AzureOpenAILLM
+from src.libs.providers.llm.openai_compatible import OpenAICompatibleLLM
+from src.libs.providers.reranker.openai_compatible_llm import OpenAICompatibleLLMReranker
+
+
+def _chat(text: str) -> httpx.Response:
+    return httpx.Response(200, json={"choices": [{"message": {"content": text}}], "usage": {"prompt_tokens": 3}})
+
+
+def _handler(request: httpx.Request) -> httpx.Response:
+    """Mock chat completions endpoint: answers by the kind of system prompt it gets."""
+    system = json.loads(request.content)["messages"][0]["content"]
+    if "reranker" in system:
+        return _chat(json.dumps([{"chunk_id": "b", "score": 0.9}, {"chunk_id": "a", "score": 0.1}]))
+    if "evaluator" in system:
+        return _chat('{"score": 0.75, "reason": "ok"}')
+    return _chat("hello")
+
+
+def _patch_transport(monkeypatch) -> list[httpx.AsyncClient]:  # type: ignore[no-untyped-def]
+    created: list[httpx.AsyncClient] = []
+    real = httpx.AsyncClient
+
+    def factory(**kw):  # type: ignore[no-untyped-def]
+        client = real(transport=httpx.MockTransport(_handler), timeout=kw["timeout"])
+        created.append(client)
+        return client
+
+    monkeypatch.setattr(batching.httpx, "AsyncClient", factory)
+    return created
+
+
+def test_async_providers_share_one_client_per_event_loop(monkeypatch) -> None:  # type: ignore[no-untyped-def]
+    created = _patch_transport(monkeypatch)
+    llms = [
+        OpenAICompatibleLLM(base_url="https://llm", api_key="k", model="m"),
+        AzureOpenAILLM(base_url="https://az", api_key="k", deployment_name="d"),
+    ]
+    reranker = OpenAICompatibleLLMReranker(base_url="https://llm", api_key="k", model="m")
+    judges = [
+        OpenAICompatibleJudge(base_url="https://llm", api_key="k"),
+        AzureOpenAIJudge(base_url="https://az", api_key="k", deployment_name="d"),
+    ]
+    candidates = [
+        RankedCandidate(chunk_id="a", score=1.0, rank=1, source="dense", metadata={"chunk_text": "alpha"}),
+        RankedCandidate(chunk_id="b", score=0.5, rank=2, source="dense", metadata={"chunk_text": "beta"}),
+    ]
+
+    async def run() -> None:
+        for _ in range(2):
+            for llm in llms:
+                res = await llm.agenerate("answer", [{"role": "user", "content": "hi"}])
+                assert (res.text, res.tokens_in) == ("hello", 3)
+            ranked = await reranker.arerank("q", candidates)
+            assert [c.chunk_id for c in ranked] == ["b", "a"]
+            for judge in judges:
+                assert (await judge.ascore_faithfulness("ans", "ctx")).score == 0.75
+                assert (await judge.ascore_answer_relevancy("ans", "q")).score == 0.75
+
+    asyncio.run(run())
+    assert len(created) == 1 and not created[0].is_closed
+
+    # A new event loop gets its own client; the previous one is never reused across loops.
+    asyncio.run(run())
+    assert len(created) == 2 and created[1] is not created[0]
+
+
+def test_async_client_is_keyed_by_loop_and_pool_settings() -> None:
+    async def clients() -> list[httpx.AsyncClient]:
+        a = batching.async_client(timeout_s=5.0, max_connections=4)
+        b = batching.async_client(timeout_s=5.0, max_connections=4)
+        c = batching.async_client(timeout_s=5.0, max_connections=8)
+        await a.aclose()
+        d = batching.async_client(timeout_s=5.0, max_connections=4)  # closed -> replaced
+        return [a, b, c, d]
+
+    a, b, c, d = asyncio.run(clients())
+    assert a is b and c is not a and d is not a
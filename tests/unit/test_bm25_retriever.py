@@ -0,0 +1,165 @@
+from __future__ import annotations
+
+import math
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from src.ingestion.stages.storage.fts5 import Fts5Store
+from src.libs.interfaces.vector_store import SearchFilter
+from src.libs.providers.vector_store.bm25_index import Bm25Index, tokenize
+from src.libs.providers.vector_store.bm25_retriever import Bm25Retriever
+
+_DOCS = [
+    ("chk_1", "rag uses chroma", "d1", "v1"),
+    ("chk_2", "sqlite fts5 bm25 bm25", "d1", "v1"),
+    ("chk_3", "rag uses sqlite fts5 with a much longer body of text", "d2", "v2"),
+]
+
+
+def test_tokenize_profiles() -> None:
+    assert tokenize("SQLite FTS5, 检索增强!") == ["sqlite", "fts5", "检索增强"]
+    assert tokenize("检索增强", "cjk_bigram") == ["检索", "索增", "增强"]
+
+
+def test_bm25_index_scores_and_mmap_roundtrip(tmp_path: Path) -> None:
+    index = Bm25Index.build(_DOCS, generation=3)
+    hits = index.search("bm25 sqlite", top_k=10, k1=1.2, b=0.75)
+    assert [cid for cid, _ in hits] == ["chk_2", "chk_3"]
+
+    # Hand-computed BM25 for chk_2: "bm25" (tf=2, df=1) + "sqlite" (tf=1, df=2).
+    avg = (3 + 4 + 11) / 3
+    norm = 1.2 * (1 - 0.75 + 0.75 * 4 / avg)
+    idf_bm25 = math.log1p((3 - 1 + 0.5) / 1.5)
+    idf_sqlite = math.log1p((3 - 2 + 0.5) / 2.5)
+    expected = idf_bm25 * 2 * 2.2 / (2 + norm) + idf_sqlite * 1 * 2.2 / (1 + norm)
+    assert hits[0][1] == pytest.approx(expected, rel=1e-5)
+
+    index.save(tmp_path / "bm25.idx")
+    loaded = Bm25Index.load(tmp_path / "bm25.idx")
+    assert loaded.generation == 3
+    assert loaded.search("bm25 sqlite", top_k=10) == pytest.approx(hits)
+    flt = SearchFilter(doc_ids=frozenset({"d2"}))
+    assert [cid for cid, _ in loaded.search("sqlite", top_k=10, search_filter=flt)] == ["chk_3"]
+
+
+def test_bm25_retriever_rebuilds_after_store_writes(tmp_path: Path) -> None:
+    db_path = tmp_path / "fts.sqlite"
+    store = Fts5Store(db_path=db_path)
+    store.upsert([(cid, text) for cid, text, _, _ in _DOCS])
+
+    r = Bm25Retriever(db_path=str(db_path), k1=0.9, b=0.4)
+    hits = r.retrieve("sqlite fts5", top_k=10)
+    assert {h.chunk_id for h in hits} == {"chk_2", "chk_3"}
+    assert all(h.source == "sparse" and h.score > 0 for h in hits)
+    assert (tmp_path / "bm25_unicode61.idx").exists()
+    assert r.index() is r.index()  # unchanged store -> cached
+
+    store.delete(["chk_2"])
+    store.upsert([("chk_4", "brand new sqlite row")])
+    assert {h.chunk_id for h in r.retrieve("sqlite", top_k=10)} == {"chk_3", "chk_4"}
+    assert r.retrieve("", top_k=10) == []
+
+
+def test_block_max_matches_exhaustive_and_skips_postings(tmp_path: Path) -> None:
+    rng = np.random.default_rng(0)
+    vocab = [f"w{i}" for i in range(200)]
+    # Zipf-ish corpus: a few very common terms, a long tail of rare ones.
+    probs = 1.0 / np.arange(1, len(vocab) + 1)
+    probs /= probs.sum()
+    docs = [
+        (f"c{i}", " ".join(rng.choice(vocab, size=int(rng.integers(5, 40)), p=probs)), f"d{i % 7}", "v")
+        for i in range(3000)
+    ]
+    index = Bm25Index.build(docs, window=64)
+    index.save(tmp_path / "bm25.idx")
+    index = Bm25Index.load(tmp_path / "bm25.idx")
+
+    query = "w0 w1 w2 w3 w150 w151 w199"
+    flt = SearchFilter(doc_ids=frozenset({"d3"}))
+    for search_filter in (None, flt):
+        exact = index.search(query, 10, method="exhaustive", search_filter=search_filter)
+        stats: dict[str, int] = {}
+        fast = index.search(query, 10, method="block_max", search_filter=search_filter, stats=stats)
+        assert fast == exact
+    stats = {}
+    index.search(query, 10, stats=stats)
+    assert stats["postings_scored"] < stats["postings_total"]
+
+
+def test_bm25_retriever_concurrent_queries_build_once(tmp_path: Path, monkeypatch) -> None:  # type: ignore[no-untyped-def]
+    db_path = tmp_path / "fts.sqlite"
+    Fts5Store(db_path=db_path).upsert([(cid, text) for cid, text, _, _ in _DOCS])
+    builds: list[int] = []
+    build = Bm25Index.build
+
+    def counting_build(*args, **kwargs):  # type: ignore[no-untyped-def]
+        builds.append(1)
+        return build(*args, **kwargs)
+
+    monkeypatch.setattr(Bm25Index, "build", staticmethod(counting_build))
+    retrievers = [Bm25Retriever(db_path=str(db_path)) for _ in range(4)]
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        results = list(pool.map(lambda r: r.retrieve("sqlite", top_k=10), retrievers))
+    assert len(builds) == 1
+    assert all({h.chunk_id for h in hits} == {"chk_2", "chk_3"} for hits in results)
+
+
+def test_bm25_retriever_applies_writes_as_a_delta_until_merge(tmp_path: Path, monkeypatch) -> None:  # type: ignore[no-untyped-def]
+    from src.libs.providers.vector_store import bm25_retriever
+    from src.libs.providers.vector_store.bm25_index import Bm25DeltaIndex
+
+    db_path = tmp_path / "fts.sqlite"
+    store = Fts5Store(db_path=db_path)
+    store.upsert([(f"c{i}", f"common row {i} " + ("rare " if i % 5 == 0 else "")) for i in range(40)])
+    r = Bm25Retriever(db_path=str(db_path), delta_max_fraction=0.25)
+    base = r.index()
+    assert isinstance(base, Bm25Index)
+
+    built: list[int] = []
+    build = Bm25Index.build
+
+    def counting_build(docs, **kwargs):  # type: ignore[no-untyped-def]
+        docs = list(docs)
+        built.append(len(docs))
+        return build(docs, **kwargs)
+
+    monkeypatch.setattr(Bm25Index, "build", staticmethod(counting_build))
+    monkeypatch.setattr(bm25_retriever, "_DELTA_MIN_ROWS", 0)
+    store.delete(["c0", "c1"])
+    store.upsert([("c2", "rare rare rewritten"), ("n1", "rare new row")])
+    view = r.index()
+    assert isinstance(view, Bm25DeltaIndex) and view.base is base
+    assert built == [2]  # only the changed rows were tokenized
+
+    # Same scores as a from-scratch index over the current rows.
+    full = build(list(store.iter_docs()))
+    for query in ("rare", "common rare row", "rewritten"):
+        got = dict(r.index().search(query, 50))
+        assert got == pytest.approx(dict(full.search(query, 50)), rel=1e-5)
+    assert {cid for cid, _ in view.search("rare", 50)}.isdisjoint({"c0", "c1"})
+    flt = SearchFilter(doc_ids=frozenset({"nope"}))
+    assert view.search("rare", 10, search_filter=flt) == []
+
+    # Past delta_max_fraction of the base the file is rebuilt (merged).
+    store.upsert([(f"m{i}", "merge me") for i in range(10)])
+    merged = r.index()
+    assert isinstance(merged, Bm25Index) and merged.num_docs == 49
+    assert built[-1] == 49
+    assert Bm25Index.load(tmp_path / "bm25_unicode61.idx").generation == store.generation()
+
+
+def test_fts5_changes_since_tracks_rows_and_deletes(tmp_path: Path) -> None:
+    store = Fts5Store(db_path=tmp_path / "fts.sqlite")
+    store.upsert([("a", "one"), ("b", "two")], doc_id="d1")
+    g = store.generation()
+    store.upsert([("a", "one"), ("b", "two, edited")], doc_id="d1")  # "a" unchanged
+    store.delete(["a"])
+    store.upsert([("c", "three")])
+    current, rows, deleted = store.changes_since(g) or (None, None, None)
+    assert current == store.generation()
+    assert [r[0] for r in rows] == ["b", "c"] and rows[0] == ("b", "two, edited", "d1", None)
+    assert deleted == ["a"]
+    assert store.changes_since(store.generation()) == (store.generation(), [], [])
@@ -1,5 +1,9 @@
 from __future__ import annotations
 
+import hashlib
+import math
+import re
+
 from src.libs.providers.embedding.bow_embedder import BowHashEmbedder
 
 
@@ -19,3 +23,19 @@ def test_bow_embedder_deterministic_and_overlap() -> None:
 
     assert dot(a, b) > dot(a, c)
 
+
+
+def _reference(text: str, dim: int) -> list[float]:
+    # The original per-token implementation; batch output must match it exactly.
+    vec = [0.0] * dim
+    for tok in re.findall(r"[0-9A-Za-z_]+|[\u4e00-\u9fff]+", text.lower()):
+        h = hashlib.sha256(tok.encode("utf-8")).digest()
+        vec[int.from_bytes(h[:4], "big") % dim] += 1.0
+    n = math.sqrt(sum(v * v for v in vec))
+    return [v / n for v in vec] if n > 0.0 else vec
+
+
+def test_bow_embedder_batch_matches_reference_exactly() -> None:
+    texts = ["sqlite fts5 bm25 sqlite", "中文检索 RAG rag", "", "!!!", "a b c " * 50]
+    for dim in (1, 7, 64):
+        assert BowHashEmbedder(dim=dim).embed_texts(texts) == [_reference(t, dim) for t in texts]
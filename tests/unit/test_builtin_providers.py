@@ -62,6 +62,9 @@ def test_register_builtin_providers() -> None:
     assert reg.has("llm", "fake")
     assert reg.has("vector_index", "vector.in_memory")
     assert reg.has("vector_index", "vector.chroma_lite")
+    assert reg.has("vector_index", "vector.hnsw")
+    assert reg.has("vector_index", "vector.ivf_pq")
+    assert reg.has("vector_index", "vector.segments")
     assert reg.has("reranker", "noop")
     assert reg.has("reranker", "cross_encoder")
 
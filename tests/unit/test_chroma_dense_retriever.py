@@ -1,7 +1,12 @@
 from __future__ import annotations
 
+from pathlib import Path
+
+import numpy as np
+
 from src.libs.providers.embedding.fake_embedder import FakeEmbedder
 from src.libs.providers.vector_store.chroma_retriever import ChromaDenseRetriever
+from src.libs.providers.vector_store.chroma_lite import ChromaLiteVectorIndex
 from src.libs.providers.vector_store.in_memory import InMemoryVectorIndex
 from src.libs.interfaces.vector_store import VectorItem
 
@@ -19,3 +24,55 @@ def test_chroma_dense_retriever_topk() -> None:
     hits = retriever.retrieve("alpha", top_k=1)
     assert hits and hits[0].chunk_id == "chk_a"
 
+
+
+def test_chroma_dense_retriever_binary_prefilter_matches_exact(tmp_path: Path) -> None:
+    rng = np.random.default_rng(0)
+    mat = rng.normal(size=(500, 64)).astype(np.float32)
+    items = [VectorItem(chunk_id=f"c{i}", vector=mat[i].tolist()) for i in range(500)]
+    embedder = FakeEmbedder(dim=64)
+    queries = ["alpha", "beta", "gamma"]
+    for text, vec in zip(queries, embedder.embed_texts(queries)):
+        items.append(VectorItem(chunk_id=f"chk_{text}", vector=vec))
+
+    for index in (InMemoryVectorIndex(), ChromaLiteVectorIndex(db_path=str(tmp_path / "v.sqlite"))):
+        index.upsert(items)
+        exact = ChromaDenseRetriever(embedder=embedder, vector_index=index)
+        binary = ChromaDenseRetriever(embedder=embedder, vector_index=index, prefilter="binary", prefilter_factor=10)
+        for q in queries:
+            hits = binary.retrieve(q, top_k=3)
+            assert hits[0].chunk_id == f"chk_{q}"
+            assert [h.chunk_id for h in hits] == [h.chunk_id for h in exact.retrieve(q, top_k=3)]
+        assert [[h.chunk_id for h in hs][:1] for hs in binary.retrieve_batch(queries, top_k=3)] == [
+            [f"chk_{q}"] for q in queries
+        ]
+
+
+def test_chroma_dense_retriever_caches_query_vectors() -> None:
+    from src.libs.providers.embedding.cache import InMemoryEmbeddingCache
+
+    calls: list[list[str]] = []
+
+    class CountingEmbedder(FakeEmbedder):
+        def embed_texts(self, texts):  # type: ignore[no-untyped-def]
+            calls.append(list(texts))
+            return super().embed_texts(texts)
+
+    embedder = CountingEmbedder(dim=8)
+    index = InMemoryVectorIndex()
+    index.upsert([VectorItem(chunk_id="chk_a", vector=FakeEmbedder(dim=8).embed_texts(["alpha"])[0])])
+    persistent = InMemoryEmbeddingCache()
+    retriever = ChromaDenseRetriever(
+        embedder=embedder, vector_index=index, query_cache_size=2, embedding_cache=persistent, embedder_id="fake"
+    )
+
+    first = retriever.retrieve("alpha", top_k=1)
+    assert retriever.retrieve(" alpha ", top_k=1) == first
+    assert calls == [["alpha"]]
+
+    # Batch only embeds the misses; a new retriever (empty LRU) is served by the persistent tier.
+    retriever.retrieve_batch(["alpha", "beta", "gamma"], top_k=1)
+    assert calls == [["alpha"], ["beta", "gamma"]]
+    fresh = ChromaDenseRetriever(embedder=embedder, vector_index=index, embedding_cache=persistent, embedder_id="fake")
+    assert fresh.retrieve("alpha", top_k=1) == first
+    assert len(calls) == 2
@@ -1,9 +1,13 @@
 from __future__ import annotations
 
+import json
+import sqlite3
 from pathlib import Path
 
+import pytest
+
 from src.libs.providers.vector_store import ChromaLiteVectorIndex
-from src.libs.interfaces.vector_store import VectorItem
+from src.libs.interfaces.vector_store import SearchFilter, VectorItem
 
 
 def test_chroma_lite_upsert_and_query(tmp_path: Path) -> None:
@@ -20,3 +24,126 @@ def test_chroma_lite_upsert_and_query(tmp_path: Path) -> None:
     assert idx.count() == 2
     top = idx.query([1.0, 0.0], top_k=1)
     assert top[0][0] == "a"
+
+
+def test_chroma_lite_topk_order_and_delete(tmp_path: Path) -> None:
+    idx = ChromaLiteVectorIndex(db_path=str(tmp_path / "idx.sqlite"))
+    idx.upsert(
+        [
+            VectorItem(chunk_id="a", vector=[1.0, 0.0, 0.0]),
+            VectorItem(chunk_id="b", vector=[0.9, 0.1, 0.0]),
+            VectorItem(chunk_id="c", vector=[0.0, 0.0, 1.0]),
+            VectorItem(chunk_id="z", vector=[0.0, 0.0, 0.0]),
+        ]
+    )
+
+    top = idx.query([1.0, 0.0, 0.0], top_k=3)
+    assert [cid for cid, _ in top] == ["a", "b", "c"]
+    assert top[0][1] == pytest.approx(1.0)
+    assert top[2][1] == pytest.approx(0.0)
+
+    idx.delete(["a"])
+    assert idx.query([1.0, 0.0, 0.0], top_k=1)[0][0] == "b"
+    # Vectors of a different dimension never match.
+    assert idx.query([1.0, 0.0], top_k=5) == []
+
+
+def test_chroma_lite_migrates_legacy_vector_json(tmp_path: Path) -> None:
+    db = tmp_path / "legacy.sqlite"
+    with sqlite3.connect(db) as conn:
+        conn.execute(
+            """
+            CREATE TABLE vectors (
+                chunk_id TEXT PRIMARY KEY,
+                dim INTEGER,
+                vector_json TEXT,
+                metadata_json TEXT,
+                updated_at REAL
+            )
+            """
+        )
+        conn.executemany(
+            "INSERT INTO vectors(chunk_id, dim, vector_json, metadata_json, updated_at) VALUES(?, ?, ?, ?, ?)",
+            [
+                ("a", 2, json.dumps([1.0, 0.0]), "{}", 0.0),
+                ("b", 2, json.dumps([0.0, 1.0]), "{}", 0.0),
+            ],
+        )
+
+    idx = ChromaLiteVectorIndex(db_path=str(db))
+    assert idx.count() == 2
+    assert idx.query([0.0, 1.0], top_k=1)[0][0] == "b"
+
+    with sqlite3.connect(db) as conn:
+        row = conn.execute("SELECT COUNT(*) FROM vectors WHERE vector_json IS NOT NULL").fetchone()
+    assert row[0] == 0
+
+
+def test_chroma_lite_matrix_cache_reloads_incrementally(tmp_path: Path) -> None:
+    db = str(tmp_path / "cached.sqlite")
+    reader = ChromaLiteVectorIndex(db_path=db)
+    writer = ChromaLiteVectorIndex(db_path=db)
+    writer.upsert(
+        [
+            VectorItem(chunk_id="a", vector=[1.0, 0.0], metadata={"doc_id": "d1"}),
+            VectorItem(chunk_id="b", vector=[0.0, 1.0], metadata={"doc_id": "d2"}),
+        ]
+    )
+    assert reader.query([1.0, 0.0], top_k=1)[0][0] == "a"
+    first = reader._snapshot(2, "float32")
+    assert reader._snapshot(2, "float32") is first  # unchanged watermark -> cache hit
+
+    # Writes from another instance: update, delete, re-dimension, insert.
+    writer.upsert([VectorItem(chunk_id="b", vector=[1.0, 0.1], metadata={"doc_id": "d2"})])
+    writer.delete(["a"])
+    writer.upsert([VectorItem(chunk_id="c", vector=[0.5, 0.5], metadata={"doc_id": "d3"})])
+    writer.upsert([VectorItem(chunk_id="c", vector=[0.5, 0.5, 0.0], metadata={"doc_id": "d3"})])
+    writer.upsert([VectorItem(chunk_id="a", vector=[0.0, 1.0], metadata={"doc_id": "d1"})])
+
+    uncached = ChromaLiteVectorIndex(db_path=db, matrix_cache=False)
+    expected = uncached.query([1.0, 0.0], top_k=5)
+    assert reader.query([1.0, 0.0], top_k=5) == expected
+    assert [cid for cid, _ in expected] == ["b", "a"]
+
+    snap = reader._snapshot(2, "float32")
+    assert snap.epoch == first.epoch and snap.watermark > first.watermark
+    assert sorted(snap.rows.ids) == ["a", "b"]
+
+
+def test_chroma_lite_matrix_cache_invalidated_by_recreated_db(tmp_path: Path) -> None:
+    db = tmp_path / "recreated.sqlite"
+    idx = ChromaLiteVectorIndex(db_path=str(db))
+    idx.upsert([VectorItem(chunk_id="old", vector=[1.0, 0.0])])
+    assert idx.query([1.0, 0.0], top_k=1)[0][0] == "old"
+
+    db.unlink()
+    fresh = ChromaLiteVectorIndex(db_path=str(db))
+    fresh.upsert([VectorItem(chunk_id="new", vector=[1.0, 0.0])])
+    assert idx.query([1.0, 0.0], top_k=5) == [("new", pytest.approx(1.0))]
+
+
+@pytest.mark.parametrize("dtype", ["float32", "int8"])
+def test_chroma_lite_cached_filter_masks_the_shared_snapshot(tmp_path: Path, dtype: str) -> None:
+    db = str(tmp_path / "masked.sqlite")
+    cached = ChromaLiteVectorIndex(db_path=db, dtype=dtype)
+    uncached = ChromaLiteVectorIndex(db_path=db, dtype=dtype, matrix_cache=False)
+    cached.upsert(
+        [
+            VectorItem(chunk_id=f"c{i}", vector=[1.0, i / 10.0], metadata={"doc_id": f"d{i % 3}", "version_id": f"v{i}"})
+            for i in range(12)
+        ]
+    )
+    snap = cached._snapshot(2, dtype)
+    rows, mask = cached._load_rows(dim=2, kind=dtype, search_filter=SearchFilter(doc_ids=frozenset({"d1"})))
+    assert rows is snap.rows and mask is not None and int(mask.sum()) == 4
+
+    for flt in (
+        SearchFilter(doc_ids=frozenset({"d1"})),
+        SearchFilter(exclude_version_ids=frozenset({"v0"})),
+        SearchFilter(version_ids=frozenset({"nope"})),
+    ):
+        # top_k above the eligible count must not leak masked rows.
+        got = cached.query([1.0, 0.0], top_k=20, search_filter=flt)
+        assert got == uncached.query([1.0, 0.0], top_k=20, search_filter=flt)
+        bits = cached.query_binary_batch([[1.0, 0.0]], top_k=20, shortlist=20, search_filter=flt)
+        assert {cid for cid, _ in bits[0]} == {cid for cid, _ in got}
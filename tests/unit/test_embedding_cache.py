@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+import numpy as np
+
 from src.ingestion.stages import EmbeddingStage, EncodingStrategy
 from src.libs.interfaces.splitter import ChunkIR
 from src.libs.providers.embedding import FakeEmbedder
@@ -45,3 +47,96 @@ def test_embedding_cache_hit_on_second_run() -> None:
     assert out2.dense.cache_misses == 0
 
     assert out1.dense.items[0].vector == out2.dense.items[0].vector
+
+
+def test_sqlite_embedding_cache_persists_float32_and_evicts_lru(tmp_path) -> None:  # type: ignore[no-untyped-def]
+    from src.libs.providers.embedding.cache import SqliteEmbeddingCache
+
+    db = str(tmp_path / "cache" / "embeddings.sqlite")
+    cache = SqliteEmbeddingCache(db_path=db, max_entries=2, touch_interval_s=0)
+    cache.put_many([("a", [0.1, 0.2]), ("b", [1.0, 2.0])])
+    assert cache.get("a") == [float(np.float32(0.1)), float(np.float32(0.2))]
+    cache.put("c", [3.0, 4.0])  # "b" is least recently used ("a" was just read)
+    reopened = SqliteEmbeddingCache(db_path=db, max_entries=2)
+    assert reopened.count() == 2
+    assert reopened.get_many(["a", "b", "c"]) == [cache.get("a"), None, [3.0, 4.0]]
+
+
+def test_sqlite_embedding_cache_tracks_count_and_keeps_warm_reads_read_only(tmp_path) -> None:  # type: ignore[no-untyped-def]
+    import sqlite3
+
+    from src.libs.providers.embedding.cache import SqliteEmbeddingCache
+
+    db = str(tmp_path / "embeddings.sqlite")
+    cache = SqliteEmbeddingCache(db_path=db, max_entries=3)
+    cache.put_many([("a", [1.0]), ("b", [2.0])])
+    cache.put_many([("a", [1.5]), ("c", [3.0])])  # overwrite + insert
+    assert cache.count() == 3
+    cache.put_many([("d", [4.0]), ("e", [5.0])])
+    assert cache.count() == 3
+    with sqlite3.connect(db) as conn:
+        assert conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0] == 3
+
+    writes: list[str] = []
+    conn = sqlite3.connect(db)
+    conn.set_trace_callback(lambda sql: writes.append(sql) if sql.lstrip().startswith("UPDATE") else None)
+    cache._connect = lambda: conn  # type: ignore[method-assign]
+    assert cache.get_many(["d", "e", "missing"]) == [[4.0], [5.0], None]
+    assert writes == []  # last_used is fresher than touch_interval_s
+
+    cache.touch_interval_s = 0
+    cache.get_many(["d", "e"])
+    assert len(writes) == 1  # one batched recency update
+
+
+def test_embedder_cache_id_covers_output_affecting_params() -> None:
+    from src.libs.providers.embedding.cache import embedder_cache_id
+
+    base = {"base_url": "https://a", "api_key": "k1", "model": "m"}
+    ident = embedder_cache_id("embedder.openai_compatible", base)
+    assert ident.startswith("embedder.openai_compatible/m#")
+    # Credentials and throughput knobs keep the same id.
+    assert embedder_cache_id("embedder.openai_compatible", {**base, "api_key": "k2", "batch_size": 5}) == ident
+    for changed in ({"dimensions": 256}, {"base_url": "https://b"}, {"model": "m2"}):
+        assert embedder_cache_id("embedder.openai_compatible", {**base, **changed}) != ident
+
+    assert embedder_cache_id("embedder.bow", {"dim": 64}) != embedder_cache_id("embedder.bow", {"dim": 128})
+    local = {"model_name": "st", "normalize": True, "backend": "torch"}
+    ids = {
+        embedder_cache_id("embedder.local", {**local, **extra})
+        for extra in ({}, {"normalize": False}, {"backend": "onnx"}, {"onnx_file_name": "onnx/q.onnx"})
+    }
+    assert len(ids) == 4
+    assert embedder_cache_id("embedder.fake", None) == "embedder.fake"
+
+
+def test_embedding_stage_reuses_persistent_cache_across_runs(tmp_path) -> None:  # type: ignore[no-untyped-def]
+    from src.libs.providers.embedding.cache import SqliteEmbeddingCache
+
+    calls: list[list[str]] = []
+
+    class CountingEmbedder(FakeEmbedder):
+        def embed_texts(self, texts):  # type: ignore[no-untyped-def]
+            calls.append(list(texts))
+            return super().embed_texts(texts)
+
+    db = str(tmp_path / "embeddings.sqlite")
+    chunks = [
+        ChunkIR(chunk_id="c1", section_path="A", text="same text", metadata={}),
+        ChunkIR(chunk_id="c2", section_path="A", text="same text", metadata={}),
+        ChunkIR(chunk_id="c3", section_path="B", text="other", metadata={}),
+    ]
+
+    def run(cs):  # type: ignore[no-untyped-def]
+        stage = EmbeddingStage(embedder=CountingEmbedder(dim=4), cache=SqliteEmbeddingCache(db_path=db), embedder_id="fake")
+        return stage.run(cs, EncodingStrategy(mode="dense")).dense
+
+    first = run(chunks)
+    assert first is not None and first.cache_misses == 3
+    assert calls == [["same text", "other"]]
+
+    # A new process re-ingesting with one edited chunk only embeds that chunk.
+    edited = chunks[:2] + [ChunkIR(chunk_id="c3", section_path="B", text="other, edited", metadata={})]
+    second = run(edited)
+    assert second is not None and (second.cache_hits, second.cache_misses) == (2, 1)
+    assert calls[1:] == [["other, edited"]]
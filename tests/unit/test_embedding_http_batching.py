@@ -0,0 +1,141 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import threading
+import time
+
+import httpx
+
+from src.libs.providers.embedding import azure_openai, openai_compatible
+from src.libs.providers.embedding.azure_openai import AzureOpenAIEmbedder
+from src.libs.providers.embedding.batching import estimate_tokens, is_size_rejection, plan_batches
+from src.libs.providers.embedding.openai_compatible import OpenAICompatibleEmbedder
+from src.observability.obs import api as obs
+from src.observability.trace.context import TraceContext
+
+
+class _Server:
+    """Mock embeddings endpoint: vector = [len(text)], with a delay to expose concurrency."""
+
+    def __init__(self, *, delay_s: float = 0.05, throttle_first: int = 0, max_items: int = 0) -> None:
+        self.delay_s = delay_s
+        self.throttle_first = throttle_first
+        self.max_items = max_items
+        self.calls = 0
+        self.sizes: list[int] = []
+        self.in_flight = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        with self._lock:
+            self.calls += 1
+            if self.calls <= self.throttle_first:
+                return httpx.Response(429, headers={"retry-after": "0"})
+            self.in_flight += 1
+            self.peak = max(self.peak, self.in_flight)
+        time.sleep(self.delay_s)
+        texts = json.loads(request.content)["input"]
+        with self._lock:
+            self.in_flight -= 1
+            self.sizes.append(len(texts))
+        if self.max_items and len(texts) > self.max_items:
+            return httpx.Response(413, text="payload too large")
+        # Out-of-order `data` must still be reassembled by `index`.
+        data = [{"index": i, "embedding": [float(len(t))]} for i, t in enumerate(texts)][::-1]
+        return httpx.Response(200, json={"data": data})
+
+
+def _patch_client(monkeypatch, server: _Server) -> None:  # type: ignore[no-untyped-def]
+    def fake_pooled(**kw):  # type: ignore[no-untyped-def]
+        return httpx.Client(transport=httpx.MockTransport(server), timeout=kw["timeout_s"])
+
+    def fake_async(**kw):  # type: ignore[no-untyped-def]
+        async def handler(request: httpx.Request) -> httpx.Response:
+            return await asyncio.to_thread(server, request)
+
+        return httpx.AsyncClient(transport=httpx.MockTransport(handler), timeout=kw["timeout_s"])
+
+    for mod in (openai_compatible, azure_openai):
+        monkeypatch.setattr(mod, "pooled_client", fake_pooled)
+        monkeypatch.setattr(mod, "async_client", fake_async)
+
+
+def test_embedders_dispatch_batches_concurrently_in_order(monkeypatch) -> None:  # type: ignore[no-untyped-def]
+    texts = ["x" * n for n in range(1, 41)]
+    for make in (
+        lambda: OpenAICompatibleEmbedder(base_url="http://e/v1", api_key="k", model="m", batch_size=5, max_concurrency=4),
+        lambda: AzureOpenAIEmbedder(base_url="http://e", api_key="k", deployment_name="d", batch_size=5, max_concurrency=4),
+    ):
+        server = _Server()
+        _patch_client(monkeypatch, server)
+        embedder = make()
+        assert embedder.embed_texts(texts) == [[float(len(t))] for t in texts]
+        assert server.calls == 8 and server.peak == 4
+        assert asyncio.run(embedder.aembed_texts(texts)) == [[float(len(t))] for t in texts]
+
+    serial = _Server()
+    _patch_client(monkeypatch, serial)
+    OpenAICompatibleEmbedder(base_url="http://e/v1", api_key="k", model="m", batch_size=5, max_concurrency=1).embed_texts(texts)
+    assert serial.peak == 1
+
+
+def test_embedder_retries_throttled_batches(monkeypatch) -> None:  # type: ignore[no-untyped-def]
+    server = _Server(delay_s=0.0, throttle_first=2)
+    _patch_client(monkeypatch, server)
+    embedder = OpenAICompatibleEmbedder(base_url="http://e/v1", api_key="k", model="m", max_retries=2)
+    assert embedder.embed_texts(["ab"]) == [[2.0]]
+    assert server.calls == 3
+
+
+def test_plan_batches_caps_items_and_tokens_in_order() -> None:
+    texts = ["a" * 40, "b" * 40, "c" * 400, "d", "e", "f"]
+    batches = plan_batches(texts, max_items=2, max_tokens=30)
+    assert [t for b in batches for t in b] == texts
+    assert batches == [["a" * 40, "b" * 40], ["c" * 400], ["d", "e"], ["f"]]
+    assert estimate_tokens("你好世界") > estimate_tokens("abcd")
+
+
+def test_embedder_splits_batches_rejected_for_size(monkeypatch) -> None:  # type: ignore[no-untyped-def]
+    server = _Server(delay_s=0.0, max_items=2)
+    _patch_client(monkeypatch, server)
+    texts = ["x" * n for n in range(1, 9)]
+    embedder = OpenAICompatibleEmbedder(base_url="http://e/v1", api_key="k", model="m", batch_size=8, max_concurrency=1)
+
+    ctx = TraceContext.new("t-embed-split")
+    with TraceContext.activate(ctx):
+        with obs.span("stage.embed"):
+            assert embedder.embed_texts(texts) == [[float(len(t))] for t in texts]
+        env = ctx.finish()
+
+    assert server.sizes == [8, 4, 2, 2, 4, 2, 2]
+    metrics = [e.attrs for e in env.spans[0].events if e.kind == "metric"]
+    assert sum(m["value"] for m in metrics if m["name"] == "embedding_batch_split") == 3
+    items = [m["value"] for m in metrics if m["name"] == "embedding_batch_items"]
+    assert items == [2, 2, 2, 2]
+    assert all(m["provider"] == "openai_compatible/m" for m in metrics)
+
+    server.max_items = 0
+    server.sizes.clear()
+    assert asyncio.run(embedder.aembed_texts(texts)) == [[float(len(t))] for t in texts]
+    assert server.sizes == [8]
+
+
+def test_is_size_rejection_needs_a_size_specific_400() -> None:
+    assert is_size_rejection(httpx.Response(413, text=""))
+    for body in (
+        "This model's maximum context length is 8192 tokens, however you requested 9001 tokens",
+        "Batch size exceeds the maximum of 2048",
+        "input is too long",
+        "Too many inputs. Max 16 per request.",
+    ):
+        assert is_size_rejection(httpx.Response(400, text=body)), body
+    for body in (
+        "Too many requests",
+        "temperature exceeds maximum value 2.0",
+        "Invalid value: maximum is 3 for 'dimensions'",
+        "model not found",
+    ):
+        assert not is_size_rejection(httpx.Response(400, text=body)), body
+    assert not is_size_rejection(httpx.Response(500, text="input is too long"))
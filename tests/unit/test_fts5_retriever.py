@@ -3,7 +3,7 @@ from __future__ import annotations
 from pathlib import Path
 
 from src.ingestion.stages.storage.fts5 import Fts5Store
-from src.libs.providers.vector_store.fts5_retriever import Fts5Retriever, build_fts5_query
+from src.libs.providers.vector_store.fts5_retriever import Fts5Retriever, build_fts5_query, short_trigram_terms
 
 
 def test_build_fts5_query_is_conservative() -> None:
@@ -26,3 +26,66 @@ def test_fts5_retriever_retrieve(tmp_path: Path) -> None:
     ids = {h.chunk_id for h in hits}
     assert {"chk_2", "chk_3"}.issubset(ids)
 
+
+
+def test_build_fts5_query_tokenizer_profiles() -> None:
+    assert build_fts5_query("向量检索 rag", "cjk_bigram") == '"向量 量检 检索" rag'
+    assert build_fts5_query("库", "cjk_bigram") == "库*"
+    assert build_fts5_query("向量检索 ai", "trigram") == '"向量检索"'
+    assert short_trigram_terms("向量检索 ai 向量 ai") == ("ai", "向量")
+
+
+def test_fts5_retriever_cjk_bigram_after_explicit_rebuild(tmp_path: Path) -> None:
+    db_path = tmp_path / "fts.sqlite"
+    store = Fts5Store(db_path=db_path)
+    store.upsert(
+        [
+            ("chk_1", "混合检索结合向量检索与关键词检索"),
+            ("chk_2", "向量数据库存储嵌入"),
+            ("chk_3", "sqlite fts5 bm25"),
+        ]
+    )
+    generation = store.generation()
+    # unicode61 indexes each CJK run as one token: a word inside a sentence never matches.
+    assert Fts5Retriever(db_path=str(db_path)).retrieve("关键词", top_k=10) == []
+
+    # Opening with another profile never rebuilds implicitly.
+    r = Fts5Retriever(db_path=str(db_path), tokenizer="cjk_bigram")
+    assert Fts5Store(db_path=db_path).tokenizer == "unicode61"
+    assert Fts5Store(db_path=db_path).generation() == generation
+    assert r.retrieve("关键词", top_k=10) == []
+
+    Fts5Store(db_path=db_path).rebuild("cjk_bigram")
+    r = Fts5Retriever(db_path=str(db_path), tokenizer="cjk_bigram")
+    assert Fts5Store(db_path=db_path).tokenizer == "cjk_bigram"
+    assert Fts5Store(db_path=db_path).generation() > generation
+    assert [h.chunk_id for h in r.retrieve("关键词", top_k=10)] == ["chk_1"]
+    assert {h.chunk_id for h in r.retrieve("向量", top_k=10)} == {"chk_1", "chk_2"}
+    assert [h.chunk_id for h in r.retrieve("bm25", top_k=10)] == ["chk_3"]
+
+    # Writes after the switch are pre-tokenized too; trigram is a rebuild away.
+    Fts5Store(db_path=db_path).upsert([("chk_4", "稀疏关键词索引")])
+    assert {h.chunk_id for h in r.retrieve("关键词", top_k=10)} == {"chk_1", "chk_4"}
+    Fts5Store(db_path=db_path).rebuild("trigram")
+    tri = Fts5Retriever(db_path=str(db_path), tokenizer="trigram")
+    assert {h.chunk_id for h in tri.retrieve("关键词", top_k=10)} == {"chk_1", "chk_4"}
+
+
+def test_fts5_retriever_trigram_matches_short_terms_as_substrings(tmp_path: Path) -> None:
+    db_path = tmp_path / "fts.sqlite"
+    Fts5Store(db_path=db_path, tokenizer="trigram").upsert(
+        [
+            ("chk_1", "向量数据库存储嵌入"),
+            ("chk_2", "AI agents written in Go"),
+            ("chk_3", "sqlite fts5 with 100%_done"),
+        ]
+    )
+    r = Fts5Retriever(db_path=str(db_path), tokenizer="trigram")
+    assert [h.chunk_id for h in r.retrieve("向量", top_k=10)] == ["chk_1"]
+    assert [h.chunk_id for h in r.retrieve("ai", top_k=10)] == ["chk_2"]
+    # Mixed queries keep BM25 ranking from the long terms and require the short ones.
+    assert [h.chunk_id for h in r.retrieve("agents go", top_k=10)] == ["chk_2"]
+    assert r.retrieve("agents 向量", top_k=10) == []
+    # LIKE wildcards in a term are literal.
+    assert r.retrieve("n_", top_k=10) == []
+    assert [h.chunk_id for h in r.retrieve("_d", top_k=10)] == ["chk_3"]
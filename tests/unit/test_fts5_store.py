@@ -1,8 +1,10 @@
 from __future__ import annotations
 
+import sqlite3
 from pathlib import Path
 
 from src.ingestion.stages.storage.fts5 import Fts5Store
+from src.libs.interfaces.vector_store import SearchFilter
 
 
 def test_fts5_store_upsert_and_query(tmp_path: Path) -> None:
@@ -27,3 +29,79 @@ def test_fts5_store_upsert_and_query(tmp_path: Path) -> None:
     hit2_ids = {cid for cid, _ in hits2}
     assert "chk_2" not in hit2_ids
 
+
+
+def test_fts5_store_query_applies_search_filter(tmp_path: Path) -> None:
+    store = Fts5Store(db_path=tmp_path / "fts.sqlite")
+    store.upsert([("chk_1", "sqlite fts5"), ("chk_2", "sqlite fts5 bm25")], doc_id="d1", version_id="v1")
+    store.upsert([("chk_3", "sqlite fts5 again")], doc_id="d2", version_id="v2")
+
+    hits = store.query("sqlite", top_k=10, search_filter=SearchFilter(doc_ids=frozenset({"d2"})))
+    assert [cid for cid, _ in hits] == ["chk_3"]
+
+    hits = store.query("sqlite", top_k=10, search_filter=SearchFilter(exclude_version_ids=frozenset({"v2"})))
+    assert {cid for cid, _ in hits} == {"chk_1", "chk_2"}
+
+    store.delete(["chk_3"])
+    assert store.query("sqlite", top_k=10, search_filter=SearchFilter(doc_ids=frozenset({"d2"}))) == []
+
+
+def test_fts5_store_migrates_legacy_layout(tmp_path: Path) -> None:
+    db_path = tmp_path / "fts.sqlite"
+    with sqlite3.connect(db_path) as conn:
+        conn.execute("CREATE VIRTUAL TABLE chunks_fts USING fts5(chunk_id, text)")
+        conn.execute("CREATE TABLE chunk_scope (chunk_id TEXT PRIMARY KEY, doc_id TEXT, version_id TEXT)")
+        conn.executemany(
+            "INSERT INTO chunks_fts(chunk_id, text) VALUES(?, ?)",
+            [("chk_1", "legacy sqlite row"), ("chk_2", "another legacy row")],
+        )
+        conn.execute("INSERT INTO chunk_scope VALUES('chk_1', 'd1', 'v1')")
+
+    store = Fts5Store(db_path=db_path)
+    assert {cid for cid, _ in store.query("legacy", top_k=10)} == {"chk_1", "chk_2"}
+    assert [cid for cid, _ in store.query("legacy", top_k=10, search_filter=SearchFilter(doc_ids=frozenset({"d1"})))] == [
+        "chk_1"
+    ]
+
+    store.upsert([("chk_2", "rewritten text")], doc_id="d2", version_id="v2")
+    store.delete(["chk_1"])
+    assert store.query("legacy", top_k=10) == []
+    assert [cid for cid, _ in store.query("rewritten", top_k=10)] == ["chk_2"]
+    with sqlite3.connect(db_path) as conn:
+        tables = {r[0] for r in conn.execute("SELECT name FROM sqlite_master WHERE type='table'")}
+    assert "chunk_scope" not in tables and "chunks_fts_legacy" not in tables
+
+
+def test_admin_maintain_fts_index_merges_segments(tmp_path: Path) -> None:
+    from src.core.runners.admin import AdminRunner
+
+    sqlite_dir = tmp_path / "sqlite"
+    settings_path = tmp_path / "settings.yaml"
+    settings_path.write_text(f"paths:\n  sqlite_dir: {sqlite_dir.as_posix()}\n", encoding="utf-8")
+    store = Fts5Store(db_path=sqlite_dir / "fts.sqlite")
+    # Per-chunk write churn: every transaction leaves its own segment behind.
+    for i in range(30):
+        store.upsert([(f"chk_{i}", f"sqlite fts5 segment {i}")])
+        if i % 3 == 0:
+            store.delete([f"chk_{i}"])
+
+    runner = AdminRunner(settings_path=settings_path)
+    report = runner.maintain_fts_index(stats_only=True)
+    assert report.status == "noop" and report.merge_steps == 0
+    assert report.before["segments"] > 1 and report.before["rows"] == 20
+
+    res = runner.maintain_fts_index(budget_s=5.0, automerge=8)
+    assert res.status == "ok" and res.complete
+    assert res.after["segments"] == 1
+    assert res.after["automerge"] == 8
+    assert {cid for cid, _ in store.query("sqlite", top_k=50)} == {f"chk_{i}" for i in range(30) if i % 3}
+
+    # Already one segment: still runs a merge step, which reports nothing left to do.
+    again = runner.maintain_fts_index(budget_s=5.0)
+    assert again.merge_steps == 1 and again.complete and again.status == "noop"
+
+    switched = runner.maintain_fts_index(tokenizer="cjk_bigram")
+    assert switched.status == "ok"
+    assert (switched.before["tokenizer"], switched.after["tokenizer"]) == ("unicode61", "cjk_bigram")
+    assert Fts5Store(db_path=sqlite_dir / "fts.sqlite", tokenizer="trigram").tokenizer == "cjk_bigram"
+    assert runner.maintain_fts_index(tokenizer="bogus").warnings == ["invalid_tokenizer_ignored"]
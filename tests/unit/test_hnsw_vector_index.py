@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import numpy as np
+
+from src.libs.interfaces.vector_store import VectorItem
+from src.libs.providers.vector_store import HnswVectorIndex, InMemoryVectorIndex
+
+
+def _random_items(n: int, dim: int, seed: int = 0) -> list[VectorItem]:
+    rng = np.random.default_rng(seed)
+    mat = rng.normal(size=(n, dim)).astype(np.float32)
+    return [VectorItem(chunk_id=f"c{i}", vector=mat[i].tolist()) for i in range(n)]
+
+
+def test_hnsw_recall_matches_exact_scan() -> None:
+    items = _random_items(500, 16)
+    hnsw = HnswVectorIndex(persist_dir=None, M=8, ef_construction=100, ef_search=64)
+    exact = InMemoryVectorIndex()
+    hnsw.upsert(items)
+    exact.upsert(items)
+
+    queries = _random_items(20, 16, seed=1)
+    hit = 0
+    for q in queries:
+        want = {cid for cid, _ in exact.query(q.vector, top_k=10)}
+        got = hnsw.query(q.vector, top_k=10)
+        assert len(got) == 10
+        hit += len(want & {cid for cid, _ in got})
+    assert hit / (10 * len(queries)) >= 0.9
+
+
+def test_hnsw_upsert_replaces_and_delete_hides() -> None:
+    idx = HnswVectorIndex(persist_dir=None)
+    idx.upsert(
+        [
+            VectorItem(chunk_id="a", vector=[1.0, 0.0]),
+            VectorItem(chunk_id="b", vector=[0.0, 1.0]),
+        ]
+    )
+    top = idx.query([1.0, 0.0], top_k=1)
+    assert top[0][0] == "a"
+    assert abs(top[0][1] - 1.0) < 1e-6
+
+    idx.upsert([VectorItem(chunk_id="a", vector=[-1.0, 0.0])])
+    assert idx.count() == 2
+    assert idx.query([1.0, 0.0], top_k=2)[-1][0] == "a"
+
+    idx.delete(["a"])
+    assert [cid for cid, _ in idx.query([1.0, 0.0], top_k=5)] == ["b"]
+
+
+def test_hnsw_persists_graph(tmp_path: Path) -> None:
+    persist_dir = tmp_path / "chroma" / "hnsw"
+    items = _random_items(50, 8)
+    idx = HnswVectorIndex(persist_dir=str(persist_dir), M=4)
+    idx.upsert(items)
+    idx.delete(["c0"])
+    before = idx.query(items[1].vector, top_k=5)
+
+    reopened = HnswVectorIndex(persist_dir=str(persist_dir), M=4)
+    assert reopened.count() == 49
+    assert reopened.query(items[1].vector, top_k=5) == before
+    assert all(cid != "c0" for cid, _ in reopened.query(items[0].vector, top_k=10))
+
+
+def test_hnsw_appends_writes_to_a_log_until_compaction(tmp_path: Path, monkeypatch) -> None:  # type: ignore[no-untyped-def]
+    from src.libs.providers.vector_store import hnsw
+
+    persist_dir = tmp_path / "hnsw"
+    graph, log = persist_dir / "hnsw_graph.npz", persist_dir / "hnsw_graph.log"
+    items = _random_items(80, 8)
+    idx = HnswVectorIndex(persist_dir=str(persist_dir), M=4)
+    idx.upsert(items[:60])
+    snapshot = graph.stat().st_mtime_ns, graph.stat().st_size
+
+    for i in range(60, 80, 5):  # small writes only append
+        idx.upsert(items[i : i + 5])
+    idx.upsert([VectorItem(chunk_id="c3", vector=items[70].vector)])
+    idx.delete(["c7", "c61"])
+    assert (graph.stat().st_mtime_ns, graph.stat().st_size) == snapshot
+    assert log.stat().st_size > 0
+
+    reopened = HnswVectorIndex(persist_dir=str(persist_dir), M=4)
+    assert reopened.count() == idx.count() == 78
+    for q in _random_items(10, 8, seed=3):
+        assert reopened.query(q.vector, top_k=8) == idx.query(q.vector, top_k=8)
+    assert reopened._neighbors == idx._neighbors
+
+    # A torn append is ignored, and the next write folds everything into a new snapshot.
+    with open(log, "ab") as f:
+        f.write((1 << 20).to_bytes(8, "little") + b"partial")
+    torn = HnswVectorIndex(persist_dir=str(persist_dir), M=4)
+    assert torn.count() == 78
+    torn.upsert([VectorItem(chunk_id="z", vector=[1.0] * 8)])
+    assert graph.stat().st_mtime_ns != snapshot[0]
+    assert HnswVectorIndex(persist_dir=str(persist_dir), M=4).count() == 79
+
+    # Once the log outgrows the snapshot it is compacted away.
+    monkeypatch.setattr(hnsw, "_LOG_MIN_BYTES", 0)
+    writer = HnswVectorIndex(persist_dir=str(persist_dir), M=4)
+    for i in range(30):
+        writer.upsert([VectorItem(chunk_id=f"x{i}", vector=_random_items(1, 8, seed=100 + i)[0].vector)])
+    assert log.stat().st_size <= graph.stat().st_size
+    assert HnswVectorIndex(persist_dir=str(persist_dir), M=4).count() == 109
@@ -0,0 +1,97 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import numpy as np
+
+from src.core.runners.admin import AdminRunner
+from src.libs.interfaces.vector_store import VectorItem
+from src.libs.providers.vector_store import ChromaLiteVectorIndex, IvfPqVectorIndex
+
+
+def _items(n: int, dim: int, seed: int = 0, prefix: str = "c") -> list[VectorItem]:
+    rng = np.random.default_rng(seed)
+    mat = rng.normal(size=(n, dim)).astype(np.float32)
+    return [VectorItem(chunk_id=f"{prefix}{i}", vector=mat[i].tolist()) for i in range(n)]
+
+
+def test_ivf_pq_untrained_falls_back_to_exact(tmp_path: Path) -> None:
+    idx = IvfPqVectorIndex(db_path=str(tmp_path / "v.sqlite"), persist_dir=str(tmp_path / "ivf"))
+    idx.upsert([VectorItem("a", [1.0, 0.0]), VectorItem("b", [0.0, 1.0])])
+    assert not idx.is_trained
+    assert idx.query([1.0, 0.0], top_k=1)[0][0] == "a"
+
+
+def test_ivf_pq_train_query_rerank_and_reload(tmp_path: Path) -> None:
+    db = str(tmp_path / "v.sqlite")
+    items = _items(400, 32)
+    ChromaLiteVectorIndex(db_path=db).upsert(items)
+
+    idx = IvfPqVectorIndex(db_path=db, persist_dir=str(tmp_path / "ivf"), nlist=8, m=8, nprobe=4)
+    stats = idx.train()
+    assert stats["trained"] and stats["vectors"] == 400
+    assert stats["code_bytes"] == 400 * 8
+
+    exact = ChromaLiteVectorIndex(db_path=db)
+    hit = 0
+    for q in _items(10, 32, seed=3):
+        want = {cid for cid, _ in exact.query(q.vector, top_k=5)}
+        hit += len(want & {cid for cid, _ in idx.query(q.vector, top_k=5)})
+    assert hit >= 35
+
+    # Self-query with exact rerank returns the stored vector with cosine ~1.
+    top = idx.query(items[7].vector, top_k=1)
+    assert top[0][0] == "c7" and abs(top[0][1] - 1.0) < 1e-5
+
+    # Post-train writes are encoded incrementally; deletes drop codes.
+    idx.upsert([VectorItem("new", items[7].vector)])
+    idx.delete(["c7"])
+    assert idx.query(items[7].vector, top_k=1)[0][0] == "new"
+
+    reopened = IvfPqVectorIndex(db_path=db, persist_dir=str(tmp_path / "ivf"), nlist=8, m=8, nprobe=4)
+    assert reopened.is_trained
+    assert reopened.query(items[7].vector, top_k=1)[0][0] == "new"
+
+
+def test_ivf_pq_trains_from_a_sample_and_encodes_in_blocks(tmp_path: Path) -> None:
+    db = str(tmp_path / "v.sqlite")
+    items = _items(300, 16)
+    ChromaLiteVectorIndex(db_path=db).upsert(items)
+
+    idx = IvfPqVectorIndex(
+        db_path=db, persist_dir=str(tmp_path / "ivf"), nlist=4, m=4, nprobe=4, max_train_points=64, encode_block_rows=50
+    )
+    assert idx.train()["vectors"] == 300
+    assert sorted(idx._ids) == sorted(it.chunk_id for it in items)
+    # Postings partition the rows by coarse list.
+    assert sorted(np.concatenate(idx._postings).tolist()) == list(range(300))
+    for c, rows in enumerate(idx._postings):
+        assert (idx._lists[rows] == c).all()
+
+    # With every list probed the rerank is exact.
+    exact = ChromaLiteVectorIndex(db_path=db)
+    q = _items(1, 16, seed=5)[0].vector
+    assert [c for c, _ in idx.query(q, top_k=5)] == [c for c, _ in exact.query(q, top_k=5)]
+
+    idx.upsert([VectorItem("new", items[3].vector)])
+    assert idx.query(items[3].vector, top_k=2)[0][0] in {"c3", "new"}
+    assert sorted(np.concatenate(idx._postings).tolist()) == list(range(301))
+
+
+def test_admin_train_vector_index(tmp_path: Path) -> None:
+    chroma_dir = tmp_path / "data" / "chroma"
+    settings_path = tmp_path / "config" / "settings.yaml"
+    settings_path.parent.mkdir(parents=True)
+    settings_path.write_text(f"paths:\n  chroma_dir: {chroma_dir.as_posix()}\n", encoding="utf-8")
+    strategy_path = tmp_path / "strategy.yaml"
+    strategy_path.write_text(
+        "providers:\n  vector_index:\n    provider_id: vector.ivf_pq\n    params:\n      nlist: 4\n      m: 4\n",
+        encoding="utf-8",
+    )
+    ChromaLiteVectorIndex(db_path=str(chroma_dir / "chroma_lite.sqlite")).upsert(_items(50, 8))
+
+    res = AdminRunner(settings_path=settings_path).train_vector_index(strategy_config_id=str(strategy_path))
+    assert res.status == "ok"
+    assert res.provider_id == "vector.ivf_pq"
+    assert res.stats["vectors"] == 50
+    assert (chroma_dir / "ivf_pq" / "ivf_pq.npz").exists()
@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+import sqlite3
+from pathlib import Path
+
+import pytest
+
+from src.ingestion.stages.storage.near_dup import NearDupStore
+from src.ingestion.stages.transform.near_dup import MinHasher, NearDupConfig, NearDupStage, estimate_jaccard
+from src.libs.interfaces.splitter import ChunkIR
+
+_BASE = (
+    "The quarterly maintenance window starts at 02:00 UTC on the first Sunday. "
+    "All write traffic is drained to the standby region before the primary is patched, "
+    "and the runbook owner confirms replication lag is below five seconds."
+)
+
+
+def _chunk(cid: str, text: str) -> ChunkIR:
+    return ChunkIR(chunk_id=cid, section_path="s", text=text, metadata={})
+
+
+def test_minhash_estimates_similarity() -> None:
+    h = MinHasher(num_perm=128, shingle_size=5)
+    a = h.signature(_BASE)
+    near = h.signature(_BASE.replace("five", "ten"))
+    far = h.signature("Completely unrelated text about sourdough starters and hydration ratios.")
+    assert a is not None and near is not None and far is not None
+    assert estimate_jaccard(a, near) > 0.8
+    assert estimate_jaccard(a, far) < 0.2
+    assert h.signature("   ") is None
+
+
+def test_near_dup_collapse_within_version_and_flag_across_documents(tmp_path: Path) -> None:
+    store = NearDupStore(db_path=tmp_path / "near_dup.sqlite")
+    stage = NearDupStage(cfg=NearDupConfig(policy="collapse"), store=store)
+
+    first = stage.run(
+        [_chunk("a1", _BASE), _chunk("a2", "Header: ACME Corp confidential"), _chunk("a3", _BASE + " ")],
+        doc_id="d1",
+        version_id="v1",
+    )
+    assert [c.chunk_id for c in first] == ["a1", "a2"]
+
+    # A fresh stage (new process) sees the persisted LSH index. Another document's
+    # near-duplicate is kept (it needs its own vectors/FTS rows) and only flagged.
+    stage = NearDupStage(cfg=NearDupConfig(policy="collapse"), store=NearDupStore(db_path=tmp_path / "near_dup.sqlite"))
+    second = stage.run(
+        [_chunk("b1", _BASE.replace("five", "ten")), _chunk("b2", "Something new entirely, about tides.")],
+        doc_id="d2",
+        version_id="v2",
+    )
+    assert [c.chunk_id for c in second] == ["b1", "b2"]
+    assert second[0].metadata["near_dup_of"] == "a1"
+    assert store.count() == 3
+
+    # Deleting the canonical drops the audit rows of chunks collapsed into it.
+    store.delete(["a1"])
+    with sqlite3.connect(tmp_path / "near_dup.sqlite") as conn:
+        assert conn.execute("SELECT COUNT(*) FROM near_dup_collapsed").fetchone()[0] == 0
+
+
+def test_near_dup_flag_within_document_and_ignores_deleted(tmp_path: Path) -> None:
+    class _Sqlite:
+        def fetch_deleted_version_ids(self) -> list[str]:
+            return ["v_old"]
+
+    store = NearDupStore(db_path=tmp_path / "near_dup.sqlite")
+    NearDupStage(cfg=NearDupConfig(policy="flag"), store=store).run([_chunk("old", _BASE)], doc_id="d", version_id="v_old")
+
+    stage = NearDupStage(cfg=NearDupConfig(policy="flag"), store=store, sqlite=_Sqlite())  # type: ignore[arg-type]
+    out = stage.run([_chunk("c1", _BASE), _chunk("c2", _BASE + " ")], doc_id="d", version_id="v_new")
+    assert [c.chunk_id for c in out] == ["c1", "c2"]
+    assert "near_dup_of" not in out[0].metadata  # canonical lives in a deleted version
+    assert out[1].metadata["near_dup_of"] == "c1"
+    assert out[1].metadata["near_dup_score"] == pytest.approx(1.0)
+
+
+def test_near_dup_config_validation() -> None:
+    assert NearDupConfig.from_params({"policy": "flag", "bands": 32}).bands == 32
+    with pytest.raises(ValueError):
+        NearDupConfig(policy="drop")
+    with pytest.raises(ValueError):
+        NearDupConfig(num_perm=100, bands=16)
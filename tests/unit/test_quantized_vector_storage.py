@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+import sqlite3
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from src.libs.interfaces.vector_store import VectorItem
+from src.libs.providers.vector_store import ChromaLiteVectorIndex, InMemoryVectorIndex
+from src.libs.providers.vector_store.matrix import quantize
+
+
+def _items(n: int, dim: int, seed: int = 0) -> list[VectorItem]:
+    rng = np.random.default_rng(seed)
+    mat = rng.normal(size=(n, dim)).astype(np.float32)
+    return [VectorItem(chunk_id=f"c{i}", vector=mat[i].tolist()) for i in range(n)]
+
+
+def test_int8_quantize_roundtrip_is_close() -> None:
+    mat = np.random.default_rng(1).normal(size=(10, 64)).astype(np.float32)
+    codes, scales = quantize(mat, "int8")
+    assert codes.dtype == np.int8
+    assert np.abs(codes.astype(np.float32) * scales[:, None] - mat).max() <= scales.max() / 2 + 1e-6
+
+
+@pytest.mark.parametrize("dtype", ["float16", "int8"])
+def test_quantized_modes_match_exact_top_k(tmp_path: Path, dtype: str) -> None:
+    items = _items(300, 32)
+    queries = [it.vector for it in _items(10, 32, seed=7)]
+
+    exact = InMemoryVectorIndex()
+    exact.upsert(items)
+    expected = exact.query_batch(queries, top_k=5)
+
+    lite = ChromaLiteVectorIndex(db_path=str(tmp_path / f"{dtype}.sqlite"), dtype=dtype, oversample=4)
+    lite.upsert(items)
+    for g, e in zip(lite.query_batch(queries, top_k=5), expected):
+        assert [cid for cid, _ in g] == [cid for cid, _ in e]
+        # Final scores come from the exact float32 rescoring pass.
+        assert [s for _, s in g] == pytest.approx([s for _, s in e], abs=1e-5)
+
+
+def test_in_memory_index_is_float32_only_with_lazy_sign_bits() -> None:
+    # No full-precision copy to rescore from: quantized modes live in ChromaLite.
+    for dtype in ("float16", "int8"):
+        with pytest.raises(ValueError, match="chroma_lite"):
+            InMemoryVectorIndex(dtype=dtype)
+
+    idx = InMemoryVectorIndex()
+    idx.upsert(_items(64, 32))
+    assert idx._vecs.dtype == np.float32
+    assert idx._bits is None
+
+    # Sign-bit codes are built on first binary query and kept up to date afterwards.
+    q = _items(1, 32, seed=3)[0].vector
+    assert len(idx.query_binary_batch([q], top_k=3, shortlist=20)[0]) == 3
+    assert idx._bits is not None
+    idx.upsert([VectorItem(chunk_id="new", vector=q)])
+    assert idx.query_binary_batch([q], top_k=1, shortlist=20)[0][0][0] == "new"
+
+
+def test_chroma_lite_quantizes_existing_rows_on_open(tmp_path: Path) -> None:
+    db = tmp_path / "v.sqlite"
+    ChromaLiteVectorIndex(db_path=str(db)).upsert(_items(20, 16))
+
+    idx = ChromaLiteVectorIndex(db_path=str(db), dtype="int8")
+    with sqlite3.connect(db) as conn:
+        row = conn.execute("SELECT COUNT(*) FROM vectors WHERE qdtype='int8' AND length(qblob)=16").fetchone()
+    assert row[0] == 20
+
+    # Rows written later by a float32 writer are still found (quantized on the fly).
+    ChromaLiteVectorIndex(db_path=str(db)).upsert([VectorItem(chunk_id="late", vector=[1.0] * 16)])
+    assert idx.query([1.0] * 16, top_k=1)[0][0] == "late"
+
+
+def test_unknown_dtype_is_rejected(tmp_path: Path) -> None:
+    with pytest.raises(ValueError):
+        InMemoryVectorIndex(dtype="bfloat16")
+    with pytest.raises(ValueError):
+        ChromaLiteVectorIndex(db_path=str(tmp_path / "v.sqlite"), dtype="int4")
@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+from dataclasses import replace
+from pathlib import Path
+
+from src.core.query_engine.models import QueryRuntime
+from src.core.query_engine.result_cache import MemoryResultCache, SqliteResultCache, result_cache_key
+from src.core.runners import QueryRunner
+from src.ingestion.stages.storage.fts5 import Fts5Store
+from src.ingestion.stages.storage.sqlite import SqliteStore
+from src.libs.interfaces.vector_store import VectorItem
+from src.libs.providers.embedding.fake_embedder import FakeEmbedder
+from src.libs.providers.llm.fake_llm import FakeLLM
+from src.libs.providers.vector_store.chroma_retriever import ChromaDenseRetriever
+from src.libs.providers.vector_store.fts5_retriever import Fts5Retriever
+from src.libs.providers.vector_store.in_memory import InMemoryVectorIndex
+
+
+def test_memory_result_cache_lru_and_ttl() -> None:
+    cache = MemoryResultCache(max_entries=2, ttl_s=60.0)
+    cache.put("a", {"v": 1})
+    cache.put("b", {"v": 2})
+    assert cache.get("a") == {"v": 1}
+    cache.put("c", {"v": 3})  # evicts "b" (least recently used)
+    assert cache.get("b") is None
+    assert cache.get("a") == {"v": 1} and cache.get("c") == {"v": 3}
+
+    expired = MemoryResultCache(ttl_s=0.0)
+    expired.put("a", {"v": 1})
+    assert expired.get("a") is None
+
+
+def test_sqlite_result_cache_survives_new_instance(tmp_path: Path) -> None:
+    db = tmp_path / "cache" / "query_cache.sqlite"
+    SqliteResultCache(db_path=str(db)).put("k", {"content_md": "x"})
+    fresh = SqliteResultCache(db_path=str(db))
+    assert fresh.get("k") == {"content_md": "x"}
+    fresh.clear()
+    assert SqliteResultCache(db_path=str(db)).get("k") is None
+
+
+def test_query_runner_serves_repeats_from_cache_until_index_changes(tmp_path: Path) -> None:
+    sqlite = SqliteStore(db_path=tmp_path / "app.sqlite")
+    sqlite.upsert_doc_version_minimal("doc_1", "ver_1", file_sha256="h", status="indexed")
+    sqlite.upsert_chunk(
+        chunk_id="chk_1",
+        doc_id="doc_1",
+        version_id="ver_1",
+        section_id="sec_1",
+        section_path="Install",
+        chunk_index=1,
+        chunk_text="hello cached world",
+    )
+    calls: list[str] = []
+
+    class CountingEmbedder(FakeEmbedder):
+        def embed_texts(self, texts):  # type: ignore[no-untyped-def]
+            calls.extend(texts)
+            return super().embed_texts(texts)
+
+    embedder = CountingEmbedder(dim=8)
+    vec = InMemoryVectorIndex()
+    vec.upsert([VectorItem(chunk_id="chk_1", vector=FakeEmbedder(dim=8).embed_texts(["hello cached world"])[0], metadata={})])
+    runtime = QueryRuntime(
+        embedder=embedder,
+        vector_index=vec,
+        retriever=ChromaDenseRetriever(embedder=embedder, vector_index=vec, query_cache_size=0),
+        sqlite=sqlite,
+        sparse_retriever=Fts5Retriever(db_path=str(tmp_path / "fts.sqlite")),
+        llm=FakeLLM(),
+        result_cache=MemoryResultCache(),
+    )
+    runner = QueryRunner(runtime_builder=lambda _: runtime)
+
+    first = runner.run("hello cached world", strategy_config_id="local.default", top_k=3)
+    second = runner.run("  hello   cached world ", strategy_config_id="local.default", top_k=3)
+    assert len(calls) == 1
+    assert second.content_md == first.content_md
+    assert [s.chunk_id for s in second.sources] == ["chk_1"]
+    assert second.trace is not None and second.trace_id == second.trace.trace_id != first.trace_id
+    assert [s.name for s in second.trace.spans] == ["stage.query_cache"]
+    assert [e.kind for e in second.trace.spans[0].events if e.kind.startswith("query_cache.")] == ["query_cache.hit"]
+    assert second.trace.replay["ranked_chunk_ids"] == ["chk_1"]
+
+    # Different top_k is a different entry; an index write invalidates both.
+    runner.run("hello cached world", strategy_config_id="local.default", top_k=1)
+    assert len(calls) == 2
+    sqlite.set_version_status("ver_1", "indexed")
+    runner.run("hello cached world", strategy_config_id="local.default", top_k=3)
+    assert len(calls) == 3
+
+    # So do a sparse index rebuild and a runtime built from edited config files.
+    Fts5Store(db_path=tmp_path / "fts.sqlite").rebuild("trigram")
+    runner.run("hello cached world", strategy_config_id="local.default", top_k=3)
+    assert len(calls) == 4
+    runtime = replace(runtime, config_fingerprint="edited")
+    runner.run("hello cached world", strategy_config_id="local.default", top_k=3)
+    assert len(calls) == 5
+
+
+def test_result_cache_key_covers_text_norm_profile() -> None:
+    base = dict(query_hash="q", strategy_config_id="local.default", top_k=3, filters=None, index_generation=1)
+    assert result_cache_key(**base) != result_cache_key(**base, text_norm_profile_id="zh")  # type: ignore[arg-type]
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import sqlite3
 from hashlib import sha256
 from pathlib import Path
 
@@ -148,3 +149,220 @@ def test_query_runner_settings_trace_includes_rerank_profile_id(tmp_path: Path)
     assert resp.trace is not None
     assert resp.trace.providers["reranker"]["provider_id"] == "noop"
     assert resp.trace.providers["reranker"]["rerank_profile_id"] == "noop.default"
+
+
+def test_query_runner_run_batch_prefetches_dense_once(tmp_path: Path) -> None:
+    sqlite = SqliteStore(db_path=tmp_path / "app.sqlite")
+    embedder = FakeEmbedder(dim=8)
+    texts = {"chk_a": "alpha install guide", "chk_b": "beta upgrade notes"}
+    sqlite.upsert_doc_version_minimal("doc_1", "ver_1", file_sha256="h", status="indexed")
+    for i, (cid, text) in enumerate(texts.items()):
+        sqlite.upsert_chunk(
+            chunk_id=cid,
+            doc_id="doc_1",
+            version_id="ver_1",
+            section_id="sec_1",
+            section_path="Guide",
+            chunk_index=i,
+            chunk_text=text,
+        )
+
+    class CountingIndex(InMemoryVectorIndex):
+        calls: int = 0
+
+        def query_batch(self, vectors, top_k, search_filter=None):  # type: ignore[no-untyped-def]
+            CountingIndex.calls += 1
+            return super().query_batch(vectors, top_k, search_filter=search_filter)
+
+    vec = CountingIndex()
+    vec.upsert(
+        [
+            VectorItem(chunk_id=cid, vector=embedder.embed_texts([text])[0], metadata={"doc_id": "doc_1"})
+            for cid, text in texts.items()
+        ]
+    )
+    runtime = QueryRuntime(
+        embedder=embedder,
+        vector_index=vec,
+        retriever=ChromaDenseRetriever(embedder=embedder, vector_index=vec),
+        sparse_retriever=None,
+        sqlite=sqlite,
+        fusion=None,
+        reranker=None,
+        llm=None,
+    )
+    runner = QueryRunner(runtime_builder=lambda _: runtime)
+
+    responses = runner.run_batch(list(texts.values()), strategy_config_id="local.default", top_k=1)
+
+    assert CountingIndex.calls == 1
+    assert [r.sources[0].chunk_id for r in responses] == ["chk_a", "chk_b"]
+    assert len({r.trace.trace_id for r in responses if r.trace is not None}) == 2
+
+
+def test_query_runner_caches_runtime_until_config_changes(tmp_path: Path, monkeypatch) -> None:  # type: ignore[no-untyped-def]
+    from src.core.runners import query as query_mod
+
+    data_dir = tmp_path / "data"
+    settings_path = tmp_path / "config" / "settings.yaml"
+    settings_path.parent.mkdir(parents=True)
+    settings_path.write_text(
+        f"paths:\n  chroma_dir: {(data_dir / 'chroma').as_posix()}\n  sqlite_dir: {(data_dir / 'sqlite').as_posix()}\n",
+        encoding="utf-8",
+    )
+    strategy_path = tmp_path / "strategy.yaml"
+    repo_strategy = Path(__file__).resolve().parents[2] / "config" / "strategies" / "local.test.yaml"
+    strategy_path.write_text(repo_strategy.read_text(encoding="utf-8"), encoding="utf-8")
+
+    builds: list[str] = []
+    real_build = query_mod._build_query_runtime_from_settings
+
+    def counting_build(strategy_config_id: str, *, settings):  # type: ignore[no-untyped-def]
+        builds.append(strategy_config_id)
+        return real_build(strategy_config_id, settings=settings)
+
+    monkeypatch.setattr(query_mod, "_build_query_runtime_from_settings", counting_build)
+    query_mod.clear_runtime_cache()
+
+    runner = QueryRunner(settings_path=settings_path)
+    sid = str(strategy_path)
+    first = runner.run("no results expected", strategy_config_id=sid, top_k=1)
+    second = QueryRunner(settings_path=settings_path).run("still nothing", strategy_config_id=sid, top_k=1)
+    assert len(builds) == 1
+    assert second.trace is not None and first.trace is not None
+    assert second.trace.providers == first.trace.providers
+
+    strategy_path.write_text(strategy_path.read_text(encoding="utf-8") + "\n# edited\n", encoding="utf-8")
+    runner.run("after edit", strategy_config_id=sid, top_k=1)
+    assert len(builds) == 2
+
+    settings_path.write_text(settings_path.read_text(encoding="utf-8") + "# edited\n", encoding="utf-8")
+    runner.run("after settings edit", strategy_config_id=sid, top_k=1)
+    QueryRunner(settings_path=settings_path, cache_runtime=False).run("uncached", strategy_config_id=sid, top_k=1)
+    assert len(builds) == 4
+
+    # A write to the indexed corpus (e.g. ingest from another process) keeps the warm runtime.
+    with sqlite3.connect(data_dir / "sqlite" / "app.sqlite") as conn:
+        conn.execute("UPDATE store_meta SET value = value + 1 WHERE key = 'generation'")
+    runner.run("after ingest", strategy_config_id=sid, top_k=1)
+    assert len(builds) == 4
+    query_mod.clear_runtime_cache()
+
+
+def test_query_runner_retrieves_dense_and_sparse_concurrently(tmp_path: Path) -> None:
+    import time
+
+    from src.libs.interfaces.vector_store import Candidate
+
+    sqlite = SqliteStore(db_path=tmp_path / "app.sqlite")
+    embedder = FakeEmbedder(dim=8)
+    vec = InMemoryVectorIndex()
+
+    class SlowDense(ChromaDenseRetriever):
+        def retrieve(self, query, top_k, search_filter=None):  # type: ignore[no-untyped-def]
+            time.sleep(0.3)
+            return [Candidate(chunk_id="chk_d", score=1.0, source="dense")]
+
+    class SlowSparse:
+        def retrieve(self, query, top_k, search_filter=None):  # type: ignore[no-untyped-def]
+            time.sleep(0.3)
+            return [Candidate(chunk_id="chk_s", score=2.0, source="sparse")]
+
+    runtime = QueryRuntime(
+        embedder=embedder,
+        vector_index=vec,
+        retriever=SlowDense(embedder=embedder, vector_index=vec),
+        sparse_retriever=SlowSparse(),
+        sqlite=sqlite,
+        fusion=None,
+        reranker=None,
+        llm=None,
+    )
+    t0 = time.perf_counter()
+    resp = QueryRunner(runtime_builder=lambda _: runtime).run("overlap", strategy_config_id="local.default", top_k=2)
+    assert time.perf_counter() - t0 < 0.55
+
+    assert resp.trace is not None
+    spans = {s.name: s for s in resp.trace.spans}
+    assert [s.name for s in resp.trace.spans][1:3] == ["stage.retrieve_dense", "stage.retrieve_sparse"]
+    for source in ("dense", "sparse"):
+        s = spans[f"stage.retrieve_{source}"]
+        assert s.parent_span_id is None
+        events = [e for e in s.events if e.kind == "retrieval.candidates"]
+        assert [e.attrs["source"] for e in events] == [source]
+        assert [e.attrs["stage"] for e in s.events if e.kind in {"stage.start", "stage.end"}] == [f"retrieve_{source}"] * 2
+
+
+def test_query_runner_arun_awaits_async_providers(tmp_path: Path) -> None:
+    import asyncio
+    import threading
+    import time
+
+    from src.libs.interfaces.vector_store import Candidate
+
+    sqlite = SqliteStore(db_path=tmp_path / "app.sqlite")
+    sqlite.upsert_doc_version_minimal("doc_1", "ver_1", file_sha256="h", status="indexed")
+    sqlite.upsert_chunk(
+        chunk_id="chk_s",
+        doc_id="doc_1",
+        version_id="ver_1",
+        section_id="sec_1",
+        section_path="Install",
+        chunk_index=1,
+        chunk_text="async path chunk",
+    )
+    embedder = FakeEmbedder(dim=8)
+    index_threads: list[int] = []
+
+    class ThreadRecordingIndex(InMemoryVectorIndex):
+        def query(self, vector, top_k, search_filter=None):  # type: ignore[no-untyped-def]
+            index_threads.append(threading.get_ident())
+            return super().query(vector, top_k, search_filter=search_filter)
+
+    vec = ThreadRecordingIndex()
+
+    class SlowAsyncEmbedder(FakeEmbedder):
+        async def aembed_texts(self, texts):  # type: ignore[no-untyped-def]
+            await asyncio.sleep(0.3)
+            return self.embed_texts(texts)
+
+    class SlowAsyncSparse:
+        async def aretrieve(self, query, top_k, search_filter=None):  # type: ignore[no-untyped-def]
+            await asyncio.sleep(0.3)
+            return [Candidate(chunk_id="chk_s", score=2.0, source="sparse")]
+
+    class AsyncLLM(FakeLLM):
+        async def agenerate(self, mode, messages, **kwargs):  # type: ignore[no-untyped-def]
+            return self.generate(mode, messages, **kwargs)
+
+    runtime = QueryRuntime(
+        embedder=embedder,
+        vector_index=vec,
+        retriever=ChromaDenseRetriever(embedder=SlowAsyncEmbedder(dim=8), vector_index=vec),
+        sparse_retriever=SlowAsyncSparse(),
+        sqlite=sqlite,
+        fusion=None,
+        reranker=None,
+        llm=AsyncLLM(name="async-llm"),
+    )
+    runner = QueryRunner(runtime_builder=lambda _: runtime)
+    t0 = time.perf_counter()
+    resp = asyncio.run(runner.arun("async path", strategy_config_id="local.default", top_k=2))
+    assert time.perf_counter() - t0 < 0.55
+    # The index search ran on a worker thread, not on the event loop.
+    assert index_threads and threading.get_ident() not in index_threads
+
+    assert resp.trace is not None
+    assert [s.name for s in resp.trace.spans] == [
+        "stage.query_norm",
+        "stage.retrieve_dense",
+        "stage.retrieve_sparse",
+        "stage.fusion",
+        "stage.rerank",
+        "stage.context_build",
+        "stage.generate",
+        "stage.format_response",
+    ]
+    assert all(s.parent_span_id is None for s in resp.trace.spans)
+    assert resp.sources and resp.sources[0].chunk_id == "chk_s"
+    assert "[async-llm:rag]" in resp.content_md
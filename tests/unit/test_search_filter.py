@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Any, Callable
+
+import numpy as np
+import pytest
+
+from src.core.query_engine.filters import resolve_search_filter
+from src.ingestion.stages.storage.sqlite import SqliteStore
+from src.libs.interfaces.vector_store import SearchFilter, VectorItem
+from src.libs.providers.vector_store import (
+    ChromaLiteVectorIndex,
+    HnswVectorIndex,
+    InMemoryVectorIndex,
+    IvfPqVectorIndex,
+    SegmentedVectorIndex,
+)
+
+
+def _items(n: int, dim: int = 8) -> list[VectorItem]:
+    rng = np.random.default_rng(0)
+    mat = rng.normal(size=(n, dim)).astype(np.float32)
+    return [
+        VectorItem(
+            chunk_id=f"c{i}",
+            vector=mat[i].tolist(),
+            metadata={"doc_id": f"d{i % 3}", "version_id": f"v{i % 6}"},
+        )
+        for i in range(n)
+    ]
+
+
+def _ivf_pq(tmp_path: Path) -> Any:
+    idx = IvfPqVectorIndex(db_path=str(tmp_path / "v.sqlite"), persist_dir=str(tmp_path / "ivf"), nlist=4, m=4)
+    idx.upsert(_items(60))
+    idx.train()
+    return idx
+
+
+_FACTORIES: dict[str, Callable[[Path], Any]] = {
+    "in_memory": lambda p: InMemoryVectorIndex(),
+    "chroma_lite": lambda p: ChromaLiteVectorIndex(db_path=str(p / "v.sqlite")),
+    "hnsw": lambda p: HnswVectorIndex(persist_dir=str(p / "hnsw"), filter_scan_max=0),
+    "segments": lambda p: SegmentedVectorIndex(persist_dir=str(p / "seg"), tail_max_rows=16),
+    "ivf_pq": _ivf_pq,
+}
+
+
+@pytest.mark.parametrize("name", sorted(_FACTORIES))
+def test_vector_index_prefilter_keeps_top_k_full(tmp_path: Path, name: str) -> None:
+    idx = _FACTORIES[name](tmp_path)
+    idx.upsert(_items(60))
+    q = _items(60)[0].vector
+
+    hits = idx.query(q, top_k=5, search_filter=SearchFilter(doc_ids=frozenset({"d1"})))
+    assert len(hits) == 5
+    assert all(int(cid[1:]) % 3 == 1 for cid, _ in hits)
+
+    excluded = SearchFilter(exclude_version_ids=frozenset({"v0"}))
+    hits = idx.query(q, top_k=10, search_filter=excluded)
+    assert len(hits) == 10
+    assert "c0" not in {cid for cid, _ in hits}
+
+    hits = idx.query(q, top_k=5, search_filter=SearchFilter(version_ids=frozenset({"nope"})))
+    assert hits == []
+
+
+def test_resolve_search_filter_excludes_deleted_versions(tmp_path: Path) -> None:
+    sqlite = SqliteStore(db_path=tmp_path / "app.sqlite")
+    sqlite.upsert_doc_version_minimal("d1", "v1", file_sha256="h1", status="indexed")
+    sqlite.upsert_doc_version_minimal("d1", "v2", file_sha256="h2", status="indexed")
+    sqlite.mark_deleted(doc_id="d1", version_id="v1")
+
+    assert resolve_search_filter(None, sqlite=sqlite) == SearchFilter(exclude_version_ids=frozenset({"v1"}))
+    assert resolve_search_filter({"include_deleted": True}, sqlite=sqlite) is None
+
+    f = resolve_search_filter({"doc_scope": {"doc_ids": ["d1", "d2"]}, "doc_id": "d1"}, sqlite=sqlite)
+    assert f is not None
+    assert f.doc_ids == frozenset({"d1"})
+    assert f.exclude_version_ids == frozenset({"v1"})
+
+    f = resolve_search_filter({"version_id": "v2"}, sqlite=sqlite)
+    assert f == SearchFilter(version_ids=frozenset({"v2"}))
+
+    # Values without a usable id are ignored instead of matching nothing.
+    assert resolve_search_filter({"doc_id": 123, "doc_scope": [], "include_deleted": True}, sqlite=sqlite) is None
+    f = resolve_search_filter({"doc_scope": ["d1", 7], "include_deleted": True}, sqlite=sqlite)
+    assert f == SearchFilter(doc_ids=frozenset({"d1"}))
@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import numpy as np
+
+from src.libs.interfaces.vector_store import VectorItem
+from src.libs.providers.vector_store import InMemoryVectorIndex, SegmentedVectorIndex
+
+
+def _items(n: int, dim: int = 8, seed: int = 0) -> list[VectorItem]:
+    rng = np.random.default_rng(seed)
+    mat = rng.normal(size=(n, dim)).astype(np.float32)
+    return [VectorItem(chunk_id=f"c{i}", vector=mat[i].tolist()) for i in range(n)]
+
+
+def test_segments_seal_mmap_and_match_exact(tmp_path: Path) -> None:
+    items = _items(25)
+    idx = SegmentedVectorIndex(persist_dir=str(tmp_path / "seg"), tail_max_rows=10, max_segments=100)
+    for i in range(0, 25, 5):
+        idx.upsert(items[i : i + 5])
+    assert idx.count() == 25
+    assert len(list((tmp_path / "seg").glob("seg_*.norms.npy"))) == 2
+
+    exact = InMemoryVectorIndex()
+    exact.upsert(items)
+    q = _items(1, seed=9)[0].vector
+    want = exact.query(q, top_k=5)
+    got = idx.query(q, top_k=5)
+    assert [cid for cid, _ in got] == [cid for cid, _ in want]
+
+    reopened = SegmentedVectorIndex(persist_dir=str(tmp_path / "seg"), tail_max_rows=10)
+    assert isinstance(reopened._segments[reopened._order[0]].vectors, np.memmap)
+    assert [cid for cid, _ in reopened.query(q, top_k=5)] == [cid for cid, _ in want]
+
+
+def test_segments_delete_replace_and_compaction(tmp_path: Path) -> None:
+    items = _items(30)
+    idx = SegmentedVectorIndex(
+        persist_dir=str(tmp_path / "seg"),
+        tail_max_rows=5,
+        max_segments=100,
+        background_compaction=False,
+    )
+    idx.upsert(items)
+    idx.delete(["c0", "c1"])
+    idx.upsert([VectorItem(chunk_id="c2", vector=items[3].vector)])
+    assert idx.count() == 28
+    assert all(cid not in {"c0", "c1"} for cid, _ in idx.query(items[0].vector, top_k=30))
+
+    idx.compact(wait=True)
+    assert len(idx._order) == 1
+    assert idx.count() == 28
+    top = idx.query(items[3].vector, top_k=2)
+    assert {cid for cid, _ in top} == {"c2", "c3"}
+
+    # A second handle (e.g. the dashboard process) sees writes made elsewhere.
+    other = SegmentedVectorIndex(persist_dir=str(tmp_path / "seg"), tail_max_rows=5)
+    idx.delete(["c3"])
+    assert [cid for cid, _ in other.query(items[3].vector, top_k=1)] == ["c2"]
+
+
+def test_segments_background_compaction(tmp_path: Path) -> None:
+    idx = SegmentedVectorIndex(persist_dir=str(tmp_path / "seg"), tail_max_rows=2, max_segments=2)
+    items = _items(12)
+    for it in items:
+        idx.upsert([it])
+    idx.wait_for_compaction(timeout=10)
+    assert idx.count() == 12
+    assert len(idx._order) <= 3
+    assert idx.query(items[5].vector, top_k=1)[0][0] == "c5"
+
+
+def test_segments_merge_size_tiered_and_retire_files_after_grace(tmp_path: Path) -> None:
+    seg_dir = tmp_path / "seg"
+    idx = SegmentedVectorIndex(
+        persist_dir=str(seg_dir),
+        tail_max_rows=2,
+        max_segments=100,
+        merge_factor=2,
+        background_compaction=False,
+    )
+    reader = SegmentedVectorIndex(persist_dir=str(seg_dir), tail_max_rows=2)
+    items = _items(16)
+    for i in range(0, 8, 2):
+        idx.upsert(items[i : i + 2])
+    # 2+2 -> 4, 2+2 -> 4, then 4+4 -> 8: one segment, each row rewritten log2(4) times.
+    assert [len(idx._segments[sid].ids) for sid in idx._order] == [8]
+    retired = [sid for sid, _ in idx._retired]
+    assert len(retired) == 6
+    # Superseded files survive the grace period, so a reader on the old manifest can still open them.
+    assert all(idx._seg_path(sid, ".npy").exists() for sid in retired)
+    assert reader.count() == 8
+
+    for i in range(8, 12, 2):
+        idx.upsert(items[i : i + 2])
+    # Only the small tier merges; the 8-row segment is not rewritten.
+    assert [len(idx._segments[sid].ids) for sid in idx._order] == [8, 4]
+
+    idx.retire_grace_s = 0.0
+    idx.delete(["c0"])
+    assert not idx._retired
+    assert len(list(seg_dir.glob("seg_*.norms.npy"))) == 2
+    reopened = SegmentedVectorIndex(persist_dir=str(seg_dir), tail_max_rows=2)
+    assert reopened.count() == 11
+    assert reopened.query(items[9].vector, top_k=1)[0][0] == "c9"
@@ -0,0 +1,46 @@
+from __future__ import annotations
+
+from src.libs.providers.embedding.sentence_transformer import SentenceTransformerEmbedder
+
+
+class _FakeModel:
+    max_seq_length = 0
+
+    def __init__(self) -> None:
+        self.batches: list[list[str]] = []
+
+    def encode(self, texts, **kwargs):  # type: ignore[no-untyped-def]
+        assert kwargs["batch_size"] == len(texts)
+        self.batches.append(list(texts))
+        return [[float(len(t)), 1.0] for t in texts]
+
+
+def test_sentence_transformer_embedder_buckets_by_length_and_keeps_order(monkeypatch) -> None:  # type: ignore[no-untyped-def]
+    model = _FakeModel()
+    loads: list[tuple] = []
+
+    def load(*args):  # type: ignore[no-untyped-def]
+        loads.append(args)
+        return model
+
+    monkeypatch.setattr(SentenceTransformerEmbedder, "_load_model_cached", staticmethod(load))
+    texts = ["x" * 400, "a", "b" * 8, "y" * 399, "c" * 16, "d" * 30]
+    emb = SentenceTransformerEmbedder(model_name="dummy", batch_size=3, max_batch_tokens=220)
+
+    assert emb.embed_texts(texts) == [[float(len(t)), 1.0] for t in texts]
+    # The two long texts share a bucket (2 x 101 tokens); short ones are not padded up to them.
+    assert model.batches == [["x" * 400, "y" * 399], ["d" * 30, "c" * 16, "b" * 8], ["a"]]
+    # The truncation length is part of the model cache key, never set on a shared model per call.
+    assert {args[-1] for args in loads} == {512}
+    assert model.max_seq_length == 0
+    assert emb.embed_texts([]) == []
+
+
+def test_sentence_transformer_embedder_requires_model_name() -> None:
+    emb = SentenceTransformerEmbedder(model_name=" ")
+    try:
+        emb.embed_texts(["x"])
+    except ValueError as e:
+        assert "model_name" in str(e)
+    else:
+        raise AssertionError("expected ValueError")
@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Any, Callable
+
+import numpy as np
+import pytest
+
+from src.libs.interfaces.vector_store import VectorItem
+from src.libs.providers.embedding.fake_embedder import FakeEmbedder
+from src.libs.providers.vector_store import (
+    ChromaLiteVectorIndex,
+    HnswVectorIndex,
+    InMemoryVectorIndex,
+    IvfPqVectorIndex,
+    SegmentedVectorIndex,
+)
+from src.libs.providers.vector_store import matrix
+from src.libs.providers.vector_store.chroma_retriever import ChromaDenseRetriever
+
+_FACTORIES: dict[str, Callable[[Path], Any]] = {
+    "in_memory": lambda p: InMemoryVectorIndex(),
+    "chroma_lite": lambda p: ChromaLiteVectorIndex(db_path=str(p / "v.sqlite")),
+    "hnsw": lambda p: HnswVectorIndex(persist_dir=None),
+    "segments": lambda p: SegmentedVectorIndex(persist_dir=str(p / "seg"), tail_max_rows=16),
+    "ivf_pq": lambda p: IvfPqVectorIndex(db_path=str(p / "v.sqlite"), persist_dir=None),
+}
+
+
+@pytest.mark.parametrize("name", sorted(_FACTORIES))
+def test_query_batch_matches_single_queries(tmp_path: Path, name: str) -> None:
+    rng = np.random.default_rng(3)
+    mat = rng.normal(size=(40, 8)).astype(np.float32)
+    idx = _FACTORIES[name](tmp_path)
+    idx.upsert([VectorItem(chunk_id=f"c{i}", vector=mat[i].tolist()) for i in range(40)])
+
+    queries = rng.normal(size=(5, 8)).astype(np.float32).tolist()
+    batch = idx.query_batch(queries, top_k=4)
+    assert len(batch) == 5
+    for q, hits in zip(queries, batch):
+        single = idx.query(q, top_k=4)
+        assert [cid for cid, _ in hits] == [cid for cid, _ in single]
+        assert [s for _, s in hits] == pytest.approx([s for _, s in single], abs=1e-5)
+
+    assert idx.query_batch([], top_k=4) == []
+    assert idx.query_batch(queries[:2], top_k=0) == [[], []]
+
+
+@pytest.mark.parametrize(
+    "name,make",
+    [
+        ("in_memory", lambda p: InMemoryVectorIndex()),
+        ("chroma_lite", lambda p: ChromaLiteVectorIndex(db_path=str(p / "v.sqlite"), matrix_cache=False)),
+        ("chroma_lite_int8", lambda p: ChromaLiteVectorIndex(db_path=str(p / "q.sqlite"), dtype="int8")),
+        ("segments", lambda p: SegmentedVectorIndex(persist_dir=str(p / "seg"), tail_max_rows=16)),
+    ],
+)
+def test_query_batch_scores_in_bounded_query_blocks(tmp_path: Path, monkeypatch, name: str, make) -> None:  # type: ignore[no-untyped-def]
+    rng = np.random.default_rng(5)
+    mat = rng.normal(size=(40, 8)).astype(np.float32)
+    idx = make(tmp_path)
+    idx.upsert([VectorItem(chunk_id=f"c{i}", vector=mat[i].tolist()) for i in range(40)])
+    queries = rng.normal(size=(7, 8)).astype(np.float32).tolist()
+    expected = idx.query_batch(queries, top_k=3)
+
+    # At most two queries' worth of score cells per block.
+    monkeypatch.setattr(matrix, "SCORE_BLOCK_CELLS", 80)
+    assert [s.stop - s.start for s in matrix.query_blocks(7, 40)] == [2, 2, 2, 2]
+    chunked = idx.query_batch(queries, top_k=3)
+    assert [[cid for cid, _ in hits] for hits in chunked] == [[cid for cid, _ in hits] for hits in expected]
+    for hits, want in zip(chunked, expected):
+        assert [sc for _, sc in hits] == pytest.approx([sc for _, sc in want], abs=1e-5)
+
+
+def test_dense_retriever_retrieve_batch(tmp_path: Path) -> None:
+    embedder = FakeEmbedder(dim=8)
+    index = ChromaLiteVectorIndex(db_path=str(tmp_path / "v.sqlite"))
+    texts = ["alpha", "beta", "gamma"]
+    vecs = embedder.embed_texts(texts)
+    index.upsert([VectorItem(chunk_id=f"chk_{t}", vector=v) for t, v in zip(texts, vecs)])
+
+    retriever = ChromaDenseRetriever(embedder=embedder, vector_index=index)
+    out = retriever.retrieve_batch(["gamma", "  ", "alpha"], top_k=1)
+    assert [[c.chunk_id for c in hits] for hits in out] == [["chk_gamma"], [], ["chk_alpha"]]